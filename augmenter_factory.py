@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+由配置创建增强器
+GUI（包括预览）、性能基准测试和确定性校验工具都通过create_augmenter()创建增强器，
+保证基准测试和校验的对象与GUI实际使用的增强器及参数完全一致。
+"""
+
+
+# 支持的增强器名称（imgaug.augmenters中的类名）
+SUPPORTED_AUGMENTERS = (
+    # 几何变换
+    "Affine", "Rotate", "Scale", "Translate", "Shear", "Resize",
+    "PerspectiveTransform", "ElasticTransformation",
+    # 颜色变换
+    "AddToBrightness", "MultiplyBrightness", "AddToHue", "AddToSaturation",
+    "Grayscale", "ChangeColorTemperature", "Posterize",
+    # 模糊和噪声
+    "GaussianBlur", "AverageBlur", "MedianBlur", "MotionBlur",
+    "AdditiveGaussianNoise", "AdditivePoissonNoise", "SaltAndPepper",
+    # 对比度和锐化
+    "ContrastNormalization", "HistogramEqualization", "CLAHE", "Sharpen", "Emboss",
+    # 天气效果
+    "Clouds", "Rain", "Snowflakes", "Fog",
+    # 边缘和纹理
+    "Canny", "DirectedEdgeDetect", "FrequencyNoiseAlpha", "SimplexNoiseAlpha",
+)
+
+
+def create_augmenter(aug_name, params):
+    """
+    按名称和配置参数创建增强器
+    参数原样传给增强器（JSON中的列表不转换为元组），与GUI的行为一致。
+    Args:
+        aug_name: 增强器名称
+        params: 配置文件中的参数字典
+    Returns:
+        增强器
+    Raises:
+        ValueError: 不支持的增强器名称
+        增强器构造失败（例如参数无效）时抛出的异常
+    """
+    if aug_name not in SUPPORTED_AUGMENTERS:
+        raise ValueError(f"未知的增强器 {aug_name}")
+
+    # 延迟导入imgaug，GUI启动时不需要加载
+    import imgaug.augmenters as iaa
+
+    if aug_name == "CLAHE":
+        # 配置中的tile_grid_size不是CLAHE的参数，只使用clip_limit
+        return iaa.CLAHE(clip_limit=params.get("clip_limit", (1, 4)))
+    return getattr(iaa, aug_name)(**params)
@@ -21,6 +21,12 @@ from datetime import datetime
 sys.path.append(os.path.join(os.path.dirname(__file__), 'pkg'))
 import imgaug as ia
 import imgaug.augmenters as iaa
+from imgaug import multicore
+from imgaug.augmentables.batches import UnnormalizedBatch
+
+from augmenter_factory import SUPPORTED_AUGMENTERS, create_augmenter
+from batch_manifest import BatchManifest
+from image_discovery import FILE_LIST_CACHE_FILENAME, ImageFileScanner
 
 class BatchImageAugmentation:
     def __init__(self, root):
@@ -204,6 +210,10 @@ class BatchImageAugmentation:
         self.keep_size_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(param_frame, text="保持原始尺寸", variable=self.keep_size_var).grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=2)
         
+        # 包含子文件夹中的图像
+        self.recursive_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(param_frame, text="包含子文件夹", variable=self.recursive_var).grid(row=3, column=0, columnspan=2, sticky=tk.W, pady=2)
+        
     def create_control_frame(self, parent):
         """创建控制按钮框架"""
         control_frame = ttk.Frame(parent)
@@ -270,79 +280,12 @@ class BatchImageAugmentation:
         augmenters = []
         
         for aug_name, config in selected_augmenters:
+            if aug_name not in SUPPORTED_AUGMENTERS:
+                self.log_message(f"警告: 未知的增强器 {aug_name}")
+                continue
+                
             try:
-                if aug_name == "Affine":
-                    aug = iaa.Affine(**config["params"])
-                elif aug_name == "Rotate":
-                    aug = iaa.Rotate(**config["params"])
-                elif aug_name == "Scale":
-                    aug = iaa.Scale(**config["params"])
-                elif aug_name == "Translate":
-                    aug = iaa.Translate(**config["params"])
-                elif aug_name == "Shear":
-                    aug = iaa.Shear(**config["params"])
-                elif aug_name == "PerspectiveTransform":
-                    aug = iaa.PerspectiveTransform(**config["params"])
-                elif aug_name == "ElasticTransformation":
-                    aug = iaa.ElasticTransformation(**config["params"])
-                elif aug_name == "AddToBrightness":
-                    aug = iaa.AddToBrightness(**config["params"])
-                elif aug_name == "MultiplyBrightness":
-                    aug = iaa.MultiplyBrightness(**config["params"])
-                elif aug_name == "AddToHue":
-                    aug = iaa.AddToHue(**config["params"])
-                elif aug_name == "AddToSaturation":
-                    aug = iaa.AddToSaturation(**config["params"])
-                elif aug_name == "Grayscale":
-                    aug = iaa.Grayscale(**config["params"])
-                elif aug_name == "ChangeColorTemperature":
-                    aug = iaa.ChangeColorTemperature(**config["params"])
-                elif aug_name == "Posterize":
-                    aug = iaa.Posterize(**config["params"])
-                elif aug_name == "GaussianBlur":
-                    aug = iaa.GaussianBlur(**config["params"])
-                elif aug_name == "AverageBlur":
-                    aug = iaa.AverageBlur(**config["params"])
-                elif aug_name == "MedianBlur":
-                    aug = iaa.MedianBlur(**config["params"])
-                elif aug_name == "MotionBlur":
-                    aug = iaa.MotionBlur(**config["params"])
-                elif aug_name == "AdditiveGaussianNoise":
-                    aug = iaa.AdditiveGaussianNoise(**config["params"])
-                elif aug_name == "AdditivePoissonNoise":
-                    aug = iaa.AdditivePoissonNoise(**config["params"])
-                elif aug_name == "SaltAndPepper":
-                    aug = iaa.SaltAndPepper(**config["params"])
-                elif aug_name == "ContrastNormalization":
-                    aug = iaa.ContrastNormalization(**config["params"])
-                elif aug_name == "HistogramEqualization":
-                    aug = iaa.HistogramEqualization(**config["params"])
-                elif aug_name == "CLAHE":
-                    aug = iaa.CLAHE(**config["params"])
-                elif aug_name == "Sharpen":
-                    aug = iaa.Sharpen(**config["params"])
-                elif aug_name == "Emboss":
-                    aug = iaa.Emboss(**config["params"])
-                elif aug_name == "Clouds":
-                    aug = iaa.Clouds(**config["params"])
-                elif aug_name == "Rain":
-                    aug = iaa.Rain(**config["params"])
-                elif aug_name == "Snowflakes":
-                    aug = iaa.Snowflakes(**config["params"])
-                elif aug_name == "Fog":
-                    aug = iaa.Fog(**config["params"])
-                elif aug_name == "Canny":
-                    aug = iaa.Canny(**config["params"])
-                elif aug_name == "DirectedEdgeDetect":
-                    aug = iaa.DirectedEdgeDetect(**config["params"])
-                elif aug_name == "FrequencyNoiseAlpha":
-                    aug = iaa.FrequencyNoiseAlpha(**config["params"])
-                elif aug_name == "SimplexNoiseAlpha":
-                    aug = iaa.SimplexNoiseAlpha(**config["params"])
-                else:
-                    self.log_message(f"警告: 未知的增强器 {aug_name}")
-                    continue
-                    
+                aug = create_augmenter(aug_name, config["params"])
                 augmenters.append(aug)
                 self.log_message(f"添加增强器: {aug_name}")
                 
@@ -375,6 +318,11 @@ class BatchImageAugmentation:
         thread.daemon = True
         thread.start()
         
+    def update_progress(self, processed_operations, scanner, augmentation_count):
+        """更新进度条；输入文件夹扫描完成前图像总数未知，暂不更新"""
+        if scanner.total:
+            self.progress_var.set(processed_operations / (scanner.total * augmentation_count) * 100)
+            
     def stop_processing(self):
         """停止处理"""
         self.is_processing = False
@@ -384,6 +332,7 @@ class BatchImageAugmentation:
         
     def process_images(self, selected_augmenters):
         """处理图像"""
+        manifest = None
         try:
             # 创建增强器管道
             augmenters = self.create_augmenter_pipeline(selected_augmenters)
@@ -402,26 +351,41 @@ class BatchImageAugmentation:
             output_path = Path(self.output_folder.get())
             output_path.mkdir(exist_ok=True)
             
-            # 支持的图像格式
-            image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif'}
-            image_files = [f for f in input_path.iterdir() 
-                          if f.is_file() and f.suffix.lower() in image_extensions]
+            # 在后台扫描输入文件夹，找到第一张图像即开始处理；
+            # 文件列表缓存在输出文件夹中，目录未变化时重新运行不再扫描；
+            # 输出文件夹位于输入文件夹中时跳过，不把输出当作输入
+            scanner = ImageFileScanner(input_path, recursive=self.recursive_var.get(),
+                                       cache_path=output_path / FILE_LIST_CACHE_FILENAME,
+                                       exclude=[output_path])
             
-            if not image_files:
-                self.log_message("错误: 输入文件夹中没有找到图像文件")
-                return
-                
-            self.log_message(f"找到 {len(image_files)} 个图像文件")
-            
-            total_operations = len(image_files) * self.augmentation_count.get()
+            augmentation_count = self.augmentation_count.get()
             processed_operations = 0
+            skipped_files = 0
+            
+            # 输出文件夹中的清单记录已完成的工作，重新运行时跳过未变化的文件
+            manifest_config = {
+                "augmenters": [[aug_name, config["params"]]
+                               for aug_name, config in selected_augmenters],
+                "seed": self.seed_var.get(),
+                "count": augmentation_count,
+                "seed_scheme": "sample_variant",
+                "output_format": "source"
+            }
+            manifest = BatchManifest(output_path, manifest_config, source_root=input_path)
             
             # 处理每个图像文件
-            for i, image_file in enumerate(image_files):
+            for i, image_file in enumerate(map(Path, scanner)):
                 if not self.is_processing:
                     break
                     
                 try:
+                    entry = manifest.start(image_file)
+                    if manifest.is_complete(entry):
+                        skipped_files += 1
+                        processed_operations += augmentation_count
+                        self.update_progress(processed_operations, scanner, augmentation_count)
+                        continue
+                        
                     # 读取图像
                     image = cv2.imread(str(image_file))
                     if image is None:
@@ -431,31 +395,48 @@ class BatchImageAugmentation:
                     # 转换为RGB
                     image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
                     
-                    # 创建输出文件夹
-                    output_subdir = output_path / image_file.stem
-                    output_subdir.mkdir(exist_ok=True)
+                    # 创建输出文件夹（子文件夹中的图像保留相对路径）
+                    output_subdir = output_path / Path(os.path.relpath(image_file, input_path)).parent / image_file.stem
+                    output_subdir.mkdir(parents=True, exist_ok=True)
                     
                     # 保存原始图像
-                    original_output = output_subdir / f"{image_file.stem}_original{image_file.suffix}"
-                    cv2.imwrite(str(original_output), image)
+                    if not entry.has_variant("original"):
+                        original_output = output_subdir / f"{image_file.stem}_original{image_file.suffix}"
+                        if cv2.imwrite(str(original_output), image):
+                            manifest.record_variant(entry, "original", [original_output])
                     
                     # 生成增强图像
-                    for j in range(self.augmentation_count.get()):
+                    # 每个副本的种子由基础种子、源文件内容哈希和副本序号派生
+                    # （与multicore.Pool(seed_per_sample=True)相同），结果与处理顺序、
+                    # 副本数量以及任务如何分到多台机器无关；中断后只增强尚未保存的副本
+                    missing_variants = [j for j in range(augmentation_count)
+                                        if not entry.has_variant(j)]
+                    processed_operations += augmentation_count - len(missing_variants)
+                    augmented_images = []
+                    try:
+                        if missing_variants:
+                            batch = UnnormalizedBatch(
+                                images=[image_rgb] * len(missing_variants),
+                                data=[(entry.source_hash, j) for j in missing_variants])
+                            augmented_images = multicore.augment_batch_by_sample_seeds_(
+                                pipeline, batch, self.seed_var.get()).images_aug
+                    except Exception as e:
+                        self.log_message(f"错误: 增强图像 {image_file.name} 失败: {str(e)}")
+                        continue
+                        
+                    for j, augmented_image in zip(missing_variants, augmented_images):
                         if not self.is_processing:
                             break
                             
                         try:
-                            # 应用增强
-                            augmented_image = pipeline.augment_image(image_rgb)
-                            
                             # 转换回BGR并保存
                             augmented_bgr = cv2.cvtColor(augmented_image, cv2.COLOR_RGB2BGR)
                             output_file = output_subdir / f"{image_file.stem}_aug_{j+1:02d}{image_file.suffix}"
-                            cv2.imwrite(str(output_file), augmented_bgr)
+                            if cv2.imwrite(str(output_file), augmented_bgr):
+                                manifest.record_variant(entry, j, [output_file])
                             
                             processed_operations += 1
-                            progress = (processed_operations / total_operations) * 100
-                            self.progress_var.set(progress)
+                            self.update_progress(processed_operations, scanner, augmentation_count)
                             
                             # 更新状态
                             self.status_label.config(text=f"处理中: {image_file.name} ({j+1}/{self.augmentation_count.get()})")
@@ -463,13 +444,24 @@ class BatchImageAugmentation:
                         except Exception as e:
                             self.log_message(f"错误: 增强图像 {image_file.name} 第 {j+1} 次失败: {str(e)}")
                             
+                    if entry.has_variant("original") and all(
+                            entry.has_variant(j) for j in range(augmentation_count)):
+                        manifest.finish(entry)
+                            
                 except Exception as e:
                     self.log_message(f"错误: 处理图像 {image_file.name} 失败: {str(e)}")
                     
+            if scanner.nb_found == 0:
+                self.log_message("错误: 输入文件夹中没有找到图像文件")
+                return
+                
+            if skipped_files:
+                self.log_message(f"跳过 {skipped_files} 个已完成的文件")
+                
             if self.is_processing:
-                self.log_message(f"处理完成! 共处理 {len(image_files)} 个文件，生成 {processed_operations} 个增强图像")
+                self.log_message(f"处理完成! 共处理 {scanner.nb_found} 个文件，生成 {processed_operations} 个增强图像")
                 self.status_label.config(text="处理完成")
-                messagebox.showinfo("完成", f"批量增强完成!\n共处理 {len(image_files)} 个文件\n生成 {processed_operations} 个增强图像")
+                messagebox.showinfo("完成", f"批量增强完成!\n共处理 {scanner.nb_found} 个文件\n生成 {processed_operations} 个增强图像")
             else:
                 self.log_message("处理已停止")
                 
@@ -478,6 +470,8 @@ class BatchImageAugmentation:
             messagebox.showerror("错误", f"处理过程中发生错误:\n{str(e)}")
             
         finally:
+            if manifest is not None:
+                manifest.close()
             self.is_processing = False
             self.process_btn.config(state=tk.NORMAL)
             self.stop_btn.config(state=tk.DISABLED)
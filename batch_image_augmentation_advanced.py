@@ -15,9 +15,16 @@ import numpy as np
 import cv2
 from PIL import Image, ImageTk
 import json
+import queue
 from datetime import datetime
 import traceback
 
+from augmenter_factory import SUPPORTED_AUGMENTERS, create_augmenter
+from batch_manifest import BatchManifest
+from image_discovery import FILE_LIST_CACHE_FILENAME, ImageFileScanner, find_first_image_file
+from preview_engine import PreviewEngine
+from sharded_output import ShardWriter, make_key
+
 # 添加imgaug库路径
 sys.path.append(os.path.join(os.path.dirname(__file__), 'pkg'))
 
@@ -54,6 +61,9 @@ class AdvancedBatchImageAugmentation:
         self.config_file = "config.json"
         self.config = self.load_config()
         self.augmenters_config = {}
+        self.preview_engine = None
+        # 预览管道在工作线程中创建，其日志消息由界面线程从该队列取出后写入日志
+        self.preview_log_queue = queue.Queue()
         
         # 设置主题颜色
         self.set_theme()
@@ -238,6 +248,11 @@ class AdvancedBatchImageAugmentation:
         file_menu.add_separator()
         file_menu.add_command(label="退出", command=self.root.quit)
         
+        # 工具菜单
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="工具", menu=tools_menu)
+        tools_menu.add_command(label="JPEG压缩扫描", command=self.preview_jpeg_quality_sweep)
+        
         # 帮助菜单
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="帮助", menu=help_menu)
@@ -599,6 +614,20 @@ class AdvancedBatchImageAugmentation:
         format_combo = ttk.Combobox(param_frame, textvariable=self.output_format, values=["png", "jpg", "bmp", "tiff"], width=10)
         format_combo.grid(row=3, column=1, sticky=tk.W, padx=5, pady=2)
         
+        # 性能分析（记录每个增强器的耗时和内存分配）
+        self.profiling_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(param_frame, text="性能分析（记录各增强器耗时）", variable=self.profiling_var).grid(row=4, column=0, columnspan=2, sticky=tk.W, pady=2)
+        
+        # 输出容器：每个变体一个文件，或写入tar分片（WebDataset布局，避免大量小文件）
+        self.output_container = tk.StringVar(value="files")
+        ttk.Label(param_frame, text="输出容器:").grid(row=5, column=0, sticky=tk.W, pady=2)
+        container_combo = ttk.Combobox(param_frame, textvariable=self.output_container, values=["files", "tar"], width=10, state="readonly")
+        container_combo.grid(row=5, column=1, sticky=tk.W, padx=5, pady=2)
+        
+        # 包含子文件夹中的图像
+        self.recursive_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(param_frame, text="包含子文件夹", variable=self.recursive_var).grid(row=6, column=0, columnspan=2, sticky=tk.W, pady=2)
+        
     def create_control_frame(self, parent):
         """创建控制按钮框架"""
         control_frame = ttk.Frame(parent)
@@ -673,6 +702,15 @@ class AdvancedBatchImageAugmentation:
         self.log_text.see(tk.END)
         self.root.update_idletasks()
         
+    def flush_preview_log(self):
+        """在界面线程中写入预览管道创建时的日志消息"""
+        while True:
+            try:
+                message = self.preview_log_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.log_message(message)
+        
     def clear_log(self):
         """清空日志"""
         self.log_text.delete(1.0, tk.END)
@@ -685,88 +723,28 @@ class AdvancedBatchImageAugmentation:
                 selected.append((aug_name, config))
         return selected
         
-    def create_augmenter_pipeline(self, selected_augmenters):
-        """创建增强器管道"""
-        # 延迟导入imgaug
-        ia, iaa = _lazy_import_imgaug()
-        
+    def create_augmenter_pipeline(self, selected_augmenters, log=None):
+        """
+        创建增强器管道
+        Args:
+            selected_augmenters: [(名称, {"params": 参数, ...}), ...]
+            log: 记录消息的函数，默认为self.log_message
+        """
+        log = log or self.log_message
         augmenters = []
         
         for aug_name, config in selected_augmenters:
+            if aug_name not in SUPPORTED_AUGMENTERS:
+                log(f"警告: 未知的增强器 {aug_name}")
+                continue
+                
             try:
-                if aug_name == "Affine":
-                    aug = iaa.Affine(**config["params"])
-                elif aug_name == "Rotate":
-                    aug = iaa.Rotate(**config["params"])
-                elif aug_name == "Resize":
-                    aug = iaa.Resize(**config["params"])
-                elif aug_name == "PerspectiveTransform":
-                    aug = iaa.PerspectiveTransform(**config["params"])
-                elif aug_name == "ElasticTransformation":
-                    aug = iaa.ElasticTransformation(**config["params"])
-                elif aug_name == "AddToBrightness":
-                    aug = iaa.AddToBrightness(**config["params"])
-                elif aug_name == "MultiplyBrightness":
-                    aug = iaa.MultiplyBrightness(**config["params"])
-                elif aug_name == "AddToHue":
-                    aug = iaa.AddToHue(**config["params"])
-                elif aug_name == "AddToSaturation":
-                    aug = iaa.AddToSaturation(**config["params"])
-                elif aug_name == "Grayscale":
-                    aug = iaa.Grayscale(**config["params"])
-                elif aug_name == "ChangeColorTemperature":
-                    aug = iaa.ChangeColorTemperature(**config["params"])
-                elif aug_name == "Posterize":
-                    aug = iaa.Posterize(**config["params"])
-                elif aug_name == "GaussianBlur":
-                    aug = iaa.GaussianBlur(**config["params"])
-                elif aug_name == "AverageBlur":
-                    aug = iaa.AverageBlur(**config["params"])
-                elif aug_name == "MedianBlur":
-                    aug = iaa.MedianBlur(**config["params"])
-                elif aug_name == "MotionBlur":
-                    aug = iaa.MotionBlur(**config["params"])
-                elif aug_name == "AdditiveGaussianNoise":
-                    aug = iaa.AdditiveGaussianNoise(**config["params"])
-                elif aug_name == "AdditivePoissonNoise":
-                    aug = iaa.AdditivePoissonNoise(**config["params"])
-                elif aug_name == "SaltAndPepper":
-                    aug = iaa.SaltAndPepper(**config["params"])
-                elif aug_name == "ContrastNormalization":
-                    aug = iaa.ContrastNormalization(**config["params"])
-                elif aug_name == "HistogramEqualization":
-                    aug = iaa.HistogramEqualization(**config["params"])
-                elif aug_name == "CLAHE":
-                    aug = iaa.CLAHE(clip_limit=config["params"].get("clip_limit", (1, 4)))
-                elif aug_name == "Sharpen":
-                    aug = iaa.Sharpen(**config["params"])
-                elif aug_name == "Emboss":
-                    aug = iaa.Emboss(**config["params"])
-                elif aug_name == "Clouds":
-                    aug = iaa.Clouds(**config["params"])
-                elif aug_name == "Rain":
-                    aug = iaa.Rain(**config["params"])
-                elif aug_name == "Snowflakes":
-                    aug = iaa.Snowflakes(**config["params"])
-                elif aug_name == "Fog":
-                    aug = iaa.Fog(**config["params"])
-                elif aug_name == "Canny":
-                    aug = iaa.Canny(**config["params"])
-                elif aug_name == "DirectedEdgeDetect":
-                    aug = iaa.DirectedEdgeDetect(**config["params"])
-                elif aug_name == "FrequencyNoiseAlpha":
-                    aug = iaa.FrequencyNoiseAlpha(**config["params"])
-                elif aug_name == "SimplexNoiseAlpha":
-                    aug = iaa.SimplexNoiseAlpha(**config["params"])
-                else:
-                    self.log_message(f"警告: 未知的增强器 {aug_name}")
-                    continue
-                    
+                aug = create_augmenter(aug_name, config["params"])
                 augmenters.append(aug)
-                self.log_message(f"添加增强器: {aug_name}")
+                log(f"添加增强器: {aug_name}")
                 
             except Exception as e:
-                self.log_message(f"错误: 创建增强器 {aug_name} 失败: {str(e)}")
+                log(f"错误: 创建增强器 {aug_name} 失败: {str(e)}")
                 
         return augmenters
         
@@ -786,100 +764,138 @@ class AdvancedBatchImageAugmentation:
         
     def create_preview_window(self, selected_augmenters):
         """创建预览窗口"""
+        # 获取第一张图片进行预览
+        image_file = find_first_image_file(self.input_folder.get(), recursive=self.recursive_var.get(),
+                                           exclude=[self.output_folder.get()] if self.output_folder.get() else [])
+        if image_file is None:
+            messagebox.showerror("错误", "输入文件夹中没有找到图像文件")
+            return
+        image_file = Path(image_file)
+        
+        # 预览引擎缓存缩小解码的图像和增强管道，重复预览时不再读取原图和重建管道
+        if self.preview_engine is None:
+            # 管道在工作线程中创建，不能直接操作Tk控件，日志消息先放入队列
+            self.preview_engine = PreviewEngine(
+                lambda selected: self.create_augmenter_pipeline(selected, log=self.preview_log_queue.put))
+        
         preview_window = tk.Toplevel(self.root)
         preview_window.title("增强效果预览")
-        preview_window.geometry("800x600")
+        preview_window.geometry("1000x600")
         
-        # 获取第一张图片进行预览
-        input_path = Path(self.input_folder.get())
-        image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif'}
-        image_files = [f for f in input_path.iterdir() 
-                      if f.is_file() and f.suffix.lower() in image_extensions]
+        frame = ttk.Frame(preview_window, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        ttk.Label(frame, text=f"预览: {image_file.name}", font=("Arial", 12, "bold")).pack(pady=10)
         
-        if not image_files:
+        # 图像显示框架
+        image_frame = ttk.Frame(frame)
+        image_frame.pack(fill=tk.BOTH, expand=True)
+        original_frame = ttk.LabelFrame(image_frame, text="原图")
+        original_frame.pack(side=tk.LEFT, fill=tk.BOTH, padx=5)
+        augmented_frame = ttk.LabelFrame(image_frame, text=f"增强后（{self.preview_engine.nb_variants}个变体）")
+        augmented_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5)
+        original_label = ttk.Label(original_frame)
+        original_label.pack(pady=10)
+        augmented_label = ttk.Label(augmented_frame, text="渲染中...")
+        augmented_label.pack(pady=10)
+        
+        status_label = ttk.Label(frame, text="")
+        status_label.pack()
+        
+        # 渲染在工作线程中进行，结果通过队列交给界面线程显示
+        results = queue.Queue()
+        seed_offset = [0]
+        
+        def render():
+            augmented_label.config(text="渲染中...")
+            self.preview_engine.render_async(
+                image_file, selected_augmenters, self.seed_var.get() + seed_offset[0],
+                lambda result, error: results.put((result, error)))
+        
+        def poll():
+            # 窗口关闭后停止轮询
+            if not preview_window.winfo_exists():
+                return
+            preview_window.after(15, poll)
+            self.flush_preview_log()
+            try:
+                result, error = results.get_nowait()
+            except queue.Empty:
+                return
+            if error is not None:
+                augmented_label.config(text=f"预览失败: {error}")
+                return
+            self.show_preview_image(original_label, result.original)
+            self.show_preview_image(augmented_label, result.grid)
+            status_label.config(text=f"渲染耗时: {result.seconds * 1000:.0f} ms（预览缩放 {result.scale:.2f}）")
+        
+        def reroll():
+            seed_offset[0] += 1
+            render()
+        
+        button_frame = ttk.Frame(frame)
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="换一组", command=reroll).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="关闭", command=preview_window.destroy).pack(side=tk.LEFT, padx=5)
+        
+        render()
+        poll()
+        
+    def preview_jpeg_quality_sweep(self):
+        """JPEG压缩质量扫描：在内存中生成多个质量的压缩结果并显示，不写磁盘"""
+        if not self.input_folder.get():
+            messagebox.showerror("错误", "请先选择输入文件夹")
+            return
+            
+        image_file = find_first_image_file(self.input_folder.get(), recursive=self.recursive_var.get(),
+                                           exclude=[self.output_folder.get()] if self.output_folder.get() else [])
+        if image_file is None:
             messagebox.showerror("错误", "输入文件夹中没有找到图像文件")
             return
             
-        # 读取第一张图片
-        image_file = image_files[0]
+        image_file = Path(image_file)
         image = cv2.imread(str(image_file))
         if image is None:
             messagebox.showerror("错误", f"无法读取图像 {image_file.name}")
             return
             
-        # 创建增强器管道
-        augmenters = self.create_augmenter_pipeline(selected_augmenters)
-        if not augmenters:
-            messagebox.showerror("错误", "没有有效的增强器")
-            return
-            
         # 延迟导入imgaug
-        ia, iaa = _lazy_import_imgaug()
-        
-        pipeline = iaa.Sequential(augmenters, random_order=True)
-        ia.seed(self.seed_var.get())
+        _lazy_import_imgaug()
+        from imgaug.augmenters.arithmetic import roundtrip_jpeg_batch
         
-        # 应用增强
+        # 所有质量在线程池中并行编解码
+        qualities = [10, 30, 50, 70, 90]
         image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        augmented_image = pipeline.augment_image(image_rgb)
-        augmented_bgr = cv2.cvtColor(augmented_image, cv2.COLOR_RGB2BGR)
+        decoded, nb_bytes = roundtrip_jpeg_batch(
+            [image_rgb] * len(qualities), qualities, return_nb_bytes=True)
         
-        # 显示原图和增强后的图片
-        self.show_image_comparison(preview_window, image, augmented_bgr, image_file.name)
+        sweep_window = tk.Toplevel(self.root)
+        sweep_window.title(f"JPEG压缩扫描: {image_file.name}")
         
-    def show_image_comparison(self, window, original, augmented, filename):
-        """显示图像对比"""
-        # 创建框架
-        frame = ttk.Frame(window, padding="10")
+        frame = ttk.Frame(sweep_window, padding="10")
         frame.pack(fill=tk.BOTH, expand=True)
         
-        # 标题
-        ttk.Label(frame, text=f"预览: {filename}", font=("Arial", 12, "bold")).pack(pady=10)
-        
-        # 图像显示框架
-        image_frame = ttk.Frame(frame)
-        image_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # 原图
-        original_frame = ttk.LabelFrame(image_frame, text="原图")
-        original_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
-        
-        # 增强图
-        augmented_frame = ttk.LabelFrame(image_frame, text="增强后")
-        augmented_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5)
-        
-        # 调整图像大小用于显示
-        def resize_for_display(img, max_size=300):
-            height, width = img.shape[:2]
-            if height > max_size or width > max_size:
-                scale = min(max_size / height, max_size / width)
-                new_height = int(height * scale)
-                new_width = int(width * scale)
-                return cv2.resize(img, (new_width, new_height))
-            return img
-        
-        # 显示图像
-        original_resized = resize_for_display(original)
-        augmented_resized = resize_for_display(augmented)
-        
-        # 转换为PIL图像用于显示
-        original_pil = Image.fromarray(cv2.cvtColor(original_resized, cv2.COLOR_BGR2RGB))
-        augmented_pil = Image.fromarray(cv2.cvtColor(augmented_resized, cv2.COLOR_BGR2RGB))
-        
-        original_photo = ImageTk.PhotoImage(original_pil)
-        augmented_photo = ImageTk.PhotoImage(augmented_pil)
-        
-        # 创建标签显示图像
-        original_label = ttk.Label(original_frame, image=original_photo)
-        original_label.image = original_photo  # 保持引用
-        original_label.pack(pady=10)
-        
-        augmented_label = ttk.Label(augmented_frame, image=augmented_photo)
-        augmented_label.image = augmented_photo  # 保持引用
-        augmented_label.pack(pady=10)
+        for col, (quality, image_q, size) in enumerate(zip(qualities, decoded, nb_bytes)):
+            cell = ttk.LabelFrame(frame, text=f"质量 {quality} - {size / 1024:.1f} KB")
+            cell.grid(row=0, column=col, padx=5, pady=5)
+            
+            height, width = image_q.shape[:2]
+            scale = min(1.0, 200 / max(height, width))
+            thumbnail = cv2.resize(image_q, (max(1, int(width * scale)), max(1, int(height * scale))),
+                                   interpolation=cv2.INTER_AREA)
+            photo = ImageTk.PhotoImage(Image.fromarray(thumbnail))
+            label = ttk.Label(cell, image=photo)
+            label.image = photo  # 保持引用
+            label.pack(padx=5, pady=5)
+            
+        ttk.Button(frame, text="关闭", command=sweep_window.destroy).grid(
+            row=1, column=0, columnspan=len(qualities), pady=10)
+        self.log_message(f"JPEG压缩扫描完成: {image_file.name}，质量 {qualities}")
         
-        # 关闭按钮
-        ttk.Button(frame, text="关闭", command=window.destroy).pack(pady=10)
+    def show_preview_image(self, label, image_bgr):
+        """在标签中显示BGR图像"""
+        photo = ImageTk.PhotoImage(Image.fromarray(cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)))
+        label.config(image=photo, text="")
+        label.image = photo  # 保持引用
         
     def start_processing(self):
         """开始批量处理"""
@@ -908,6 +924,11 @@ class AdvancedBatchImageAugmentation:
         thread.daemon = True
         thread.start()
         
+    def update_progress(self, processed_operations, scanner, augmentation_count):
+        """更新进度条；输入文件夹扫描完成前图像总数未知，暂不更新"""
+        if scanner.total:
+            self.progress_var.set(processed_operations / (scanner.total * augmentation_count) * 100)
+            
     def stop_processing(self):
         """停止处理"""
         self.is_processing = False
@@ -917,6 +938,10 @@ class AdvancedBatchImageAugmentation:
         
     def process_images(self, selected_augmenters):
         """处理图像"""
+        profiler = None
+        output_path = None
+        manifest = None
+        shard_writer = None
         try:
             # 创建增强器管道
             augmenters = self.create_augmenter_pipeline(selected_augmenters)
@@ -926,6 +951,8 @@ class AdvancedBatchImageAugmentation:
                 
             # 延迟导入imgaug
             ia, iaa = _lazy_import_imgaug()
+            from imgaug import multicore
+            from imgaug.augmentables.batches import UnnormalizedBatch
             
             # 组合增强器
             pipeline = iaa.Sequential(augmenters, random_order=True)
@@ -938,26 +965,53 @@ class AdvancedBatchImageAugmentation:
             output_path = Path(self.output_folder.get())
             output_path.mkdir(exist_ok=True)
             
-            # 支持的图像格式
-            image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif'}
-            image_files = [f for f in input_path.iterdir() 
-                          if f.is_file() and f.suffix.lower() in image_extensions]
+            # 启用性能分析
+            if self.profiling_var.get():
+                from imgaug.profiling import AugmenterProfiler
+                profiler = AugmenterProfiler(trace_memory=True)
+                profiler.start()
+                self.log_message("性能分析已启用")
             
-            if not image_files:
-                self.log_message("错误: 输入文件夹中没有找到图像文件")
-                return
-                
-            self.log_message(f"找到 {len(image_files)} 个图像文件")
+            # 在后台扫描输入文件夹，找到第一张图像即开始处理；
+            # 文件列表缓存在输出文件夹中，目录未变化时重新运行不再扫描；
+            # 输出文件夹位于输入文件夹中时跳过，不把输出当作输入
+            scanner = ImageFileScanner(input_path, recursive=self.recursive_var.get(),
+                                       cache_path=output_path / FILE_LIST_CACHE_FILENAME,
+                                       exclude=[output_path])
             
-            total_operations = len(image_files) * self.augmentation_count.get()
+            augmentation_count = self.augmentation_count.get()
             processed_operations = 0
+            skipped_files = 0
+            
+            # 输出文件夹中的清单记录已完成的工作，重新运行时跳过未变化的文件
+            manifest_config = {
+                "augmenters": [[aug_name, config["params"]]
+                               for aug_name, config in selected_augmenters],
+                "seed": self.seed_var.get(),
+                "count": augmentation_count,
+                "seed_scheme": "sample_variant",
+                "output_format": self.output_format.get(),
+                "output_container": self.output_container.get()
+            }
+            manifest = BatchManifest(output_path, manifest_config, source_root=input_path)
+            
+            if self.output_container.get() == "tar":
+                shard_writer = ShardWriter(output_path / "shards")
+                self.log_message(f"输出写入tar分片: {output_path / 'shards'}")
             
             # 处理每个图像文件
-            for i, image_file in enumerate(image_files):
+            for i, image_file in enumerate(map(Path, scanner)):
                 if not self.is_processing:
                     break
                     
                 try:
+                    entry = manifest.start(image_file)
+                    if manifest.is_complete(entry):
+                        skipped_files += 1
+                        processed_operations += augmentation_count
+                        self.update_progress(processed_operations, scanner, augmentation_count)
+                        continue
+                        
                     # 读取图像
                     image = cv2.imread(str(image_file))
                     if image is None:
@@ -967,31 +1021,53 @@ class AdvancedBatchImageAugmentation:
                     # 转换为RGB
                     image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
                     
-                    # 创建输出文件夹
-                    output_subdir = output_path / image_file.stem
-                    output_subdir.mkdir(exist_ok=True)
+                    # 创建输出文件夹（子文件夹中的图像保留相对路径）
+                    output_subdir = output_path / Path(os.path.relpath(image_file, input_path)).parent / image_file.stem
+                    if shard_writer is None:
+                        output_subdir.mkdir(parents=True, exist_ok=True)
                     
                     # 保存原始图像
-                    original_output = output_subdir / f"{image_file.stem}_original.{self.output_format.get()}"
-                    cv2.imwrite(str(original_output), image)
+                    if not entry.has_variant("original"):
+                        original_output = self.save_output_image(
+                            image, output_subdir, f"{image_file.stem}_original.{self.output_format.get()}",
+                            shard_writer)
+                        if original_output is not None:
+                            manifest.record_variant(entry, "original", [original_output])
                     
                     # 生成增强图像
-                    for j in range(self.augmentation_count.get()):
+                    # 每个副本的种子由基础种子、源文件内容哈希和副本序号派生
+                    # （与multicore.Pool(seed_per_sample=True)相同），结果与处理顺序、
+                    # 副本数量以及任务如何分到多台机器无关；中断后只增强尚未保存的副本
+                    missing_variants = [j for j in range(augmentation_count)
+                                        if not entry.has_variant(j)]
+                    processed_operations += augmentation_count - len(missing_variants)
+                    augmented_images = []
+                    try:
+                        if missing_variants:
+                            batch = UnnormalizedBatch(
+                                images=[image_rgb] * len(missing_variants),
+                                data=[(entry.source_hash, j) for j in missing_variants])
+                            augmented_images = multicore.augment_batch_by_sample_seeds_(
+                                pipeline, batch, self.seed_var.get()).images_aug
+                    except Exception as e:
+                        self.log_message(f"错误: 增强图像 {image_file.name} 失败: {str(e)}")
+                        continue
+                        
+                    for j, augmented_image in zip(missing_variants, augmented_images):
                         if not self.is_processing:
                             break
                             
                         try:
-                            # 应用增强
-                            augmented_image = pipeline.augment_image(image_rgb)
-                            
                             # 转换回BGR并保存
                             augmented_bgr = cv2.cvtColor(augmented_image, cv2.COLOR_RGB2BGR)
-                            output_file = output_subdir / f"{image_file.stem}_aug_{j+1:02d}.{self.output_format.get()}"
-                            cv2.imwrite(str(output_file), augmented_bgr)
+                            output_file = self.save_output_image(
+                                augmented_bgr, output_subdir, f"{image_file.stem}_aug_{j+1:02d}.{self.output_format.get()}",
+                                shard_writer)
+                            if output_file is not None:
+                                manifest.record_variant(entry, j, [output_file])
                             
                             processed_operations += 1
-                            progress = (processed_operations / total_operations) * 100
-                            self.progress_var.set(progress)
+                            self.update_progress(processed_operations, scanner, augmentation_count)
                             
                             # 更新状态
                             self.status_label.config(text=f"处理中: {image_file.name} ({j+1}/{self.augmentation_count.get()})")
@@ -999,13 +1075,24 @@ class AdvancedBatchImageAugmentation:
                         except Exception as e:
                             self.log_message(f"错误: 增强图像 {image_file.name} 第 {j+1} 次失败: {str(e)}")
                             
+                    if entry.has_variant("original") and all(
+                            entry.has_variant(j) for j in range(augmentation_count)):
+                        manifest.finish(entry)
+                            
                 except Exception as e:
                     self.log_message(f"错误: 处理图像 {image_file.name} 失败: {str(e)}")
                     
+            if scanner.nb_found == 0:
+                self.log_message("错误: 输入文件夹中没有找到图像文件")
+                return
+                
+            if skipped_files:
+                self.log_message(f"跳过 {skipped_files} 个已完成的文件")
+                
             if self.is_processing:
-                self.log_message(f"处理完成! 共处理 {len(image_files)} 个文件，生成 {processed_operations} 个增强图像")
+                self.log_message(f"处理完成! 共处理 {scanner.nb_found} 个文件，生成 {processed_operations} 个增强图像")
                 self.status_label.config(text="处理完成")
-                messagebox.showinfo("完成", f"批量增强完成!\n共处理 {len(image_files)} 个文件\n生成 {processed_operations} 个增强图像")
+                messagebox.showinfo("完成", f"批量增强完成!\n共处理 {scanner.nb_found} 个文件\n生成 {processed_operations} 个增强图像")
             else:
                 self.log_message("处理已停止")
                 
@@ -1014,11 +1101,55 @@ class AdvancedBatchImageAugmentation:
             messagebox.showerror("错误", f"处理过程中发生错误:\n{str(e)}")
             
         finally:
+            if shard_writer is not None:
+                shard_writer.close()
+            if manifest is not None:
+                manifest.close()
+            if profiler is not None:
+                profiler.stop()
+                self.report_profile(profiler, output_path)
             self.is_processing = False
             self.process_btn.config(state=tk.NORMAL)
             self.stop_btn.config(state=tk.DISABLED)
             self.progress_var.set(0)
             
+    def save_output_image(self, image_bgr, output_subdir, filename, shard_writer=None):
+        """
+        保存一张输出图像
+        Args:
+            image_bgr: BGR图像
+            output_subdir: 输出子文件夹（写入分片时作为样本键的前缀）
+            filename: 文件名，扩展名决定编码格式
+            shard_writer: 分片写入器，为None时保存为单独的文件
+        Returns:
+            保存位置（文件路径，或"<分片文件>#<样本键>"），保存失败时返回None
+        """
+        if shard_writer is None:
+            output_file = output_subdir / filename
+            return output_file if cv2.imwrite(str(output_file), image_bgr) else None
+        
+        stem, ext = os.path.splitext(filename)
+        success, buffer = cv2.imencode(ext, image_bgr)
+        if not success:
+            return None
+        key = make_key(*output_subdir.relative_to(self.output_folder.get()).parts, stem)
+        shard_path = shard_writer.write(key, {ext[1:]: buffer.tobytes()})
+        return f"{shard_path}#{key}"
+        
+    def report_profile(self, profiler, output_path):
+        """在日志中显示性能分析结果，并保存为JSON和CSV"""
+        self.log_message("性能分析结果:")
+        for line in profiler.format_table():
+            self.log_message(line)
+            
+        if output_path is not None:
+            try:
+                profiler.to_json(str(output_path / "profile_report.json"))
+                profiler.to_csv(str(output_path / "profile_report.csv"))
+                self.log_message(f"性能分析报告已保存到: {output_path}")
+            except Exception as e:
+                self.log_message(f"错误: 保存性能分析报告失败: {str(e)}")
+            
     def load_config_from_file(self):
         """从文件加载配置"""
         filename = filedialog.askopenfilename(
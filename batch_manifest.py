@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批处理任务清单（manifest）
+记录每个源文件的内容哈希、管道配置哈希及已生成的输出，
+使中断后的批处理任务可以跳过已完成的文件，并从未完成文件的中间位置继续。
+
+清单以JSON Lines日志的形式保存在输出文件夹中，每次进度更新只追加一行，
+处理结束时再压缩为每个源文件一行的快照。
+"""
+
+import hashlib
+import json
+import os
+
+
+# 清单文件名（保存在输出文件夹中）
+MANIFEST_FILENAME = ".augmentation_manifest.jsonl"
+
+# 清单格式版本，格式不兼容时递增
+MANIFEST_VERSION = 1
+
+# 计算文件哈希时每次读取的字节数
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def canonical_config(config):
+    """
+    将管道配置转换为规范的JSON字符串（键排序、元组转为列表）
+    Args:
+        config: 可JSON序列化的配置（字典/列表/元组/数值/字符串）
+    Returns:
+        规范JSON字符串，相同配置总是得到相同字符串
+    """
+    return json.dumps(config, sort_keys=True, separators=(",", ":"),
+                      ensure_ascii=False)
+
+
+def config_hash(config):
+    """计算管道配置的SHA-256哈希"""
+    return hashlib.sha256(canonical_config(config).encode("utf-8")).hexdigest()
+
+
+def file_hash(path):
+    """计算文件内容的SHA-256哈希"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def derive_seed(base_seed, source_hash, *keys):
+    """
+    由基础种子、源文件内容哈希和附加键派生出确定的随机种子
+    每个源文件（及每个阶段）的随机状态因此与处理顺序及跳过的文件无关，
+    中断后继续处理时可以得到与一次性处理完全相同的结果。
+    derive_seed(seed, sample_id, variant)与imgaug.multicore.derive_sample_seed相同。
+    Args:
+        base_seed: 用户设置的随机种子
+        source_hash: 源文件内容哈希
+        keys: 附加键，例如阶段名称
+    Returns:
+        范围为[0, 2**31)的整数种子
+    """
+    text = "|".join([str(base_seed), source_hash] + [str(key) for key in keys])
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "little") & 0x7FFFFFFF
+
+
+def shard_index_of(key, num_shards):
+    """
+    由样本键确定样本所属的分片序号
+    分片只取决于键本身，与文件的扫描顺序及文件总数无关，
+    因此可以把一个大任务按分片分配到多台机器上，每台机器只处理自己的分片。
+    Args:
+        key: 稳定的样本键，例如源文件相对于输入文件夹的路径（以"/"分隔）
+        num_shards: 分片总数
+    Returns:
+        范围为[0, num_shards)的分片序号
+    """
+    digest = hashlib.sha256(str(key).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little") % num_shards
+
+
+class ManifestEntry:
+    """单个源文件在清单中的记录"""
+
+    def __init__(self, key, source_hash, size, mtime_ns, config_hash,
+                 variants=None, complete=False):
+        self.key = key
+        self.source_hash = source_hash
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.config_hash = config_hash
+        # 变体键（例如增强序号或变换阶段名称） -> 输出文件相对路径列表
+        self.variants = variants if variants is not None else {}
+        self.complete = complete
+
+    def to_dict(self):
+        return {
+            "key": self.key,
+            "source_hash": self.source_hash,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "config_hash": self.config_hash,
+            "variants": self.variants,
+            "complete": self.complete
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["key"], data["source_hash"], data["size"],
+                   data["mtime_ns"], data["config_hash"],
+                   variants=dict(data.get("variants", {})),
+                   complete=data.get("complete", False))
+
+    def has_variant(self, variant):
+        return str(variant) in self.variants
+
+    def get_outputs(self, variant):
+        return self.variants.get(str(variant), [])
+
+
+class BatchManifest:
+    """
+    输出文件夹中的批处理清单
+
+    用法:
+        with BatchManifest(output_dir, config) as manifest:
+            for path in source_files:
+                entry = manifest.start(path)
+                if manifest.is_complete(entry):
+                    continue
+                for j in range(count):
+                    if entry.has_variant(j):
+                        continue
+                    ...保存输出...
+                    manifest.record_variant(entry, j, [output_path])
+                manifest.finish(entry)
+
+    源文件内容或配置发生变化时，start()会丢弃该文件的旧记录，使其被重新处理。
+    """
+
+    def __init__(self, output_dir, config, source_root=None,
+                 filename=MANIFEST_FILENAME):
+        """
+        Args:
+            output_dir: 输出文件夹，清单保存在其中
+            config: 可JSON序列化的管道配置（增强器、参数、随机种子等）
+            source_root: 源文件根目录，清单中的源文件键相对于该目录；
+                为None时使用绝对路径
+            filename: 清单文件名
+        """
+        self.output_dir = os.path.abspath(str(output_dir))
+        self.source_root = (os.path.abspath(str(source_root))
+                            if source_root is not None else None)
+        self.path = os.path.join(self.output_dir, filename)
+        self.config = config
+        self.config_hash = config_hash(config)
+        self.entries = {}
+        self._journal = None
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 任务中断时最后一行可能只写了一半
+                    continue
+                self._apply(record)
+
+    def _apply(self, record):
+        op = record.get("op")
+        if op == "header":
+            if record.get("version") != MANIFEST_VERSION:
+                self.entries = {}
+        elif op in ("entry", "start"):
+            entry = ManifestEntry.from_dict(record["entry"])
+            self.entries[entry.key] = entry
+        elif op == "variant":
+            entry = self.entries.get(record["key"])
+            if entry is not None:
+                entry.variants[str(record["variant"])] = record["outputs"]
+        elif op == "finish":
+            entry = self.entries.get(record["key"])
+            if entry is not None:
+                entry.complete = True
+
+    def _append(self, record):
+        if self._journal is None:
+            is_new = not os.path.exists(self.path)
+            self._journal = open(self.path, "a", encoding="utf-8")
+            if is_new:
+                self._write_line(self._journal, {"op": "header",
+                                                 "version": MANIFEST_VERSION})
+        self._write_line(self._journal, record)
+        # 每条记录立即落盘，崩溃后最多丢失正在写入的一条
+        self._journal.flush()
+
+    @staticmethod
+    def _write_line(f, record):
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def get_key(self, source_path):
+        """获取源文件在清单中的键"""
+        source_path = os.path.abspath(str(source_path))
+        if self.source_root is not None:
+            return os.path.relpath(source_path, self.source_root).replace(
+                os.sep, "/")
+        return source_path
+
+    def get_relative_output(self, output_path):
+        """获取输出文件相对于输出文件夹的路径"""
+        return os.path.relpath(os.path.abspath(str(output_path)),
+                               self.output_dir).replace(os.sep, "/")
+
+    def start(self, source_path):
+        """
+        开始（或继续）处理一个源文件
+        文件大小和修改时间与记录一致时复用记录的内容哈希，否则重新计算。
+        Args:
+            source_path: 源文件路径
+        Returns:
+            ManifestEntry；内容或配置变化时为新的空记录
+        """
+        key = self.get_key(source_path)
+        stat = os.stat(str(source_path))
+        entry = self.entries.get(key)
+
+        if (entry is not None and entry.size == stat.st_size
+                and entry.mtime_ns == stat.st_mtime_ns):
+            source_hash = entry.source_hash
+        else:
+            source_hash = file_hash(str(source_path))
+
+        if (entry is not None and entry.source_hash == source_hash
+                and entry.config_hash == self.config_hash):
+            if entry.size != stat.st_size or entry.mtime_ns != stat.st_mtime_ns:
+                # 内容未变但时间戳变了（例如被复制），更新缓存的文件状态
+                entry.size = stat.st_size
+                entry.mtime_ns = stat.st_mtime_ns
+                self._append({"op": "entry", "entry": entry.to_dict()})
+            return entry
+
+        entry = ManifestEntry(key, source_hash, stat.st_size,
+                              stat.st_mtime_ns, self.config_hash)
+        self.entries[key] = entry
+        self._append({"op": "start", "entry": entry.to_dict()})
+        return entry
+
+    def is_complete(self, entry):
+        """判断源文件是否已处理完成且所有输出文件仍然存在"""
+        if not entry.complete:
+            return False
+        for outputs in entry.variants.values():
+            for output in outputs:
+                # 写入分片容器的输出记为"<分片文件>#<样本键>"
+                output_file = output.split("#", 1)[0]
+                if not os.path.exists(os.path.join(self.output_dir, output_file)):
+                    return False
+        return True
+
+    def record_variant(self, entry, variant, output_paths):
+        """
+        记录一个已完成的变体
+        Args:
+            entry: start()返回的记录
+            variant: 变体键（例如增强序号或变换阶段名称）
+            output_paths: 该变体生成的输出文件路径列表，
+                写入分片容器的输出为"<分片文件>#<样本键>"
+        """
+        outputs = [self.get_relative_output(path) for path in output_paths]
+        entry.variants[str(variant)] = outputs
+        self._append({"op": "variant", "key": entry.key,
+                      "variant": str(variant), "outputs": outputs})
+
+    def finish(self, entry):
+        """标记源文件已处理完成"""
+        entry.complete = True
+        self._append({"op": "finish", "key": entry.key})
+
+    def close(self):
+        """关闭日志并将清单压缩为每个源文件一行的快照"""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        else:
+            # 没有新的进度，无需重写
+            return
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            self._write_line(f, {"op": "header", "version": MANIFEST_VERSION})
+            for entry in self.entries.values():
+                self._write_line(f, {"op": "entry", "entry": entry.to_dict()})
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增强器性能基准测试脚本
+
+读取config.json中的augmenter_categories，按与GUI相同的方式（augmenter_factory）
+创建每个增强器，在data/img中的图像以及256²、1024²、4096²的合成图像上以不同批大小计时。
+支持fork的平台上每项测试在单独的子进程中运行，记录该进程的峰值RSS（peak_rss_bytes）；
+另外记录tracemalloc统计的峰值内存分配（peak_alloc_bytes）。
+结果保存为JSON，并可与已保存的基准结果对比，检测到性能退化时以非零状态码退出。
+无法按配置创建的增强器会被醒目地列出并记录在结果中，但不影响状态码；
+在基准结果中可以运行、现在却无法创建的增强器按性能退化处理。
+
+用法:
+    python benchmark_augmenters.py                          # 运行并保存到 benchmark_results.json
+    python benchmark_augmenters.py --quick                  # 快速模式（仅256²，批大小1和16）
+    python benchmark_augmenters.py --save-baseline          # 运行并保存为基准结果
+    python benchmark_augmenters.py --baseline benchmark_baseline.json  # 与基准对比
+    python benchmark_augmenters.py --pooling --warp         # 额外运行micro_benchmarks.py中注册的微基准测试
+    python benchmark_augmenters.py --help                   # 列出所有微基准测试的开关
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import cv2
+import numpy as np
+
+# 添加imgaug库路径
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pkg'))
+import imgaug as ia
+
+from augmenter_factory import create_augmenter
+from micro_benchmarks import MICRO_BENCHMARKS, benchmark_case, load_data_images, run_micro_benchmarks
+
+ROOT_DIR = Path(__file__).resolve().parent
+DEFAULT_CONFIG = ROOT_DIR / "config.json"
+DEFAULT_OUTPUT = ROOT_DIR / "benchmark_results.json"
+DEFAULT_BASELINE = ROOT_DIR / "benchmark_baseline.json"
+
+DEFAULT_SIZES = [256, 1024, 4096]
+DEFAULT_BATCH_SIZES = [1, 16, 64]
+
+# ru_maxrss的单位：macOS为字节，Linux为KB
+MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+
+def load_augmenter_specs(config_path, categories=None, names=None):
+    """
+    读取配置文件中的增强器定义
+    Returns:
+        [(类别, 增强器名称, 参数字典), ...]
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    specs = []
+    for category, augmenters in config.get("augmenter_categories", {}).items():
+        if categories and category not in categories:
+            continue
+        for aug_name, aug_config in augmenters.items():
+            if names and aug_name not in names:
+                continue
+            specs.append((category, aug_name, aug_config.get("params", {})))
+    return specs
+
+
+def check_buildable(specs):
+    """
+    检查每个增强器能否按配置创建
+    Returns:
+        (可创建的增强器定义列表, [(类别, 增强器名称, 错误信息), ...])
+    """
+    buildable = []
+    build_errors = []
+    for category, aug_name, params in specs:
+        try:
+            create_augmenter(aug_name, params)
+            buildable.append((category, aug_name, params))
+        except Exception as e:
+            build_errors.append((category, aug_name, f"{type(e).__name__}: {e}"))
+    return buildable, build_errors
+
+
+def print_build_errors(build_errors):
+    """醒目地列出无法创建的增强器"""
+    print("\n" + "!" * 50)
+    print(f"✗ {len(build_errors)} 个增强器无法按配置创建，未参与测试:")
+    for category, aug_name, error in build_errors:
+        print(f"  [{category}] {aug_name}: {error}")
+    print("!" * 50 + "\n")
+
+
+def build_inputs(sizes, batch_sizes, seed, max_batch_mb):
+    """
+    构建基准测试输入
+    Returns:
+        [(输入名称, 批大小, 图像列表或数组), ...]
+    """
+    inputs = []
+
+    data_images = load_data_images()
+    if data_images:
+        # 图像不足批大小时循环使用
+        for batch_size in batch_sizes:
+            inputs.append(("data_img", batch_size,
+                           [data_images[i % len(data_images)] for i in range(batch_size)]))
+    else:
+        print("⚠ 未找到data/img中的测试图像")
+
+    rng = np.random.RandomState(seed)
+    for size in sizes:
+        # 带平滑结构的合成图像，比纯噪声更接近真实图像
+        base = rng.randint(0, 256, (max(size // 16, 1), max(size // 16, 1), 3)).astype(np.uint8)
+        image = cv2.resize(base, (size, size), interpolation=cv2.INTER_CUBIC)
+        for batch_size in batch_sizes:
+            batch_mb = batch_size * image.nbytes / 1024 ** 2
+            if batch_mb > max_batch_mb:
+                print(f"⚠ 跳过 {size}x{size} 批大小 {batch_size}（{batch_mb:.0f} MB 超过上限 {max_batch_mb} MB）")
+                continue
+            batch = np.broadcast_to(image, (batch_size,) + image.shape)
+            inputs.append((f"synthetic_{size}", batch_size, batch))
+    return inputs
+
+
+def can_measure_rss():
+    """是否可以在fork出的子进程中运行测试并读取其峰值RSS"""
+    return resource is not None and "fork" in multiprocessing.get_all_start_methods()
+
+
+def _child_main(func, conn):
+    try:
+        value, error = func(), None
+    except Exception as e:
+        value, error = None, f"{type(e).__name__}: {e}"
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * MAXRSS_UNIT
+    conn.send((value, error, peak_rss))
+    conn.close()
+
+
+def run_in_child(func):
+    """
+    在fork出的子进程中运行func()，子进程的峰值RSS只包含这一项测试
+    Returns:
+        (func()的返回值, 错误信息或None, 子进程的峰值RSS字节数)
+    """
+    context = multiprocessing.get_context("fork")
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(target=_child_main, args=(func, child_conn))
+    process.start()
+    child_conn.close()
+    try:
+        return parent_conn.recv()
+    except EOFError:
+        # 子进程崩溃（例如段错误），没有发回结果
+        process.join()
+        return None, f"子进程异常退出（退出码 {process.exitcode}）", None
+    finally:
+        process.join()
+        parent_conn.close()
+
+
+def _run_case(aug_name, params, images, seed, repeats):
+    ia.seed(seed)
+    augmenter = create_augmenter(aug_name, params)
+    augmenter.seed_(seed)
+    return benchmark_case(augmenter, images, repeats)
+
+
+def run_benchmarks(specs, inputs, seed, repeats):
+    """运行所有基准测试，可以fork时每项测试在单独的子进程中运行"""
+    measure_rss = can_measure_rss()
+    results = []
+    for category, aug_name, params in specs:
+        for input_name, batch_size, images in inputs:
+            result = {
+                "category": category,
+                "augmenter": aug_name,
+                "params": params,
+                "input": input_name,
+                "batch_size": batch_size,
+                "ms_per_image": None,
+                "peak_alloc_bytes": None,
+                "peak_rss_bytes": None,
+                "error": None
+            }
+
+            def _case():
+                return _run_case(aug_name, params, images, seed, repeats)
+
+            if measure_rss:
+                timing, result["error"], result["peak_rss_bytes"] = run_in_child(_case)
+            else:
+                try:
+                    timing = _case()
+                except Exception as e:
+                    timing, result["error"] = None, f"{type(e).__name__}: {e}"
+            if result["error"] is None:
+                result["ms_per_image"], result["peak_alloc_bytes"] = timing
+                rss_text = (f", 峰值RSS {result['peak_rss_bytes'] / 2 ** 20:7.1f} MB"
+                            if result["peak_rss_bytes"] is not None else "")
+                print(f"✓ {aug_name:<24} {input_name:<16} 批大小 {batch_size:>3}: "
+                      f"{result['ms_per_image']:9.3f} ms/张{rss_text}")
+            else:
+                print(f"✗ {aug_name:<24} {input_name:<16} 批大小 {batch_size:>3}: {result['error']}")
+            results.append(result)
+    return results
+
+
+def build_report(results, args, build_errors=(), micro_results=None):
+    """
+    生成包含环境信息的结果报告
+    Args:
+        micro_results: run_micro_benchmarks()的结果，按名称保存在报告中
+    """
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "imgaug": ia.__version__,
+            "seed": args.seed,
+            "repeats": args.repeats
+        },
+        "results": results,
+        "build_errors": [{"category": category, "augmenter": aug_name, "error": error}
+                         for category, aug_name, error in build_errors]
+    }
+    report.update(micro_results or {})
+    return report
+
+
+def _result_key(result):
+    return (result["augmenter"], result["input"], result["batch_size"])
+
+
+def compare_with_baseline(results, baseline, tolerance, min_delta_ms, build_errors=()):
+    """
+    与基准结果对比
+    Args:
+        build_errors: 本次无法创建的增强器 [(类别, 增强器名称, 错误信息), ...]，
+            其在基准结果中成功运行的各项均视为退化
+    Returns:
+        性能退化列表 [(增强器, 输入, 批大小, 基准ms, 当前ms 或 错误信息), ...]
+    """
+    baseline_by_key = {_result_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    build_error_by_name = {aug_name: error for _, aug_name, error in build_errors}
+    for key, base in baseline_by_key.items():
+        if key[0] in build_error_by_name and base["ms_per_image"] is not None:
+            regressions.append(key + (base["ms_per_image"], build_error_by_name[key[0]]))
+    for result in results:
+        base = baseline_by_key.get(_result_key(result))
+        if base is None or base["ms_per_image"] is None:
+            continue
+        if result["ms_per_image"] is None:
+            regressions.append(_result_key(result) + (base["ms_per_image"], result["error"]))
+            continue
+        slower = result["ms_per_image"] > base["ms_per_image"] * tolerance
+        if slower and result["ms_per_image"] - base["ms_per_image"] > min_delta_ms:
+            regressions.append(_result_key(result) + (base["ms_per_image"], result["ms_per_image"]))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="imgaug增强器性能基准测试")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG), help="配置文件路径")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="结果JSON保存路径")
+    parser.add_argument("--baseline", default=None, help="基准结果JSON路径，提供时进行对比")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基准结果")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="合成图像边长")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES, help="批大小")
+    parser.add_argument("--categories", nargs="+", default=None, help="只测试这些类别")
+    parser.add_argument("--augmenters", nargs="+", default=None, help="只测试这些增强器")
+    parser.add_argument("--repeats", type=int, default=3, help="每项重复次数（取最快一次）")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--max-batch-mb", type=float, default=1024, help="单个批次的最大内存（MB），超过则跳过")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="允许比基准慢的倍数")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="忽略小于该值的差异（毫秒/张）")
+    parser.add_argument("--quick", action="store_true", help="快速模式：仅256²，批大小1和16")
+    # 每个注册的微基准测试一个开关，例如import_time对应--import-time
+    for name, benchmark in MICRO_BENCHMARKS.items():
+        parser.add_argument("--" + name.replace("_", "-"), dest=name, action="store_true",
+                            help=benchmark.description)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """主函数"""
+    args = parse_args(argv)
+    if args.quick:
+        args.sizes = [256]
+        args.batch_sizes = [1, 16]
+
+    print("=" * 50)
+    print("增强器性能基准测试")
+    print("=" * 50)
+
+    specs, build_errors = check_buildable(
+        load_augmenter_specs(args.config, args.categories, args.augmenters))
+    if build_errors:
+        print_build_errors(build_errors)
+    inputs = build_inputs(args.sizes, args.batch_sizes, args.seed, args.max_batch_mb)
+    print(f"共 {len(specs)} 个增强器，{len(inputs)} 组输入\n")
+
+    results = run_benchmarks(specs, inputs, args.seed, args.repeats)
+
+    micro_names = [name for name in MICRO_BENCHMARKS if getattr(args, name)]
+    micro_results = run_micro_benchmarks(micro_names, inputs, args.seed, args.repeats)
+    report = build_report(results, args, build_errors, micro_results)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存到: {args.output}")
+
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"基准结果已保存到: {DEFAULT_BASELINE}")
+
+    nb_errors = sum(1 for r in results if r["error"] is not None)
+    if nb_errors:
+        print(f"⚠ {nb_errors} 项运行失败，详见结果文件")
+    if build_errors:
+        print_build_errors(build_errors)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.tolerance, args.min_delta_ms,
+                                            build_errors)
+        if regressions:
+            print("\n" + "!" * 50)
+            print(f"检测到 {len(regressions)} 项性能退化（阈值 {args.tolerance}x）:")
+            for aug_name, input_name, batch_size, base_ms, current in regressions:
+                current_text = f"{current:.3f} ms/张" if isinstance(current, float) else current
+                print(f"  {aug_name} {input_name} 批大小 {batch_size}: 基准 {base_ms:.3f} ms/张 -> {current_text}")
+            print("!" * 50)
+            return 1
+        print("\n✓ 未检测到性能退化")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输入图像发现
+使用os.scandir流式扫描输入文件夹（可递归），找到第一张图像即可开始处理，
+不需要先为每个文件调用stat并生成完整列表。
+输出文件夹位于输入文件夹中时，可将其排除，递归扫描不会把输出当作输入。
+可选地把扫描结果缓存到文件中，以各目录的修改时间作为键，目录未变化时直接读取缓存。
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+
+
+# 默认支持的图像格式
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif')
+
+# 文件列表缓存的默认文件名（通常保存在输出文件夹中）
+FILE_LIST_CACHE_FILENAME = ".input_file_list.json"
+
+# 缓存格式版本，格式不兼容时递增
+_FILE_LIST_CACHE_VERSION = 2
+
+# 修改时间距当前时间小于该秒数的目录不写入缓存。
+# 部分文件系统的时间戳精度较低，同一时间单位内的后续修改不会改变修改时间。
+_RACY_MTIME_SECONDS = 2.0
+
+
+def _normalize_extensions(extensions):
+    return tuple(sorted(set(
+        (ext if ext.startswith('.') else '.' + ext).lower()
+        for ext in extensions)))
+
+
+def _relative(path, folder):
+    return os.path.relpath(path, folder).replace(os.sep, "/")
+
+
+def _normalize_dir(path):
+    return os.path.normcase(os.path.abspath(str(path)))
+
+
+def _scan(folder, extensions, recursive, dir_mtimes, exclude=()):
+    # 深度优先遍历，每个目录先生成其中的文件再进入子目录。
+    # DirEntry.is_file()/is_dir()在大多数平台上直接使用目录项中的类型信息，不需要stat。
+    # 每个目录先读完再生成其中的文件，处理过程中写入同一目录的输出不会被当作输入。
+    excluded = set(_normalize_dir(path) for path in exclude)
+    stack = [folder]
+    while stack:
+        directory = stack.pop()
+        try:
+            dir_mtimes[_relative(directory, folder)] = os.stat(directory).st_mtime_ns
+            iterator = os.scandir(directory)
+        except OSError:
+            continue
+
+        files = []
+        subdirs = []
+        with iterator:
+            for entry in iterator:
+                try:
+                    if entry.is_file():
+                        if os.path.splitext(entry.name)[1].lower() in extensions:
+                            files.append(entry.path)
+                    elif (recursive and entry.is_dir(follow_symlinks=False)
+                          and _normalize_dir(entry.path) not in excluded):
+                        subdirs.append(entry.path)
+                except OSError:
+                    continue
+        yield from files
+        stack.extend(reversed(subdirs))
+
+
+def _load_file_list_cache(cache_path, folder, extensions, recursive, exclude):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if (cache.get("version") != _FILE_LIST_CACHE_VERSION
+            or cache.get("folder") != folder
+            or cache.get("extensions") != list(extensions)
+            or cache.get("recursive") != recursive
+            or cache.get("exclude") != exclude):
+        return None
+
+    # 文件的增删会改变其所在目录的修改时间，子目录的增删会改变上级目录的修改时间
+    for rel_dir, mtime_ns in cache["dirs"].items():
+        try:
+            if os.stat(os.path.join(folder, rel_dir)).st_mtime_ns != mtime_ns:
+                return None
+        except OSError:
+            return None
+    return cache["files"]
+
+
+def _save_file_list_cache(cache_path, folder, extensions, recursive, exclude, dir_mtimes, files):
+    newest = max(dir_mtimes.values()) / 1e9 if dir_mtimes else 0
+    if newest > time.time() - _RACY_MTIME_SECONDS:
+        return
+
+    cache = {
+        "version": _FILE_LIST_CACHE_VERSION,
+        "folder": folder,
+        "extensions": list(extensions),
+        "recursive": recursive,
+        "exclude": exclude,
+        "dirs": dir_mtimes,
+        "files": files
+    }
+    tmp_path = str(cache_path) + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_path, str(cache_path))
+    except OSError:
+        # 缓存只用于加速，无法写入时忽略
+        pass
+
+
+def iter_image_files(folder, extensions=IMAGE_EXTENSIONS, recursive=False, cache_path=None,
+                     exclude=()):
+    """
+    流式生成文件夹中的图像文件路径
+    Args:
+        folder: 输入文件夹
+        extensions: 支持的扩展名（不区分大小写）
+        recursive: 是否包含子文件夹
+        cache_path: 文件列表缓存路径。为None时不使用缓存；
+            缓存有效时直接生成缓存中的列表，否则扫描完成后写入缓存
+        exclude: 递归扫描时跳过的文件夹（及其子文件夹），通常为输出文件夹
+    Returns:
+        生成图像文件路径（字符串）的生成器
+    """
+    folder = os.path.abspath(str(folder))
+    extensions = _normalize_extensions(extensions)
+    exclude = sorted(set(_normalize_dir(path) for path in exclude))
+
+    if cache_path is not None:
+        cached = _load_file_list_cache(cache_path, folder, extensions, recursive, exclude)
+        if cached is not None:
+            for rel_path in cached:
+                yield os.path.join(folder, rel_path)
+            return
+
+    dir_mtimes = {}
+    files = [] if cache_path is not None else None
+    for path in _scan(folder, extensions, recursive, dir_mtimes, exclude):
+        if files is not None:
+            files.append(_relative(path, folder))
+        yield path
+
+    if cache_path is not None:
+        _save_file_list_cache(cache_path, folder, extensions, recursive, exclude, dir_mtimes, files)
+
+
+def find_first_image_file(folder, extensions=IMAGE_EXTENSIONS, recursive=False, exclude=()):
+    """获取文件夹中找到的第一张图像，没有图像时返回None"""
+    return next(iter_image_files(folder, extensions, recursive, exclude=exclude), None)
+
+
+_SCAN_DONE = object()
+
+
+class ImageFileScanner:
+    """
+    在后台线程中扫描输入文件夹
+
+    遍历扫描器时，每找到一张图像就立即生成，处理线程不需要等待扫描完成。
+    扫描在后台继续进行，完成后total给出图像总数，可用于显示进度。
+
+    用法:
+        scanner = ImageFileScanner(input_folder, recursive=True, exclude=[output_folder])
+        for path in scanner:
+            ...
+            if scanner.total is not None:
+                progress = processed / scanner.total
+    """
+
+    def __init__(self, folder, extensions=IMAGE_EXTENSIONS, recursive=False, cache_path=None,
+                 exclude=()):
+        """
+        Args:
+            folder: 输入文件夹
+            extensions: 支持的扩展名（不区分大小写）
+            recursive: 是否包含子文件夹
+            cache_path: 文件列表缓存路径，见iter_image_files()
+            exclude: 递归扫描时跳过的文件夹，见iter_image_files()
+        """
+        self.folder = folder
+        self.extensions = extensions
+        self.recursive = recursive
+        self.cache_path = cache_path
+        self.exclude = list(exclude)
+        # 目前已找到的图像数
+        self.nb_found = 0
+        # 图像总数，扫描完成前为None
+        self.total = None
+        self._error = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="image-discovery")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        try:
+            for path in iter_image_files(self.folder, self.extensions,
+                                         self.recursive, self.cache_path,
+                                         self.exclude):
+                self.nb_found += 1
+                self._queue.put(path)
+            self.total = self.nb_found
+        except Exception as e:
+            self._error = e
+        finally:
+            self._queue.put(_SCAN_DONE)
+
+    def __iter__(self):
+        while True:
+            path = self._queue.get()
+            if path is _SCAN_DONE:
+                # 允许再次遍历时立即结束
+                self._queue.put(_SCAN_DONE)
+                if self._error is not None:
+                    raise self._error
+                return
+            yield path
@@ -9,6 +9,7 @@ import os
 import random
 import sys
 import glob
+import inspect
 
 from PIL import Image, ImageDraw
 from skimage.util import random_noise
@@ -16,6 +17,13 @@ from ftplib import FTP
 from io import BytesIO
 from datetime import datetime
 
+# 添加imgaug库路径（JPEG压缩扫描使用其批量编解码）
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pkg'))
+
+from batch_manifest import MANIFEST_FILENAME, BatchManifest, derive_seed, shard_index_of
+from image_discovery import FILE_LIST_CACHE_FILENAME, iter_image_files
+from sharded_output import DEFAULT_MAX_SHARD_BYTES, ShardWriter, make_key
+
 def get_image(url):
     return Image.open(requests.get(url, stream=True).raw)
 
@@ -52,6 +60,9 @@ def geometrical_transform(image, img_prefix, output_base_dir="./"):
     new_im = image.transpose(Image.FLIP_TOP_BOTTOM)
     __save_file(new_im, "flip_up_down", img_prefix, "ud", output_base_dir=output_base_dir)
 
+# skimage 0.21起random_noise的随机数参数名为rng，此前为seed
+_RANDOM_NOISE_RNG_KWARG = "rng" if "rng" in inspect.signature(random_noise).parameters else "seed"
+
 # 加随机噪声，默认高斯
 def add_noise(image, img_prefix, output_base_dir="./"):
     im_arr = np.asarray(image)
@@ -64,7 +75,10 @@ def add_noise(image, img_prefix, output_base_dir="./"):
         standard_deviation = i / 10  # 标准差
 
         # 默认高斯，其它可选mode: 'poisson', 'salt', 'pepper' ……
-        noise_img = random_noise(im_arr, mode='gaussian', var=(1-standard_deviation) ** 2)
+        # 噪声种子取自np.random，批处理设置种子后结果可复现
+        noise_seed = np.random.randint(0, 2**31 - 1)
+        noise_img = random_noise(im_arr, mode='gaussian', var=(1-standard_deviation) ** 2,
+                                 **{_RANDOM_NOISE_RNG_KWARG: noise_seed})
         noise_img = (255 * noise_img).astype(np.uint8)
 
         __save_file(Image.fromarray(noise_img), "noise", img_prefix, f"{standard_deviation:.1f}", output_base_dir=output_base_dir)
@@ -73,8 +87,30 @@ def add_noise(image, img_prefix, output_base_dir="./"):
 # 压缩图片
 def compress_image(image, img_prefix, output_base_dir="./"):
 
-    for i in range(1, 10):
-        __save_file(image, "compress", img_prefix, f"q{i*10}", i * 10, output_base_dir=output_base_dir)
+    # 直接写入内存中已编码好的JPEG数据，避免再编码一次
+    for quality, _, _, jpeg_bytes in jpeg_quality_sweep(image, range(10, 100, 10)):
+        __save_encoded_file(jpeg_bytes, "compress", img_prefix, f"q{quality}", output_base_dir=output_base_dir)
+
+
+# JPEG压缩质量扫描（全部在内存中完成，不写磁盘）
+def jpeg_quality_sweep(image, qualities):
+    """
+    在内存中对同一张图片按多个JPEG质量进行压缩，各质量在线程池中并行编解码
+    Args:
+        image: PIL图片
+        qualities: JPEG质量列表，取值范围1-100
+    Returns:
+        [(质量, 压缩后的PIL图片, 编码字节数, JPEG编码数据), ...]
+    """
+    from imgaug.augmenters.arithmetic import roundtrip_jpeg_batch
+
+    qualities = list(qualities)
+    im_arr = np.asarray(image.convert('RGB'))
+    decoded, nb_bytes, buffers = roundtrip_jpeg_batch(
+        [im_arr] * len(qualities), qualities,
+        return_nb_bytes=True, return_buffers=True)
+    return [(quality, Image.fromarray(arr), size, buf)
+            for quality, arr, size, buf in zip(qualities, decoded, nb_bytes, buffers)]
 
 
 # 缩放图片
@@ -261,6 +297,24 @@ def reset_counter():
     global _global_counter
     _global_counter = 0
 
+def _advance_counter(count):
+    """跳过已生成的编号（继续未完成的批处理时使用）"""
+    global _global_counter
+    _global_counter += count
+
+# 当前变换阶段保存的文件路径，供批处理清单记录
+_saved_files = []
+
+# 分片写入器，设置后输出写入tar分片而不是单独的文件
+_shard_writer = None
+
+def _save_to_shard(data, img_prefix, filename):
+    """将已编码的图片写入分片，样本键为：图片前缀/文件名（不含扩展名）"""
+    stem, ext = os.path.splitext(filename)
+    key = make_key(img_prefix, stem)
+    shard_path = _shard_writer.write(key, {ext[1:]: data})
+    _saved_files.append(f"{shard_path}#{key}")
+
 # 保存图片到本地
 def __save_file(image, transform_type, img_prefix, param_value, quality=100, output_base_dir="./"):
     """
@@ -273,13 +327,6 @@ def __save_file(image, transform_type, img_prefix, param_value, quality=100, out
         quality: 图片质量
         output_base_dir: 输出基础目录路径
     """
-    # 创建图片专属文件夹路径：output_base_dir/img_prefix/
-    img_dir = os.path.join(output_base_dir, img_prefix)
-    
-    # 创建目录（递归创建）
-    if not os.path.exists(img_dir):
-        os.makedirs(img_dir)
-
     image_tmp = image.convert('RGB')
     
     # 获取下一个编号
@@ -287,9 +334,51 @@ def __save_file(image, transform_type, img_prefix, param_value, quality=100, out
     
     # 新的命名格式：编号_图片名_变化方式_参数.jpg
     filename = f"{img_number}_{img_prefix}_{transform_type}_{param_value}.jpg"
+    
+    if _shard_writer is not None:
+        buf = BytesIO()
+        image_tmp.save(buf, format="JPEG", quality=quality)
+        _save_to_shard(buf.getvalue(), img_prefix, filename)
+        return
+    
+    # 创建图片专属文件夹路径：output_base_dir/img_prefix/
+    img_dir = os.path.join(output_base_dir, img_prefix)
+    
+    # 创建目录（递归创建）
+    if not os.path.exists(img_dir):
+        os.makedirs(img_dir)
+
     filepath = os.path.join(img_dir, filename)
     image_tmp.save(filepath, quality=quality)
+    _saved_files.append(filepath)
+
+
 
+# 保存已编码的图片数据到本地
+def __save_encoded_file(jpeg_bytes, transform_type, img_prefix, param_value, output_base_dir="./"):
+    """
+    将已编码的JPEG数据直接写入文件，命名规则与__save_file一致
+    Args:
+        jpeg_bytes: JPEG编码数据
+        transform_type: 变换类型名称
+        img_prefix: 图片前缀名
+        param_value: 参数值
+        output_base_dir: 输出基础目录路径
+    """
+    img_number = _get_next_number()
+    filename = f"{img_number}_{img_prefix}_{transform_type}_{param_value}.jpg"
+    if _shard_writer is not None:
+        _save_to_shard(bytes(jpeg_bytes), img_prefix, filename)
+        return
+
+    img_dir = os.path.join(output_base_dir, img_prefix)
+    if not os.path.exists(img_dir):
+        os.makedirs(img_dir)
+
+    filepath = os.path.join(img_dir, filename)
+    with open(filepath, 'wb') as f:
+        f.write(jpeg_bytes)
+    _saved_files.append(filepath)
 
 
 def __box_to_int(box):
@@ -415,12 +504,8 @@ def browse_files():
     print(f"\n📂 当前目录: {current_dir}")
     
     # 查找图片文件
-    image_extensions = ['*.jpg', '*.jpeg', '*.png', '*.bmp', '*.tiff', '*.webp']
-    image_files = []
-    
-    for ext in image_extensions:
-        image_files.extend(glob.glob(ext))
-        image_files.extend(glob.glob(ext.upper()))
+    image_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp']
+    image_files = [os.path.basename(path) for path in iter_image_files(current_dir, image_extensions)]
     
     if not image_files:
         print("❌ 当前目录下没有找到图片文件")
@@ -638,14 +723,34 @@ def interactive_main():
         traceback.print_exc()
 
 
+# 单张图片的变换阶段（按执行顺序），批处理清单按阶段名称记录进度
+_SINGLE_IMAGE_STAGES = [
+    ("compress", compress_image),
+    ("noise", add_noise),
+    ("geometrical", geometrical_transform),
+    ("cut", cut),
+    ("resize", resize),
+    ("mosaic", add_mosaic),
+    ("interference_lines", add_interference_lines),
+    ("grid", add_grid_interference),
+]
+
+# 批处理清单的版本，变换阶段的实现改变时递增，使已有结果被重新生成
+_TRANSFORMS_VERSION = 1
+
+
 # 便捷函数：只对单张图片进行变换（不需要第二张图片）
-def gen_single_image_transforms(image_path, img_prefix=None, output_base_dir="./transformed_images"):
+def gen_single_image_transforms(image_path, img_prefix=None, output_base_dir="./transformed_images",
+                                manifest=None, seed=0):
     """
     对单张图片进行所有变换（除了拼接）
     Args:
         image_path: 图片路径
         img_prefix: 图片前缀名，如果不提供则从文件名自动生成
         output_base_dir: 输出基础目录
+        manifest: 批处理清单（BatchManifest），提供时跳过已完成的变换阶段，
+            并按源文件内容和阶段名称设置随机种子，使继续处理的结果与一次性处理相同
+        seed: 使用清单时的基础随机种子
     """
     if img_prefix is None:
         # 从文件路径自动生成前缀名
@@ -653,28 +758,56 @@ def gen_single_image_transforms(image_path, img_prefix=None, output_base_dir="./
     
     reset_counter()  # 重置计数器
     original_image = get_image_local(image_path)
-    compress_image(original_image, img_prefix, output_base_dir)
-    add_noise(original_image, img_prefix, output_base_dir)
-    geometrical_transform(original_image, img_prefix, output_base_dir)
-    cut(original_image, img_prefix, output_base_dir)
-    resize(original_image, img_prefix, output_base_dir)
-    add_mosaic(original_image, img_prefix, output_base_dir)
-    add_interference_lines(original_image, img_prefix, output_base_dir)
-    add_grid_interference(original_image, img_prefix, output_base_dir)
+    entry = manifest.start(image_path) if manifest is not None else None
+    for stage, transform in _SINGLE_IMAGE_STAGES:
+        if entry is not None and entry.has_variant(stage):
+            # 阶段已完成，编号保持与一次性处理时一致
+            _advance_counter(len(entry.get_outputs(stage)))
+            continue
+        
+        if entry is not None:
+            stage_seed = derive_seed(seed, entry.source_hash, stage)
+            random.seed(stage_seed)
+            np.random.seed(stage_seed)
+        
+        del _saved_files[:]
+        transform(original_image, img_prefix, output_base_dir)
+        if entry is not None:
+            manifest.record_variant(entry, stage, _saved_files)
+    
+    if entry is not None:
+        manifest.finish(entry)
     
     print(f"✅ 已完成图片 '{img_prefix}' 的所有变换，保存到: {output_base_dir}/{img_prefix}/")
     return output_base_dir
 
 
 # 批量处理多张图片
-def batch_transform_images(image_dir, output_base_dir="./transformed_images", file_extensions=None):
+def batch_transform_images(image_dir, output_base_dir="./transformed_images", file_extensions=None,
+                           resume=True, seed=0, shard_output=False,
+                           max_shard_bytes=DEFAULT_MAX_SHARD_BYTES, recursive=False,
+                           num_shards=1, shard_index=0):
     """
     批量处理文件夹中的所有图片
     Args:
         image_dir: 输入图片文件夹路径
         output_base_dir: 输出基础目录
         file_extensions: 支持的文件扩展名列表，默认为常见图片格式
-    """
+        resume: 是否使用输出目录中的批处理清单，跳过已完成的图片并从中断处继续；
+            为False时重新处理所有图片（随机变换不设置种子）
+        seed: 使用清单时的基础随机种子
+        shard_output: 是否将输出写入output_base_dir/shards下的tar分片（WebDataset布局），
+            而不是每个变换一个文件，可用sharded_output.ShardReader读取
+        max_shard_bytes: 单个分片的最大字节数
+        recursive: 是否包含子文件夹中的图片，子文件夹中图片的前缀名包含其相对路径
+        num_shards: 把任务分到多少台机器（或多个进程）上处理，每张图片按其相对路径
+            确定所属分片（batch_manifest.shard_index_of），与扫描顺序无关
+        shard_index: 本次只处理该序号的分片；各分片使用各自的清单文件和tar分片前缀，
+            可以写入同一个输出目录，合并后的结果与一次性处理全部图片相同
+    """
+    global _shard_writer
+    assert 0 <= shard_index < num_shards, (
+        f"分片序号应在[0, {num_shards})范围内，实际为{shard_index}")
     if file_extensions is None:
         file_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp']
     
@@ -683,32 +816,71 @@ def batch_transform_images(image_dir, output_base_dir="./transformed_images", fi
         print(f"❌ 输入目录不存在: {image_dir}")
         return
     
-    # 获取所有图片文件
-    image_files = []
-    for ext in file_extensions:
-        pattern = os.path.join(image_dir, f"*{ext}")
-        pattern_upper = os.path.join(image_dir, f"*{ext.upper()}")
-        import glob
-        image_files.extend(glob.glob(pattern))
-        image_files.extend(glob.glob(pattern_upper))
-    
-    if not image_files:
+    # 流式扫描图片文件，找到第一张即开始处理；文件列表缓存在输出目录中，
+    # 输出目录位于输入目录中时跳过，不把输出当作输入
+    os.makedirs(output_base_dir, exist_ok=True)
+    image_files = iter_image_files(image_dir, file_extensions, recursive=recursive,
+                                   cache_path=os.path.join(output_base_dir, FILE_LIST_CACHE_FILENAME),
+                                   exclude=[output_base_dir])
+    shard_suffix = ""
+    if num_shards > 1:
+        shard_suffix = f".{shard_index}-of-{num_shards}"
+        image_files = (
+            image_path for image_path in image_files
+            if shard_index_of(os.path.relpath(image_path, image_dir).replace(os.sep, "/"),
+                              num_shards) == shard_index)
+        print(f"🧩 只处理分片 {shard_index + 1}/{num_shards}")
+    print(f"🔍 扫描目录 {image_dir}，开始批量处理...")
+    
+    manifest = None
+    if resume:
+        manifest_config = {
+            "tool": "image_process_id",
+            "version": _TRANSFORMS_VERSION,
+            "stages": [stage for stage, _ in _SINGLE_IMAGE_STAGES],
+            "seed": seed,
+            "shard_output": shard_output
+        }
+        manifest = BatchManifest(output_base_dir, manifest_config, source_root=image_dir,
+                                 filename=MANIFEST_FILENAME.replace(".jsonl", shard_suffix + ".jsonl"))
+    
+    if shard_output:
+        _shard_writer = ShardWriter(os.path.join(output_base_dir, "shards"),
+                                    prefix="shard" + shard_suffix.replace(".", "_"),
+                                    max_shard_bytes=max_shard_bytes)
+    
+    nb_images = 0
+    success_count = 0
+    skipped_count = 0
+    try:
+        for i, image_path in enumerate(image_files, 1):
+            nb_images = i
+            try:
+                img_name = os.path.splitext(os.path.relpath(image_path, image_dir))[0].replace(os.sep, "_")
+                if manifest is not None and manifest.is_complete(manifest.start(image_path)):
+                    skipped_count += 1
+                    success_count += 1
+                    continue
+                print(f"[{i}] 处理图片: {img_name}")
+                gen_single_image_transforms(image_path, img_name, output_base_dir,
+                                            manifest=manifest, seed=seed)
+                success_count += 1
+            except Exception as e:
+                print(f"❌ 处理图片 {image_path} 失败: {e}")
+    finally:
+        if _shard_writer is not None:
+            _shard_writer.close()
+            _shard_writer = None
+        if manifest is not None:
+            manifest.close()
+    
+    if nb_images == 0:
         print(f"⚠️  在目录 {image_dir} 中未找到支持的图片文件")
         return
     
-    print(f"🔍 找到 {len(image_files)} 张图片，开始批量处理...")
-    
-    success_count = 0
-    for i, image_path in enumerate(image_files, 1):
-        try:
-            img_name = os.path.splitext(os.path.basename(image_path))[0]
-            print(f"[{i}/{len(image_files)}] 处理图片: {img_name}")
-            gen_single_image_transforms(image_path, img_name, output_base_dir)
-            success_count += 1
-        except Exception as e:
-            print(f"❌ 处理图片 {image_path} 失败: {e}")
-    
-    print(f"\n📊 批量处理完成: {success_count}/{len(image_files)} 张图片处理成功")
+    if skipped_count:
+        print(f"⏭️  跳过 {skipped_count} 张已完成的图片")
+    print(f"\n📊 批量处理完成: {success_count}/{nb_images} 张图片处理成功")
     print(f"📁 结果保存在: {os.path.abspath(output_base_dir)}")
     return output_base_dir
 
@@ -0,0 +1,655 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+微基准测试
+
+benchmark_augmenters.py之外针对单项实现的基准测试，例如池化核与skimage的对比、
+augment()入口开销、导入耗时等。每项通过register_micro_benchmark()注册，
+benchmark_augmenters.py为每项生成一个命令行开关（名称中的下划线换成短横线，
+例如--import-time），结果保存在结果JSON中与名称相同的键下。
+新增微基准测试时只需在这里注册一个函数，不需要修改benchmark_augmenters.py。
+"""
+
+import collections
+import os
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy as np
+import skimage.measure
+
+# 添加imgaug库路径
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pkg'))
+import imgaug as ia
+import imgaug.augmenters as iaa
+from imgaug import dtypes as iadt
+from imgaug.augmenters import size as iasize
+
+ROOT_DIR = Path(__file__).resolve().parent
+DATA_IMAGE_DIR = ROOT_DIR / "data" / "img"
+
+# 池化基准: (名称, 池化函数, 填充模式, 填充值)，与ia.avg_pool等函数的默认值一致
+POOLING_KERNELS = [
+    ("avg", np.average, "reflect", 128),
+    ("max", np.max, "edge", 0),
+    ("min", np.min, "edge", 255),
+    ("median", np.median, "reflect", 128)
+]
+POOLING_BLOCK_SIZES = [2, 3, 4]
+
+# 入口开销基准: (名称, 创建增强器的函数)，均为在小图像上几乎不耗时的增强器
+OVERHEAD_AUGMENTERS = [
+    ("Identity", lambda: iaa.Identity()),
+    ("Fliplr", lambda: iaa.Fliplr(1.0)),
+    ("Add", lambda: iaa.Add((-20, 20))),
+    ("Sequential", lambda: iaa.Sequential([iaa.Fliplr(0.5), iaa.Multiply((0.8, 1.2))]))
+]
+OVERHEAD_IMAGE_SIZE = 32
+OVERHEAD_CALLS = 500
+
+# 导入耗时基准: (名称, 在新的解释器中执行的代码)
+IMPORT_TIME_CASES = [
+    ("import imgaug", "import imgaug"),
+    ("Fliplr+AddToBrightness",
+     "import imgaug.augmenters as iaa; iaa.Fliplr; iaa.AddToBrightness"),
+    ("all augmenters", "from imgaug.augmenters import *")
+]
+# 常用的轻量增强器不应导入的重量级模块
+HEAVY_MODULES = ["scipy.stats", "scipy.spatial", "scipy.ndimage", "skimage.transform",
+                 "skimage.segmentation", "imageio"]
+
+# k-means颜色量化基准: 图像边长与颜色数
+KMEANS_IMAGE_SIZE = 1024
+KMEANS_NB_COLORS = [4, 16, 64]
+
+# 批量绘制基准: 图像形状、每张图像的图元数，以及逐个绘制对比的最大图元数（逐个绘制很慢）
+DRAWING_IMAGE_SHAPE = (720, 1280, 3)
+DRAWING_NB_PRIMITIVES = [10, 100, 1000, 10000]
+DRAWING_MAX_ITEMWISE = 1000
+
+# 裁剪基准: 图像形状与多边形（折线）数，多边形中心分布在图像外扩的区域内，部分与图像边界相交
+CLIPPING_IMAGE_SHAPE = (720, 1280, 3)
+CLIPPING_NB_POLYGONS = 1000
+CLIPPING_MARGIN = 60
+
+# Cutout/CoarseDropout基准: 图像边长与批大小
+DROPOUT_IMAGE_SIZE = 1024
+DROPOUT_BATCH_SIZE = 4
+DROPOUT_AUGMENTERS = [
+    ("CoarseDropout", {"p": 0.1, "size_percent": 0.05}),
+    ("CoarseDropout", {"p": (0.02, 0.1), "size_px": (3, 8)}),
+    ("CoarseDropout", {"p": 0.1, "size_percent": 0.5, "per_channel": True}),
+    ("Cutout", {"nb_iterations": (1, 5)}),
+    ("Cutout", {"nb_iterations": 50, "size": 0.05, "fill_mode": ["constant", "gaussian"],
+                "cval": (0, 255), "fill_per_channel": 0.5}),
+]
+
+# 仿射/透视变换基准: 图像边长、数据类型、插值阶数与通道数（多通道对应RGB+深度+掩码堆叠）
+WARP_IMAGE_SIZE = 512
+WARP_DTYPES = ["bool", "uint8", "uint16", "uint32", "int8", "int16", "int32",
+               "float16", "float32", "float64"]
+WARP_ORDERS = [0, 1, 3]
+WARP_CHANNELS = [3, 6, 12]
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \| \s*(\S+)$")
+
+# 已注册的微基准测试，按注册顺序运行
+MicroBenchmark = collections.namedtuple("MicroBenchmark", ["name", "title", "description", "func"])
+MICRO_BENCHMARKS = collections.OrderedDict()
+
+
+def register_micro_benchmark(name, title, description):
+    """
+    注册微基准测试的装饰器
+    被装饰的函数以func(inputs, seed, repeats)调用，返回结果字典的列表
+    Args:
+        name: 名称，同时用作命令行开关和结果JSON中的键
+        title: 运行时打印的标题
+        description: 命令行帮助信息
+    """
+    def _register(func):
+        assert name not in MICRO_BENCHMARKS, f"微基准测试 {name} 已注册"
+        MICRO_BENCHMARKS[name] = MicroBenchmark(name, title, description, func)
+        return func
+    return _register
+
+
+def run_micro_benchmarks(names, inputs, seed, repeats):
+    """
+    按注册顺序运行指定的微基准测试
+    Args:
+        inputs: benchmark_augmenters.build_inputs()构建的输入
+    Returns:
+        {名称: 结果列表}
+    """
+    results = collections.OrderedDict()
+    for name, benchmark in MICRO_BENCHMARKS.items():
+        if name in names:
+            print(f"\n{benchmark.title}:")
+            results[name] = benchmark.func(inputs, seed, repeats)
+    return results
+
+
+def load_data_images():
+    """读取data/img中的测试图像（RGB）"""
+    images = []
+    if DATA_IMAGE_DIR.exists():
+        for image_file in sorted(DATA_IMAGE_DIR.iterdir()):
+            image = cv2.imread(str(image_file))
+            if image is not None:
+                images.append(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    return images
+
+
+
+def copy_batch(images):
+    if isinstance(images, np.ndarray):
+        return np.array(images)
+    return [np.copy(image) for image in images]
+
+
+def benchmark_case(augmenter, images, repeats):
+    """
+    对单个增强器和输入计时
+    Returns:
+        (每张图像的毫秒数, 峰值内存分配字节数)
+    """
+    nb_images = len(images)
+
+    # 预热，排除首次调用的初始化开销
+    augmenter.augment_images(copy_batch(images))
+
+    timings = []
+    for _ in range(repeats):
+        batch = copy_batch(images)
+        start = time.perf_counter()
+        augmenter.augment_images(batch)
+        timings.append(time.perf_counter() - start)
+
+    # 单独运行一次统计内存分配，避免tracemalloc影响计时
+    batch = copy_batch(images)
+    tracemalloc.start()
+    try:
+        augmenter.augment_images(batch)
+        _, peak_alloc = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return min(timings) * 1000 / nb_images, peak_alloc
+
+
+
+def best_time(func, repeats):
+    func()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+
+def _pool_skimage(images, block_size, func, pad_mode, pad_cval):
+    """原实现：逐张填充后调用skimage.measure.block_reduce"""
+    pooled = []
+    for image in images:
+        image = iasize.pad_to_multiples_of(image, block_size, block_size,
+                                           mode=pad_mode, cval=pad_cval)
+        pooled.append(skimage.measure.block_reduce(
+            image, (block_size, block_size, 1), func).astype(image.dtype))
+    return np.stack(pooled)
+
+
+
+@register_micro_benchmark("pooling", "池化核对比", "额外对比池化核与skimage实现")
+def run_pooling_benchmarks(inputs, seed, repeats):
+    """对比ia.pool_many_images的池化核与skimage实现（使用合成图像输入）"""
+    inputs = [item for item in inputs if item[0] != "data_img"]
+    results = []
+    for input_name, batch_size, images in inputs:
+        for kernel_name, func, pad_mode, pad_cval in POOLING_KERNELS:
+            for block_size in POOLING_BLOCK_SIZES:
+                expected = _pool_skimage(images, block_size, func, pad_mode, pad_cval)
+                pooled = ia.pool_many_images(images, block_size, func,
+                                             pad_mode=pad_mode, pad_cval=pad_cval)
+                ms_skimage = best_time(
+                    lambda: _pool_skimage(images, block_size, func, pad_mode, pad_cval),
+                    repeats) * 1000 / batch_size
+                ms_kernel = best_time(
+                    lambda: ia.pool_many_images(images, block_size, func,
+                                                pad_mode=pad_mode, pad_cval=pad_cval),
+                    repeats) * 1000 / batch_size
+                result = {
+                    "kernel": kernel_name,
+                    "input": input_name,
+                    "batch_size": batch_size,
+                    "block_size": block_size,
+                    "ms_per_image_skimage": ms_skimage,
+                    "ms_per_image_kernel": ms_kernel,
+                    "speedup": ms_skimage / ms_kernel if ms_kernel > 0 else None,
+                    "identical": bool(np.array_equal(expected, pooled))
+                }
+                results.append(result)
+                print(f"{'✓' if result['identical'] else '✗'} {kernel_name:<7} {input_name:<16} "
+                      f"批大小 {batch_size:>3} 块 {block_size}: skimage {ms_skimage:8.3f} ms/张, "
+                      f"池化核 {ms_kernel:8.3f} ms/张 ({result['speedup']:.1f}x)")
+    return results
+
+
+def _time_per_call(func, repeats, nb_calls=OVERHEAD_CALLS):
+    def _loop():
+        for _ in range(nb_calls):
+            func()
+    return best_time(_loop, repeats) / nb_calls
+
+
+@register_micro_benchmark("overhead", "入口开销", "额外测量小图像上augment()入口的固定开销")
+def run_overhead_benchmarks(inputs, seed, repeats):
+    """
+    测量小图像上augment()入口的固定开销
+    对比通用路径（UnnormalizedBatch归一化）与单张uint8图像的快速路径，
+    以及gate_dtypes()缓存命中与完整检查的耗时
+    """
+    rng = np.random.RandomState(seed)
+    image = rng.randint(0, 256, size=(OVERHEAD_IMAGE_SIZE, OVERHEAD_IMAGE_SIZE, 3)).astype(np.uint8)
+    results = []
+
+    for aug_name, make_augmenter in OVERHEAD_AUGMENTERS:
+        aug_generic = make_augmenter()
+        aug_fast = make_augmenter()
+        aug_generic.seed_(seed)
+        aug_fast.seed_(seed)
+        identical = all(
+            np.array_equal(aug_generic.augment_images([image])[0], aug_fast.augment_image(image))
+            for _ in range(10))
+
+        us_generic = _time_per_call(lambda: aug_generic.augment_images([image])[0], repeats) * 1e6
+        us_fast = _time_per_call(lambda: aug_fast.augment_image(image), repeats) * 1e6
+        result = {
+            "augmenter": aug_name,
+            "image_size": OVERHEAD_IMAGE_SIZE,
+            "us_per_call_generic": us_generic,
+            "us_per_call_fast": us_fast,
+            "speedup": us_generic / us_fast if us_fast > 0 else None,
+            "identical": bool(identical)
+        }
+        results.append(result)
+        print(f"{'✓' if identical else '✗'} {aug_name:<12} {OVERHEAD_IMAGE_SIZE}²: "
+              f"通用路径 {us_generic:8.1f} us/次, 快速路径 {us_fast:8.1f} us/次 "
+              f"({result['speedup']:.1f}x)")
+
+    # gate_dtypes: 与arithmetic.add_scalar()等函数相同的允许/禁止列表
+    allowed = ["bool", "uint8", "uint16", "int8", "int16", "float16", "float32"]
+    disallowed = ["uint32", "uint64", "uint128", "uint256",
+                  "int32", "int64", "int128", "int256",
+                  "float64", "float96", "float128", "float256"]
+    augmenter = iaa.Add(1)
+    images = [image] * 4
+
+
+    def _gate_uncached():
+        iadt._clear_gate_dtypes_cache()
+        iadt.gate_dtypes(images, allowed, disallowed, augmenter)
+
+    us_uncached = _time_per_call(_gate_uncached, repeats) * 1e6
+    us_cached = _time_per_call(
+        lambda: iadt.gate_dtypes(images, allowed, disallowed, augmenter), repeats) * 1e6
+    result = {
+        "augmenter": "gate_dtypes",
+        "image_size": OVERHEAD_IMAGE_SIZE,
+        "us_per_call_generic": us_uncached,
+        "us_per_call_fast": us_cached,
+        "speedup": us_uncached / us_cached if us_cached > 0 else None,
+        "identical": True
+    }
+    results.append(result)
+    print(f"✓ {'gate_dtypes':<12} 4张: 完整检查 {us_uncached:8.1f} us/次, "
+          f"缓存命中 {us_cached:8.1f} us/次 ({result['speedup']:.1f}x)")
+    return results
+
+
+def measure_import_time(code):
+    """
+    在新的解释器中用python -X importtime执行代码
+    Returns:
+        (执行耗时（毫秒）, 执行后已导入的模块名集合, {模块名: 累计导入耗时（毫秒）})
+    """
+    env = dict(os.environ)
+    pkg_dir = str(ROOT_DIR / "pkg")
+    env["PYTHONPATH"] = pkg_dir + os.pathsep + env.get("PYTHONPATH", "")
+    script = ("import sys, time\n"
+              "time_start = time.perf_counter()\n"
+              f"{code}\n"
+              "print(time.perf_counter() - time_start)\n"
+              "print(' '.join(sorted(sys.modules)))\n")
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", script],
+                             env=env, capture_output=True, text=True, check=True)
+    seconds, modules = process.stdout.strip().splitlines()[-2:]
+    cumulative = {}
+    for line in process.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative[match.group(2)] = int(match.group(1)) / 1000
+    return float(seconds) * 1000, set(modules.split()), cumulative
+
+
+@register_micro_benchmark("import_time", "导入耗时", "额外测量imgaug的导入耗时（python -X importtime）")
+def run_import_time_benchmarks(inputs, seed, repeats):
+    """测量imgaug在不同使用方式下的导入耗时，以及导入了哪些重量级模块"""
+    results = []
+    for case_name, code in IMPORT_TIME_CASES:
+        timings = []
+        for _ in range(max(repeats, 1)):
+            ms, modules, cumulative = measure_import_time(code)
+            timings.append(ms)
+        heavy = [name for name in HEAVY_MODULES if name in modules]
+        slowest = sorted(((ms, name) for name, ms in cumulative.items()
+                          if name.startswith("imgaug.")), reverse=True)[:5]
+        result = {
+            "case": case_name,
+            "ms": min(timings),
+            "heavy_modules": heavy,
+            "slowest_imgaug_modules": [[name, ms] for ms, name in slowest]
+        }
+        results.append(result)
+        print(f"{case_name:<24} {result['ms']:8.1f} ms  重量级模块: {', '.join(heavy) or '无'}")
+    return results
+
+
+@register_micro_benchmark("kmeans", "k-means颜色量化", "额外对比k-means颜色量化的cv2与直方图方法")
+def run_kmeans_benchmarks(inputs, seed, repeats):
+    """
+    对比quantize_kmeans()的cv2方法（对全部像素聚类）与直方图方法（对颜色直方图聚类）
+    在百万像素图像上的耗时和量化误差（均方误差）
+    """
+    images = load_data_images()
+    if images:
+        image = cv2.resize(images[0], (KMEANS_IMAGE_SIZE, KMEANS_IMAGE_SIZE),
+                           interpolation=cv2.INTER_LINEAR)
+    else:
+        # 没有测试图像时使用平滑渐变加噪声，颜色分布与自然图像类似
+        rng = np.random.RandomState(seed)
+        ramp = np.linspace(0, 255, KMEANS_IMAGE_SIZE)
+        image = np.dstack([ramp[np.newaxis, :].repeat(KMEANS_IMAGE_SIZE, 0),
+                           ramp[:, np.newaxis].repeat(KMEANS_IMAGE_SIZE, 1),
+                           np.full((KMEANS_IMAGE_SIZE, KMEANS_IMAGE_SIZE), 128.0)])
+        image = np.clip(image + rng.normal(0, 10, image.shape), 0, 255).astype(np.uint8)
+
+    def _mse(quantized):
+        return float(np.mean((quantized.astype(np.float64) - image) ** 2))
+
+    results = []
+    for nb_colors in KMEANS_NB_COLORS:
+        quantized_cv2 = iaa.quantize_kmeans(image, nb_colors)
+        quantized_hist = iaa.quantize_kmeans(image, nb_colors, method="histogram")
+        ms_cv2 = best_time(lambda: iaa.quantize_kmeans(image, nb_colors), repeats) * 1000
+        ms_hist = best_time(
+            lambda: iaa.quantize_kmeans(image, nb_colors, method="histogram"), repeats) * 1000
+        result = {
+            "image_size": KMEANS_IMAGE_SIZE,
+            "nb_colors": nb_colors,
+            "ms_cv2": ms_cv2,
+            "ms_histogram": ms_hist,
+            "speedup": ms_cv2 / ms_hist if ms_hist > 0 else None,
+            "mse_cv2": _mse(quantized_cv2),
+            "mse_histogram": _mse(quantized_hist)
+        }
+        results.append(result)
+        print(f"{KMEANS_IMAGE_SIZE}² {nb_colors:>3} 色: cv2 {ms_cv2:8.1f} ms (误差 {result['mse_cv2']:7.1f}), "
+              f"直方图 {ms_hist:8.1f} ms (误差 {result['mse_histogram']:7.1f}) ({result['speedup']:.1f}x)")
+    return results
+
+
+def _make_drawing_primitives(kind, nb_primitives, rng):
+    from imgaug.augmentables.kps import KeypointsOnImage
+    from imgaug.augmentables.lines import LineString, LineStringsOnImage
+    from imgaug.augmentables.polys import Polygon, PolygonsOnImage
+
+    height, width = DRAWING_IMAGE_SHAPE[0:2]
+    centers = rng.uniform([0, 0], [width, height], (nb_primitives, 2))
+    if kind == "keypoints":
+        return KeypointsOnImage.from_xy_array(centers, shape=DRAWING_IMAGE_SHAPE)
+    if kind == "line_strings":
+        return LineStringsOnImage(
+            [LineString(center + rng.uniform(-40, 40, (5, 2))) for center in centers],
+            shape=DRAWING_IMAGE_SHAPE)
+    # 多边形：围绕中心按角度排序的8个点（LabelMe标注通常为简单多边形）
+    angles = np.sort(rng.uniform(0, 2 * np.pi, (nb_primitives, 8)), axis=1)
+    radii = rng.uniform(5, 40, (nb_primitives, 8))
+    exteriors = centers[:, np.newaxis, :] + radii[..., np.newaxis] * np.stack(
+        [np.cos(angles), np.sin(angles)], axis=-1)
+    return PolygonsOnImage([Polygon(exterior) for exterior in exteriors],
+                           shape=DRAWING_IMAGE_SHAPE)
+
+
+@register_micro_benchmark("drawing", "批量绘制", "额外测量关键点、折线和多边形的批量绘制耗时")
+def run_drawing_benchmarks(inputs, seed, repeats):
+    """
+    测量KeypointsOnImage、LineStringsOnImage和PolygonsOnImage的draw_on_image()耗时
+    （每个图元只在其覆盖的区域内混合），图元较少时与逐个调用draw_on_image()对比
+    """
+    rng = np.random.RandomState(seed)
+    image = rng.randint(0, 255, DRAWING_IMAGE_SHAPE).astype(np.uint8)
+
+    results = []
+    for kind in ["keypoints", "line_strings", "polygons"]:
+        for nb_primitives in DRAWING_NB_PRIMITIVES:
+            cbaoi = _make_drawing_primitives(kind, nb_primitives, rng)
+            ms_batched = best_time(lambda: cbaoi.draw_on_image(image, alpha=0.75),
+                                    repeats) * 1000
+
+            ms_itemwise = None
+            if nb_primitives <= DRAWING_MAX_ITEMWISE:
+                def _draw_itemwise():
+                    image_drawn = image
+                    for item in cbaoi.items:
+                        image_drawn = item.draw_on_image(image_drawn, alpha=0.75)
+                    return image_drawn
+                ms_itemwise = best_time(_draw_itemwise, 1) * 1000
+
+            result = {
+                "kind": kind,
+                "nb_primitives": nb_primitives,
+                "ms_batched": ms_batched,
+                "ms_itemwise": ms_itemwise,
+                "speedup": (ms_itemwise / ms_batched
+                            if ms_itemwise is not None and ms_batched > 0 else None)
+            }
+            results.append(result)
+            itemwise_text = (f"逐个 {ms_itemwise:9.1f} ms ({result['speedup']:.1f}x)"
+                             if ms_itemwise is not None else "逐个 -")
+            print(f"{kind:<13} {nb_primitives:>6} 个: 批量 {ms_batched:8.1f} ms, {itemwise_text}")
+    return results
+
+
+@register_micro_benchmark("clipping", "裁剪与越界移除", "额外测量多边形和折线的裁剪与越界移除耗时")
+def run_clipping_benchmarks(inputs, seed, repeats):
+    """
+    测量PolygonsOnImage和LineStringsOnImage的裁剪与越界移除耗时，
+    以及RemoveCBAsByOutOfImageFraction+ClipCBAsToImagePlanes处理一张图像的耗时。
+    作为参照，同时给出对每个多边形都用shapely与图像矩形求交的耗时。
+    """
+    import shapely.geometry
+    from imgaug.augmentables.lines import LineString, LineStringsOnImage
+    from imgaug.augmentables.polys import Polygon, PolygonsOnImage
+    from imgaug.augmentables.utils import _classify_coords_by_image_plane, _COORDS_CROSSING
+
+    rng = np.random.RandomState(seed)
+    height, width = CLIPPING_IMAGE_SHAPE[0:2]
+    centers = rng.uniform([-CLIPPING_MARGIN, -CLIPPING_MARGIN],
+                          [width + CLIPPING_MARGIN, height + CLIPPING_MARGIN],
+                          (CLIPPING_NB_POLYGONS, 2))
+    # 围绕中心的12个点（星形，不自相交）
+    angles = (np.linspace(0, 2 * np.pi, 12, endpoint=False)[np.newaxis, :]
+              + rng.uniform(0, 0.3, (CLIPPING_NB_POLYGONS, 12)))
+    radii = (rng.uniform(5, 40, (CLIPPING_NB_POLYGONS, 1))
+             * rng.uniform(0.7, 1.0, (CLIPPING_NB_POLYGONS, 12)))
+    exteriors = centers[:, np.newaxis, :] + radii[..., np.newaxis] * np.stack(
+        [np.cos(angles), np.sin(angles)], axis=-1)
+    psoi = PolygonsOnImage([Polygon(exterior) for exterior in exteriors],
+                           shape=CLIPPING_IMAGE_SHAPE)
+    lsoi = LineStringsOnImage([LineString(exterior[0:6]) for exterior in exteriors],
+                              shape=CLIPPING_IMAGE_SHAPE)
+    image = np.zeros(CLIPPING_IMAGE_SHAPE, dtype=np.uint8)
+    aug = iaa.Sequential([iaa.RemoveCBAsByOutOfImageFraction(0.5),
+                          iaa.ClipCBAsToImagePlanes()])
+    image_rect = shapely.geometry.Polygon([(0, 0), (width, 0), (width, height), (0, height)])
+
+    classes = _classify_coords_by_image_plane([poly.exterior for poly in psoi.polygons],
+                                              CLIPPING_IMAGE_SHAPE)
+    nb_crossing = int(np.sum(classes == _COORDS_CROSSING))
+    print(f"{CLIPPING_NB_POLYGONS} 个多边形，其中 {nb_crossing} 个与图像边界相交")
+
+    # 计时包含deepcopy()，原地操作不能在同一对象上重复执行
+    cases = [
+        ("polygons", "clip_out_of_image_", lambda: psoi.deepcopy().clip_out_of_image_()),
+        ("polygons", "remove_out_of_image_fraction_",
+         lambda: psoi.deepcopy().remove_out_of_image_fraction_(0.5)),
+        ("polygons", "remove_out_of_image_",
+         lambda: psoi.deepcopy().remove_out_of_image_(fully=True, partly=True)),
+        ("polygons", "augmenters",
+         lambda: aug(image=image, polygons=psoi)),
+        ("polygons", "shapely_intersection_all",
+         lambda: [poly.to_shapely_polygon().intersection(image_rect) for poly in psoi.polygons]),
+        ("line_strings", "clip_out_of_image_", lambda: lsoi.deepcopy().clip_out_of_image_()),
+        ("line_strings", "remove_out_of_image_fraction_",
+         lambda: lsoi.deepcopy().remove_out_of_image_fraction_(0.5)),
+        ("line_strings", "augmenters",
+         lambda: aug(image=image, line_strings=lsoi)),
+    ]
+    results = []
+    for kind, operation, func in cases:
+        ms = best_time(func, repeats) * 1000
+        results.append({
+            "kind": kind,
+            "operation": operation,
+            "nb_items": CLIPPING_NB_POLYGONS,
+            "nb_crossing": nb_crossing,
+            "ms": ms
+        })
+        print(f"{kind:<13} {operation:<30} {ms:8.1f} ms")
+    return results
+
+
+@register_micro_benchmark("dropout", "Cutout与CoarseDropout", "额外测量Cutout和CoarseDropout的耗时与峰值内存")
+def run_dropout_benchmarks(inputs, seed, repeats):
+    """
+    测量Cutout和CoarseDropout在1024²图像上的耗时与峰值内存分配
+    （峰值内存中扣除了augment_images()对输入图像的复制，剩余部分主要是掩码等临时数组）
+    """
+    rng = np.random.RandomState(seed)
+    images = [rng.randint(0, 255, (DROPOUT_IMAGE_SIZE, DROPOUT_IMAGE_SIZE, 3)).astype(np.uint8)
+              for _ in range(DROPOUT_BATCH_SIZE)]
+    image_bytes = images[0].nbytes
+
+    results = []
+    for aug_name, params in DROPOUT_AUGMENTERS:
+        augmenter = getattr(iaa, aug_name)(seed=seed, **params)
+        ms_per_image, peak_alloc = benchmark_case(augmenter, images, repeats)
+        extra_bytes = max(peak_alloc / DROPOUT_BATCH_SIZE - image_bytes, 0)
+        results.append({
+            "augmenter": aug_name,
+            "params": {k: list(v) if isinstance(v, tuple) else v for k, v in params.items()},
+            "image_size": DROPOUT_IMAGE_SIZE,
+            "batch_size": DROPOUT_BATCH_SIZE,
+            "ms_per_image": ms_per_image,
+            "peak_alloc_bytes": peak_alloc,
+            "extra_bytes_per_image": extra_bytes
+        })
+        print(f"{aug_name:<14} {ms_per_image:8.2f} ms/张, 额外内存 {extra_bytes / 2 ** 20:7.2f} MB/张  {params}")
+    return results
+
+
+def _make_warp_image(dtype, nb_channels, rng):
+    """生成平滑的多通道图像（随机低分辨率图像双线性放大），按数据类型缩放到合适的取值范围"""
+    small = rng.rand(16, 16, nb_channels).astype(np.float32)
+    smooth = cv2.resize(small, (WARP_IMAGE_SIZE, WARP_IMAGE_SIZE), interpolation=cv2.INTER_LINEAR)
+    smooth = smooth.reshape((WARP_IMAGE_SIZE, WARP_IMAGE_SIZE, nb_channels))
+    if dtype == "bool":
+        return smooth > 0.5
+    if dtype.startswith("float"):
+        return smooth.astype(dtype)
+    min_value, _, max_value = iadt.get_value_range_of_dtype(np.dtype(dtype))
+    low, high = max(min_value, -1000), min(max_value, 1000)
+    return np.round(low + smooth * (high - low)).astype(dtype)
+
+
+@register_micro_benchmark("warp", "仿射与透视变换（数据类型×插值阶数）",
+                          "额外测量Affine各数据类型×插值阶数在cv2与skimage后端的耗时和误差")
+def run_warp_benchmarks(inputs, seed, repeats):
+    """
+    对每种数据类型×插值阶数×通道数，测量Affine在auto后端（cv2可用时使用cv2）与skimage后端的耗时，
+    以及两者结果的最大/平均绝对差；另外测量PerspectiveTransform在多通道uint16/float32图像上的耗时
+    """
+    from imgaug.augmenters import geometric
+
+    rng = np.random.RandomState(seed)
+    results = []
+    for dtype in WARP_DTYPES:
+        for nb_channels in WARP_CHANNELS:
+            image = _make_warp_image(dtype, nb_channels, rng)
+            for order in WARP_ORDERS:
+                auto = iaa.Affine(rotate=15, scale=1.1, shear=5, order=order, cval=0)
+                reference = iaa.Affine(rotate=15, scale=1.1, shear=5, order=order, cval=0,
+                                       backend="skimage")
+                warped = auto(image=image)
+                ms_auto = best_time(lambda: auto(image=image), repeats) * 1000
+                cv2_dtype = geometric._get_cv2_warp_dtype(image.dtype, order)
+                result = {
+                    "augmenter": "Affine",
+                    "dtype": dtype,
+                    "order": order,
+                    "channels": nb_channels,
+                    "image_size": WARP_IMAGE_SIZE,
+                    "auto_backend": "cv2" if cv2_dtype is not None else "skimage",
+                    "cv2_dtype": cv2_dtype.name if cv2_dtype is not None else None,
+                    "ms_auto": ms_auto,
+                    "ms_skimage": None,
+                    "speedup": None,
+                    "max_abs_diff": None,
+                    "mean_abs_diff": None
+                }
+                try:
+                    warped_reference = reference(image=image)
+                except (ValueError, RuntimeError) as exc:
+                    # 新版skimage/scipy拒绝对bool图像使用order>0的插值，且不支持float16
+                    print(f"Affine {dtype:<8} order={order} {nb_channels:>2}通道: "
+                          f"auto({result['auto_backend']:<7}) {ms_auto:7.1f} ms, skimage 不支持: {exc}")
+                    results.append(result)
+                    continue
+                ms_skimage = best_time(lambda: reference(image=image), repeats) * 1000
+                diff = np.abs(warped.astype(np.float64) - warped_reference.astype(np.float64))
+                result.update({
+                    "ms_skimage": ms_skimage,
+                    "speedup": ms_skimage / ms_auto if ms_auto > 0 else None,
+                    "max_abs_diff": float(diff.max()),
+                    "mean_abs_diff": float(diff.mean())
+                })
+                results.append(result)
+                print(f"Affine {dtype:<8} order={order} {nb_channels:>2}通道: "
+                      f"auto({result['auto_backend']:<7}) {ms_auto:7.1f} ms, "
+                      f"skimage {ms_skimage:7.1f} ms ({result['speedup']:.1f}x), "
+                      f"差异 最大 {result['max_abs_diff']:.3g} 平均 {result['mean_abs_diff']:.3g}")
+
+    for dtype in ["uint16", "float32"]:
+        for nb_channels in WARP_CHANNELS:
+            image = _make_warp_image(dtype, nb_channels, rng)
+            aug = iaa.PerspectiveTransform(scale=0.1, keep_size=True, seed=seed)
+            ms = best_time(lambda: aug(image=image), repeats) * 1000
+            results.append({
+                "augmenter": "PerspectiveTransform",
+                "dtype": dtype,
+                "order": 1,
+                "channels": nb_channels,
+                "image_size": WARP_IMAGE_SIZE,
+                "ms_auto": ms
+            })
+            print(f"PerspectiveTransform {dtype:<8} {nb_channels:>2}通道: {ms:7.1f} ms")
+    return results
+
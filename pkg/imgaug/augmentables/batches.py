@@ -40,6 +40,32 @@ def _get_columns(batch, postfix):
     return result
 
 
+def _rows_to_array_index(indices):
+    # Row indices forming a single ascending run (e.g. a single row or all
+    # rows) are turned into a slice, so that the rows of an image array
+    # are selected as a view instead of being copied via fancy indexing.
+    nb_indices = len(indices)
+    if nb_indices > 0:
+        start = int(indices[0])
+        stop = int(indices[-1]) + 1
+        if stop - start == nb_indices and (
+                nb_indices <= 2
+                or np.all(np.diff(np.asarray(indices)) == 1)):
+            return slice(start, stop)
+    return indices
+
+
+def _is_same_rows_view(arr_sub, arr, index):
+    # Whether arr_sub is (still) the view arr[index] of a slice index.
+    return (
+        isinstance(index, slice)
+        and ia.is_np_array(arr_sub)
+        and arr_sub.strides == arr.strides
+        and (arr_sub.__array_interface__["data"][0]
+             == arr[index].__array_interface__["data"][0])
+    )
+
+
 # TODO also support (H,W,C) for heatmaps of len(images) == 1
 # TODO also support (H,W) for segmaps of len(images) == 1
 class UnnormalizedBatch(object):
@@ -787,6 +813,10 @@ class _BatchInAugmentation(object):
     def subselect_rows_by_indices(self, indices):
         """Reduce this batch to a subset of rows based on their row indices.
 
+        If the images are an array and `indices` is a single ascending run
+        of row indices (e.g. a single row), the images of the returned batch
+        are a view of this batch's array instead of a copy.
+
         Added in 0.4.0.
 
         Parameters
@@ -805,7 +835,7 @@ class _BatchInAugmentation(object):
             rows = getattr(self, augm_name)
             if rows is not None:
                 if augm_name == "images" and ia.is_np_array(rows):
-                    rows = rows[indices]  # pylint: disable=unsubscriptable-object
+                    rows = rows[_rows_to_array_index(indices)]  # pylint: disable=unsubscriptable-object
                 else:
                     rows = [rows[index] for index in indices]
 
@@ -876,7 +906,11 @@ class _BatchInAugmentation(object):
                             + [image.dtype.name for image in column_sub])
 
                     if len(shapes) == 1 and len(dtypes) == 1:
-                        column[indices] = column_sub  # pylint: disable=unsupported-assignment-operation
+                        index = _rows_to_array_index(indices)
+                        # rows selected as a view were already changed
+                        # in-place
+                        if not _is_same_rows_view(column_sub, column, index):
+                            column[index] = column_sub  # pylint: disable=unsupported-assignment-operation
                     else:
                         self.images = list(column)
                         for ith_index, index in enumerate(indices):
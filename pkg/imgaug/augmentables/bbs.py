@@ -1,6 +1,7 @@
 """Classes representing bounding boxes."""
 from __future__ import print_function, division, absolute_import
 
+import collections
 import copy
 
 import numpy as np
@@ -1730,10 +1731,42 @@ class BoundingBoxesOnImage(IAugmentable):
         (H,W,3) ndarray
             Image with drawn bounding boxes.
 
+        Notes
+        -----
+        For ``uint8`` images, the rectangles of all bounding boxes are drawn
+        in one pass and the labels are drawn afterwards. Labels are hence
+        never covered by the rectangles of other bounding boxes.
+
         """
         # pylint: disable=redefined-outer-name
         image = np.copy(image) if copy else image
 
+        if image.dtype.name == "uint8" and image.ndim == 3:
+            if thickness is not None:
+                ia.warn_deprecated(
+                    "Usage of argument 'thickness' in "
+                    "BoundingBox.draw_on_image() is deprecated. The argument "
+                    "was renamed to 'size'.")
+                size = thickness
+
+            if raise_if_out_of_image:
+                for bb in self.bounding_boxes:
+                    if bb.is_out_of_image(image):
+                        raise Exception(
+                            "Cannot draw bounding box x1=%.8f, y1=%.8f, "
+                            "x2=%.8f, y2=%.8f on image with shape %s." % (
+                                bb.x1, bb.y1, bb.x2, bb.y2, image.shape))
+
+            # Draw all rectangles in one pass, then the labels on top.
+            _draw_boxes_on_image_uint8_(image, self.bounding_boxes,
+                                        color=color, alpha=alpha, size=size)
+            for bb in self.bounding_boxes:
+                if bb.label is not None:
+                    image = bb.draw_label_on_image(
+                        image, color=color, alpha=alpha, size=size,
+                        copy=False)
+            return image
+
         for bb in self.bounding_boxes:
             image = bb.draw_on_image(
                 image,
@@ -2250,11 +2283,12 @@ class _LabelOnImageDrawer(object):
                         color_text, color_bg, size_text):
         label_arr = np.zeros((height, width, nb_channels), dtype=dtype)
         label_arr[...] = color_bg.reshape((1, 1, -1))
-        label_arr = ia.draw_text(label_arr,
-                                 x=2, y=2,
-                                 text=str(label),
-                                 color=color_text,
-                                 size=size_text)
+        text_arr = _get_label_text_arr(str(label), nb_channels, dtype,
+                                       color_text, color_bg, size_text)
+        text_height = min(height, text_arr.shape[0])
+        text_width = min(width, text_arr.shape[1])
+        label_arr[0:text_height, 0:text_width, :] = \
+            text_arr[0:text_height, 0:text_width, :]
         return label_arr
 
     def _blend_label_arr_with_image_(self, image, label_arr, x1, y1, x2, y2):
@@ -2269,3 +2303,156 @@ class _LabelOnImageDrawer(object):
             blend = np.clip(blend, 0, 255).astype(input_dtype)
             image[y1:y2, x1:x2, :] = blend
         return image
+
+
+# Rendered label texts of _LabelOnImageDrawer, see _get_label_text_arr().
+_LABEL_TEXT_CACHE = collections.OrderedDict()
+_LABEL_TEXT_CACHE_MAX_SIZE = 512
+
+
+def _get_label_text_arr(text, nb_channels, dtype, color_text, color_bg,
+                        size_text):
+    # Labels usually repeat (class names), so the rendered text is cached
+    # and only copied into each label box. The text is rendered on a canvas
+    # that is large enough for all of its glyphs. As the text is always
+    # drawn at the top left of the label box, cropping this canvas to the
+    # label box size is identical to drawing the text on the label box.
+    key = (text, nb_channels, np.dtype(dtype).str,
+           tuple(int(v) for v in color_text),
+           tuple(int(v) for v in color_bg), size_text)
+    text_arr = _LABEL_TEXT_CACHE.get(key)
+    if text_arr is not None:
+        _LABEL_TEXT_CACHE.move_to_end(key)
+        return text_arr
+
+    # pylint: disable=protected-access
+    _left, _top, right, bottom = ia._get_default_font(size_text).getbbox(
+        text)
+    # 2px offset of the text, 2px margin for antialiasing
+    canvas = np.zeros((max(bottom, 0) + 4, max(right, 0) + 4, nb_channels),
+                      dtype=dtype)
+    canvas[...] = np.uint8(color_bg).reshape((1, 1, -1))
+    text_arr = ia.draw_text(canvas, x=2, y=2, text=text, color=color_text,
+                            size=size_text)
+    text_arr.flags.writeable = False
+
+    _LABEL_TEXT_CACHE[key] = text_arr
+    while len(_LABEL_TEXT_CACHE) > _LABEL_TEXT_CACHE_MAX_SIZE:
+        _LABEL_TEXT_CACHE.popitem(last=False)
+    return text_arr
+
+
+def _draw_boxes_on_image_uint8_(image, bounding_boxes, color, alpha, size):
+    """Draw the rectangles of many bounding boxes in-place on an image.
+
+    This produces the same pixels as calling
+    :func:`~imgaug.augmentables.bbs.BoundingBox.draw_box_on_image` for each
+    bounding box, but replaces the per-box ``polygon_perimeter()`` calls by
+    slicing and blends only the drawn pixels (via lookup tables) instead of
+    converting the whole image to ``float32`` per box.
+
+    Parameters
+    ----------
+    image : (H,W,C) ndarray
+        ``uint8`` image to draw on. Will be modified in-place.
+
+    bounding_boxes : list of imgaug.augmentables.bbs.BoundingBox
+        Bounding boxes to draw.
+
+    color : int or iterable of int
+        See :func:`~imgaug.augmentables.bbs.BoundingBox.draw_box_on_image`.
+
+    alpha : float
+        See :func:`~imgaug.augmentables.bbs.BoundingBox.draw_box_on_image`.
+
+    size : int
+        See :func:`~imgaug.augmentables.bbs.BoundingBox.draw_box_on_image`.
+
+    Returns
+    -------
+    (H,W,C) ndarray
+        The input image with the rectangles drawn on it.
+
+    """
+    # pylint: disable=invalid-name
+    if len(bounding_boxes) == 0 or size < 1:
+        return image
+
+    height, width = image.shape[0:2]
+    coords = np.float64([[bb.x1, bb.y1, bb.x2, bb.y2]
+                         for bb in bounding_boxes])
+    x1, y1, x2, y2 = np.round(coords).astype(np.int64).T
+
+    # Same as in BoundingBox.draw_box_on_image(): Keep the borders of boxes
+    # that are fully inside the image visible when they round to H or W.
+    within = (
+        (coords[:, 0] >= 0) & (coords[:, 2] < width)
+        & (coords[:, 1] >= 0) & (coords[:, 3] < height))
+    x1 = np.where(within, np.clip(x1, 0, width-1), x1)
+    x2 = np.where(within, np.clip(x2, 0, width-1), x2)
+    y1 = np.where(within, np.clip(y1, 0, height-1), y1)
+    y2 = np.where(within, np.clip(y2, 0, height-1), y2)
+
+    # The perimeters drawn for thickness steps 0..size-1 cover the rectangle
+    # grown by size-1 pixels minus the interior of the original rectangle.
+    # This area is split into four disjoint bands per box (top and bottom
+    # with full width, left and right between them), each given as
+    # half-open row and column ranges.
+    outer_y1 = y1 - size + 1
+    outer_y2 = y2 + size
+    outer_x1 = x1 - size + 1
+    outer_x2 = x2 + size
+    inner_y1 = y1 + 1
+    inner_x1 = x1 + 1
+    bands = np.concatenate([
+        np.stack([outer_y1, inner_y1, outer_x1, outer_x2], axis=-1),
+        np.stack([np.maximum(y2, inner_y1), outer_y2,
+                  outer_x1, outer_x2], axis=-1),
+        np.stack([inner_y1, y2, outer_x1, inner_x1], axis=-1),
+        np.stack([inner_y1, y2, np.maximum(x2, inner_x1), outer_x2],
+                 axis=-1)
+    ], axis=0)
+    bands[:, 0:2] = np.clip(bands[:, 0:2], 0, height)
+    bands[:, 2:4] = np.clip(bands[:, 2:4], 0, width)
+    bands = bands[(bands[:, 1] > bands[:, 0]) & (bands[:, 3] > bands[:, 2])]
+    if len(bands) == 0:
+        return image
+
+    if isinstance(color, (tuple, list)):
+        color = np.uint8(color)
+
+    if alpha >= 0.99:
+        for band_y1, band_y2, band_x1, band_x2 in bands:
+            image[band_y1:band_y2, band_x1:band_x2, :] = color
+        return image
+
+    # Count how often each pixel is drawn (overlapping boxes) within the
+    # area spanned by all bands.
+    area_y1, area_x1 = np.min(bands[:, [0, 2]], axis=0)
+    area_y2, area_x2 = np.max(bands[:, [1, 3]], axis=0)
+    counts = np.zeros((area_y2 - area_y1, area_x2 - area_x1),
+                      dtype=np.int32)
+    for band_y1, band_y2, band_x1, band_x2 in bands:
+        counts[band_y1-area_y1:band_y2-area_y1,
+               band_x1-area_x1:band_x2-area_x1] += 1
+    yy, xx = np.nonzero(counts)
+    counts = counts[yy, xx]
+    yy += area_y1
+    xx += area_x1
+
+    # luts[n] maps pixel values to the values after n successive blends,
+    # with the same float32 arithmetic as BoundingBox.draw_box_on_image()
+    nb_channels = image.shape[2]
+    luts = np.empty((np.max(counts) + 1, 256, nb_channels), dtype=np.uint8)
+    luts[0] = np.arange(256, dtype=np.uint8)[:, np.newaxis]
+    for i in range(1, len(luts)):
+        blend = np.empty((256, nb_channels), dtype=np.float32)
+        blend[...] = (
+            (1 - alpha) * luts[i-1].astype(np.float32)
+            + alpha * color)
+        luts[i] = np.clip(blend, 0, 255).astype(np.uint8)
+
+    channels = np.arange(nb_channels)[np.newaxis, :]
+    image[yy, xx, :] = luts[counts[:, np.newaxis], image[yy, xx, :],
+                            channels]
+    return image
@@ -2,12 +2,60 @@
 from __future__ import print_function, division, absolute_import
 
 import numpy as np
-import six.moves as sm
 
 from .. import imgaug as ia
 from .base import IAugmentable
 
 
+# Cache of color lookup tables, see _get_colormap_lut().
+_COLORMAP_LUTS = {}
+
+# Cache of blending lookup tables, see _get_blend_lut().
+_BLEND_LUTS = {}
+_BLEND_LUTS_MAX_SIZE = 64
+
+
+def _get_colormap_lut(cmap):
+    # (256, 3) uint8 table mapping uint8 heatmap values to RGB colors.
+    # The colors are computed exactly as they used to be computed per pixel,
+    # i.e. from float32 values v/255.
+    cacheable = cmap is None or ia.is_string(cmap)
+    lut = _COLORMAP_LUTS.get(cmap) if cacheable else None
+    if lut is None:
+        values = np.arange(256).astype(np.float32) / 255.0
+        if cmap is None:
+            colors = np.tile(values[:, np.newaxis], (1, 3))
+        else:
+            # import only when necessary (faster startup; optional
+            # dependency; less fragile -- see issue #225)
+            import matplotlib.pyplot as plt
+
+            cmap_func = plt.get_cmap(cmap)
+            colors = cmap_func(values)[:, 0:3]
+        lut = np.clip(colors * 255, 0, 255).astype(np.uint8)
+        if cacheable:
+            _COLORMAP_LUTS[cmap] = lut
+    return lut
+
+
+def _get_blend_lut(alpha):
+    # (65536,) uint8 table containing at index (v_image << 8) | v_heatmap
+    # the blend of two uint8 values, computed exactly as in
+    # HeatmapsOnImage.draw_on_image().
+    lut = _BLEND_LUTS.get(alpha)
+    if lut is None:
+        values = np.arange(256)
+        lut = np.clip(
+            (1-alpha) * values[:, np.newaxis]
+            + alpha * values[np.newaxis, :],
+            0, 255
+        ).astype(np.uint8).ravel()
+        if len(_BLEND_LUTS) >= _BLEND_LUTS_MAX_SIZE:
+            _BLEND_LUTS.clear()
+        _BLEND_LUTS[alpha] = lut
+    return lut
+
+
 class HeatmapsOnImage(IAugmentable):
     """Object representing heatmaps on a single image.
 
@@ -154,37 +202,18 @@ class HeatmapsOnImage(IAugmentable):
 
         """
         heatmaps_uint8 = self.to_uint8()
-        heatmaps_drawn = []
-
-        for c in sm.xrange(heatmaps_uint8.shape[2]):
-            # We use c:c+1 here to get a (H,W,1) array. Otherwise imresize
-            # would have to re-attach an axis.
-            heatmap_c = heatmaps_uint8[..., c:c+1]
-
-            if size is not None:
-                heatmap_c_rs = ia.imresize_single_image(
-                    heatmap_c, size, interpolation="nearest")
-            else:
-                heatmap_c_rs = heatmap_c
-            heatmap_c_rs = np.squeeze(heatmap_c_rs).astype(np.float32) / 255.0
-
-            if cmap is not None:
-                # import only when necessary (faster startup; optional
-                # dependency; less fragile -- see issue #225)
-                import matplotlib.pyplot as plt
-
-                cmap_func = plt.get_cmap(cmap)
-                heatmap_cmapped = cmap_func(heatmap_c_rs)
-                heatmap_cmapped = np.delete(heatmap_cmapped, 3, 2)
-            else:
-                heatmap_cmapped = np.tile(
-                    heatmap_c_rs[..., np.newaxis], (1, 1, 3))
-
-            heatmap_cmapped = np.clip(
-                heatmap_cmapped * 255, 0, 255).astype(np.uint8)
-
-            heatmaps_drawn.append(heatmap_cmapped)
-        return heatmaps_drawn
+
+        if size is not None:
+            heatmaps_uint8 = ia.imresize_single_image(
+                heatmaps_uint8, size, interpolation="nearest")
+
+        # Map all channels in one step via a lookup table. Moving the
+        # channel axis to the front results in one contiguous (H,W,3)
+        # image per channel.
+        lut = _get_colormap_lut(cmap)
+        heatmaps_drawn = np.take(lut, np.moveaxis(heatmaps_uint8, 2, 0),
+                                 axis=0)
+        return list(heatmaps_drawn)
 
     def draw_on_image(self, image, alpha=0.75, cmap="jet", resize="heatmaps"):
         """Draw the heatmaps as overlays over an image.
@@ -242,12 +271,11 @@ class HeatmapsOnImage(IAugmentable):
             size=image.shape[0:2] if resize == "heatmaps" else None,
             cmap=cmap)
 
-        # TODO use blend_alpha here
+        # blend in uint8 via a lookup table indexed by both pixel values
+        lut = _get_blend_lut(alpha)
+        image_idx = image.astype(np.uint16) << 8
         mix = [
-            np.clip(
-                (1-alpha) * image + alpha * heatmap_i,
-                0, 255
-            ).astype(np.uint8)
+            np.take(lut, image_idx | heatmap_i)
             for heatmap_i
             in heatmaps_drawn]
 
@@ -2,13 +2,12 @@
 from __future__ import print_function, division, absolute_import
 
 import numpy as np
-import scipy.spatial.distance
 import six.moves as sm
 
 from .. import imgaug as ia
 from .base import IAugmentable
 from .utils import (normalize_shape, project_coords,
-                    _remove_out_of_image_fraction_)
+                    _remove_out_of_image_fraction_, _CoverageDrawer)
 
 
 def compute_geometric_median(points=None, eps=1e-5, X=None):
@@ -39,6 +38,9 @@ def compute_geometric_median(points=None, eps=1e-5, X=None):
         ia.warn_deprecated("Using 'X' is deprecated, use 'points' instead.")
         points = X
 
+    # deferred import, scipy.spatial is slow to import
+    import scipy.spatial.distance
+
     y = np.mean(points, 0)
 
     while True:
@@ -780,9 +782,31 @@ class KeypointsOnImage(IAugmentable):
         (H,W,3) ndarray
             Image with drawn keypoints.
 
+        Notes
+        -----
+        For ``uint8`` images, all keypoints are drawn in one pass and
+        blended once with the image. Overlapping squares are hence not
+        blended multiple times when ``alpha`` is below ``1.0``.
+
         """
         # pylint: disable=redefined-outer-name
         image = np.copy(image) if copy else image
+
+        if image.dtype.name == "uint8" and image.ndim == 3:
+            if ia.is_single_number(color):
+                color = [color] * image.shape[-1]
+            drawer = _CoverageDrawer(image.shape)
+            # not to_xy_array(), which would round the coordinates to
+            # float32 before they are rounded to integers
+            xy = np.float64([(kp.x, kp.y) for kp in self.keypoints])
+            drawn = drawer.draw_squares(xy, size, color, alpha)
+            if raise_if_out_of_image and not np.all(drawn):
+                keypoint = self.keypoints[np.flatnonzero(~drawn)[0]]
+                raise Exception(
+                    "Cannot draw keypoint x=%.8f, y=%.8f on image with "
+                    "shape %s." % (keypoint.x, keypoint.y, image.shape))
+            return drawer.draw_on_image_(image)
+
         for keypoint in self.keypoints:
             image = keypoint.draw_on_image(
                 image, color=color, alpha=alpha, size=size, copy=False,
@@ -13,8 +13,13 @@ from .base import IAugmentable
 from .utils import (normalize_shape,
                     project_coords_,
                     interpolate_points,
-                    _remove_out_of_image_fraction_,
-                    _normalize_shift_args)
+                    _normalize_shift_args,
+                    _CoverageDrawer,
+                    _classify_coords_by_image_plane,
+                    _remove_out_of_image_by_coords_,
+                    _remove_out_of_image_fraction_by_coords_,
+                    _COORDS_INSIDE,
+                    _COORDS_OUTSIDE)
 
 
 # TODO Add Line class and make LineString a list of Line elements
@@ -397,6 +402,12 @@ class LineString(object):
             of the line that is inside the image plane is returned.
 
         """
+        coords_class = _classify_coords_by_image_plane([self.coords], image)[0]
+        if coords_class == _COORDS_INSIDE:
+            return 0.0
+        if coords_class == _COORDS_OUTSIDE:
+            return 1.0
+
         length = self.length
         if length == 0:
             if len(self.coords) == 0:
@@ -531,6 +542,12 @@ class LineString(object):
         if np.all(inside_image_mask):
             return [self.copy()]
 
+        # no intersections with the image edges are possible if the bounding
+        # box of the line string does not touch the image plane
+        coords_class = _classify_coords_by_image_plane([self.coords], image)[0]
+        if coords_class == _COORDS_OUTSIDE:
+            return []
+
         # top, right, bottom, left image edges
         # we subtract eps here, because intersection() works inclusively,
         # i.e. not subtracting eps would be equivalent to 0<=x<=C for C being
@@ -1172,37 +1189,36 @@ class LineString(object):
         ndarray
             Image with line string drawn on it.
 
-        """
-        def _assert_not_none(arg_name, arg_value):
-            assert arg_value is not None, (
-                "Expected '%s' to not be None, got type %s." % (
-                    arg_name, type(arg_value),))
-
-        _assert_not_none("color", color)
-        _assert_not_none("alpha", alpha)
-        _assert_not_none("size", size)
-
-        color_lines = color_lines if color_lines is not None \
-            else np.float32(color)
-        color_points = color_points if color_points is not None \
-            else np.float32(color) * 0.5
-
-        alpha_lines = alpha_lines if alpha_lines is not None \
-            else np.float32(alpha)
-        alpha_points = alpha_points if alpha_points is not None \
-            else np.float32(alpha)
-
-        size_lines = size_lines if size_lines is not None else size
-        size_points = size_points if size_points is not None else size * 3
+        Notes
+        -----
+        For ``uint8`` images of shape ``(H,W,C)``, the line segments and
+        points are blended only with the image area that the line string
+        covers, instead of converting the whole image to ``float32``. The
+        pixels are the same as for other dtypes up to rounding.
+
+        """
+        (color_lines, color_points, alpha_lines, alpha_points,
+         size_lines, size_points) = _get_line_string_draw_args(
+             color, color_lines, color_points, alpha, alpha_lines,
+             alpha_points, size, size_lines, size_points)
+
+        if image.dtype.name == "uint8" and image.ndim == 3:
+            return _draw_line_strings_on_image_uint8_(
+                np.copy(image), [self],
+                color_lines=color_lines, color_points=color_points,
+                alpha_lines=alpha_lines, alpha_points=alpha_points,
+                size_lines=size_lines, size_points=size_points,
+                antialiased=antialiased,
+                raise_if_out_of_image=raise_if_out_of_image)
 
         image = self.draw_lines_on_image(
-            image, color=np.array(color_lines).astype(np.uint8),
+            image, color=color_lines,
             alpha=alpha_lines, size=size_lines,
             antialiased=antialiased,
             raise_if_out_of_image=raise_if_out_of_image)
 
         image = self.draw_points_on_image(
-            image, color=np.array(color_points).astype(np.uint8),
+            image, color=color_points,
             alpha=alpha_points, size=size_points,
             copy=False,
             raise_if_out_of_image=raise_if_out_of_image)
@@ -1908,7 +1924,29 @@ class LineStringsOnImage(IAugmentable):
         ndarray
             Image with line strings drawn on it.
 
-        """
+        Notes
+        -----
+        For ``uint8`` images of shape ``(H,W,C)``, each line string's
+        segments and points are blended only with the image area that the
+        line string covers, instead of converting the whole image to
+        ``float32`` per line string. The line strings are still drawn one
+        after another, and the pixels are the same as for other dtypes up to
+        rounding.
+
+        """
+        if image.dtype.name == "uint8" and image.ndim == 3:
+            (color_lines, color_points, alpha_lines, alpha_points,
+             size_lines, size_points) = _get_line_string_draw_args(
+                 color, color_lines, color_points, alpha, alpha_lines,
+                 alpha_points, size, size_lines, size_points)
+            return _draw_line_strings_on_image_uint8_(
+                np.copy(image), self.line_strings,
+                color_lines=color_lines, color_points=color_points,
+                alpha_lines=alpha_lines, alpha_points=alpha_points,
+                size_lines=size_lines, size_points=size_points,
+                antialiased=antialiased,
+                raise_if_out_of_image=raise_if_out_of_image)
+
         # TODO improve efficiency here by copying only once
         for ls in self.line_strings:
             image = ls.draw_on_image(
@@ -1945,10 +1983,8 @@ class LineStringsOnImage(IAugmentable):
             The object and its items may have been modified in-place.
 
         """
-        self.line_strings = [
-            ls for ls in self.line_strings
-            if not ls.is_out_of_image(self.shape, fully=fully, partly=partly)]
-        return self
+        return _remove_out_of_image_by_coords_(
+            self, [ls.coords for ls in self.line_strings], fully, partly)
 
     def remove_out_of_image(self, fully=True, partly=False):
         """
@@ -1995,7 +2031,8 @@ class LineStringsOnImage(IAugmentable):
             The object and its items may have been modified in-place.
 
         """
-        return _remove_out_of_image_fraction_(self, fraction)
+        return _remove_out_of_image_fraction_by_coords_(
+            self, [ls.coords for ls in self.line_strings], fraction)
 
     def remove_out_of_image_fraction(self, fraction):
         """Remove all LS with an out of image fraction of at least `fraction`.
@@ -2043,10 +2080,17 @@ class LineStringsOnImage(IAugmentable):
             The count of output line strings may differ from the input count.
 
         """
-        self.line_strings = [
-            ls_clipped
-            for ls in self.line_strings
-            for ls_clipped in ls.clip_out_of_image(self.shape)]
+        # Classify all line strings at once, so that only line strings
+        # crossing the image plane have to be clipped.
+        classes = _classify_coords_by_image_plane(
+            [ls.coords for ls in self.line_strings], self.shape)
+        line_strings = []
+        for ls, coords_class in zip(self.line_strings, classes):
+            if coords_class == _COORDS_INSIDE:
+                line_strings.append(ls.copy())
+            elif coords_class != _COORDS_OUTSIDE:
+                line_strings.extend(ls.clip_out_of_image(self.shape))
+        self.line_strings = line_strings
         return self
 
     def clip_out_of_image(self):
@@ -2388,6 +2432,132 @@ class LineStringsOnImage(IAugmentable):
             str(self.line_strings), self.shape)
 
 
+def _get_line_string_draw_args(color, color_lines, color_points,
+                               alpha, alpha_lines, alpha_points,
+                               size, size_lines, size_points):
+    """Derive unset colors, alphas and sizes in ``LineString.draw_on_image()``.
+    """
+    def _assert_not_none(arg_name, arg_value):
+        assert arg_value is not None, (
+            "Expected '%s' to not be None, got type %s." % (
+                arg_name, type(arg_value),))
+
+    _assert_not_none("color", color)
+    _assert_not_none("alpha", alpha)
+    _assert_not_none("size", size)
+
+    color_lines = color_lines if color_lines is not None \
+        else np.float32(color)
+    color_points = color_points if color_points is not None \
+        else np.float32(color) * 0.5
+
+    alpha_lines = alpha_lines if alpha_lines is not None \
+        else np.float32(alpha)
+    alpha_points = alpha_points if alpha_points is not None \
+        else np.float32(alpha)
+
+    size_lines = size_lines if size_lines is not None else size
+    size_points = size_points if size_points is not None else size * 3
+
+    return (np.array(color_lines).astype(np.uint8),
+            np.array(color_points).astype(np.uint8),
+            alpha_lines, alpha_points, size_lines, size_points)
+
+
+def _draw_line_strings_on_image_uint8_(image, line_strings,
+                                       color_lines, color_points,
+                                       alpha_lines, alpha_points,
+                                       size_lines, size_points,
+                                       antialiased, raise_if_out_of_image,
+                                       closed=False, color_face=None,
+                                       alpha_face=0):
+    """Draw the lines and points of many line strings in-place on an image.
+
+    The line strings are drawn one after another, each one only within the
+    image area that it covers (see :func:`_get_draw_roi`). Per line string,
+    the line segments and then the points are drawn into coverage masks and
+    blended with that area (see
+    :class:`~imgaug.augmentables.utils._CoverageDrawer`). Lines and points
+    are rasterized the same way as in
+    :func:`~imgaug.augmentables.lines.LineString.draw_on_image`. The result
+    differs from it only by rounding, as the image is not converted to
+    ``float32`` as a whole.
+
+    If `closed` is ``True``, the last point of each line string is connected
+    to its first point. If `alpha_face` is above ``0``, the area enclosed by
+    each line string is filled with `color_face` before its lines are drawn
+    (see :func:`~imgaug.augmentables.polys.Polygon.draw_on_image`).
+
+    """
+    if raise_if_out_of_image:
+        for ls in line_strings:
+            if ls.is_out_of_image(image, partly=False, fully=True):
+                raise Exception(
+                    "Cannot draw line string '%s' on image with shape %s, "
+                    "because it would be out of bounds." % (
+                        ls.__str__(), image.shape))
+
+    margin = max(size_lines, size_points) // 2 + 2
+    for ls in line_strings:
+        if len(ls.coords) == 0:
+            continue
+        # Rounding before the shift to the drawing area keeps the pixels
+        # identical to drawing on the whole image.
+        xy = np.round(np.float32(ls.coords)).astype(np.int32)
+        roi = _get_draw_roi(xy, image.shape, margin)
+        if roi is None:
+            drawn = np.zeros((len(xy),), dtype=bool)
+        else:
+            y1, y2, x1, x2 = roi
+            image_roi = image[y1:y2, x1:x2]
+            xy = xy - np.int32([x1, y1])
+            drawer = _CoverageDrawer(image_roi.shape)
+            drawer.fill_polygons([xy], color_face, alpha_face)
+            drawer.draw_on_image_(image_roi)
+            drawer.draw_polylines([xy], size_lines, color_lines, alpha_lines,
+                                  closed=closed, antialiased=antialiased)
+            drawer.draw_on_image_(image_roi)
+            if alpha_points > 0.99:
+                drawn = drawer.draw_squares(xy, size_points, color_points,
+                                            alpha_points)
+                drawer.draw_on_image_(image_roi)
+            else:
+                # overlapping points are blended multiple times, as in
+                # LineString.draw_points_on_image()
+                drawn = np.zeros((len(xy),), dtype=bool)
+                for i in np.arange(len(xy)):
+                    drawn[i] = drawer.draw_squares(
+                        xy[i:i+1], size_points, color_points, alpha_points)[0]
+                    drawer.draw_on_image_(image_roi)
+
+        if raise_if_out_of_image and alpha_points >= 0.01 \
+                and not np.all(drawn):
+            x, y = ls.coords[np.flatnonzero(~drawn)[0]]
+            raise Exception(
+                "Cannot draw keypoint x=%.8f, y=%.8f on image with "
+                "shape %s." % (x, y, image.shape))
+
+    return image
+
+
+def _get_draw_roi(xy, image_shape, margin):
+    """Get the image area ``(y1, y2, x1, x2)`` that integer points cover.
+
+    The area is extended by `margin` pixels on each side and clipped to the
+    image plane. ``None`` is returned if it does not overlap with the image.
+
+    """
+    # pylint: disable=invalid-name
+    height, width = image_shape[0:2]
+    x1 = max(int(np.min(xy[:, 0])) - margin, 0)
+    x2 = min(int(np.max(xy[:, 0])) + margin + 1, width)
+    y1 = max(int(np.min(xy[:, 1])) - margin, 0)
+    y2 = min(int(np.max(xy[:, 1])) + margin + 1, height)
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return y1, y2, x1, x2
+
+
 def _is_point_on_line(line_start, line_end, point, eps=1e-4):
     dist_s2e = np.linalg.norm(np.float32(line_start) - np.float32(line_end))
     dist_s2p2e = (
@@ -5,7 +5,6 @@ import traceback
 import collections
 
 import numpy as np
-import scipy.spatial.distance
 import six.moves as sm
 import skimage.draw
 import skimage.measure
@@ -15,9 +14,13 @@ from .. import random as iarandom
 from .base import IAugmentable
 from .utils import (normalize_shape,
                     interpolate_points,
-                    _remove_out_of_image_fraction_,
                     project_coords_,
-                    _normalize_shift_args)
+                    _normalize_shift_args,
+                    _classify_coords_by_image_plane,
+                    _remove_out_of_image_by_coords_,
+                    _remove_out_of_image_fraction_by_coords_,
+                    _COORDS_INSIDE,
+                    _COORDS_OUTSIDE)
 
 
 def recover_psois_(psois, psois_orig, recoverer, random_state):
@@ -432,6 +435,13 @@ class Polygon(object):
             returned.
 
         """
+        coords_class = _classify_coords_by_image_plane([self.exterior],
+                                                       image)[0]
+        if coords_class == _COORDS_INSIDE:
+            return 0.0
+        if coords_class == _COORDS_OUTSIDE:
+            return 1.0
+
         area = self.area
         if area == 0:
             return self.to_line_string().compute_out_of_image_fraction(image)
@@ -577,6 +587,21 @@ class Polygon(object):
         # Shapely polygon conversion requires at least 3 coordinates
         if len(self.exterior) == 0:
             return []
+
+        # Polygons with all points inside of the image plane are fully
+        # inside of it (the image plane is convex) and are returned
+        # unchanged, i.e. without shapely changing the order of their points.
+        # Degenerate polygons still go through shapely below, which drops
+        # them (zero area) or removes their duplicate points.
+        # Polygons whose bounding box does not touch the image plane are
+        # fully outside of it.
+        coords_class = _classify_coords_by_image_plane([self.exterior],
+                                                       image)[0]
+        if coords_class == _COORDS_INSIDE and not _is_degenerate(self):
+            return [self.deepcopy()]
+        if coords_class == _COORDS_OUTSIDE:
+            return []
+
         if len(self.exterior) in [1, 2]:
             ls = self.to_line_string(closed=False)
             ls_clipped = ls.clip_out_of_image(image)
@@ -632,20 +657,18 @@ class Polygon(object):
         # polygon overlaps with the image plane, but all of its points are
         # outside of the image plane. The new polygon will not be made up of
         # any of the old points.
+        # This computes the same distances as calling
+        # find_closest_point_index() for each old point, but for all pairs of
+        # old and new points at once.
         polygons_reordered = []
         for polygon in polygons:
-            best_idx = None
-            best_dist = None
-            for x, y in self.exterior:
-                point_idx, dist = polygon.find_closest_point_index(
-                    x=x, y=y, return_distance=True)
-                if best_idx is None or dist < best_dist:
-                    best_idx = point_idx
-                    best_dist = dist
-            if best_idx is not None:
-                polygon_reordered = \
-                    polygon.change_first_point_by_index(best_idx)
-                polygons_reordered.append(polygon_reordered)
+            diffs = (polygon.exterior[np.newaxis, :, :]
+                     - self.exterior[:, np.newaxis, :])
+            distances = np.sqrt(diffs[..., 0] ** 2 + diffs[..., 1] ** 2)
+            best_old_idx = np.argmin(np.min(distances, axis=1))
+            best_idx = int(np.argmin(distances[best_old_idx]))
+            polygon_reordered = polygon.change_first_point_by_index(best_idx)
+            polygons_reordered.append(polygon_reordered)
 
         return polygons_reordered
 
@@ -813,47 +836,31 @@ class Polygon(object):
             Image with the polygon drawn on it. Result dtype is the same as the
             input dtype.
 
+        Notes
+        -----
+        For ``uint8`` images of shape ``(H,W,C)``, the area, perimeter and
+        corner points are blended only with the image area that the polygon
+        covers, instead of converting the whole image to ``float32``. The
+        pixels are the same as for other dtypes up to rounding.
+
         """
         # pylint: disable=invalid-name
-        def _assert_not_none(arg_name, arg_value):
-            assert arg_value is not None, (
-                "Expected '%s' to not be None, got type %s." % (
-                    arg_name, type(arg_value),))
-
-        def _default_to(var, default):
-            if var is None:
-                return default
-            return var
-
-        _assert_not_none("color", color)
-        _assert_not_none("alpha", alpha)
-        _assert_not_none("size", size)
-
-        # FIXME due to the np.array(.) and the assert at ndim==2 below, this
-        #       will always fail on 2D images?
-        color_face = _default_to(color_face, np.array(color))
-        color_lines = _default_to(color_lines, np.array(color) * 0.5)
-        color_points = _default_to(color_points, np.array(color) * 0.5)
-
-        alpha_face = _default_to(alpha_face, alpha * 0.5)
-        alpha_lines = _default_to(alpha_lines, alpha)
-        alpha_points = _default_to(alpha_points, alpha)
-
-        size_lines = _default_to(size_lines, size)
-        size_points = _default_to(size_points, size * 3)
-
-        if image.ndim == 2:
-            assert ia.is_single_number(color_face), (
-                "Got a 2D image. Expected then 'color_face' to be a single "
-                "number, but got %s." % (str(color_face),))
-            color_face = [color_face]
-        elif image.ndim == 3 and ia.is_single_number(color_face):
-            color_face = [color_face] * image.shape[-1]
-
-        if alpha_face < 0.01:
-            alpha_face = 0
-        elif alpha_face > 0.99:
-            alpha_face = 1
+        (color_face, color_lines, color_points,
+         alpha_face, alpha_lines, alpha_points,
+         size_lines, size_points) = _get_polygon_draw_args(
+             image, color, color_face, color_lines, color_points,
+             alpha, alpha_face, alpha_lines, alpha_points,
+             size, size_lines, size_points)
+
+        if image.dtype.name == "uint8" and image.ndim == 3:
+            return _draw_polygons_on_image_uint8_(
+                np.copy(image), [self],
+                color_face=color_face, color_lines=color_lines,
+                color_points=color_points,
+                alpha_face=alpha_face, alpha_lines=alpha_lines,
+                alpha_points=alpha_points,
+                size_lines=size_lines, size_points=size_points,
+                raise_if_out_of_image=raise_if_out_of_image)
 
         if raise_if_out_of_image and self.is_out_of_image(image):
             raise Exception("Cannot draw polygon %s on image with "
@@ -1633,7 +1640,32 @@ class PolygonsOnImage(IAugmentable):
         (H,W,C) ndarray
             Image with drawn polygons.
 
-        """
+        Notes
+        -----
+        For ``uint8`` images of shape ``(H,W,C)``, each polygon's area,
+        perimeter and corner points are blended only with the image area
+        that the polygon covers, instead of converting the whole image to
+        ``float32`` per polygon. The polygons are still drawn one after
+        another, and the pixels are the same as for other dtypes up to
+        rounding.
+
+        """
+        if image.dtype.name == "uint8" and image.ndim == 3:
+            (color_face, color_lines, color_points,
+             alpha_face, alpha_lines, alpha_points,
+             size_lines, size_points) = _get_polygon_draw_args(
+                 image, color, color_face, color_lines, color_points,
+                 alpha, alpha_face, alpha_lines, alpha_points,
+                 size, size_lines, size_points)
+            return _draw_polygons_on_image_uint8_(
+                np.copy(image), self.polygons,
+                color_face=color_face, color_lines=color_lines,
+                color_points=color_points,
+                alpha_face=alpha_face, alpha_lines=alpha_lines,
+                alpha_points=alpha_points,
+                size_lines=size_lines, size_points=size_points,
+                raise_if_out_of_image=raise_if_out_of_image)
+
         for poly in self.polygons:
             image = poly.draw_on_image(
                 image,
@@ -1675,11 +1707,8 @@ class PolygonsOnImage(IAugmentable):
             The object and its items may have been modified in-place.
 
         """
-        self.polygons = [
-            poly for poly in self.polygons
-            if not poly.is_out_of_image(self.shape, fully=fully, partly=partly)
-        ]
-        return self
+        return _remove_out_of_image_by_coords_(
+            self, [poly.exterior for poly in self.polygons], fully, partly)
 
     def remove_out_of_image(self, fully=True, partly=False):
         """Remove all polygons that are fully/partially outside of an image.
@@ -1722,7 +1751,8 @@ class PolygonsOnImage(IAugmentable):
             The object and its items may have been modified in-place.
 
         """
-        return _remove_out_of_image_fraction_(self, fraction)
+        return _remove_out_of_image_fraction_by_coords_(
+            self, [poly.exterior for poly in self.polygons], fraction)
 
     def remove_out_of_image_fraction(self, fraction):
         """Remove all Polys with an out of image fraction of ``>=fraction``.
@@ -1774,10 +1804,17 @@ class PolygonsOnImage(IAugmentable):
             The object and its items may have been modified in-place.
 
         """
-        self.polygons = [
-            poly_clipped
-            for poly in self.polygons
-            for poly_clipped in poly.clip_out_of_image(self.shape)]
+        # Classify all polygons at once, so that only polygons crossing the
+        # image plane have to be clipped (via shapely).
+        classes = _classify_coords_by_image_plane(
+            [poly.exterior for poly in self.polygons], self.shape)
+        polygons = []
+        for poly, coords_class in zip(self.polygons, classes):
+            if coords_class == _COORDS_INSIDE and not _is_degenerate(poly):
+                polygons.append(poly.deepcopy())
+            elif coords_class != _COORDS_OUTSIDE:
+                polygons.extend(poly.clip_out_of_image(self.shape))
+        self.polygons = polygons
         return self
 
     def clip_out_of_image(self):
@@ -2158,6 +2195,107 @@ class PolygonsOnImage(IAugmentable):
             str(self.polygons), self.shape)
 
 
+def _is_degenerate(polygon):
+    """Estimate whether shapely would change a polygon that is fully inside
+    of the image plane during clipping.
+
+    That is the case for polygons with repeated points (which shapely
+    removes) and polygons without area (which shapely turns into lines or
+    points, which are then dropped).
+    """
+    exterior = polygon.exterior
+    if len(exterior) < 3:
+        return True
+    if len(np.unique(exterior, axis=0)) < len(exterior):
+        return True
+    xx = exterior[:, 0]
+    yy = exterior[:, 1]
+    return np.isclose(np.dot(xx, np.roll(yy, -1)), np.dot(np.roll(xx, -1), yy))
+
+
+def _get_polygon_draw_args(image, color, color_face, color_lines,
+                           color_points, alpha, alpha_face, alpha_lines,
+                           alpha_points, size, size_lines, size_points):
+    """Derive unset colors, alphas and sizes in ``Polygon.draw_on_image()``.
+    """
+    def _assert_not_none(arg_name, arg_value):
+        assert arg_value is not None, (
+            "Expected '%s' to not be None, got type %s." % (
+                arg_name, type(arg_value),))
+
+    def _default_to(var, default):
+        if var is None:
+            return default
+        return var
+
+    _assert_not_none("color", color)
+    _assert_not_none("alpha", alpha)
+    _assert_not_none("size", size)
+
+    # FIXME due to the np.array(.) and the assert at ndim==2 below, this
+    #       will always fail on 2D images?
+    color_face = _default_to(color_face, np.array(color))
+    color_lines = _default_to(color_lines, np.array(color) * 0.5)
+    color_points = _default_to(color_points, np.array(color) * 0.5)
+
+    alpha_face = _default_to(alpha_face, alpha * 0.5)
+    alpha_lines = _default_to(alpha_lines, alpha)
+    alpha_points = _default_to(alpha_points, alpha)
+
+    size_lines = _default_to(size_lines, size)
+    size_points = _default_to(size_points, size * 3)
+
+    if image.ndim == 2:
+        assert ia.is_single_number(color_face), (
+            "Got a 2D image. Expected then 'color_face' to be a single "
+            "number, but got %s." % (str(color_face),))
+        color_face = [color_face]
+    elif image.ndim == 3 and ia.is_single_number(color_face):
+        color_face = [color_face] * image.shape[-1]
+
+    if alpha_face < 0.01:
+        alpha_face = 0
+    elif alpha_face > 0.99:
+        alpha_face = 1
+
+    return (color_face, color_lines, color_points,
+            alpha_face, alpha_lines, alpha_points,
+            size_lines, size_points)
+
+
+def _draw_polygons_on_image_uint8_(image, polygons,
+                                   color_face, color_lines, color_points,
+                                   alpha_face, alpha_lines, alpha_points,
+                                   size_lines, size_points,
+                                   raise_if_out_of_image):
+    """Draw many polygons in-place on an image.
+
+    The polygons are drawn one after another, each one only within the
+    image area that it covers. Per polygon, the area, the perimeter and
+    then the corner points are blended with that area (see
+    :func:`~imgaug.augmentables.lines._draw_line_strings_on_image_uint8_`).
+    The result differs from
+    :func:`~imgaug.augmentables.polys.Polygon.draw_on_image` for each
+    polygon only by rounding.
+
+    """
+    from .lines import _draw_line_strings_on_image_uint8_
+
+    if raise_if_out_of_image:
+        for poly in polygons:
+            if poly.is_out_of_image(image):
+                raise Exception("Cannot draw polygon %s on image with "
+                                "shape %s." % (str(poly), image.shape))
+
+    return _draw_line_strings_on_image_uint8_(
+        image, [poly.to_line_string(closed=False) for poly in polygons],
+        color_lines=color_lines, color_points=color_points,
+        alpha_lines=alpha_lines, alpha_points=alpha_points,
+        size_lines=size_lines, size_points=size_points,
+        antialiased=True, raise_if_out_of_image=raise_if_out_of_image,
+        closed=True, color_face=color_face, alpha_face=alpha_face)
+
+
 def _convert_points_to_shapely_line_string(points, closed=False,
                                            interpolate=0):
     # load shapely lazily, which makes the dependency more optional
@@ -2610,6 +2748,9 @@ class _ConcavePolygonRecoverer(object):
         if poly.is_valid:
             return sm.xrange(len(points))
 
+        # deferred import, scipy.spatial is slow to import
+        import scipy.spatial
+
         hull = scipy.spatial.ConvexHull(points)
         points_kept = list(hull.vertices)
         points_left = [i for i in range(len(points)) if i not in points_kept]
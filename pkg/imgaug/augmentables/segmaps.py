@@ -6,13 +6,17 @@ E.g. masks, semantic or instance segmentation maps.
 from __future__ import print_function, division, absolute_import
 
 import numpy as np
-import six.moves as sm
 
 from .. import imgaug as ia
 from ..augmenters import blend as blendlib
 from .base import IAugmentable
 
 
+def _get_palette(colors):
+    # (N, 3) uint8 table mapping class ids to RGB colors.
+    return np.array(colors, dtype=np.uint8).reshape((-1, 3))
+
+
 @ia.deprecated(alt_func="SegmentationMapsOnImage",
                comment="(Note the plural 'Maps' instead of old 'Map'.)")
 def SegmentationMapOnImage(*args, **kwargs):
@@ -330,7 +334,7 @@ class SegmentationMapsOnImage(IAugmentable):
             "Expected 'resize' to be \"segmentation_map\" or \"image\", got "
             "%s." % (resize,))
 
-        colors = (
+        palette = _get_palette(
             colors
             if colors is not None
             else SegmentationMapsOnImage.DEFAULT_SEGMENT_COLORS
@@ -340,43 +344,37 @@ class SegmentationMapsOnImage(IAugmentable):
             image = ia.imresize_single_image(
                 image, self.arr.shape[0:2], interpolation="cubic")
 
-        segmaps_drawn = []
-        arr_channelwise = np.dsplit(self.arr, self.arr.shape[2])
-        for arr in arr_channelwise:
-            arr = arr[:, :, 0]
-
-            nb_classes = 1 + np.max(arr)
-            segmap_drawn = np.zeros((arr.shape[0], arr.shape[1], 3),
-                                    dtype=np.uint8)
-            assert nb_classes <= len(colors), (
-                "Can't draw all %d classes as it would exceed the maximum "
-                "number of %d available colors." % (nb_classes, len(colors),))
+        nb_classes = 1 + np.max(self.arr)
+        assert nb_classes <= len(palette), (
+            "Can't draw all %d classes as it would exceed the maximum "
+            "number of %d available colors." % (nb_classes, len(palette),))
+
+        # Resizing the class ids is equivalent to resizing the drawn colors
+        # and the foreground masks, as both use nearest neighbour
+        # interpolation.
+        arr = self.arr
+        if arr.shape[0:2] != image.shape[0:2]:
+            arr = ia.imresize_single_image(
+                arr, image.shape[0:2], interpolation="nearest")
+
+        # Map the class ids of all channels to colors in one step. Moving the
+        # channel axis to the front results in one contiguous (H,W,3) image
+        # per channel.
+        segmaps_colored = np.take(palette, np.moveaxis(arr, 2, 0), axis=0,
+                                  mode="clip")
+        blend_lut = blendlib._get_blend_alpha_uint8_lut(alpha)
 
-            ids_in_map = np.unique(arr)
-            for c, color in zip(sm.xrange(nb_classes), colors):
-                if c in ids_in_map:
-                    class_mask = (arr == c)
-                    segmap_drawn[class_mask] = color
-
-            segmap_drawn = ia.imresize_single_image(
-                segmap_drawn, image.shape[0:2], interpolation="nearest")
-
-            segmap_on_image = blendlib.blend_alpha(segmap_drawn, image, alpha)
+        segmaps_drawn = []
+        for c, segmap_drawn in enumerate(segmaps_colored):
+            segmap_on_image = blendlib._blend_alpha_uint8_lut(
+                segmap_drawn, image, blend_lut)
 
             if draw_background:
                 mix = segmap_on_image
             else:
-                foreground_mask = ia.imresize_single_image(
-                    (arr != background_class_id),
-                    image.shape[0:2],
-                    interpolation="nearest")
-                # without this, the merge below does nothing
-                foreground_mask = np.atleast_3d(foreground_mask)
-
-                mix = (
-                    (~foreground_mask) * image
-                    + foreground_mask * segmap_on_image
-                )
+                foreground_mask = (arr[:, :, c] != background_class_id)
+                mix = np.where(foreground_mask[:, :, np.newaxis],
+                               segmap_on_image, image)
             segmaps_drawn.append(mix)
         return segmaps_drawn
 
@@ -1,8 +1,11 @@
 """Utility functions used in augmentable modules."""
 from __future__ import print_function, absolute_import, division
+import collections
 import copy as copylib
 import numpy as np
+import cv2
 import six.moves as sm
+import skimage.draw
 import imgaug as ia
 
 
@@ -342,6 +345,94 @@ def _remove_out_of_image_fraction_(cbaoi, fraction):
     return cbaoi
 
 
+# Classes returned by _classify_coords_by_image_plane()
+_COORDS_INSIDE = 0
+_COORDS_OUTSIDE = 1
+_COORDS_CROSSING = 2
+
+
+def _classify_coords_by_image_plane(coords, image):
+    """Classify point sets as inside, outside or crossing an image plane.
+
+    The points of all sets are packed into one array, so that the tests run
+    vectorized over all sets instead of once per set. Only sets classified
+    as crossing the image plane require an exact (e.g. shapely-based)
+    clipping.
+
+    Parameters
+    ----------
+    coords : list of (N,2) ndarray
+        xy-coordinates of each point set, e.g. of each polygon's exterior.
+
+    image : (H,W,...) ndarray or tuple of int
+        Image or shape of the image.
+
+    Returns
+    -------
+    (M,) ndarray
+        ``int8`` array containing for each point set
+        ``_COORDS_INSIDE`` if all points are inside the image plane (i.e.
+        ``0 <= x < W`` and ``0 <= y < H``, same as
+        ``LineString.get_pointwise_inside_image_mask()``),
+        ``_COORDS_OUTSIDE`` if the bounding box of the points does not even
+        touch the image plane and ``_COORDS_CROSSING`` otherwise (including
+        point sets without any points).
+
+    """
+    height, width = (image.shape if ia.is_np_array(image) else image)[0:2]
+    lengths = np.array([len(coords_i) for coords_i in coords], dtype=np.intp)
+    classes = np.full((len(coords),), _COORDS_CROSSING, dtype=np.int8)
+    nonempty = (lengths > 0)
+    if not np.any(nonempty):
+        return classes
+
+    xy = np.concatenate(
+        [coords_i for coords_i, length in zip(coords, lengths) if length > 0],
+        axis=0)
+    starts = np.cumsum(lengths[nonempty]) - lengths[nonempty]
+    xx = xy[:, 0]
+    yy = xy[:, 1]
+
+    inside = (0 <= xx) & (xx < width) & (0 <= yy) & (yy < height)
+    all_inside = np.logical_and.reduceat(inside, starts)
+    outside = (
+        (np.maximum.reduceat(xx, starts) < 0)
+        | (np.minimum.reduceat(xx, starts) > width)
+        | (np.maximum.reduceat(yy, starts) < 0)
+        | (np.minimum.reduceat(yy, starts) > height))
+
+    classes[nonempty] = np.where(
+        all_inside, _COORDS_INSIDE,
+        np.where(outside, _COORDS_OUTSIDE, _COORDS_CROSSING))
+    return classes
+
+
+def _remove_out_of_image_fraction_by_coords_(cbaoi, coords, fraction):
+    # Same as _remove_out_of_image_fraction_(), but computes the fraction
+    # only for items crossing the image plane. Items fully inside have a
+    # fraction of 0.0, items fully outside a fraction of 1.0.
+    classes = _classify_coords_by_image_plane(coords, cbaoi.shape)
+    cbaoi.items = [
+        item for item, coords_class in zip(cbaoi.items, classes)
+        if (0.0 if coords_class == _COORDS_INSIDE
+            else 1.0 if coords_class == _COORDS_OUTSIDE
+            else item.compute_out_of_image_fraction(cbaoi.shape)) < fraction]
+    return cbaoi
+
+
+def _remove_out_of_image_by_coords_(cbaoi, coords, fully, partly):
+    # Same as calling item.is_out_of_image(fully=fully, partly=partly) for
+    # each item, but only for items crossing the image plane.
+    classes = _classify_coords_by_image_plane(coords, cbaoi.shape)
+    cbaoi.items = [
+        item for item, coords_class in zip(cbaoi.items, classes)
+        if not (False if coords_class == _COORDS_INSIDE
+                else fully if coords_class == _COORDS_OUTSIDE
+                else item.is_out_of_image(cbaoi.shape, fully=fully,
+                                          partly=partly))]
+    return cbaoi
+
+
 # Added in 0.4.0.
 def _normalize_shift_args(x, y, top=None, right=None, bottom=None, left=None):
     """Normalize ``shift()`` arguments to x, y and handle deprecated args."""
@@ -359,3 +450,189 @@ def _normalize_shift_args(x, y, top=None, right=None, bottom=None, left=None):
         x = x + left - right
         y = y + top - bottom
     return x, y
+
+
+class _CoverageDrawer(object):
+    """Draw many points, line strings and polygons on a ``uint8`` image.
+
+    Instead of blending each primitive separately with the whole image,
+    all primitives drawn with the same color and opacity are accumulated
+    in a single ``float32`` coverage mask (``0.0`` to ``1.0``).
+    :func:`_CoverageDrawer.draw_on_image_` then alpha-blends each mask once,
+    only at the pixels that it covers.
+
+    As a consequence, overlapping primitives of the same color and opacity
+    are blended only once with the image. Masks are blended in the order in
+    which their combination of color and opacity was first used.
+
+    Parameters
+    ----------
+    image_shape : tuple of int
+        Shape of the image that will be drawn on.
+
+    """
+
+    def __init__(self, image_shape):
+        self.height, self.width = image_shape[0:2]
+        self._masks = collections.OrderedDict()
+
+    def _get_mask(self, color, alpha):
+        key = (tuple(np.float32(color).flat), float(alpha))
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = np.zeros((self.height, self.width), dtype=np.float32)
+            self._masks[key] = mask
+        return mask
+
+    def draw_squares(self, xy, size, color, alpha):
+        """Draw squares around points, see ``Keypoint.draw_on_image()``.
+
+        Parameters
+        ----------
+        xy : (N,2) ndarray
+            Center xy-coordinates of the squares.
+
+        size : int
+            Side length of each square.
+
+        color : iterable of number
+            Color of the squares.
+
+        alpha : float
+            Opacity of the squares.
+
+        Returns
+        -------
+        (N,) ndarray
+            Boolean mask denoting for each point whether its square
+            overlapped with the image.
+
+        """
+        # pylint: disable=invalid-name
+        xy_int = np.round(np.float64(xy).reshape((-1, 2))).astype(np.int64)
+        x1 = np.maximum(xy_int[:, 0] - size//2, 0)
+        x2 = np.minimum(xy_int[:, 0] + 1 + size//2, self.width)
+        y1 = np.maximum(xy_int[:, 1] - size//2, 0)
+        y2 = np.minimum(xy_int[:, 1] + 1 + size//2, self.height)
+        drawn = (x2 - x1 >= 1) & (y2 - y1 >= 1)
+
+        if alpha >= 0.01 and np.any(drawn):
+            mask = self._get_mask(color, 1.0 if alpha > 0.99 else alpha)
+            for y1_i, y2_i, x1_i, x2_i in zip(y1[drawn], y2[drawn],
+                                              x1[drawn], x2[drawn]):
+                mask[y1_i:y2_i, x1_i:x2_i] = 1.0
+        return drawn
+
+    def draw_polylines(self, coords, size, color, alpha, closed=False,
+                       antialiased=True):
+        """Draw line strings, see ``LineString.draw_lines_on_image()``.
+
+        Parameters
+        ----------
+        coords : list of (N,2) ndarray
+            xy-coordinates of each line string.
+
+        size : int
+            Thickness of the lines. Lines are drawn with a thickness of one
+            pixel and then dilated to this size.
+
+        color : iterable of number
+            Color of the lines.
+
+        alpha : float
+            Opacity of the lines.
+
+        closed : bool, optional
+            Whether to connect the last point of each line string with its
+            first point.
+
+        antialiased : bool, optional
+            Whether to draw the lines with anti-aliasing.
+
+        """
+        # pylint: disable=invalid-name
+        if alpha < 1e-4 or size < 1:
+            return
+
+        # Same rasterization as in LineString.draw_lines_on_image(), i.e.
+        # skimage on rounded coordinates, so that e.g. axis-aligned lines
+        # are fully covered.
+        mask_lines = np.zeros((self.height, self.width), dtype=np.float32)
+        for coords_i in coords:
+            if len(coords_i) <= 1:
+                continue
+            points = np.round(np.float32(coords_i)).astype(np.int32)
+            if closed:
+                points = np.concatenate([points, points[0:1]], axis=0)
+            for (x1, y1), (x2, y2) in zip(points[:-1], points[1:]):
+                if antialiased:
+                    rr, cc, val = skimage.draw.line_aa(y1, x1, y2, x2)
+                else:
+                    rr, cc = skimage.draw.line(y1, x1, y2, x2)
+                    val = np.ones(rr.shape, dtype=np.float32)
+                inside = ((rr >= 0) & (rr < self.height)
+                          & (cc >= 0) & (cc < self.width))
+                mask_lines[rr[inside], cc[inside]] = val[inside]
+        if size > 1:
+            mask_lines = cv2.dilate(mask_lines,
+                                    np.ones((size, size), dtype=np.uint8))
+
+        mask = self._get_mask(color, alpha)
+        np.maximum(mask, mask_lines, out=mask)
+
+    def fill_polygons(self, coords, color, alpha):
+        """Fill the areas of polygons.
+
+        Parameters
+        ----------
+        coords : list of (N,2) ndarray
+            xy-coordinates of each polygon's corner points.
+
+        color : iterable of number
+            Color of the areas.
+
+        alpha : float
+            Opacity of the areas.
+
+        """
+        if len(coords) == 0 or alpha < 0.01:
+            return
+
+        mask = self._get_mask(color, 1.0 if alpha > 0.99 else alpha)
+        for coords_i in coords:
+            if len(coords_i) > 0:
+                # same rasterization as in Polygon.draw_on_image()
+                points = np.round(np.float32(coords_i)).astype(np.int32)
+                rr, cc = skimage.draw.polygon(points[:, 1], points[:, 0],
+                                              shape=mask.shape)
+                mask[rr, cc] = 1.0
+
+    def draw_on_image_(self, image):
+        """Blend all masks in-place with an image and then remove them.
+
+        Primitives drawn afterwards are hence blended on top of the ones
+        drawn so far.
+
+        Parameters
+        ----------
+        image : (H,W) ndarray or (H,W,C) ndarray
+            ``uint8`` image to draw on. Will be modified in-place.
+
+        Returns
+        -------
+        ndarray
+            The input image with all primitives drawn on it.
+
+        """
+        image_3d = image if image.ndim == 3 else image[:, :, np.newaxis]
+        for (color, alpha), mask in self._masks.items():
+            yy, xx = np.nonzero(mask)
+            if len(yy) == 0:
+                continue
+            weights = mask[yy, xx] * np.float32(alpha)
+            values = image_3d[yy, xx].astype(np.float32)
+            values += (np.float32(color) - values) * weights[:, np.newaxis]
+            image_3d[yy, xx] = np.clip(np.round(values), 0, 255).astype(
+                np.uint8)
+        self._masks.clear()
+        return image
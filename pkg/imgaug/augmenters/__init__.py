@@ -1,23 +1,177 @@
-"""Combination of all augmenters, related classes and related functions."""
+"""Combination of all augmenters, related classes and related functions.
+
+The augmenter modules are imported lazily (PEP 562). Accessing a name, e.g.
+``iaa.Fliplr``, imports only the module that defines it. This keeps
+``import imgaug.augmenters`` cheap, as some modules depend on heavy libraries
+(e.g. ``skimage.transform`` or ``scipy.ndimage``). ``from
+imgaug.augmenters import *`` still imports all names.
+
+"""
 # pylint: disable=unused-import
 from __future__ import absolute_import
-from imgaug.augmenters.base import *
-from imgaug.augmenters.arithmetic import *
-from imgaug.augmenters.artistic import *
-from imgaug.augmenters.blend import *
-from imgaug.augmenters.blur import *
-from imgaug.augmenters.collections import *
-from imgaug.augmenters.color import *
-from imgaug.augmenters.contrast import *
-from imgaug.augmenters.convolutional import *
-from imgaug.augmenters.debug import *
-from imgaug.augmenters.edges import *
-from imgaug.augmenters.flip import *
-from imgaug.augmenters.geometric import *
-import imgaug.augmenters.imgcorruptlike  # use as iaa.imgcorrupt.<Augmenter>
-from imgaug.augmenters.meta import *
-import imgaug.augmenters.pillike  # use via: iaa.pillike.*
-from imgaug.augmenters.pooling import *
-from imgaug.augmenters.segmentation import *
-from imgaug.augmenters.size import *
-from imgaug.augmenters.weather import *
+
+import importlib as _importlib
+
+# Public names of the augmenter modules, formerly imported via
+# ``from imgaug.augmenters.<module> import *``. Only names defined in a module
+# are listed, not the modules/functions that it imports itself. Listing them
+# here avoids importing every module to find its names. When adding a public
+# class or function to one of the modules, add it here too;
+# test_lazy_imports() in test_augmentation.py fails for missing names.
+_MODULE_NAMES = {
+    "base": (
+        "SuspiciousMultiImageShapeWarning", "SuspiciousSingleImageShapeWarning",
+    ),
+    "arithmetic": (
+        "Add", "AddElementwise", "AdditiveGaussianNoise",
+        "AdditiveLaplaceNoise", "AdditivePoissonNoise", "CoarseDropout",
+        "CoarsePepper", "CoarseSalt", "CoarseSaltAndPepper",
+        "ContrastNormalization", "Cutout", "Dropout", "Dropout2d",
+        "ImpulseNoise", "Invert", "JpegCompression", "Multiply",
+        "MultiplyElementwise", "Pepper", "ReplaceElementwise", "Salt",
+        "SaltAndPepper", "Solarize", "TotalDropout", "add_elementwise",
+        "add_scalar", "compress_jpeg", "compress_jpeg_batch", "cutout",
+        "cutout_", "invert", "invert_", "multiply_elementwise",
+        "multiply_scalar", "replace_elementwise_", "roundtrip_jpeg_batch",
+        "solarize", "solarize_",
+    ),
+    "artistic": (
+        "Cartoon", "stylize_cartoon",
+    ),
+    "blend": (
+        "Alpha", "AlphaElementwise", "BlendAlpha", "BlendAlphaBoundingBoxes",
+        "BlendAlphaCheckerboard", "BlendAlphaElementwise",
+        "BlendAlphaFrequencyNoise", "BlendAlphaHorizontalLinearGradient",
+        "BlendAlphaMask", "BlendAlphaRegularGrid", "BlendAlphaSegMapClassIds",
+        "BlendAlphaSimplexNoise", "BlendAlphaSomeColors",
+        "BlendAlphaVerticalLinearGradient", "BoundingBoxesMaskGen",
+        "CheckerboardMaskGen", "FrequencyNoiseAlpha",
+        "HorizontalLinearGradientMaskGen", "IBatchwiseMaskGenerator",
+        "InvertMaskGen", "RegularGridMaskGen", "SegMapClassIdsMaskGen",
+        "SimplexNoiseAlpha", "SomeColorsMaskGen", "StochasticParameterMaskGen",
+        "VerticalLinearGradientMaskGen", "blend_alpha",
+    ),
+    "blur": (
+        "AverageBlur", "BilateralBlur", "GaussianBlur", "MeanShiftBlur",
+        "MedianBlur", "MotionBlur", "blur_gaussian_", "blur_mean_shift_",
+    ),
+    "collections": (
+        "RandAugment",
+    ),
+    "color": (
+        "AddToBrightness", "AddToHue", "AddToHueAndSaturation",
+        "AddToSaturation", "CSPACE_ALL", "CSPACE_BGR", "CSPACE_CIE",
+        "CSPACE_GRAY", "CSPACE_HLS", "CSPACE_HSV", "CSPACE_Lab", "CSPACE_Luv",
+        "CSPACE_RGB", "CSPACE_YCrCb", "CSPACE_YUV", "ChangeColorTemperature",
+        "ChangeColorspace", "Grayscale", "InColorspace",
+        "KMeansColorQuantization", "MultiplyAndAddToBrightness",
+        "MultiplyBrightness", "MultiplyHue", "MultiplyHueAndSaturation",
+        "MultiplySaturation", "Posterize", "RemoveSaturation",
+        "UniformColorQuantization", "UniformColorQuantizationToNBits",
+        "WithBrightnessChannels", "WithColorspace", "WithHueAndSaturation",
+        "change_color_temperature", "change_color_temperatures_",
+        "change_colorspace_", "change_colorspaces_", "posterize",
+        "quantize_colors_kmeans", "quantize_colors_uniform", "quantize_kmeans",
+        "quantize_uniform", "quantize_uniform_", "quantize_uniform_to_n_bits",
+        "quantize_uniform_to_n_bits_",
+    ),
+    "contrast": (
+        "AllChannelsCLAHE", "AllChannelsHistogramEqualization", "CLAHE",
+        "GammaContrast", "HistogramEqualization", "LinearContrast",
+        "LogContrast", "SigmoidContrast", "adjust_contrast_gamma",
+        "adjust_contrast_linear", "adjust_contrast_log",
+        "adjust_contrast_sigmoid",
+    ),
+    "convolutional": (
+        "Convolve", "DirectedEdgeDetect", "EdgeDetect", "Emboss", "Sharpen",
+    ),
+    "debug": (
+        "SaveDebugImageEveryNBatches", "draw_debug_image",
+    ),
+    "edges": (
+        "Canny", "IBinaryImageColorizer", "RandomColorsBinaryImageColorizer",
+    ),
+    "flip": (
+        "Fliplr", "Flipud", "HorizontalFlip", "VerticalFlip", "fliplr",
+        "flipud",
+    ),
+    "geometric": (
+        "Affine", "AffineCv2", "ElasticTransformation", "Jigsaw",
+        "PerspectiveTransform", "PiecewiseAffine", "Rot90", "Rotate", "ScaleX",
+        "ScaleY", "ShearX", "ShearY", "TranslateX", "TranslateY",
+        "WithPolarWarping", "apply_jigsaw", "apply_jigsaw_to_coords",
+        "generate_jigsaw_destinations",
+    ),
+    "meta": (
+        "AssertLambda", "AssertShape", "Augmenter", "Batch", "ChannelShuffle",
+        "ClipCBAsToImagePlanes", "Identity", "Lambda", "Noop", "OneOf",
+        "RemoveCBAsByOutOfImageFraction", "Sequential", "SomeOf", "Sometimes",
+        "UnnormalizedBatch", "WithChannels", "clip_augmented_image",
+        "clip_augmented_image_", "clip_augmented_images",
+        "clip_augmented_images_", "copy_arrays",
+        "estimate_max_number_of_channels", "handle_children_list",
+        "invert_reduce_to_nonempty", "reduce_to_nonempty", "shuffle_channels",
+    ),
+    "pooling": (
+        "AveragePooling", "MaxPooling", "MedianPooling", "MinPooling",
+    ),
+    "segmentation": (
+        "DropoutPointsSampler", "IPointsSampler", "RegularGridPointsSampler",
+        "RegularGridVoronoi", "RelativeRegularGridPointsSampler",
+        "RelativeRegularGridVoronoi", "SubsamplingPointsSampler",
+        "Superpixels", "UniformPointsSampler", "UniformVoronoi", "Voronoi",
+        "segment_voronoi",
+    ),
+    "size": (
+        "CenterCropToAspectRatio", "CenterCropToFixedSize",
+        "CenterCropToMultiplesOf", "CenterCropToPowersOf",
+        "CenterCropToSquare", "CenterPadToAspectRatio", "CenterPadToFixedSize",
+        "CenterPadToMultiplesOf", "CenterPadToPowersOf", "CenterPadToSquare",
+        "Crop", "CropAndPad", "CropToAspectRatio", "CropToFixedSize",
+        "CropToMultiplesOf", "CropToPowersOf", "CropToSquare",
+        "KeepSizeByResize", "Pad", "PadToAspectRatio", "PadToFixedSize",
+        "PadToMultiplesOf", "PadToPowersOf", "PadToSquare", "Resize", "Scale",
+        "compute_croppings_to_reach_aspect_ratio",
+        "compute_croppings_to_reach_multiples_of",
+        "compute_croppings_to_reach_powers_of",
+        "compute_paddings_to_reach_aspect_ratio",
+        "compute_paddings_to_reach_multiples_of",
+        "compute_paddings_to_reach_powers_of", "pad", "pad_to_aspect_ratio",
+        "pad_to_multiples_of",
+    ),
+    "weather": (
+        "CloudLayer", "Clouds", "FastSnowyLandscape", "Fog", "Rain",
+        "RainLayer", "Snowflakes", "SnowflakesLayer",
+    ),
+
+}
+
+# Modules that are only accessible as attributes,
+# e.g. ``iaa.pillike.Autocontrast``
+_SUBMODULES = tuple(_MODULE_NAMES.keys()) + ("imgcorruptlike", "pillike")
+
+_NAME_TO_MODULE = {
+    name: module_name
+    for module_name, names in _MODULE_NAMES.items()
+    for name in names
+}
+
+__all__ = sorted(_NAME_TO_MODULE.keys())
+
+
+def __getattr__(name):
+    module_name = _NAME_TO_MODULE.get(name)
+    if module_name is not None:
+        module = _importlib.import_module("%s.%s" % (__name__, module_name))
+        value = getattr(module, name)
+        # cache the value, subsequent accesses no longer call __getattr__()
+        globals()[name] = value
+        return value
+    if name in _SUBMODULES:
+        return _importlib.import_module("%s.%s" % (__name__, name))
+    raise AttributeError(
+        "module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(__all__) | set(_SUBMODULES))
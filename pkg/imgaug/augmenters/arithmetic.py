@@ -31,10 +31,11 @@ List of augmenters:
 """
 from __future__ import print_function, division, absolute_import
 
-import tempfile
+import importlib
+import threading
 
-import imageio
 import numpy as np
+import cv2
 
 import imgaug as ia
 from . import meta
@@ -545,6 +546,18 @@ def multiply_elementwise(image, multipliers):
         Image, multiplied by `multipliers`.
 
     """
+    _gate_dtypes_multiply_elementwise(image)
+
+    if multipliers.dtype.kind == "b":
+        # TODO extend this with some shape checks
+        image *= multipliers
+        return image
+    if image.dtype.name == "uint8":
+        return _multiply_elementwise_to_uint8(image, multipliers)
+    return _multiply_elementwise_to_non_uint8(image, multipliers)
+
+
+def _gate_dtypes_multiply_elementwise(image):
     iadt.gate_dtypes(
         image,
         allowed=["bool",
@@ -556,14 +569,6 @@ def multiply_elementwise(image, multipliers):
                     "float64", "float96", "float128", "float256"],
         augmenter=None)
 
-    if multipliers.dtype.kind == "b":
-        # TODO extend this with some shape checks
-        image *= multipliers
-        return image
-    if image.dtype.name == "uint8":
-        return _multiply_elementwise_to_uint8(image, multipliers)
-    return _multiply_elementwise_to_non_uint8(image, multipliers)
-
 
 def _multiply_elementwise_to_uint8(image, multipliers):
     # This special uint8 block is around 60-100% faster than the
@@ -628,6 +633,71 @@ def _multiply_elementwise_to_non_uint8(image, multipliers):
     return iadt.restore_dtypes_(image, input_dtype)
 
 
+def _multiply_elementwise_by_coarse_mask_(image, mask):
+    """Multiply an image in-place with an upscaled low resolution mask.
+
+    This has the same effect as upscaling `mask` to the image's height and
+    width via nearest neighbour interpolation and then calling
+    :func:`multiply_elementwise` with the result converted to ``bool``, but
+    never creates the full resolution mask. Nearest neighbour upscaling maps
+    each row of `mask` to a contiguous band of image rows, so each mask row
+    containing zeros is expanded to one image row and multiplied with its
+    whole band. Bands without zeros are not touched.
+
+    **Supported dtypes**:
+
+    See :func:`~imgaug.augmenters.arithmetic.multiply_elementwise`.
+
+    Parameters
+    ----------
+    image : ndarray
+        Image array of shape ``(H,W,C)``. Might be modified in-place.
+
+    mask : ndarray
+        Low resolution mask of shape ``(H',W',1)`` or ``(H',W',C)``.
+        Zeros denote areas to drop.
+
+    Returns
+    -------
+    ndarray
+        Image with dropped areas set to zero.
+        The input image might have been modified in-place.
+
+    """
+    _gate_dtypes_multiply_elementwise(image)
+    if image.size == 0:
+        return image
+
+    height, width, nb_channels = image.shape
+    rows = _get_nearest_neighbour_index_map(mask.shape[0], height)
+    cols = _get_nearest_neighbour_index_map(mask.shape[1], width)
+    bands = np.searchsorted(rows, np.arange(mask.shape[0] + 1))
+    keep = (mask != 0)
+    row_indices = np.flatnonzero(~np.all(keep, axis=(1, 2)))
+
+    # expand the mask rows containing zeros to the image width and channels,
+    # as multiplying (h,W*C) bands with a contiguous (W*C,) row is much
+    # faster than broadcasting a (W,1) row over the channel axis
+    keep_rows = np.take(keep[row_indices], cols, axis=1)
+    keep_rows = np.broadcast_to(
+        keep_rows, (len(row_indices), width, nb_channels)
+    ).reshape((len(row_indices), width * nb_channels))
+
+    image = np.ascontiguousarray(image)
+    image_flat = image.reshape((height, width * nb_channels))
+    for row_idx, keep_row in zip(row_indices, keep_rows):
+        band = image_flat[bands[row_idx]:bands[row_idx + 1]]
+        np.multiply(band, keep_row, out=band)
+    return image
+
+
+def _get_nearest_neighbour_index_map(size_small, size):
+    # Let cv2 compute the source index of each target index, so that the
+    # mapping is guaranteed to match imresize_many_images(..., "nearest").
+    indices = np.arange(size_small, dtype=np.int32)[np.newaxis, :]
+    return cv2.resize(indices, (size, 1), interpolation=cv2.INTER_NEAREST)[0]
+
+
 def cutout(image, x1, y1, x2, y2,
            fill_mode="constant", cval=0, fill_per_channel=False,
            seed=None):
@@ -751,8 +821,6 @@ def cutout_(image, x1, y1, x2, y2,
         The input image might have been modified in-place.
 
     """
-    import importlib
-
     height, width = image.shape[0:2]
     x1 = min(max(int(x1), 0), width)
     y1 = min(max(int(y1), 0), height)
@@ -1404,11 +1472,148 @@ def compress_jpeg(image, compression):
         the result into a new array. Same shape and dtype as the input.
 
     """
-    import PIL.Image
-
     if image.size == 0:
         return np.copy(image)
 
+    quality = _compression_to_jpeg_quality(compression)
+    image_compressed, _ = _roundtrip_jpeg(image, quality)
+    return image_compressed
+
+
+def compress_jpeg_batch(images, compressions, return_nb_bytes=False,
+                        nb_workers=None):
+    """Compress many images using jpeg compression in parallel threads.
+
+    This is the batched variant of :func:`compress_jpeg`. The images are
+    encoded and decoded in memory via ``cv2.imencode()`` and
+    ``cv2.imdecode()``, which release the GIL, so the round trips are
+    distributed over the shared thread pool from
+    :func:`~imgaug.multicore.get_thread_pool`.
+
+    **Supported dtypes**:
+
+    See :func:`~imgaug.augmenters.arithmetic.compress_jpeg`.
+
+    Parameters
+    ----------
+    images : ndarray or list of ndarray
+        Images of dtype ``uint8``. Either a single array of shape
+        ``(N,H,W,[C])`` or a list of arrays of shape ``(H,W,[C])``. If ``C``
+        is provided, it must be ``1`` or ``3``.
+
+    compressions : int or iterable of int
+        Strength of the compression in the interval ``[0, 100]``. Either
+        one value for all images or one value per image.
+
+    return_nb_bytes : bool, optional
+        Whether to also return the size in bytes of each image's jpeg
+        encoding.
+
+    nb_workers : None or int, optional
+        Maximum number of threads to use. See
+        :func:`~imgaug.multicore.map_threaded`.
+
+    Returns
+    -------
+    ndarray or list of ndarray
+        Input images after applying jpeg compression to them and reloading
+        the results. Same container type, shapes and dtype as the input.
+
+    list of int
+        Sizes in bytes of the jpeg encodings. Only returned if
+        `return_nb_bytes` is ``True``. Empty images have size ``0``.
+
+    """
+    qualities = [
+        _compression_to_jpeg_quality(compression)
+        for compression
+        in _broadcast_per_image(compressions, len(images), "compressions")]
+    return roundtrip_jpeg_batch(images, qualities,
+                                return_nb_bytes=return_nb_bytes,
+                                nb_workers=nb_workers)
+
+
+def roundtrip_jpeg_batch(images, qualities, return_nb_bytes=False,
+                         return_buffers=False, nb_workers=None):
+    """Encode images as jpeg and decode them again, without touching disk.
+
+    Other than :func:`compress_jpeg_batch`, this function is parameterized
+    via the usual jpeg *quality* instead of a *compression strength*. This
+    makes it suitable to generate quality sweeps of the same image, e.g.
+    by providing the same image multiple times.
+
+    **Supported dtypes**:
+
+    See :func:`~imgaug.augmenters.arithmetic.compress_jpeg`.
+
+    Parameters
+    ----------
+    images : ndarray or list of ndarray
+        Images of dtype ``uint8``. See :func:`compress_jpeg_batch`.
+
+    qualities : int or iterable of int
+        Jpeg quality in the interval ``[1, 100]``. Either one value for all
+        images or one value per image.
+
+    return_nb_bytes : bool, optional
+        Whether to also return the size in bytes of each image's jpeg
+        encoding.
+
+    return_buffers : bool, optional
+        Whether to also return the jpeg encodings themselves as ``bytes``,
+        e.g. to write them to files without encoding a second time.
+        Empty images have an empty encoding.
+
+    nb_workers : None or int, optional
+        Maximum number of threads to use. See
+        :func:`~imgaug.multicore.map_threaded`.
+
+    Returns
+    -------
+    ndarray or list of ndarray
+        Decoded images. Same container type, shapes and dtype as the input.
+
+    list of int
+        Sizes in bytes of the jpeg encodings. Only returned if
+        `return_nb_bytes` is ``True``.
+
+    list of bytes
+        The jpeg encodings. Only returned if `return_buffers` is ``True``.
+
+    """
+    from .. import multicore
+
+    qualities = _broadcast_per_image(qualities, len(images), "qualities")
+    for quality in qualities:
+        assert 1 <= quality <= 100, (
+            "Expected jpeg quality to be in the interval [1, 100], "
+            "got %s." % (quality,))
+
+    def _roundtrip(inputs):
+        image, quality = inputs
+        if image.size == 0:
+            return np.copy(image), (b"" if return_buffers else 0)
+        return _roundtrip_jpeg(image, int(quality),
+                               return_buffer=return_buffers)
+
+    results = multicore.map_threaded(_roundtrip, zip(images, qualities),
+                                     nb_workers=nb_workers)
+
+    images_compressed = [image for image, _ in results]
+    if ia.is_np_array(images):
+        images_compressed = np.array(images_compressed, dtype=images.dtype)
+        images_compressed = images_compressed.reshape(images.shape)
+
+    outputs = [images_compressed]
+    if return_nb_bytes:
+        outputs.append([len(buf) if isinstance(buf, bytes) else buf
+                        for _, buf in results])
+    if return_buffers:
+        outputs.append([buf for _, buf in results])
+    return outputs[0] if len(outputs) == 1 else tuple(outputs)
+
+
+def _compression_to_jpeg_quality(compression):
     # The value range 1 to 95 is suggested by PIL's save() documentation
     # Values above 95 seem to not make sense (no improvement in visual
     # quality, but large file size).
@@ -1421,26 +1626,14 @@ def compress_jpeg(image, compression):
     maximum_quality = 100
     minimum_quality = 1
 
-    assert image.dtype.name == "uint8", (
-        "Jpeg compression can only be applied to uint8 images. "
-        "Got dtype %s." % (image.dtype.name,))
     assert 0 <= compression <= 100, (
         "Expected compression to be in the interval [0, 100], "
         "got %.4f." % (compression,))
 
-    has_no_channels = (image.ndim == 2)
-    is_single_channel = (image.ndim == 3 and image.shape[-1] == 1)
-    if is_single_channel:
-        image = image[..., 0]
-
-    assert has_no_channels or is_single_channel or image.shape[-1] == 3, (
-        "Expected either a grayscale image of shape (H,W) or (H,W,1) or an "
-        "RGB image of shape (H,W,3). Got shape %s." % (image.shape,))
-
-    # Map from compression to quality used by PIL
+    # Map from compression to jpeg quality
     # We have valid compressions from 0 to 100, i.e. 101 possible
     # values
-    quality = int(
+    return int(
         np.clip(
             np.round(
                 minimum_quality
@@ -1452,22 +1645,69 @@ def compress_jpeg(image, compression):
         )
     )
 
-    image_pil = PIL.Image.fromarray(image)
-    with tempfile.NamedTemporaryFile(mode="wb+", suffix=".jpg") as f:
-        image_pil.save(f, quality=quality)
-
-        # Read back from file.
-        # We dont read from f.name, because that leads to PermissionDenied
-        # errors on Windows. We add f.seek(0) here, because otherwise we get
-        # `SyntaxError: index out of range` in PIL.
-        f.seek(0)
-        pilmode = "RGB"
-        if has_no_channels or is_single_channel:
-            pilmode = "L"
-        image = imageio.imread(f, pilmode=pilmode, format="jpeg")
+
+def _broadcast_per_image(values, nb_images, name):
+    if ia.is_single_number(values):
+        return [values] * nb_images
+    values = list(values)
+    assert len(values) == nb_images, (
+        "Expected one value in `%s` per image, got %d values for %d "
+        "images." % (name, len(values), nb_images))
+    return values
+
+
+# Per-thread scratch buffer for the RGB->BGR conversion before encoding.
+# Only the largest buffer seen so far is kept; smaller images use a view of
+# its first bytes. Reusing it avoids one full-image allocation per image in
+# compress_jpeg_batch() while keeping memory bounded for mixed image sizes.
+_JPEG_BUFFERS = threading.local()
+
+
+def _get_jpeg_buffer(shape):
+    size = int(np.prod(shape))
+    flat = getattr(_JPEG_BUFFERS, "flat", None)
+    if flat is None or flat.size < size:
+        flat = np.empty((size,), dtype=np.uint8)
+        _JPEG_BUFFERS.flat = flat
+    return flat[:size].reshape(shape)
+
+
+def _roundtrip_jpeg(image, quality, return_buffer=False):
+    assert image.dtype.name == "uint8", (
+        "Jpeg compression can only be applied to uint8 images. "
+        "Got dtype %s." % (image.dtype.name,))
+
+    has_no_channels = (image.ndim == 2)
+    is_single_channel = (image.ndim == 3 and image.shape[-1] == 1)
+    if is_single_channel:
+        image = image[..., 0]
+
+    assert has_no_channels or is_single_channel or image.shape[-1] == 3, (
+        "Expected either a grayscale image of shape (H,W) or (H,W,1) or an "
+        "RGB image of shape (H,W,3). Got shape %s." % (image.shape,))
+
+    is_gray = has_no_channels or is_single_channel
+    if is_gray:
+        image_bgr = np.ascontiguousarray(image)
+    else:
+        image_bgr = _get_jpeg_buffer(image.shape)
+        cv2.cvtColor(np.ascontiguousarray(image), cv2.COLOR_RGB2BGR,
+                     dst=image_bgr)
+
+    success, buf = cv2.imencode(".jpg", image_bgr,
+                                [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    assert success, (
+        "Failed to jpeg-encode image of shape %s." % (image.shape,))
+
+    if is_gray:
+        image = cv2.imdecode(buf, cv2.IMREAD_GRAYSCALE)
+    else:
+        image = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+
     if is_single_channel:
         image = image[..., np.newaxis]
-    return image
+    return image, (buf.tobytes() if return_buffer else len(buf))
 
 
 class Add(meta.Augmenter):
@@ -1567,12 +1807,10 @@ class Add(meta.Augmenter):
         images = batch.images
         nb_images = len(images)
         nb_channels_max = meta.estimate_max_number_of_channels(images)
-        rss = random_state.duplicate(2)
-
-        per_channel_samples = self.per_channel.draw_samples(
-            (nb_images,), random_state=rss[0])
-        value_samples = self.value.draw_samples(
-            (nb_images, nb_channels_max), random_state=rss[1])
+        plan = iap.get_sampling_plan(self, "add",
+                                     [self.per_channel, self.value])
+        per_channel_samples, value_samples = plan.draw_samples(
+            [(nb_images,), (nb_images, nb_channels_max)], random_state)
 
         gen = enumerate(zip(images, value_samples, per_channel_samples))
         for i, (image, value_samples_i, per_channel_samples_i) in gen:
@@ -2182,11 +2420,10 @@ class Multiply(meta.Augmenter):
         images = batch.images
         nb_images = len(images)
         nb_channels_max = meta.estimate_max_number_of_channels(images)
-        rss = random_state.duplicate(2)
-        per_channel_samples = self.per_channel.draw_samples(
-            (nb_images,), random_state=rss[0])
-        mul_samples = self.mul.draw_samples(
-            (nb_images, nb_channels_max), random_state=rss[1])
+        plan = iap.get_sampling_plan(self, "multiply",
+                                     [self.per_channel, self.mul])
+        per_channel_samples, mul_samples = plan.draw_samples(
+            [(nb_images,), (nb_images, nb_channels_max)], random_state)
 
         gen = enumerate(zip(images, mul_samples, per_channel_samples))
         for i, (image, mul_samples_i, per_channel_samples_i) in gen:
@@ -2332,6 +2569,7 @@ class MultiplyElementwise(meta.Augmenter):
             isinstance(self.mul, iap.FromLowerResolution)
             and isinstance(self.mul.other_param, iap.Binomial)
         )
+        is_mul_coarse_mask = self._is_coarse_mask_param(self.mul)
 
         gen = enumerate(zip(images, per_channel_samples, rss[1:]))
         for i, (image, per_channel_samples_i, rs) in gen:
@@ -2339,6 +2577,16 @@ class MultiplyElementwise(meta.Augmenter):
             sample_shape = (height,
                             width,
                             nb_channels if per_channel_samples_i > 0.5 else 1)
+
+            # CoarseDropout: apply the low resolution mask directly instead
+            # of upscaling it to a full resolution multiplier array
+            if is_mul_coarse_mask:
+                (mask, _method), = self.mul.draw_low_resolution_samples(
+                    (1,) + sample_shape, random_state=rs)
+                batch.images[i] = _multiply_elementwise_by_coarse_mask_(
+                    image, mask[0])
+                continue
+
             mul = self.mul.draw_samples(sample_shape, random_state=rs)
             # TODO let Binomial return boolean mask directly instead of [0, 1]
             #      integers?
@@ -2352,6 +2600,17 @@ class MultiplyElementwise(meta.Augmenter):
 
         return batch
 
+    @classmethod
+    def _is_coarse_mask_param(cls, param):
+        # Binomial samples at lower resolution that are upscaled via nearest
+        # neighbour interpolation, i.e. the default of CoarseDropout
+        return (
+            isinstance(param, iap.FromLowerResolution)
+            and isinstance(param.other_param, iap.Binomial)
+            and isinstance(param.method, iap.Deterministic)
+            and param.method.value in ["nearest", cv2.INTER_NEAREST]
+        )
+
     def get_parameters(self):
         """See :func:`~imgaug.augmenters.meta.Augmenter.get_parameters`."""
         return [self.mul, self.per_channel]
@@ -2592,14 +2851,7 @@ class Cutout(meta.Augmenter):
             return batch
 
         samples = self._draw_samples(batch.images, random_state)
-
-        # map from xyhw to xyxy (both relative coords)
-        cutout_height_half = samples.size_h / 2
-        cutout_width_half = samples.size_w / 2
-        x1_rel = samples.pos_x - cutout_width_half
-        y1_rel = samples.pos_y - cutout_height_half
-        x2_rel = samples.pos_x + cutout_width_half
-        y2_rel = samples.pos_y + cutout_height_half
+        rects = self._compute_rectangles(batch.images, samples)
 
         nb_iterations_sum = 0
         gen = enumerate(zip(batch.images, samples.nb_iterations))
@@ -2607,16 +2859,9 @@ class Cutout(meta.Augmenter):
             start = nb_iterations_sum
             end = start + nb_iterations
 
-            height, width = image.shape[0:2]
-
-            # map from relative xyxy to absolute xyxy coords
-            batch.images[i] = self._augment_image_by_samples(
+            batch.images[i] = self._fill_rectangles_(
                 image,
-                x1_rel[start:end] * width,
-                y1_rel[start:end] * height,
-                x2_rel[start:end] * width,
-                y2_rel[start:end] * height,
-                samples.squared[start:end],
+                rects[start:end],
                 samples.fill_mode[start:end],
                 samples.cval[start:end],
                 samples.fill_per_channel[start:end],
@@ -2672,29 +2917,67 @@ class Cutout(meta.Augmenter):
             fill_per_channel=fill_per_channel
         )
 
-    # Added in 0.4.0.
     @classmethod
-    def _augment_image_by_samples(cls, image, x1, y1, x2, y2, squared,
-                                  fill_mode, cval, fill_per_channel,
-                                  random_state):
-        for i, x1_i in enumerate(x1):
-            x2_i = x2[i]
-            if squared[i] >= 0.5:
-                height_h = (y2[i] - y1[i]) / 2
-                x_center = x1_i + (x2_i - x1_i) / 2
-                x1_i = x_center - height_h
-                x2_i = x_center + height_h
-
-            image = cutout_(
+    def _compute_rectangles(cls, images, samples):
+        # Compute the absolute xyxy coordinates of all areas in the batch
+        # at once, clipped to their image planes. Returns an (N, 4) array,
+        # where N is the total number of areas in the batch.
+        heights = np.repeat([image.shape[0] for image in images],
+                            samples.nb_iterations)
+        widths = np.repeat([image.shape[1] for image in images],
+                           samples.nb_iterations)
+
+        # map from xyhw to xyxy (both relative coords)
+        cutout_height_half = samples.size_h / 2
+        cutout_width_half = samples.size_w / 2
+        x1_rel = samples.pos_x - cutout_width_half
+        y1_rel = samples.pos_y - cutout_height_half
+        x2_rel = samples.pos_x + cutout_width_half
+        y2_rel = samples.pos_y + cutout_height_half
+
+        # map from relative xyxy to absolute xyxy coords
+        # (the image sizes are cast to the coordinates' dtype, so that the
+        # products are the same as when multiplying with python integers)
+        x1 = x1_rel * widths.astype(x1_rel.dtype)
+        y1 = y1_rel * heights.astype(y1_rel.dtype)
+        x2 = x2_rel * widths.astype(x2_rel.dtype)
+        y2 = y2_rel * heights.astype(y2_rel.dtype)
+
+        # squared areas use the height for both axes
+        squared = (samples.squared >= 0.5)
+        height_h = (y2 - y1) / 2
+        x_center = x1 + (x2 - x1) / 2
+        x1 = np.where(squared, x_center - height_h, x1)
+        x2 = np.where(squared, x_center + height_h, x2)
+
+        rects = np.stack([x1, y1, x2, y2], axis=-1)
+        rects = np.trunc(rects).astype(np.int64).reshape((-1, 4))
+        maxs = np.stack([widths, heights, widths, heights], axis=-1)
+        return np.clip(rects, 0, maxs)
+
+    @classmethod
+    def _fill_rectangles_(cls, image, rects, fill_mode, cval,
+                          fill_per_channel, random_state):
+        # areas are filled in order, as later areas overwrite earlier ones
+        # and gaussian fills draw their samples from random_state
+        is_nonempty = np.logical_and(rects[:, 2] > rects[:, 0],
+                                     rects[:, 3] > rects[:, 1])
+        for i in np.flatnonzero(is_nonempty):
+            fill_mode_i = fill_mode[i]
+            assert fill_mode_i in _CUTOUT_FILL_MODES, (
+                "Expected one of the following fill modes: %s. "
+                "Got: %s." % (
+                    str(list(_CUTOUT_FILL_MODES.keys())), fill_mode_i))
+
+            module_name, fname = _CUTOUT_FILL_MODES[fill_mode_i]
+            func = getattr(importlib.import_module(module_name), fname)
+            x1, y1, x2, y2 = rects[i].tolist()
+            image = func(
                 image,
-                x1=x1_i,
-                y1=y1[i],
-                x2=x2_i,
-                y2=y2[i],
-                fill_mode=fill_mode[i],
+                x1=x1, y1=y1, x2=x2, y2=y2,
                 cval=cval[i],
-                fill_per_channel=fill_per_channel[i],
-                seed=random_state)
+                per_channel=(fill_per_channel[i] >= 0.5),
+                random_state=random_state)
         return image
 
     # Added in 0.4.0.
@@ -4759,8 +5042,8 @@ class JpegCompression(meta.Augmenter):
         samples = self.compression.draw_samples((nb_images,),
                                                 random_state=random_state)
 
-        for i, (image, sample) in enumerate(zip(images, samples)):
-            batch.images[i] = compress_jpeg(image, int(sample))
+        batch.images = compress_jpeg_batch(
+            images, [int(sample) for sample in samples])
 
         return batch
 
@@ -384,7 +384,9 @@ class Cartoon(meta.Augmenter):
     def _augment_batch_(self, batch, random_state, parents, hooks):
         if batch.images is not None:
             samples = self._draw_samples(batch, random_state)
-            for i, image in enumerate(batch.images):
+
+            def _stylize_image(i):
+                image = batch.images[i]
                 image[...] = stylize_cartoon(
                     image,
                     blur_ksize=samples[0][i],
@@ -393,6 +395,9 @@ class Cartoon(meta.Augmenter):
                     edge_prevalence=samples[3][i],
                     from_colorspace=self.from_colorspace
                 )
+
+            self._map_images_threaded(_stylize_image,
+                                      range(len(batch.images)))
         return batch
 
     # Added in 0.4.0.
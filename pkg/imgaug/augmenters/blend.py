@@ -211,6 +211,38 @@ def blend_alpha(image_fg, image_bg, alpha, eps=1e-2):
     return image_blend
 
 
+# Cache of lookup tables, see _get_blend_alpha_uint8_lut().
+_BLEND_ALPHA_UINT8_LUTS = {}
+_BLEND_ALPHA_UINT8_LUTS_MAX_SIZE = 64
+
+
+def _get_blend_alpha_uint8_lut(alpha):
+    # (65536,) uint8 table containing at index (v_fg << 8) | v_bg the
+    # result of blend_alpha() for the uint8 values v_fg and v_bg and the
+    # scalar alpha. As blend_alpha() works elementwise, applying the table
+    # via _blend_alpha_uint8_lut() gives identical results, but is faster
+    # when the same alpha is used for large images, e.g. when drawing.
+    lut = _BLEND_ALPHA_UINT8_LUTS.get(alpha)
+    if lut is None:
+        values = np.arange(256).astype(np.uint8)
+        values_fg = np.repeat(values[:, np.newaxis], 256, axis=1)
+        values_bg = np.repeat(values[np.newaxis, :], 256, axis=0)
+        lut = blend_alpha(values_fg, values_bg, alpha).ravel()
+        if len(_BLEND_ALPHA_UINT8_LUTS) >= _BLEND_ALPHA_UINT8_LUTS_MAX_SIZE:
+            _BLEND_ALPHA_UINT8_LUTS.clear()
+        _BLEND_ALPHA_UINT8_LUTS[alpha] = lut
+    return lut
+
+
+def _blend_alpha_uint8_lut(image_fg, image_bg, lut):
+    # Equivalent to blend_alpha(image_fg, image_bg, alpha) for uint8 images
+    # and lut=_get_blend_alpha_uint8_lut(alpha).
+    idx = image_fg.astype(np.uint16)
+    idx <<= 8
+    idx |= image_bg
+    return np.take(lut, idx)
+
+
 # Added in 0.4.0.
 def _generate_branch_outputs(augmenter, batch, hooks, parents):
     parents_extended = parents + [augmenter]
@@ -964,14 +964,21 @@ class BilateralBlur(meta.Augmenter):
             (nb_images,), random_state=rss[1])
         samples_sigma_space = self.sigma_space.draw_samples(
             (nb_images,), random_state=rss[2])
-        gen = enumerate(zip(images, samples_d, samples_sigma_color,
-                            samples_sigma_space))
-        for i, (image, di, sigma_color_i, sigma_space_i) in gen:
+
+        def _blur_image(inputs):
+            image, di, sigma_color_i, sigma_space_i = inputs
             has_zero_sized_axes = (image.size == 0)
-            if di != 1 and not has_zero_sized_axes:
-                batch.images[i] = cv2.bilateralFilter(
-                    _normalize_cv2_input_arr_(image),
-                    di, sigma_color_i, sigma_space_i)
+            if di == 1 or has_zero_sized_axes:
+                return image
+            return cv2.bilateralFilter(
+                _normalize_cv2_input_arr_(image),
+                di, sigma_color_i, sigma_space_i)
+
+        images_aug = self._map_images_threaded(
+            _blur_image,
+            zip(images, samples_d, samples_sigma_color, samples_sigma_space))
+        for i, image_aug in enumerate(images_aug):
+            batch.images[i] = image_aug
         return batch
 
     def get_parameters(self):
@@ -1226,13 +1233,19 @@ class MeanShiftBlur(meta.Augmenter):
     def _augment_batch_(self, batch, random_state, parents, hooks):
         if batch.images is not None:
             samples = self._draw_samples(batch, random_state)
-            for i, image in enumerate(batch.images):
-                batch.images[i] = blur_mean_shift_(
-                    image,
+
+            def _blur_image(i):
+                return blur_mean_shift_(
+                    batch.images[i],
                     spatial_window_radius=samples[0][i],
                     color_window_radius=samples[1][i]
                 )
 
+            images_aug = self._map_images_threaded(
+                _blur_image, sm.xrange(len(batch.images)))
+            for i, image_aug in enumerate(images_aug):
+                batch.images[i] = image_aug
+
         return batch
 
     # Added in 0.4.0.
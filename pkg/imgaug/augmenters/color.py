@@ -3164,7 +3164,7 @@ class _AbstractColorQuantization(meta.Augmenter):
 
         if image.shape[-1] == 1:
             # 2D image
-            image_aug = self._quantize(image, counts)
+            image_aug = self._quantize(image, counts, random_state)
         else:
             # 3D image with 3 or 4 channels
             alpha_channel = None
@@ -3195,7 +3195,7 @@ class _AbstractColorQuantization(meta.Augmenter):
                     random_state=random_state.copy())
 
             image_tf = cs.augment_image(image)
-            image_tf_aug = self._quantize(image_tf, counts)
+            image_tf_aug = self._quantize(image_tf, counts, random_state)
             image_aug = cs_inv.augment_image(image_tf_aug)
 
             if alpha_channel is not None:
@@ -3210,7 +3210,7 @@ class _AbstractColorQuantization(meta.Augmenter):
         return image_aug
 
     @abstractmethod
-    def _quantize(self, image, counts):
+    def _quantize(self, image, counts, random_state):
         """Apply the augmenter-specific quantization function to an image."""
 
     def get_parameters(self):
@@ -3318,6 +3318,15 @@ class KMeansColorQuantization(_AbstractColorQuantization):
         exceeded. Valid methods are the same as in
         :func:`~imgaug.imgaug.imresize_single_image`.
 
+    method : {"cv2", "histogram"}, optional
+        Clustering method to use,
+        see :func:`~imgaug.augmenters.color.quantize_kmeans`.
+        ``histogram`` clusters a color histogram of the image instead of
+        all of its pixels, which is much faster for large images
+        (e.g. when `max_size` is ``None``) and does not touch OpenCV's
+        global RNG. Its initial cluster centers are sampled from the
+        augmenter's random state.
+
     seed : None or int or imgaug.random.RNG or numpy.random.Generator or numpy.random.BitGenerator or numpy.random.SeedSequence or numpy.random.RandomState, optional
         See :func:`~imgaug.augmenters.meta.Augmenter.__init__`.
 
@@ -3369,11 +3378,16 @@ class KMeansColorQuantization(_AbstractColorQuantization):
     in either ``RGB`` or ``HSV`` colorspace. The assumed input colorspace
     of images is ``RGB``.
 
+    >>> aug = iaa.KMeansColorQuantization(max_size=None, method="histogram")
+
+    Create an augmenter that quantizes images at their full resolution
+    by clustering a color histogram instead of all pixels.
+
     """
 
     def __init__(self, n_colors=(2, 16), from_colorspace=CSPACE_RGB,
                  to_colorspace=[CSPACE_RGB, CSPACE_Lab],
-                 max_size=128, interpolation="linear",
+                 max_size=128, interpolation="linear", method="cv2",
                  seed=None, name=None,
                  random_state="deprecated", deterministic="deprecated"):
         # pylint: disable=dangerous-default-value
@@ -3385,6 +3399,10 @@ class KMeansColorQuantization(_AbstractColorQuantization):
             interpolation=interpolation,
             seed=seed, name=name,
             random_state=random_state, deterministic=deterministic)
+        assert method in _KMEANS_METHODS, (
+            "Expected method to be one of %s, got %s." % (
+                ", ".join(_KMEANS_METHODS), method))
+        self.method = method
 
     @property
     def n_colors(self):
@@ -3395,9 +3413,17 @@ class KMeansColorQuantization(_AbstractColorQuantization):
         """
         return self.counts
 
-    def _quantize(self, image, counts):
+    def _quantize(self, image, counts, random_state):
+        if self.method == "histogram":
+            return quantize_kmeans(image, counts, method="histogram",
+                                   random_state=random_state)
         return quantize_kmeans(image, counts)
 
+    def get_parameters(self):
+        """See :func:`~imgaug.augmenters.meta.Augmenter.get_parameters`."""
+        return super(KMeansColorQuantization, self).get_parameters() + [
+            self.method]
+
 
 @ia.deprecated("imgaug.augmenters.colors.quantize_kmeans")
 def quantize_colors_kmeans(image, n_colors, n_max_iter=10, eps=1.0):
@@ -3410,7 +3436,17 @@ def quantize_colors_kmeans(image, n_colors, n_max_iter=10, eps=1.0):
                            nb_max_iter=n_max_iter, eps=eps)
 
 
-def quantize_kmeans(arr, nb_clusters, nb_max_iter=10, eps=1.0):
+# Methods supported by quantize_kmeans().
+_KMEANS_METHODS = ("cv2", "histogram")
+
+# Maximum number of bits of a color histogram key in quantize_kmeans().
+# Each channel is reduced to ``16 // C`` bits, i.e. grayscale and two-channel
+# images are histogrammed exactly and RGB images in a 5-bit-per-channel cube.
+_KMEANS_HISTOGRAM_BITS = 16
+
+
+def quantize_kmeans(arr, nb_clusters, nb_max_iter=10, eps=1.0, method="cv2",
+                    random_state=None):
     """Quantize an array into N bins using k-means clustering.
 
     If the input is an image, this method returns in an image with a maximum
@@ -3422,9 +3458,11 @@ def quantize_kmeans(arr, nb_clusters, nb_max_iter=10, eps=1.0):
 
     .. warning::
 
-        This function currently changes the RNG state of both OpenCV's
-        internal RNG and imgaug's global RNG. This is necessary in order
-        to ensure that the k-means clustering happens deterministically.
+        With ``method="cv2"`` this function changes the RNG state of both
+        OpenCV's internal RNG and imgaug's global RNG. This is necessary in
+        order to ensure that the k-means clustering happens deterministically.
+        It also makes that method unsafe to call from several threads at
+        the same time. ``method="histogram"`` has neither problem.
 
     Added in 0.4.0. (Previously called ``quantize_colors_kmeans()``.)
 
@@ -3463,6 +3501,28 @@ def quantize_kmeans(arr, nb_clusters, nb_max_iter=10, eps=1.0):
         change by less than this amount in an iteration, the clustering is
         stopped.
 
+    method : {"cv2", "histogram"}, optional
+        Clustering method to use.
+
+            * ``cv2``: Run ``cv2.kmeans()`` on all pixels.
+            * ``histogram``: Cluster a color histogram of the array
+              instead of its pixels, weighting each histogram bin by its
+              number of pixels. Single- and two-channel arrays are
+              histogrammed exactly. Arrays with more channels are first
+              reduced to ``16 // C`` bits per channel (i.e. a
+              ``32x32x32`` color cube for ``C=3``) and each bin is
+              represented by the mean of its pixels. The clustering then
+              runs on at most ``65536`` weighted points and the pixels are
+              assigned via a lookup table from histogram bins to clusters.
+              This is usually an order of magnitude faster for large
+              arrays. Pixels falling into the same bin always get the
+              same output color.
+
+    random_state : None or int or imgaug.random.RNG or numpy.random.Generator or numpy.random.BitGenerator or numpy.random.SeedSequence or numpy.random.RandomState, optional
+        The random state used to sample the initial cluster centers
+        if `method` is ``histogram``. If ``None``, a fixed seed is used,
+        so that the result is deterministic. Ignored for ``cv2``.
+
     Returns
     -------
     ndarray
@@ -3489,12 +3549,19 @@ def quantize_kmeans(arr, nb_clusters, nb_max_iter=10, eps=1.0):
     assert 2 <= nb_clusters <= 256, (
         "Expected nb_clusters to be in the discrete interval [2..256]. "
         "Got a value of %d instead." % (nb_clusters,))
+    assert method in _KMEANS_METHODS, (
+        "Expected method to be one of %s, got %s." % (
+            ", ".join(_KMEANS_METHODS), method))
 
     # without this check, kmeans throws an exception
     n_pixels = np.prod(arr.shape[0:2])
     if nb_clusters >= n_pixels:
         return np.copy(arr)
 
+    if method == "histogram":
+        return _quantize_kmeans_histogram(arr, nb_clusters, nb_max_iter, eps,
+                                          random_state)
+
     nb_channels = 1 if arr.ndim == 2 else arr.shape[-1]
     pixel_vectors = arr.reshape((-1, nb_channels)).astype(np.float32)
 
@@ -3526,6 +3593,122 @@ def quantize_kmeans(arr, nb_clusters, nb_max_iter=10, eps=1.0):
     return quantized_flat.reshape(arr.shape)
 
 
+def _quantize_kmeans_histogram(arr, nb_clusters, nb_max_iter, eps,
+                               random_state):
+    rng = iarandom.RNG(1 if random_state is None else random_state)
+    nb_channels = 1 if arr.ndim == 2 else arr.shape[-1]
+    pixel_vectors = arr.reshape((-1, nb_channels))
+
+    # Histogram key of each pixel. Each channel is reduced to nb_bits bits
+    # and the channels are concatenated.
+    nb_bits = min(max(_KMEANS_HISTOGRAM_BITS // nb_channels, 1), 8)
+    nb_key_bits = nb_bits * nb_channels
+    components = pixel_vectors >> (8 - nb_bits)
+    keys = components[:, 0].astype(
+        np.uint16 if nb_key_bits <= 16 else np.int64)
+    for c in sm.xrange(1, nb_channels):
+        keys <<= nb_bits
+        keys |= components[:, c]
+
+    if nb_key_bits <= _KMEANS_HISTOGRAM_BITS:
+        nb_bins = 2 ** nb_key_bits
+        weights = np.bincount(keys, minlength=nb_bins)
+        bins = np.flatnonzero(weights)
+        weights = weights[bins]
+    else:
+        # only hit for arrays with more than 16 channels
+        bins, keys, weights = np.unique(keys, return_inverse=True,
+                                        return_counts=True)
+        keys = keys.reshape((-1,))
+        nb_bins = len(bins)
+        bins = np.arange(nb_bins)
+
+    if nb_bits == 8:
+        # exact histogram, decode each bin's color from its key
+        shifts = 8 * np.arange(nb_channels - 1, -1, -1)
+        points = ((bins[:, np.newaxis] >> shifts) & 255).astype(np.float64)
+    else:
+        # represent each bin by the mean color of its pixels
+        points = np.stack([
+            np.bincount(keys, weights=pixel_vectors[:, c],
+                        minlength=nb_bins)[bins]
+            for c in sm.xrange(nb_channels)
+        ], axis=-1) / weights[:, np.newaxis]
+    weights = weights.astype(np.float64)
+
+    if len(points) <= nb_clusters:
+        centers = points
+        labels = np.arange(len(points))
+    else:
+        centers, labels = _kmeans_weighted(points, weights, nb_clusters,
+                                           nb_max_iter, eps, rng)
+
+    # lookup table from histogram bin to output color
+    centers_uint8 = np.clip(np.round(centers), 0, 255).astype(arr.dtype)
+    lut = np.zeros((nb_bins, nb_channels), dtype=arr.dtype)
+    lut[bins] = centers_uint8[labels]
+    quantized_flat = np.take(lut, keys, axis=0)
+    return quantized_flat.reshape(arr.shape)
+
+
+def _kmeans_weighted(points, weights, nb_clusters, nb_max_iter, eps, rng):
+    # Weighted k-means (Lloyd's algorithm) with greedy k-means++
+    # initialization, i.e. each further center is the best of a few
+    # candidates sampled proportionally to weight * squared distance.
+    # Termination follows cv2.kmeans(): stop after nb_max_iter iterations
+    # (at least two) or once no center moved by more than eps.
+    nb_points = len(points)
+    nb_trials = 2 + int(np.log(nb_clusters))
+    centers = np.empty((nb_clusters, points.shape[1]), dtype=np.float64)
+    cumulative = np.cumsum(weights)
+    idx = np.searchsorted(cumulative, rng.uniform(0, cumulative[-1]),
+                          side="right")
+    centers[0] = points[min(idx, nb_points - 1)]
+    min_dists = np.sum((points - centers[0]) ** 2, axis=1)
+    for i in sm.xrange(1, nb_clusters):
+        cumulative = np.cumsum(min_dists * weights)
+        if cumulative[-1] <= 0:
+            # all points are already centers
+            centers[i:] = centers[0]
+            break
+        candidates = np.minimum(
+            np.searchsorted(cumulative,
+                            rng.uniform(0, cumulative[-1], size=nb_trials),
+                            side="right"),
+            nb_points - 1)
+        candidate_dists = np.minimum(
+            min_dists[np.newaxis, :],
+            np.sum((points[np.newaxis, :, :]
+                    - points[candidates][:, np.newaxis, :]) ** 2, axis=2))
+        best = np.argmin(np.dot(candidate_dists, weights))
+        centers[i] = points[candidates[best]]
+        min_dists = candidate_dists[best]
+
+    for _ in sm.xrange(max(nb_max_iter, 2)):
+        labels = _kmeans_assign(points, centers)
+        counts = np.bincount(labels, weights=weights, minlength=nb_clusters)
+        sums = np.stack([
+            np.bincount(labels, weights=points[:, c] * weights,
+                        minlength=nb_clusters)
+            for c in sm.xrange(points.shape[1])
+        ], axis=-1)
+        nonempty = counts > 0
+        centers_new = np.copy(centers)
+        centers_new[nonempty] = sums[nonempty] / counts[nonempty, np.newaxis]
+        max_shift = np.max(np.sum((centers_new - centers) ** 2, axis=1))
+        centers = centers_new
+        if max_shift <= eps ** 2:
+            break
+
+    return centers, _kmeans_assign(points, centers)
+
+
+def _kmeans_assign(points, centers):
+    # argmin_k |p - c_k|^2 == argmin_k (|c_k|^2 - 2 p.c_k)
+    dists = np.sum(centers ** 2, axis=1) - 2 * np.dot(points, centers.T)
+    return np.argmin(dists, axis=1)
+
+
 class UniformColorQuantization(_AbstractColorQuantization):
     """Quantize colors into N bins with regular distance.
 
@@ -3678,7 +3861,7 @@ class UniformColorQuantization(_AbstractColorQuantization):
         """
         return self.counts
 
-    def _quantize(self, image, counts):
+    def _quantize(self, image, counts, random_state):
         return quantize_uniform_(image, counts)
 
 
@@ -3832,7 +4015,7 @@ class UniformColorQuantizationToNBits(_AbstractColorQuantization):
             random_state=random_state, deterministic=deterministic)
 
     # Added in 0.4.0.
-    def _quantize(self, image, counts):
+    def _quantize(self, image, counts, random_state):
         return quantize_uniform_to_n_bits_(image, counts)
 
 
@@ -15,6 +15,9 @@ List of augmenters:
 """
 from __future__ import print_function, division, absolute_import
 
+import collections
+import threading
+
 import numpy as np
 import six.moves as sm
 import skimage.exposure as ski_exposure
@@ -29,6 +32,74 @@ from .. import dtypes as iadt
 from ..augmentables.batches import _BatchInAugmentation
 
 
+# Maximum number of cv2 CLAHE instances kept alive per thread by
+# _get_clahe(). Instances are keyed by their tile grid size.
+_CLAHE_CACHE_SIZE = 64
+
+# CLAHE instances are stateful (they keep internal buffers between calls to
+# apply()), so they must not be shared between threads.
+_CLAHE_CACHE = threading.local()
+
+
+def _get_clahe(clip_limit, tile_grid_size):
+    """Get a cached cv2 CLAHE instance configured with the given parameters.
+
+    The instances are cached per thread and per tile grid size in a bounded
+    LRU cache. The clip limit is set on the cached instance, so it does not
+    have to be quantized. Reusing instances avoids re-creating the CLAHE
+    object and lets cv2 reuse its internal buffers between images of the same
+    size.
+
+    Parameters
+    ----------
+    clip_limit : number
+        Clip limit of the CLAHE instance.
+
+    tile_grid_size : tuple of int
+        Tile grid size of the CLAHE instance, given as ``(width, height)``.
+
+    Returns
+    -------
+    cv2.CLAHE
+        Configured CLAHE instance.
+
+    """
+    cache = getattr(_CLAHE_CACHE, "instances", None)
+    if cache is None:
+        cache = collections.OrderedDict()
+        _CLAHE_CACHE.instances = cache
+
+    key = (int(tile_grid_size[0]), int(tile_grid_size[1]))
+    clahe = cache.pop(key, None)
+    if clahe is None:
+        clahe = cv2.createCLAHE(clipLimit=float(clip_limit), tileGridSize=key)
+        if len(cache) >= _CLAHE_CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        clahe.setClipLimit(float(clip_limit))
+    cache[key] = clahe
+    return clahe
+
+
+def _equalize_hist_uint8(image):
+    """Apply histogram equalization to each channel of a ``(H,W,C)`` image."""
+    nb_channels = image.shape[2]
+    if nb_channels == 1:
+        channel = cv2.equalizeHist(_normalize_cv2_input_arr_(image[..., 0]))
+        return channel[..., np.newaxis]
+    if nb_channels <= 4:
+        # split() produces contiguous channels in a single call and merge()
+        # interleaves them again, which is cheaper than stacking the
+        # per-channel results via numpy and transposing them
+        channels = cv2.split(_normalize_cv2_input_arr_(image))
+        return cv2.merge([cv2.equalizeHist(channel) for channel in channels])
+    image_warped = [
+        cv2.equalizeHist(_normalize_cv2_input_arr_(image[..., c]))
+        for c in sm.xrange(nb_channels)]
+    image_warped = np.array(image_warped, dtype=image_warped[0].dtype)
+    return image_warped.transpose((1, 2, 0))
+
+
 class _ContrastFuncWrapper(meta.Augmenter):
     def __init__(self, func, params1d, per_channel, dtypes_allowed=None,
                  dtypes_disallowed=None,
@@ -61,14 +132,13 @@ class _ContrastFuncWrapper(meta.Augmenter):
         rss = random_state.duplicate(1+nb_images)
         per_channel = self.per_channel.draw_samples((nb_images,),
                                                     random_state=rss[0])
+        plan = iap.get_sampling_plan(self, "params1d", self.params1d)
 
         gen = enumerate(zip(images, per_channel, rss[1:]))
         for i, (image, per_channel_i, rs) in gen:
             nb_channels = 1 if per_channel_i <= 0.5 else image.shape[2]
-            # TODO improve efficiency by sampling once
-            samples_i = [
-                param.draw_samples((nb_channels,), random_state=rs)
-                for param in self.params1d]
+            samples_i = plan.draw_samples(
+                [(nb_channels,)] * len(self.params1d), rs)
             if per_channel_i > 0.5:
                 input_dtype = image.dtype
                 # TODO This was previously a cast of image to float64. Do the
@@ -1051,20 +1121,20 @@ class AllChannelsCLAHE(meta.Augmenter):
         tile_grid_size_px_h = np.maximum(tile_grid_size_px_h,
                                          self.tile_grid_size_px_min)
 
-        gen = enumerate(zip(images, clip_limit, tile_grid_size_px_h,
-                            tile_grid_size_px_w, per_channel))
-        for i, (image, clip_limit_i, tgs_px_h_i, tgs_px_w_i, pchannel_i) in gen:
+        def _apply_clahe(inputs):
+            image, clip_limit_i, tgs_px_h_i, tgs_px_w_i, pchannel_i = inputs
             if image.size == 0:
-                continue
+                return image
 
             nb_channels = image.shape[2]
             c_param = 0
             image_warped = []
             for c in sm.xrange(nb_channels):
                 if tgs_px_w_i[c_param] > 1 or tgs_px_h_i[c_param] > 1:
-                    clahe = cv2.createCLAHE(
-                        clipLimit=clip_limit_i[c_param],
-                        tileGridSize=(tgs_px_w_i[c_param], tgs_px_h_i[c_param])
+                    # the cached CLAHE instances are thread-local
+                    clahe = _get_clahe(
+                        clip_limit_i[c_param],
+                        (tgs_px_w_i[c_param], tgs_px_h_i[c_param])
                     )
                     channel_warped = clahe.apply(
                         _normalize_cv2_input_arr_(image[..., c])
@@ -1076,9 +1146,14 @@ class AllChannelsCLAHE(meta.Augmenter):
                     c_param += 1
 
             # combine channels to one image
-            image_warped = np.stack(image_warped, axis=-1)
+            return np.stack(image_warped, axis=-1)
 
-            batch.images[i] = image_warped
+        images_aug = self._map_images_threaded(
+            _apply_clahe,
+            zip(images, clip_limit, tile_grid_size_px_h, tile_grid_size_px_w,
+                per_channel))
+        for i, image_aug in enumerate(images_aug):
+            batch.images[i] = image_aug
         return batch
 
     def get_parameters(self):
@@ -1308,6 +1383,15 @@ class CLAHE(meta.Augmenter):
             _augment_all_channels_clahe)
         return batch
 
+    def set_intra_batch_workers(self, nb_workers):
+        """Set the number of threads, also for the child CLAHE augmenter.
+
+        See :func:`~imgaug.augmenters.meta.Augmenter.set_intra_batch_workers`.
+
+        """
+        self.all_channel_clahe.set_intra_batch_workers(nb_workers)
+        return super(CLAHE, self).set_intra_batch_workers(nb_workers)
+
     def get_parameters(self):
         """See :func:`~imgaug.augmenters.meta.Augmenter.get_parameters`."""
         ac_clahe = self.all_channel_clahe
@@ -1410,13 +1494,7 @@ class AllChannelsHistogramEqualization(meta.Augmenter):
             if image.size == 0:
                 continue
 
-            image_warped = [
-                cv2.equalizeHist(_normalize_cv2_input_arr_(image[..., c]))
-                for c in sm.xrange(image.shape[2])]
-            image_warped = np.array(image_warped, dtype=image_warped[0].dtype)
-            image_warped = image_warped.transpose((1, 2, 0))
-
-            batch.images[i] = image_warped
+            batch.images[i] = _equalize_hist_uint8(image)
         return batch
 
     def get_parameters(self):
@@ -12,9 +12,14 @@ from __future__ import print_function, division, absolute_import
 from abc import ABCMeta, abstractmethod, abstractproperty
 
 import os
+import atexit
 import collections
+import threading
+import time
+import weakref
 
 import six
+import six.moves as sm
 import numpy as np
 import imageio
 
@@ -24,6 +29,25 @@ from . import meta
 from . import size as sizelib
 from . import blend as blendlib
 
+
+# Maximum time in seconds to wait at interpreter exit for debug images that
+# are still rendered in background threads.
+_DEBUG_IMAGE_EXIT_TIMEOUT = 10.0
+
+# Background renderers whose threads may still be running. Only weakly
+# referenced, so that renderers of augmenters that were garbage collected
+# do not stay alive until the interpreter exits.
+_ACTIVE_RENDERERS = weakref.WeakSet()
+
+
+def _close_renderers_at_exit():
+    deadline = time.time() + _DEBUG_IMAGE_EXIT_TIMEOUT
+    for renderer in list(_ACTIVE_RENDERERS):
+        renderer.close(timeout=max(deadline - time.time(), 0))
+
+
+atexit.register(_close_renderers_at_exit)
+
 _COLOR_PINK = (255, 192, 203)
 _COLOR_GRID_BACKGROUND = _COLOR_PINK
 
@@ -1130,6 +1154,154 @@ class _EveryNBatchesSchedule(_IBatchwiseSchedule):
         return signal
 
 
+def _draw_debug_image_of_batch(batch):
+    return draw_debug_image(
+        images=batch.images,
+        heatmaps=batch.heatmaps,
+        segmentation_maps=batch.segmentation_maps,
+        keypoints=batch.keypoints,
+        bounding_boxes=batch.bounding_boxes,
+        polygons=batch.polygons,
+        line_strings=batch.line_strings)
+
+
+class _BackgroundDebugImageRenderer(object):
+    """Render debug images of batch snapshots in a background thread.
+
+    The snapshots wait in a bounded queue. If the queue is full when a new
+    snapshot arrives, the oldest waiting snapshot is dropped. The batches
+    that it represented are merged into the next snapshot, so that the
+    destination still observes every batch via ``on_batch()`` and e.g.
+    numbers its files in the same way as without the background thread.
+
+    Parameters
+    ----------
+    destination : _IImageDestination
+        The destination receiving the rendered debug images. It is only
+        called from the background thread.
+
+    queue_size : int
+        Maximum number of snapshots waiting to be rendered.
+
+    """
+
+    def __init__(self, destination, queue_size):
+        assert queue_size >= 1, (
+            "Expected queue_size to be at least 1, got %d." % (queue_size,))
+        self.destination = destination
+        self.queue_size = queue_size
+        self.nb_dropped = 0
+        self._queue = collections.deque()
+        self._condition = threading.Condition()
+        self._nb_batches_unsubmitted = 0
+        self._is_rendering = False
+        self._is_closed = False
+        self._thread = None
+
+    def on_batch(self):
+        """Count a batch. Must be called for every batch."""
+        self._nb_batches_unsubmitted += 1
+
+    def submit(self, batch):
+        """Snapshot a batch and queue it for rendering without blocking.
+
+        Parameters
+        ----------
+        batch : imgaug.augmentables.batches._BatchInAugmentation
+            The batch to render. It is copied, so later augmenters may
+            change it in-place.
+
+        """
+        item = [self._nb_batches_unsubmitted, batch.deepcopy()]
+        self._nb_batches_unsubmitted = 0
+        with self._condition:
+            if len(self._queue) >= self.queue_size:
+                dropped = self._queue.popleft()
+                self.nb_dropped += 1
+                merge_into = self._queue[0] if self._queue else item
+                merge_into[0] += dropped[0]
+            self._queue.append(item)
+            self._is_closed = False
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="imgaug-debug-images")
+                self._thread.daemon = True
+                self._thread.start()
+                _ACTIVE_RENDERERS.add(self)
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait until all queued snapshots were rendered and saved.
+
+        Parameters
+        ----------
+        timeout : None or number, optional
+            Maximum time in seconds to wait. ``None`` waits indefinitely.
+
+        Returns
+        -------
+        bool
+            Whether all snapshots were handled within `timeout`.
+
+        """
+        with self._condition:
+            is_done = self._condition.wait_for(
+                lambda: not self._queue and not self._is_rendering,
+                timeout=timeout)
+        return is_done
+
+    def close(self, timeout=None):
+        """Render the queued snapshots, then stop the background thread.
+
+        A later call of :func:`submit` starts a new thread.
+
+        Parameters
+        ----------
+        timeout : None or number, optional
+            Maximum time in seconds to wait for the thread to finish.
+            ``None`` waits indefinitely.
+
+        Returns
+        -------
+        bool
+            Whether the thread finished within `timeout`.
+
+        """
+        with self._condition:
+            self._is_closed = True
+            thread = self._thread
+            self._condition.notify_all()
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: len(self._queue) > 0 or self._is_closed)
+                if not self._queue:
+                    # closed and nothing left to render
+                    self._thread = None
+                    return
+                nb_batches, snapshot = self._queue.popleft()
+                self._is_rendering = True
+
+            try:
+                image = _draw_debug_image_of_batch(snapshot)
+                for _ in sm.xrange(nb_batches):
+                    self.destination.on_batch(snapshot)
+                self.destination.receive(image)
+            except Exception as exc:  # pylint: disable=broad-except
+                ia.warn("Failed to render or save a debug image in the "
+                        "background: %s" % (exc,))
+            finally:
+                with self._condition:
+                    self._is_rendering = False
+                    self._condition.notify_all()
+
+
 class _SaveDebugImage(meta.Augmenter):
     """Augmenter saving debug images to a destination according to a schedule.
 
@@ -1144,6 +1316,16 @@ class _SaveDebugImage(meta.Augmenter):
         The schedule to use to determine for which batches an image is
         supposed to be generated.
 
+    background : bool, optional
+        Whether to render and save the debug images in a background
+        thread. The augmenter then only copies the batch, which
+        avoids stalling the augmentation loop on every ``N`` th batch.
+
+    queue_size : int, optional
+        Maximum number of batch copies waiting for the background thread.
+        If the queue is full, the oldest copy is dropped. Only used if
+        `background` is ``True``.
+
     seed : None or int or imgaug.random.RNG or numpy.random.Generator or numpy.random.BitGenerator or numpy.random.SeedSequence or numpy.random.RandomState, optional
         See :func:`~imgaug.augmenters.meta.Augmenter.__init__`.
 
@@ -1165,6 +1347,7 @@ class _SaveDebugImage(meta.Augmenter):
 
     # Added in 0.4.0.
     def __init__(self, destination, schedule,
+                 background=False, queue_size=1,
                  seed=None, name=None,
                  random_state="deprecated", deterministic="deprecated"):
         super(_SaveDebugImage, self).__init__(
@@ -1172,26 +1355,85 @@ class _SaveDebugImage(meta.Augmenter):
             random_state=random_state, deterministic=deterministic)
         self.destination = destination
         self.schedule = schedule
+        self.background = background
+        self.queue_size = queue_size
+        self._renderer = None
 
     # Added in 0.4.0.
     def _augment_batch_(self, batch, random_state, parents, hooks):
         save = self.schedule.on_batch(batch)
-        self.destination.on_batch(batch)
 
-        if save:
-            image = draw_debug_image(
-                images=batch.images,
-                heatmaps=batch.heatmaps,
-                segmentation_maps=batch.segmentation_maps,
-                keypoints=batch.keypoints,
-                bounding_boxes=batch.bounding_boxes,
-                polygons=batch.polygons,
-                line_strings=batch.line_strings)
+        if self.background:
+            renderer = self._get_renderer()
+            renderer.on_batch()
+            if save:
+                renderer.submit(batch)
+            return batch
 
+        self.destination.on_batch(batch)
+        if save:
+            image = _draw_debug_image_of_batch(batch)
             self.destination.receive(image)
 
         return batch
 
+    def _get_renderer(self):
+        if self._renderer is None:
+            self._renderer = _BackgroundDebugImageRenderer(
+                self.destination, self.queue_size)
+            # end the thread once this augmenter is garbage collected, the
+            # snapshots that are still queued are saved before that
+            weakref.finalize(self, self._renderer.close, 0)
+        return self._renderer
+
+    def flush(self, timeout=None):
+        """Wait until all debug images of the background thread were saved.
+
+        Does nothing if `background` is ``False``.
+
+        Parameters
+        ----------
+        timeout : None or number, optional
+            Maximum time in seconds to wait. ``None`` waits indefinitely.
+
+        Returns
+        -------
+        bool
+            Whether all debug images were saved within `timeout`.
+
+        """
+        if self._renderer is None:
+            return True
+        return self._renderer.flush(timeout=timeout)
+
+    def close(self, timeout=None):
+        """Save all pending debug images and stop the background thread.
+
+        Does nothing if `background` is ``False``. If the augmenter is used
+        again afterwards, a new background thread is started.
+
+        Parameters
+        ----------
+        timeout : None or number, optional
+            Maximum time in seconds to wait. ``None`` waits indefinitely.
+
+        Returns
+        -------
+        bool
+            Whether the background thread finished within `timeout`.
+
+        """
+        if self._renderer is None:
+            return True
+        return self._renderer.close(timeout=timeout)
+
+    def __getstate__(self):
+        # threads and locks can neither be pickled nor deepcopied, copies
+        # start their own background thread when needed
+        state = self.__dict__.copy()
+        state["_renderer"] = None
+        return state
+
 
 class SaveDebugImageEveryNBatches(_SaveDebugImage):
     """Visualize data in batches and save corresponding plots to a folder.
@@ -1217,6 +1459,19 @@ class SaveDebugImageEveryNBatches(_SaveDebugImage):
         executed conditionally or re-instantiated, it may not see all batches
         or the counter may be wrong in other ways.
 
+    background : bool, optional
+        Whether to render and save the images in a background thread
+        instead of during augmentation. The augmenter then only copies
+        every ``N`` th batch. Use :func:`flush` to wait for the images,
+        e.g. before reading them. Pending images are also waited for
+        (for a limited time) when the interpreter exits.
+
+    queue_size : int, optional
+        Maximum number of batch copies waiting for the background thread.
+        If the background thread falls behind, the oldest waiting copies
+        are dropped, i.e. no image is saved for their batches. The
+        augmentation itself never waits for the background thread.
+
     seed : None or int or imgaug.random.RNG or numpy.random.Generator or numpy.random.BitGenerator or numpy.random.SeedSequence or numpy.random.RandomState, optional
         See :func:`~imgaug.augmenters.meta.Augmenter.__init__`.
 
@@ -1247,10 +1502,19 @@ class SaveDebugImageEveryNBatches(_SaveDebugImage):
     >>>     iaa.SaveDebugImageEveryNBatches(folder_path, 100)
     >>> ])
 
+    >>> seq = iaa.Sequential([
+    >>>     iaa.Fliplr(0.5),
+    >>>     iaa.SaveDebugImageEveryNBatches(folder_path, 100,
+    >>>                                     background=True)
+    >>> ])
+
+    Render and save the debug images in a background thread.
+
     """
 
     # Added in 0.4.0.
     def __init__(self, destination, interval,
+                 background=False, queue_size=1,
                  seed=None, name=None,
                  random_state="deprecated", deterministic="deprecated"):
         schedule = _EveryNBatchesSchedule(interval)
@@ -1265,6 +1529,7 @@ class SaveDebugImageEveryNBatches(_SaveDebugImage):
             ])
         super(SaveDebugImageEveryNBatches, self).__init__(
             destination=destination, schedule=schedule,
+            background=background, queue_size=queue_size,
             seed=seed, name=name,
             random_state=random_state, deterministic=deterministic)
 
@@ -1276,5 +1541,7 @@ class SaveDebugImageEveryNBatches(_SaveDebugImage):
             dests[0].filename_pattern,
             dests[1].folder_path,
             dests[1].filename_pattern,
-            self.schedule.interval
+            self.schedule.interval,
+            self.background,
+            self.queue_size
         ]
@@ -439,14 +439,14 @@ class Canny(meta.Augmenter):
         hthresh_samples = samples[1]
         sobel_samples = samples[2]
 
-        gen = enumerate(zip(images, alpha_samples, hthresh_samples,
-                            sobel_samples))
-        for i, (image, alpha, hthreshs, sobel) in gen:
+        for image in images:
             assert image.shape[-1] in [1, 3, 4], (
                 "Canny edge detector can currently only handle images with "
                 "channel numbers that are 1, 3 or 4. Got %d.") % (
                     image.shape[-1],)
 
+        def _detect_edges(inputs):
+            image, alpha, hthreshs, sobel = inputs
             has_zero_sized_axes = (0 in image.shape[0:2])
             if alpha > 0 and sobel > 1 and not has_zero_sized_axes:
                 image_canny = cv2.Canny(
@@ -455,8 +455,18 @@ class Canny(meta.Augmenter):
                     threshold2=hthreshs[1],
                     apertureSize=sobel,
                     L2gradient=True)
-                image_canny = (image_canny > 0)
-
+                return image_canny > 0
+            return None
+
+        # the edge detection may run in threads, the colorizer samples
+        # random values and hence runs sequentially afterwards
+        images_canny = self._map_images_threaded(
+            _detect_edges,
+            zip(images, alpha_samples, hthresh_samples, sobel_samples))
+
+        gen = enumerate(zip(images, images_canny, alpha_samples))
+        for i, (image, image_canny, alpha) in gen:
+            if image_canny is not None:
                 # canny returns a boolean (H,W) image, so we change it to
                 # (H,W,C) and then uint8
                 image_canny_color = self.colorizer.colorize(
@@ -41,12 +41,38 @@ from .. import dtypes as iadt
 from .. import random as iarandom
 
 
-_VALID_DTYPES_CV2_ORDER_0 = {"uint8", "uint16", "int8", "int16", "int32",
-                             "float16", "float32", "float64",
-                             "bool"}
-_VALID_DTYPES_CV2_ORDER_NOT_0 = {"uint8", "uint16", "int8", "int16",
-                                 "float16", "float32", "float64",
-                                 "bool"}
+# Dtypes in which cv2 warps arrays of each input dtype. cv2's remap does not
+# support uint32 and only supports int32 for nearest neighbour interpolation,
+# hence these are widened to float64, which represents all of their values
+# exactly. Dtypes that are not listed here can only be warped by skimage.
+_CV2_WARP_DTYPES_ORDER_0 = {
+    "bool": "uint8",
+    "uint8": "uint8",
+    "uint16": "uint16",
+    "uint32": "float64",
+    "int8": "int8",
+    "int16": "int16",
+    "int32": "int32",
+    "float16": "float32",
+    "float32": "float32",
+    "float64": "float64"
+}
+_CV2_WARP_DTYPES_ORDER_NOT_0 = {
+    "bool": "float32",
+    "uint8": "uint8",
+    "uint16": "uint16",
+    "uint32": "float64",
+    "int8": "int16",
+    "int16": "int16",
+    "int32": "float64",
+    "float16": "float32",
+    "float32": "float32",
+    "float64": "float64"
+}
+
+# Minimum number of output pixels (height * width) from which on the
+# channel chunks of a multichannel cv2 warp are processed in threads.
+_WARP_THREADS_MIN_PIXELS = 1024 * 1024
 
 # skimage | cv2
 # 0       | cv2.INTER_NEAREST
@@ -164,16 +190,9 @@ def _warp_affine_arr(arr, matrix, order=1, mode="constant", cval=0,
     min_value, _center_value, max_value = \
         iadt.get_value_range_of_dtype(arr.dtype)
 
+    # orders 2, 4 and 5 have no equivalent in cv2
     cv2_bad_order = order not in [0, 1, 3]
-    if order == 0:
-        cv2_bad_dtype = (
-            arr.dtype.name
-            not in _VALID_DTYPES_CV2_ORDER_0)
-    else:
-        cv2_bad_dtype = (
-            arr.dtype.name
-            not in _VALID_DTYPES_CV2_ORDER_NOT_0
-        )
+    cv2_bad_dtype = _get_cv2_warp_dtype(arr.dtype, order) is None
     cv2_impossible = cv2_bad_order or cv2_bad_dtype
     use_skimage = (
         backend == "skimage"
@@ -248,25 +267,18 @@ def _warp_affine_arr_cv2(arr, matrix, cval, mode, order, output_shape):
     iadt.gate_dtypes(
         arr,
         allowed=["bool",
-                 "uint8", "uint16",
+                 "uint8", "uint16", "uint32",
                  "int8", "int16", "int32",
                  "float16", "float32", "float64"],
-        disallowed=["uint32", "uint64", "uint128", "uint256",
+        disallowed=["uint64", "uint128", "uint256",
                     "int64", "int128", "int256",
                     "float96", "float128", "float256"],
         augmenter=None)
 
-    if order != 0:
-        assert arr.dtype.name != "int32", (
-            "Affine only supports cv2-based transformations of int32 "
-            "arrays when using order=0, but order was set to %d." % (
-                order,))
-
     input_dtype = arr.dtype
-    if input_dtype in [np.bool_, np.float16]:
-        arr = arr.astype(np.float32)
-    elif input_dtype == np.int8 and order != 0:
-        arr = arr.astype(np.int16)
+    warp_dtype = _get_cv2_warp_dtype(input_dtype, order)
+    if warp_dtype != input_dtype:
+        arr = arr.astype(warp_dtype)
 
     dsize = (
         int(np.round(output_shape[1])),
@@ -281,9 +293,6 @@ def _warp_affine_arr_cv2(arr, matrix, cval, mode, order, output_shape):
     #      #chans != 3, works with 1d but what in other cases?
     nb_channels = arr.shape[-1]
     if nb_channels <= 3:
-        # TODO this block can also be when order==0 for any nb_channels,
-        #      but was deactivated for now, because cval would always
-        #      contain 3 values and not nb_channels values
         image_warped = cv2.warpAffine(
             _normalize_cv2_input_arr_(arr),
             matrix.params[:2],
@@ -297,28 +306,160 @@ def _warp_affine_arr_cv2(arr, matrix, cval, mode, order, output_shape):
         if image_warped.ndim == 2:
             image_warped = image_warped[..., np.newaxis]
     else:
-        # warp each channel on its own, re-add channel axis, then stack
-        # the result from a list of [H, W, 1] to (H, W, C).
-        image_warped = [
-            cv2.warpAffine(
-                _normalize_cv2_input_arr_(arr[:, :, c]),
-                matrix.params[:2],
-                dsize=dsize,
-                flags=order,
-                borderMode=mode,
-                borderValue=tuple([cval[0]])
-            )
-            for c in sm.xrange(nb_channels)]
-        image_warped = np.stack(image_warped, axis=-1)
+        warp_func = functools.partial(
+            cv2.warpAffine,
+            M=matrix.params[:2],
+            dsize=dsize,
+            flags=order,
+            borderMode=mode)
+        image_warped = _warp_arr_by_channel_chunks_cv2(
+            arr, warp_func, [cval[0]] * nb_channels,
+            output_shape=(dsize[1], dsize[0]))
 
     if input_dtype.name == "bool":
         image_warped = image_warped > 0.5
-    elif input_dtype.name in ["int8", "float16"]:
+    elif image_warped.dtype != input_dtype:
         image_warped = iadt.restore_dtypes_(image_warped, input_dtype)
 
     return image_warped
 
 
+def _get_cv2_warp_dtype(dtype, order):
+    """Get the dtype in which cv2 can warp arrays of a given dtype.
+
+    Parameters
+    ----------
+    dtype : numpy.dtype
+        Dtype of the array to warp.
+
+    order : int
+        Interpolation order in skimage notation.
+
+    Returns
+    -------
+    None or numpy.dtype
+        Dtype to convert the array to before warping it with cv2. ``None``
+        if cv2 cannot warp the dtype without losing accuracy.
+
+    """
+    dtypes = (_CV2_WARP_DTYPES_ORDER_0 if order == 0
+              else _CV2_WARP_DTYPES_ORDER_NOT_0)
+    warp_dtype = dtypes.get(np.dtype(dtype).name)
+    if warp_dtype is None:
+        return None
+    return np.dtype(warp_dtype)
+
+
+def _split_channels_for_cv2(nb_channels):
+    """Split a channel axis into chunks that cv2 can warp in one call.
+
+    The chunks contain four channels each, with the remainder forming one
+    chunk of three or single-channel chunks. Chunks with two channels are
+    avoided, as cv2 interpolates these via a different code path, whose
+    results are not identical to warping the channels one by one.
+
+    Parameters
+    ----------
+    nb_channels : int
+        Number of channels of the array.
+
+    Returns
+    -------
+    list of tuple of int
+        ``(start, end)`` channel indices of each chunk.
+
+    """
+    nb_full, remainder = divmod(nb_channels, 4)
+    sizes = [4] * nb_full
+    if remainder == 3:
+        sizes.append(3)
+    else:
+        sizes.extend([1] * remainder)
+    bounds = np.cumsum([0] + sizes)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _warp_arr_by_channel_chunks_cv2(arr, warp_func, cvals, output_shape):
+    """Warp an array with any number of channels via cv2.
+
+    The channels are split into chunks of at most four channels, which are
+    warped -- in threads for large arrays -- and written into a single
+    output array.
+
+    Parameters
+    ----------
+    arr : ndarray
+        ``(H,W,C)`` array to warp. Its dtype must be supported by cv2.
+
+    warp_func : callable
+        Function that receives an array and a ``borderValue`` keyword
+        argument and returns the warped array, e.g. a partial of
+        ``cv2.warpAffine``.
+
+    cvals : list of number
+        Fill value of each channel.
+
+    output_shape : tuple of int
+        ``(H',W')`` shape of the warped array.
+
+    Returns
+    -------
+    ndarray
+        ``(H',W',C)`` warped array.
+
+    """
+    height, width = output_shape[0:2]
+    nb_channels = arr.shape[2]
+    chunks = _split_channels_for_cv2(nb_channels)
+    if len(chunks) == 1:
+        result = warp_func(_normalize_cv2_input_arr_(arr),
+                           borderValue=tuple(cvals))
+        result = result.reshape((height, width, nb_channels))
+    else:
+        result = np.empty((height, width, nb_channels), dtype=arr.dtype)
+
+        def _warp_chunk(chunk):
+            start, end = chunk
+            warped = warp_func(_get_channel_chunk(arr, start, end),
+                               borderValue=tuple(cvals[start:end]))
+            _set_channel_chunk(result, start, end, warped)
+
+        nb_workers = None
+        if height * width < _WARP_THREADS_MIN_PIXELS:
+            nb_workers = 1
+
+        from .. import multicore
+        multicore.map_threaded(_warp_chunk, chunks, nb_workers=nb_workers)
+    return result
+
+
+def _get_channel_chunk(arr, start, end):
+    # Slicing channels produces a view with interleaved foreign channels,
+    # which cv2 cannot read, so the chunk has to be copied. Viewing the
+    # chunk's channels of each pixel as one opaque item turns that copy
+    # into a copy of H*W items instead of H*W*C scalars.
+    item_dtype = np.dtype((np.void, arr.itemsize * (end - start)))
+    try:
+        pixels = arr[:, :, start:end].view(item_dtype)
+    except ValueError:
+        # numpy <1.23 does not support dtype views of non-contiguous arrays
+        return np.ascontiguousarray(arr[:, :, start:end])
+    chunk = np.ascontiguousarray(pixels).view(arr.dtype)
+    return chunk.reshape(arr.shape[0:2] + (end - start,))
+
+
+def _set_channel_chunk(arr, start, end, chunk):
+    item_dtype = np.dtype((np.void, arr.itemsize * (end - start)))
+    chunk = np.ascontiguousarray(chunk).reshape(
+        arr.shape[0:2] + (end - start,))
+    try:
+        pixels = arr[:, :, start:end].view(item_dtype)
+    except ValueError:
+        arr[:, :, start:end] = chunk
+        return
+    pixels[...] = chunk.view(item_dtype)
+
+
 def _compute_affine_warp_output_shape(matrix, input_shape):
     height, width = input_shape[:2]
 
@@ -806,13 +947,13 @@ class Affine(meta.Augmenter):
 
         * ``uint8``: yes; tested
         * ``uint16``: yes; tested
-        * ``uint32``: no (1)
+        * ``uint32``: yes; tested (5)
         * ``uint64``: no (2)
         * ``int8``: yes; tested
         * ``int16``: yes; tested
         * ``int32``: yes; tested
         * ``int64``: no (2)
-        * ``float16``: yes; tested (3)
+        * ``float16``: yes; tested (4)
         * ``float32``: yes; tested
         * ``float64``: yes; tested
         * ``float128``: no (1)
@@ -820,17 +961,19 @@ class Affine(meta.Augmenter):
 
         - (1) rejected by cv2
         - (2) changed to ``int32`` by cv2
-        - (3) mapped internally to ``float32``
+        - (3) mapped internally to ``uint8``
+        - (4) mapped internally to ``float32``
+        - (5) mapped internally to ``float64``
 
     if (backend="cv2", order=1):
 
         * ``uint8``: yes; fully tested
         * ``uint16``: yes; tested
-        * ``uint32``: no (1)
+        * ``uint32``: yes; tested (5)
         * ``uint64``: no (2)
         * ``int8``: yes; tested (3)
         * ``int16``: yes; tested
-        * ``int32``: no (2)
+        * ``int32``: yes; tested (5)
         * ``int64``: no (2)
         * ``float16``: yes; tested (4)
         * ``float32``: yes; tested
@@ -844,16 +987,17 @@ class Affine(meta.Augmenter):
               (-215:Assertion failed) ifunc != 0 in function 'remap'``
         - (3) mapped internally to ``int16``
         - (4) mapped internally to ``float32``
+        - (5) mapped internally to ``float64``
 
     if (backend="cv2", order=3):
 
         * ``uint8``: yes; tested
         * ``uint16``: yes; tested
-        * ``uint32``: no (1)
+        * ``uint32``: yes; tested (5)
         * ``uint64``: no (2)
         * ``int8``: yes; tested (3)
         * ``int16``: yes; tested
-        * ``int32``: no (2)
+        * ``int32``: yes; tested (5)
         * ``int64``: no (2)
         * ``float16``: yes; tested (4)
         * ``float32``: yes; tested
@@ -867,6 +1011,10 @@ class Affine(meta.Augmenter):
               (-215:Assertion failed) ifunc != 0 in function 'remap'``
         - (3) mapped internally to ``int16``
         - (4) mapped internally to ``float32``
+        - (5) mapped internally to ``float64``
+
+    Images with more than three channels are warped by cv2 in chunks of
+    at most four channels.
 
 
     Parameters
@@ -1068,7 +1216,8 @@ class Affine(meta.Augmenter):
         If ``auto`` is used, the augmenter will automatically try
         to use ``cv2`` whenever possible (order must be in ``[0, 1, 3]``). It
         will silently fall back to skimage if order/dtype is not supported by
-        cv2. cv2 is generally faster than skimage. It also supports RGB cvals,
+        cv2, i.e. for orders ``2``, ``4`` and ``5`` and the dtypes listed as
+        not supported by cv2 above. cv2 is generally faster than skimage. It also supports RGB cvals,
         while skimage will resort to intensity cvals (i.e. 3x the same value
         as RGB). If ``cv2`` is chosen and order is ``2`` or ``4``, it will
         automatically fall back to order ``3``.
@@ -1473,53 +1622,55 @@ class Affine(meta.Augmenter):
         return augmentables
 
     def _draw_samples(self, nb_samples, random_state):
-        rngs = random_state.duplicate(12)
-
+        # All parameters are sampled via one compiled plan. This produces the
+        # same samples as calling draw_samples() on each parameter in
+        # sequence, as the RNGs are mere duplicates of random_state.
         if isinstance(self.scale, tuple):
-            scale_samples = (
-                self.scale[0].draw_samples((nb_samples,), random_state=rngs[0]),
-                self.scale[1].draw_samples((nb_samples,), random_state=rngs[1]),
-            )
+            scale_params = [self.scale[0], self.scale[1]]
         else:
-            scale_samples = self.scale.draw_samples((nb_samples,),
-                                                    random_state=rngs[2])
-            scale_samples = (scale_samples, scale_samples)
+            scale_params = [self.scale]
 
         if self.translate[1] is not None:
-            translate_samples = (
-                self.translate[0].draw_samples((nb_samples,),
-                                               random_state=rngs[3]),
-                self.translate[1].draw_samples((nb_samples,),
-                                               random_state=rngs[4]),
-            )
+            translate_params = [self.translate[0], self.translate[1]]
         else:
-            translate_samples = self.translate[0].draw_samples(
-                (nb_samples,), random_state=rngs[5])
-            translate_samples = (translate_samples, translate_samples)
+            translate_params = [self.translate[0]]
 
-        rotate_samples = self.rotate.draw_samples((nb_samples,),
-                                                  random_state=rngs[6])
         if self._shear_param_type == "dict":
-            shear_samples = (
-                self.shear[0].draw_samples((nb_samples,), random_state=rngs[7]),
-                self.shear[1].draw_samples((nb_samples,), random_state=rngs[8])
-            )
-        elif self._shear_param_type == "single-number":
+            shear_params = [self.shear[0], self.shear[1]]
+        else:
+            shear_params = [self.shear]
+
+        params = (scale_params + translate_params + [self.rotate]
+                  + shear_params + [self.cval, self.mode, self.order])
+        sizes = [(nb_samples,)] * len(params)
+        sizes[-3] = (nb_samples, 3)
+        plan = iap.get_sampling_plan(self, "affine", params)
+        samples = plan.draw_samples(sizes, random_state)
+
+        scale_samples = samples[:len(scale_params)]
+        samples = samples[len(scale_params):]
+        if len(scale_samples) == 1:
+            scale_samples = scale_samples * 2
+        scale_samples = tuple(scale_samples)
+
+        translate_samples = samples[:len(translate_params)]
+        samples = samples[len(translate_params):]
+        if len(translate_samples) == 1:
+            translate_samples = translate_samples * 2
+        translate_samples = tuple(translate_samples)
+
+        rotate_samples = samples[0]
+        shear_samples = samples[1:1+len(shear_params)]
+        if self._shear_param_type == "single-number":
             # only shear on the x-axis if a single number was given
-            shear_samples = self.shear.draw_samples((nb_samples,),
-                                                    random_state=rngs[7])
-            shear_samples = (shear_samples, np.zeros_like(shear_samples))
+            shear_samples = (shear_samples[0],
+                             np.zeros_like(shear_samples[0]))
+        elif len(shear_samples) == 1:
+            shear_samples = (shear_samples[0], shear_samples[0])
         else:
-            shear_samples = self.shear.draw_samples((nb_samples,),
-                                                    random_state=rngs[7])
-            shear_samples = (shear_samples, shear_samples)
+            shear_samples = tuple(shear_samples)
 
-        cval_samples = self.cval.draw_samples((nb_samples, 3),
-                                              random_state=rngs[9])
-        mode_samples = self.mode.draw_samples((nb_samples,),
-                                              random_state=rngs[10])
-        order_samples = self.order.draw_samples((nb_samples,),
-                                                random_state=rngs[11])
+        cval_samples, mode_samples, order_samples = samples[-3:]
 
         return _AffineSamplingResult(
             scale=scale_samples,
@@ -3390,11 +3541,11 @@ class PerspectiveTransform(meta.Augmenter):
 
         * ``uint8``: yes; fully tested
         * ``uint16``: yes; tested
-        * ``uint32``: no (1)
+        * ``uint32``: yes; tested (5)
         * ``uint64``: no (2)
         * ``int8``: yes; tested (3)
         * ``int16``: yes; tested
-        * ``int32``: no (2)
+        * ``int32``: yes; tested (5)
         * ``int64``: no (2)
         * ``float16``: yes; tested (4)
         * ``float32``: yes; tested
@@ -3408,6 +3559,7 @@ class PerspectiveTransform(meta.Augmenter):
               ifunc != 0 in function 'remap'``.
         - (3) mapped internally to ``int16``.
         - (4) mapped intenally to ``float32``.
+        - (5) mapped internally to ``float64``.
 
     if (keep_size=True):
 
@@ -3685,11 +3837,11 @@ class PerspectiveTransform(meta.Augmenter):
         iadt.gate_dtypes(
             images,
             allowed=["bool",
-                     "uint8", "uint16",
-                     "int8", "int16",
+                     "uint8", "uint16", "uint32",
+                     "int8", "int16", "int32",
                      "float16", "float32", "float64"],
-            disallowed=["uint32", "uint64", "uint128", "uint256",
-                        "int32", "int64", "int128", "int256",
+            disallowed=["uint64", "uint128", "uint256",
+                        "int64", "int128", "int256",
                         "float96", "float128", "float256"],
             augmenter=self)
 
@@ -3702,10 +3854,9 @@ class PerspectiveTransform(meta.Augmenter):
 
         for i, (image, matrix, max_height, max_width, cval, mode) in gen:
             input_dtype = image.dtype
-            if input_dtype.name in ["int8"]:
-                image = image.astype(np.int16)
-            elif input_dtype.name in ["bool", "float16"]:
-                image = image.astype(np.float32)
+            warp_dtype = _get_cv2_warp_dtype(input_dtype, 1)
+            if warp_dtype != input_dtype:
+                image = image.astype(warp_dtype)
 
             # cv2.warpPerspective only supports <=4 channels and errors
             # on axes with size zero
@@ -3723,21 +3874,17 @@ class PerspectiveTransform(meta.Augmenter):
                 if warped.ndim == 2 and images[i].ndim == 3:
                     warped = np.expand_dims(warped, 2)
             else:
-                # warp each channel on its own
-                # note that cv2 removes the channel axis in case of (H,W,1)
-                # inputs
-                warped = [
-                    cv2.warpPerspective(
-                        _normalize_cv2_input_arr_(image[..., c]),
-                        matrix,
-                        (max_width, max_height),
-                        borderValue=cval[min(c, len(cval)-1)],
-                        borderMode=mode,
-                        flags=cv2.INTER_LINEAR
-                    )
-                    for c in sm.xrange(nb_channels)
-                ]
-                warped = np.stack(warped, axis=-1)
+                warp_func = functools.partial(
+                    cv2.warpPerspective,
+                    M=matrix,
+                    dsize=(max_width, max_height),
+                    borderMode=mode,
+                    flags=cv2.INTER_LINEAR)
+                warped = _warp_arr_by_channel_chunks_cv2(
+                    image, warp_func,
+                    [cval[min(c, len(cval)-1)]
+                     for c in sm.xrange(nb_channels)],
+                    output_shape=(max_height, max_width))
 
             if self.keep_size and not has_zero_sized_axis:
                 h, w = image.shape[0:2]
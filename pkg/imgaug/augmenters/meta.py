@@ -38,6 +38,7 @@ from imgaug.augmentables.batches import (Batch, UnnormalizedBatch,
                                          _BatchInAugmentation)
 from .. import parameters as iap
 from .. import random as iarandom
+from .. import profiling as iaprofiling
 from . import base as iabase
 
 
@@ -179,6 +180,17 @@ def _remove_added_channel_axis(arrs_added, arrs_orig):
     ]
 
 
+def _is_fast_path_image(image):
+    # Whether a single image can skip the batch normalization in
+    # augment_image() and augment(image=...).
+    return (
+        ia.is_np_array(image)
+        and image.dtype == np.uint8
+        and image.ndim in (2, 3)
+        and image.flags["C_CONTIGUOUS"]
+    )
+
+
 class _maybe_deterministic_ctx(object):  # pylint: disable=invalid-name
     """Context that resets an RNG to its initial state upon exit.
 
@@ -281,6 +293,10 @@ class Augmenter(object):
 
     """
 
+    # Number of threads used by _map_images_threaded(). None falls back to
+    # imgaug.multicore.get_intra_batch_workers().
+    _intra_batch_workers = None
+
     def __init__(self, seed=None, name=None,
                  random_state="deprecated",
                  deterministic="deprecated"):
@@ -638,11 +654,18 @@ class Augmenter(object):
         # little overhead.
         with _maybe_deterministic_ctx(self):
             if not batch_inaug.empty:
-                batch_inaug = self._augment_batch_(
-                    batch_inaug,
-                    random_state=self.random_state,
-                    parents=parents if parents is not None else [],
-                    hooks=hooks)
+                profiler = iaprofiling._ACTIVE_PROFILER
+                if profiler is not None:
+                    profiler.enter(self, parents, batch_inaug)
+                try:
+                    batch_inaug = self._augment_batch_(
+                        batch_inaug,
+                        random_state=self.random_state,
+                        parents=parents if parents is not None else [],
+                        hooks=hooks)
+                finally:
+                    if profiler is not None:
+                        profiler.exit()
 
         # revert augmentables being set to None for non-activated augmenters
         for column in set_to_none:
@@ -736,6 +759,76 @@ class Augmenter(object):
 
         return batch
 
+    def _augment_batch_rows_(self, batch, rows, parents, hooks):
+        """Augment a subset of the rows of a batch in-place.
+
+        This is used by container augmenters (e.g. :class:`SomeOf`,
+        :class:`Sometimes`) to apply children only to some rows.
+        Containers that implement :func:`Augmenter._augment_rows_` receive
+        the full batch and the row indices and pass both on to their own
+        children. Only the augmenters at the bottom of the tree subselect
+        their rows, so that nested containers do not copy the rows once
+        per nesting level. If `rows` covers the whole batch, no rows are
+        subselected at all.
+
+        Parameters
+        ----------
+        batch : imgaug.augmentables.batches._BatchInAugmentation
+            The batch to augment. Rows not in `rows` are not changed.
+
+        rows : ndarray of int
+            Ascending and unique indices of the rows to augment.
+
+        parents : list of imgaug.augmenters.meta.Augmenter
+            See :func:`~imgaug.augmenters.meta.Augmenter.augment_batch_`.
+
+        hooks : imgaug.imgaug.HooksImages or None
+            See :func:`~imgaug.augmenters.meta.Augmenter.augment_batch_`.
+
+        Returns
+        ----------
+        imgaug.augmentables.batches._BatchInAugmentation
+            The augmented batch.
+
+        """
+        if len(rows) == 0:
+            return batch
+
+        # Hooks, deactivated augmenters and the profiler are handled by
+        # augment_batch_(), so use it for all of these cases.
+        if (hooks is None
+                and self.activated
+                and iaprofiling._ACTIVE_PROFILER is None
+                and self._has_rows_impl()):
+            with _maybe_deterministic_ctx(self):
+                return self._augment_rows_(batch, rows, self.random_state,
+                                           parents, hooks)
+
+        if len(rows) == batch.nb_rows:
+            return self.augment_batch_(batch, parents=parents, hooks=hooks)
+
+        batch_sub = batch.subselect_rows_by_indices(rows)
+        batch_sub = self.augment_batch_(batch_sub, parents=parents,
+                                        hooks=hooks)
+        return batch.invert_subselect_rows_by_indices_(rows, batch_sub)
+
+    def _has_rows_impl(self):
+        # Whether _augment_rows_() may be used instead of _augment_batch_().
+        # Subclasses overriding _augment_batch_() of a container must not
+        # inherit its _augment_rows_().
+        return False
+
+    def _augment_rows_(self, batch, rows, random_state, parents, hooks):
+        """Augment a subset of the rows of a batch in-place.
+
+        Row-wise counterpart of :func:`Augmenter._augment_batch_`, see
+        :func:`Augmenter._augment_batch_rows_`. Must draw the same samples
+        from `random_state` as ``_augment_batch_()`` would for a batch
+        containing only `rows`.
+
+        """
+        raise NotImplementedError()
+
     def augment_image(self, image, hooks=None):
         """Augment a single image.
 
@@ -768,8 +861,49 @@ class Augmenter(object):
             "Expected image to have shape (height, width, [channels]), "
             "got shape %s." % (image.shape,))
         iabase._warn_on_suspicious_single_image_shape(image)
+        if _is_fast_path_image(image):
+            return self._augment_fast_path_image(image, hooks=hooks)
         return self.augment_images([image], hooks=hooks)[0]
 
+    def _augment_fast_path_image(self, image, hooks=None):
+        """Augment a single contiguous ``uint8`` image without normalization.
+
+        The generic path wraps the image in an
+        :class:`~imgaug.augmentables.batches.UnnormalizedBatch`, which
+        estimates the normalization type of every augmentable and converts
+        the batch twice before and after augmentation. For a single
+        ``uint8`` image the normalized form is known upfront, hence this
+        method creates the
+        :class:`~imgaug.augmentables.batches._BatchInAugmentation` directly.
+        The results are identical to the generic path.
+
+        Parameters
+        ----------
+        image : (H,W,C) ndarray or (H,W) ndarray
+            The image to augment. Expected to pass
+            :func:`_is_fast_path_image`.
+
+        hooks : None or imgaug.HooksImages, optional
+            HooksImages object to dynamically interfere with the augmentation
+            process.
+
+        Returns
+        -------
+        ndarray
+            The corresponding augmented image.
+
+        """
+        image_norm = image if image.ndim == 3 else image[..., np.newaxis]
+        batch = _BatchInAugmentation(images=[np.copy(image_norm)])
+        image_aug = self.augment_batch_(batch, hooks=hooks).images[0]
+        if image.ndim == 2:
+            assert image_aug.shape[2] == 1, (
+                "Expected augmented image of shape (H,W,C) to have C=1 due "
+                "to the input image being a 2D image. Got instead C=%d and "
+                "shape %s." % (image_aug.shape[2], image_aug.shape))
+            return image_aug[:, :, 0]
+        return image_aug
+
     def augment_images(self, images, parents=None, hooks=None):
         """Augment a batch of images.
 
@@ -1921,6 +2055,14 @@ class Augmenter(object):
                 ", ".join(unknown_args)
             ))
 
+        # single uint8 image without other augmentables: skip the batch
+        # normalization
+        if (not return_batch and len(kwargs) == 1 and "image" in kwargs
+                and _is_fast_path_image(kwargs["image"])):
+            image = kwargs["image"]
+            iabase._warn_on_suspicious_single_image_shape(image)
+            return self._augment_fast_path_image(image, hooks=hooks)
+
         # normalize image=... input to images=...
         # this is not done by Batch.to_normalized_batch()
         if "image" in kwargs:
@@ -2007,7 +2149,8 @@ class Augmenter(object):
         """Alias for :func:`~imgaug.augmenters.meta.Augmenter.augment`."""
         return self.augment(*args, **kwargs)
 
-    def pool(self, processes=None, maxtasksperchild=None, seed=None):
+    def pool(self, processes=None, maxtasksperchild=None, seed=None,
+             seed_per_sample=False):
         """Create a pool used for multicore augmentation.
 
         Parameters
@@ -2032,6 +2175,12 @@ class Augmenter(object):
             The seed to use for child processes. If ``None``, a random seed
             will be used.
 
+        seed_per_sample : bool, optional
+            Same as for :func:`~imgaug.multicore.Pool.__init__`.
+            Whether to seed each row by the sample key stored in its batch's
+            ``data`` attribute, making the results independent of the
+            number of workers and of the batch composition.
+
         Returns
         -------
         imgaug.multicore.Pool
@@ -2080,7 +2229,53 @@ class Augmenter(object):
         """
         import imgaug.multicore as multicore
         return multicore.Pool(self, processes=processes,
-                              maxtasksperchild=maxtasksperchild, seed=seed)
+                              maxtasksperchild=maxtasksperchild, seed=seed,
+                              seed_per_sample=seed_per_sample)
+
+    def set_intra_batch_workers(self, nb_workers):
+        """Set how many threads this augmenter uses for a batch's images.
+
+        Only augmenters whose per-image work releases the GIL make use of
+        this setting, see
+        :func:`~imgaug.multicore.set_intra_batch_workers`. The results do
+        not depend on the number of threads.
+
+        Parameters
+        ----------
+        nb_workers : None or int or str
+            Maximum number of images processed concurrently. ``None`` uses
+            the process-wide default from
+            :func:`~imgaug.multicore.get_intra_batch_workers`. Otherwise
+            an integer ``>=1`` or ``"auto"`` (all threads of
+            :func:`~imgaug.multicore.get_thread_pool`).
+
+        Returns
+        -------
+        imgaug.augmenters.meta.Augmenter
+            This augmenter itself.
+
+        """
+        import imgaug.multicore as multicore
+        if nb_workers is not None:
+            nb_workers = multicore._normalize_intra_batch_workers(nb_workers)
+        self._intra_batch_workers = nb_workers
+        return self
+
+    def _map_images_threaded(self, func, items):
+        """Apply `func` to per-image items, in threads if enabled.
+
+        `func` must not sample random values, all samples have to be drawn
+        beforehand. Otherwise the results would depend on the order in
+        which the threads finish.
+
+        """
+        import imgaug.multicore as multicore
+        nb_workers = self._intra_batch_workers
+        if nb_workers is None:
+            nb_workers = multicore.get_intra_batch_workers()
+        if nb_workers == "auto":
+            nb_workers = None
+        return multicore.map_threaded(func, items, nb_workers=nb_workers)
 
     # TODO most of the code of this function could be replaced with
     #      ia.draw_grid()
@@ -3115,17 +3310,26 @@ class Sequential(Augmenter, list):
     # Added in 0.4.0.
     def _augment_batch_(self, batch, random_state, parents, hooks):
         with batch.propagation_hooks_ctx(self, hooks, parents):
-            if self.random_order:
-                order = random_state.permutation(len(self))
-            else:
-                order = sm.xrange(len(self))
+            batch = self._augment_rows_(batch, np.arange(batch.nb_rows),
+                                        random_state, parents, hooks)
+        return batch
 
-            for index in order:
-                batch = self[index].augment_batch_(
-                    batch,
-                    parents=parents + [self],
-                    hooks=hooks
-                )
+    def _has_rows_impl(self):
+        return type(self)._augment_batch_ is Sequential._augment_batch_
+
+    def _augment_rows_(self, batch, rows, random_state, parents, hooks):
+        if self.random_order:
+            order = random_state.permutation(len(self))
+        else:
+            order = sm.xrange(len(self))
+
+        for index in order:
+            batch = self[index]._augment_batch_rows_(
+                batch,
+                rows,
+                parents=parents + [self],
+                hooks=hooks
+            )
         return batch
 
     def _to_deterministic(self):
@@ -3395,20 +3599,35 @@ class SomeOf(Augmenter, list):
             augmenter_active = self._get_augmenter_active(batch.nb_rows,
                                                           random_state)
 
-            for augmenter_index in augmenter_order:
-                active = augmenter_active[:, augmenter_index].nonzero()[0]
-
-                if len(active) > 0:
-                    batch_sub = batch.subselect_rows_by_indices(active)
-                    batch_sub = self[augmenter_index].augment_batch_(
-                        batch_sub,
-                        parents=parents + [self],
-                        hooks=hooks
-                    )
-                    batch = batch.invert_subselect_rows_by_indices_(active,
-                                                                    batch_sub)
-
-            return batch
+            return self._augment_active_rows_(
+                batch, np.arange(batch.nb_rows), augmenter_order,
+                augmenter_active, parents, hooks)
+
+    def _has_rows_impl(self):
+        return type(self)._augment_batch_ is SomeOf._augment_batch_
+
+    def _augment_rows_(self, batch, rows, random_state, parents, hooks):
+        # same sampling order as in _augment_batch_()
+        augmenter_order = self._get_augmenter_order(random_state)
+        augmenter_active = self._get_augmenter_active(len(rows),
+                                                      random_state)
+        return self._augment_active_rows_(
+            batch, rows, augmenter_order, augmenter_active, parents, hooks)
+
+    def _augment_active_rows_(self, batch, rows, augmenter_order,
+                              augmenter_active, parents, hooks):
+        # Children receive the full batch and the indices of their active
+        # rows. The rows are only subselected by children that are not
+        # containers themselves, see Augmenter._augment_batch_rows_().
+        for augmenter_index in augmenter_order:
+            active = rows[augmenter_active[:, augmenter_index]]
+            batch = self[augmenter_index]._augment_batch_rows_(
+                batch,
+                active,
+                parents=parents + [self],
+                hooks=hooks
+            )
+        return batch
 
     def _to_deterministic(self):
         augs = [aug.to_deterministic() for aug in self]
@@ -3610,35 +3829,32 @@ class Sometimes(Augmenter):
     # Added in 0.4.0.
     def _augment_batch_(self, batch, random_state, parents, hooks):
         with batch.propagation_hooks_ctx(self, hooks, parents):
-            samples = self.p.draw_samples((batch.nb_rows,),
-                                          random_state=random_state)
-
-            # create lists/arrays of images for if and else lists (one for each)
-            # note that np.where returns tuple(array([0, 5, 9, ...])) or
-            # tuple(array([]))
-            indices_then_list = np.where(samples == 1)[0]
-            indices_else_list = np.where(samples == 0)[0]
-
-            indice_lists = [indices_then_list, indices_else_list]
-            augmenter_lists = [self.then_list, self.else_list]
-
-            # For then_list: collect augmentables to be processed by then_list
-            # augmenters, apply them to the list, then map back to the output
-            # list. Analogous for else_list.
-            # TODO maybe this would be easier if augment_*() accepted a list
-            #      that can contain Nones
-            for indices, augmenters in zip(indice_lists, augmenter_lists):
-                if augmenters is not None and len(augmenters) > 0:
-                    batch_sub = batch.subselect_rows_by_indices(indices)
-                    batch_sub = augmenters.augment_batch_(
-                        batch_sub,
-                        parents=parents + [self],
-                        hooks=hooks
-                    )
-                    batch = batch.invert_subselect_rows_by_indices_(indices,
-                                                                    batch_sub)
+            return self._augment_rows_(batch, np.arange(batch.nb_rows),
+                                       random_state, parents, hooks)
 
-            return batch
+    def _has_rows_impl(self):
+        return type(self)._augment_batch_ is Sometimes._augment_batch_
+
+    def _augment_rows_(self, batch, rows, random_state, parents, hooks):
+        samples = self.p.draw_samples((len(rows),),
+                                      random_state=random_state)
+
+        # split the rows into those for the then and else lists
+        rows_lists = [rows[samples == 1], rows[samples == 0]]
+        augmenter_lists = [self.then_list, self.else_list]
+
+        # The lists receive the full batch and their rows, see
+        # Augmenter._augment_batch_rows_().
+        for rows_list, augmenters in zip(rows_lists, augmenter_lists):
+            if augmenters is not None and len(augmenters) > 0:
+                batch = augmenters._augment_batch_rows_(
+                    batch,
+                    rows_list,
+                    parents=parents + [self],
+                    hooks=hooks
+                )
+
+        return batch
 
     def _to_deterministic(self):
         aug = self.copy()
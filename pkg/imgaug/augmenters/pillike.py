@@ -49,12 +49,14 @@ Added in 0.4.0.
 """
 from __future__ import print_function, division, absolute_import
 
+import collections
+import functools
+
 import six.moves as sm
 import numpy as np
 import cv2
 import PIL.Image
 import PIL.ImageOps
-import PIL.ImageEnhance
 import PIL.ImageFilter
 
 import imgaug as ia
@@ -532,7 +534,7 @@ def _autocontrast_no_pil(image, cutoff, ignore):  # noqa: C901
 
 
 # Added in 0.4.0.
-def _apply_enhance_func(image, cls, factor):
+def _apply_enhance_func(image, func_images, factor):
     assert image.dtype.name == "uint8", (
         "Can apply PIL image enhancement only to uint8 images, "
         "got dtype %s." % (image.dtype.name,))
@@ -543,17 +545,142 @@ def _apply_enhance_func(image, cls, factor):
     image, is_hw1 = _ensure_valid_shape(
         image, "imgaug.augmenters.pillike.enhance_*()")
 
-    # don't return np.asarray(...) as its results are read-only
-    result = np.array(
-        cls(
-            PIL.Image.fromarray(image)
-        ).enhance(factor)
-    )
+    result = func_images(image[np.newaxis, ...], np.float32([factor]))[0]
     if is_hw1:
         result = result[:, :, np.newaxis]
     return result
 
 
+def _apply_to_uint8_image_groups(images, func_images, func_name,
+                                 factors=None):
+    # Apply func_images() to stacks of equally shaped images and write the
+    # results back in-place. func_images() receives arrays of shape
+    # (N,H,W) or (N,H,W,3) or (N,H,W,4) and, if factors is set, one
+    # float32 factor per image.
+    if ia.is_np_array(images):
+        groups = [(np.arange(len(images)), images)]
+    else:
+        indices_by_shape = collections.OrderedDict()
+        for i, image in enumerate(images):
+            key = (image.shape, image.dtype.name)
+            indices_by_shape.setdefault(key, []).append(i)
+        groups = [(np.array(indices), None)
+                  for indices in indices_by_shape.values()]
+
+    for indices, group in groups:
+        if len(indices) == 0:
+            continue
+        first_image = images[indices[0]]
+        assert first_image.dtype.name == "uint8", (
+            "Can apply %s only to uint8 images, got dtype %s." % (
+                func_name, first_image.dtype.name))
+        if 0 in first_image.shape:
+            continue
+        _ensure_valid_shape(first_image, func_name)
+
+        if group is None:
+            group = np.stack([images[i] for i in indices])
+        is_hw1 = group.ndim == 4 and group.shape[-1] == 1
+        if is_hw1:
+            group = group[..., 0]
+
+        if factors is None:
+            result = func_images(group)
+        else:
+            result = func_images(
+                group, np.asarray(factors)[indices].astype(np.float32))
+
+        if is_hw1:
+            result = result[..., np.newaxis]
+        if ia.is_np_array(images):
+            images[...] = result
+        else:
+            for i, image_aug in zip(indices, result):
+                images[i][...] = image_aug
+
+
+def _blend_uint8(image1, image2, alphas):
+    # Same arithmetic as PIL's Image.blend(), which computes
+    # image1 + alpha * (image2 - image1) in float32 and truncates.
+    # alphas must be float32 and broadcastable to the image shape.
+    image1 = image1.astype(np.float32)
+    result = np.subtract(image2, image1, dtype=np.float32)
+    result *= alphas
+    result += image1
+    np.clip(result, 0, 255, out=result)
+    return result.astype(np.uint8)
+
+
+def _convert_rgb_to_l(images):
+    # Identical to PIL's RGB -> L conversion, which uses ITU-R 601-2 luma
+    # weights in 16 bit fixed point arithmetic.
+    images_u32 = images.astype(np.uint32)
+    gray = images_u32[..., 0] * 19595
+    gray += images_u32[..., 1] * 38470
+    gray += images_u32[..., 2] * 7471
+    gray += 0x8000
+    gray >>= 16
+    return gray.astype(np.uint8)
+
+
+def _apply_luts_to_color_channels(images, luts):
+    # Apply one LUT per image to all non-alpha channels.
+    result = np.empty_like(images)
+    has_alpha = images.ndim == 4 and images.shape[-1] == 4
+    for i, (image, lut) in enumerate(zip(images, luts)):
+        if has_alpha:
+            result[i, :, :, 0:3] = ia.apply_lut(image[:, :, 0:3], lut)
+            result[i, :, :, 3] = image[:, :, 3]
+        else:
+            result[i] = ia.apply_lut(image, lut)
+    return result
+
+
+def _blend_uint8_images(images1, images2, factors):
+    # Blend image by image, which keeps the float32 intermediates small
+    # enough to stay in the CPU caches.
+    result = np.empty_like(images2)
+    for i, (image1, image2, factor) in enumerate(
+            zip(images1, images2, factors)):
+        result[i] = _blend_uint8(image1, image2, factor)
+    if images2.ndim == 4 and images2.shape[-1] == 4:
+        result[..., 3] = images2[..., 3]
+    return result
+
+
+def _enhance_color_images(images, factors):
+    if images.ndim == 3:
+        # Grayscale images are their own degenerate images, blending
+        # them with themselves does not change any pixel.
+        return np.copy(images)
+    grays = (_convert_rgb_to_l(image)[..., np.newaxis] for image in images)
+    return _blend_uint8_images(grays, images, factors)
+
+
+def _enhance_contrast_images(images, factors):
+    values = np.arange(256, dtype=np.uint8)
+    luts = []
+    for image, factor in zip(images, factors):
+        gray = image if image.ndim == 2 else _convert_rgb_to_l(image)
+        # same rounding as PIL's ImageStat-based mean
+        mean = int(int(np.sum(gray, dtype=np.int64)) / gray.size + 0.5)
+        luts.append(_blend_uint8(np.full((256,), mean, np.uint8),
+                                 values, factor))
+    return _apply_luts_to_color_channels(images, luts)
+
+
+def _enhance_brightness_images(images, factors):
+    values = np.arange(256, dtype=np.uint8)
+    zeros = np.zeros((256,), dtype=np.uint8)
+    luts = [_blend_uint8(zeros, values, factor) for factor in factors]
+    return _apply_luts_to_color_channels(images, luts)
+
+
+def _enhance_sharpness_images(images, factors):
+    degenerate = _filter_images_by_kernel(images, PIL.ImageFilter.SMOOTH)
+    return _blend_uint8_images(degenerate, images, factors)
+
+
 def enhance_color(image, factor):
     """Change the strength of colors in an image.
 
@@ -594,7 +721,7 @@ def enhance_color(image, factor):
         Color-modified image.
 
     """
-    return _apply_enhance_func(image, PIL.ImageEnhance.Color, factor)
+    return _apply_enhance_func(image, _enhance_color_images, factor)
 
 
 def enhance_contrast(image, factor):
@@ -638,7 +765,7 @@ def enhance_contrast(image, factor):
         Contrast-modified image.
 
     """
-    return _apply_enhance_func(image, PIL.ImageEnhance.Contrast, factor)
+    return _apply_enhance_func(image, _enhance_contrast_images, factor)
 
 
 def enhance_brightness(image, factor):
@@ -681,7 +808,7 @@ def enhance_brightness(image, factor):
         Brightness-modified image.
 
     """
-    return _apply_enhance_func(image, PIL.ImageEnhance.Brightness, factor)
+    return _apply_enhance_func(image, _enhance_brightness_images, factor)
 
 
 def enhance_sharpness(image, factor):
@@ -724,7 +851,7 @@ def enhance_sharpness(image, factor):
         Sharpness-modified image.
 
     """
-    return _apply_enhance_func(image, PIL.ImageEnhance.Sharpness, factor)
+    return _apply_enhance_func(image, _enhance_sharpness_images, factor)
 
 
 # Added in 0.4.0.
@@ -739,17 +866,190 @@ def _filter_by_kernel(image, kernel):
     image, is_hw1 = _ensure_valid_shape(
         image, "imgaug.augmenters.pillike.filter_*()")
 
-    image_pil = PIL.Image.fromarray(image)
-
-    image_filtered = image_pil.filter(kernel)
-
-    # don't return np.asarray(...) as its results are read-only
-    result = np.array(image_filtered)
+    result = _filter_images_by_kernel(image[np.newaxis, ...], kernel)[0]
     if is_hw1:
         result = result[:, :, np.newaxis]
     return result
 
 
+def _filter_images_by_kernel(images, kernel):
+    """Apply a PIL filter kernel to a stack of images without using PIL.
+
+    PIL computes each output pixel as the float32 sum of
+    ``pixel * (weight / scale)`` plus ``offset + 0.5``, truncated to
+    ``[0, 255]``, and keeps the outermost pixels unchanged. For integer
+    kernels the exact value of that sum is known from an integer
+    correlation, which is why a single ``cv2.filter2D()`` call (plus a
+    small shift of the offset that turns its rounding into a floor)
+    reproduces PIL whenever PIL's float32 arithmetic cannot flip the
+    truncation. That is guaranteed for odd scales (the exact sums never
+    hit an integer) and for powers of two (PIL computes exactly). For
+    other scales, pixels whose exact sums are integers ("ties") are
+    recomputed in PIL's summation order.
+
+    Parameters
+    ----------
+    images : ndarray
+        ``uint8`` images of shape ``(N,H,W)`` or ``(N,H,W,C)``.
+
+    kernel : PIL.ImageFilter.Filter
+        Kernel to apply, e.g. ``PIL.ImageFilter.BLUR``.
+
+    Returns
+    -------
+    ndarray
+        Filtered images.
+
+    """
+    filterargs = getattr(kernel, "filterargs", None)
+    if filterargs is None:
+        # e.g. rank filters, which have no kernel weights
+        return np.stack([
+            np.array(PIL.Image.fromarray(image).filter(kernel))
+            for image in images])
+
+    size, scale, offset, weights = filterargs
+    kernel_size = size[0]
+    height, width = images.shape[1:3]
+    if height < kernel_size or width < kernel_size:
+        # PIL returns such images unchanged
+        return np.copy(images)
+
+    images = np.ascontiguousarray(images)
+    weights = np.float64(weights).reshape((kernel_size, kernel_size))
+    # the limit on the weights keeps cv2's float32 errors far below the
+    # distance of non-tie responses to the next integer
+    is_integral = (
+        np.all(np.mod(weights, 1) == 0)
+        and float(scale).is_integer() and scale > 0
+        and float(offset).is_integer()
+        and 255 * np.sum(np.abs(weights)) < 2**15)
+
+    if not is_integral:
+        result = _filter_images_by_kernel_emulated(images, kernel)
+    else:
+        scale = int(scale)
+        stacked = images.reshape((-1,) + images.shape[2:])
+        # PIL applies the first kernel row to the row below the center,
+        # cv2 correlates, hence the flip
+        result = cv2.filter2D(
+            stacked, -1,
+            np.flipud(weights / scale).astype(np.float32),
+            delta=offset + 0.25 / scale)
+        result = result.reshape(images.shape)
+        is_tie_free = (scale % 2 == 1 or (scale & (scale - 1)) == 0)
+        if not is_tie_free:
+            _repair_filter_ties_(result, images, kernel)
+
+    pad = kernel_size // 2
+    result[:, 0:pad] = images[:, 0:pad]
+    result[:, height-pad:] = images[:, height-pad:]
+    result[:, :, 0:pad] = images[:, :, 0:pad]
+    result[:, :, width-pad:] = images[:, :, width-pad:]
+    return result
+
+
+def _get_pil_normalized_kernel(kernel):
+    size, scale, _offset, weights = kernel.filterargs
+    weights = np.float32(weights) / np.float32(scale)
+    return weights.reshape((size[0], size[0]))
+
+
+def _filter_images_by_kernel_emulated(images, kernel):
+    # Reproduces PIL's float32 summation order on whole images. Zero
+    # weights are skipped as adding an exact zero does not change a sum.
+    offset = kernel.filterargs[2]
+    weights = _get_pil_normalized_kernel(kernel)
+    kernel_size = weights.shape[0]
+    pad = kernel_size // 2
+    nb_images, height, width = images.shape[0:3]
+    nb_channels = 1 if images.ndim == 3 else images.shape[-1]
+
+    image_f = images.reshape(
+        (nb_images * height, width * nb_channels)).astype(np.float32)
+    nb_rows = image_f.shape[0] - 2 * pad
+    nb_cols = (width - 2 * pad) * nb_channels
+
+    sums = np.full((nb_rows, nb_cols), np.float32(offset) + np.float32(0.5),
+                   dtype=np.float32)
+    row_sum = np.empty_like(sums)
+    term = np.empty_like(sums)
+    for kernel_row in sm.xrange(kernel_size):
+        y_start = 2 * pad - kernel_row
+        is_first = True
+        for kernel_col in sm.xrange(kernel_size):
+            weight = weights[kernel_row, kernel_col]
+            if weight == 0:
+                continue
+            x_start = kernel_col * nb_channels
+            src = image_f[y_start:y_start+nb_rows, x_start:x_start+nb_cols]
+            if is_first:
+                np.multiply(src, weight, out=row_sum)
+                is_first = False
+            else:
+                np.multiply(src, weight, out=term)
+                row_sum += term
+        if not is_first:
+            sums += row_sum
+    np.clip(sums, 0, 255, out=sums)
+
+    result = np.copy(images)
+    result_2d = result.reshape((nb_images * height, width * nb_channels))
+    result_2d[pad:pad+nb_rows, pad*nb_channels:pad*nb_channels+nb_cols] = (
+        sums.astype(np.uint8))
+    return result
+
+
+def _repair_filter_ties_(result, images, kernel):
+    # Recompute the pixels at which the exact filter response is an
+    # integer, as PIL's float32 sum may be slightly below it there.
+    # result must be floor(response), computed via the offset shift in
+    # _filter_images_by_kernel(). Shifting in the other direction yields
+    # floor(response - 0.5/scale), which differs exactly at the ties.
+    size, scale, offset, weights = kernel.filterargs
+    kernel_size = size[0]
+    pad = kernel_size // 2
+    height, width = images.shape[1:3]
+    nb_channels = 1 if images.ndim == 3 else images.shape[-1]
+
+    stacked = images.reshape((-1,) + images.shape[2:])
+    weights_cv2 = np.flipud(
+        np.float64(weights).reshape((kernel_size, kernel_size)) / scale)
+    result_below = cv2.filter2D(stacked, -1, weights_cv2.astype(np.float32),
+                                delta=offset - 0.25 / scale)
+    is_tie = cv2.compare(result.reshape(stacked.shape), result_below,
+                         cv2.CMP_NE)
+    is_tie = is_tie.reshape(images.shape)
+    is_tie[:, 0:pad] = 0
+    is_tie[:, height-pad:] = 0
+    is_tie[:, :, 0:pad] = 0
+    is_tie[:, :, width-pad:] = 0
+    indices = np.flatnonzero(is_tie)
+    if indices.size == 0:
+        return result
+
+    weights = _get_pil_normalized_kernel(kernel)
+    images_flat = images.reshape((-1,))
+    pixel_sums = np.full((indices.size,),
+                         np.float32(offset) + np.float32(0.5),
+                         dtype=np.float32)
+    for kernel_row in sm.xrange(kernel_size):
+        row_sum = None
+        for kernel_col in sm.xrange(kernel_size):
+            weight = weights[kernel_row, kernel_col]
+            if weight == 0:
+                continue
+            shift = ((pad - kernel_row) * width
+                     + (kernel_col - pad)) * nb_channels
+            term = images_flat[indices + shift].astype(np.float32) * weight
+            row_sum = term if row_sum is None else row_sum + term
+        if row_sum is not None:
+            pixel_sums += row_sum
+    np.clip(pixel_sums, 0, 255, out=pixel_sums)
+    result.reshape((-1,))[indices] = pixel_sums.astype(np.uint8)
+    return result
+
+
 def filter_blur(image):
     """Apply a blur filter kernel to the image.
 
@@ -1121,6 +1421,29 @@ def filter_detail(image):
     return _filter_by_kernel(image, PIL.ImageFilter.DETAIL)
 
 
+# Lookups used by the augmenters below to process groups of equally shaped
+# images at once instead of calling the per-image functions.
+_ENHANCE_FUNCS_IMAGES = {
+    enhance_color: _enhance_color_images,
+    enhance_contrast: _enhance_contrast_images,
+    enhance_brightness: _enhance_brightness_images,
+    enhance_sharpness: _enhance_sharpness_images
+}
+
+_FILTER_KERNELS = {
+    filter_blur: PIL.ImageFilter.BLUR,
+    filter_smooth: PIL.ImageFilter.SMOOTH,
+    filter_smooth_more: PIL.ImageFilter.SMOOTH_MORE,
+    filter_edge_enhance: PIL.ImageFilter.EDGE_ENHANCE,
+    filter_edge_enhance_more: PIL.ImageFilter.EDGE_ENHANCE_MORE,
+    filter_find_edges: PIL.ImageFilter.FIND_EDGES,
+    filter_contour: PIL.ImageFilter.CONTOUR,
+    filter_emboss: PIL.ImageFilter.EMBOSS,
+    filter_sharpen: PIL.ImageFilter.SHARPEN,
+    filter_detail: PIL.ImageFilter.DETAIL
+}
+
+
 # TODO unify this with the matrix generation for Affine,
 #      there is probably no need to keep these separate
 # Added in 0.4.0.
@@ -1569,8 +1892,14 @@ class _EnhanceBase(meta.Augmenter):
             return batch
 
         factors = self._draw_samples(len(batch.images), random_state)
-        for image, factor in zip(batch.images, factors):
-            image[...] = self.func(image, factor)
+        func_images = _ENHANCE_FUNCS_IMAGES.get(self.func)
+        if func_images is None:
+            for image, factor in zip(batch.images, factors):
+                image[...] = self.func(image, factor)
+        else:
+            _apply_to_uint8_image_groups(
+                batch.images, func_images,
+                "imgaug.augmenters.pillike.enhance_*()", factors)
         return batch
 
     # Added in 0.4.0.
@@ -1860,8 +2189,16 @@ class _FilterBase(meta.Augmenter):
     # Added in 0.4.0.
     def _augment_batch_(self, batch, random_state, parents, hooks):
         if batch.images is not None:
-            for image in batch.images:
-                image[...] = self.func(image)
+            kernel = _FILTER_KERNELS.get(self.func)
+            if kernel is None:
+                for image in batch.images:
+                    image[...] = self.func(image)
+            else:
+                _apply_to_uint8_image_groups(
+                    batch.images,
+                    functools.partial(_filter_images_by_kernel,
+                                      kernel=kernel),
+                    "imgaug.augmenters.pillike.filter_*()")
         return batch
 
     # Added in 0.4.0.
@@ -12,6 +12,7 @@ List of augmenters:
 from __future__ import print_function, division, absolute_import
 
 from abc import ABCMeta, abstractmethod
+import collections
 import functools
 
 import six
@@ -62,6 +63,11 @@ class _AbstractPoolingBase(meta.Augmenter):
     def _pool_image(self, image, kernel_size_h, kernel_size_w):
         """Apply pooling method with given kernel height/width to an image."""
 
+    def _pool_images(self, images, kernel_size_h, kernel_size_w):
+        """Apply pooling method to images of identical shape and dtype."""
+        return [self._pool_image(image, kernel_size_h, kernel_size_w)
+                for image in images]
+
     def _draw_samples(self, nb_rows, random_state):
         rss = random_state.duplicate(2)
         mode = "single" if self.kernel_size[1] is None else "two"
@@ -98,14 +104,26 @@ class _AbstractPoolingBase(meta.Augmenter):
 
         kernel_sizes_h, kernel_sizes_w = samples
 
+        # group images by shape, dtype and kernel size so that each group
+        # can be pooled (and resized) as a single batch
+        groups = collections.OrderedDict()
         gen = enumerate(zip(images, kernel_sizes_h, kernel_sizes_w))
         for i, (image, ksize_h, ksize_w) in gen:
             if ksize_h >= 2 or ksize_w >= 2:
-                image_pooled = self._pool_image(
-                    image, ksize_h, ksize_w)
-                if self.keep_size:
-                    image_pooled = ia.imresize_single_image(
-                        image_pooled, image.shape[0:2])
+                key = (image.shape, image.dtype.name, ksize_h, ksize_w)
+                groups.setdefault(key, []).append(i)
+
+        for (shape, _, ksize_h, ksize_w), indices in groups.items():
+            if len(indices) == 1:
+                images_pooled = [
+                    self._pool_image(images[indices[0]], ksize_h, ksize_w)]
+            else:
+                images_pooled = self._pool_images(
+                    [images[i] for i in indices], ksize_h, ksize_w)
+            if self.keep_size:
+                images_pooled = ia.imresize_many_images(images_pooled,
+                                                        shape[0:2])
+            for i, image_pooled in zip(indices, images_pooled):
                 images[i] = image_pooled
 
         return images
@@ -320,6 +338,15 @@ class AveragePooling(_AbstractPoolingBase):
             (kernel_size_h, kernel_size_w)
         )
 
+    def _pool_images(self, images, kernel_size_h, kernel_size_w):
+        return ia.pool_many_images(
+            images,
+            (kernel_size_h, kernel_size_w),
+            np.average,
+            pad_mode="reflect",
+            pad_cval=128
+        )
+
 
 class MaxPooling(_AbstractPoolingBase):
     """
@@ -443,6 +470,15 @@ class MaxPooling(_AbstractPoolingBase):
             (kernel_size_h, kernel_size_w)
         )
 
+    def _pool_images(self, images, kernel_size_h, kernel_size_w):
+        return ia.pool_many_images(
+            images,
+            (kernel_size_h, kernel_size_w),
+            np.max,
+            pad_mode="edge",
+            pad_cval=0
+        )
+
 
 class MinPooling(_AbstractPoolingBase):
     """
@@ -566,6 +602,15 @@ class MinPooling(_AbstractPoolingBase):
             (kernel_size_h, kernel_size_w)
         )
 
+    def _pool_images(self, images, kernel_size_h, kernel_size_w):
+        return ia.pool_many_images(
+            images,
+            (kernel_size_h, kernel_size_w),
+            np.min,
+            pad_mode="edge",
+            pad_cval=255
+        )
+
 
 class MedianPooling(_AbstractPoolingBase):
     """
@@ -688,3 +733,12 @@ class MedianPooling(_AbstractPoolingBase):
             image,
             (kernel_size_h, kernel_size_w)
         )
+
+    def _pool_images(self, images, kernel_size_h, kernel_size_w):
+        return ia.pool_many_images(
+            images,
+            (kernel_size_h, kernel_size_w),
+            np.median,
+            pad_mode="reflect",
+            pad_cval=128
+        )
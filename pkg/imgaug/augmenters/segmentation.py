@@ -250,37 +250,49 @@ class Superpixels(meta.Augmenter):
         # TODO add test for this
         n_segments_samples = np.clip(n_segments_samples, 1, None)
 
+        # draw all samples up front, so that the images can be processed
+        # in threads
+        replace_samples = []
         for i, (image, rs) in enumerate(zip(images, rss[1:])):
             if image.size == 0:
                 # Image with 0-sized axis, nothing to change.
                 # Placing this before the sampling step should be fine.
+                replace_samples.append(None)
                 continue
 
-            replace_samples = self.p_replace.draw_samples(
-                (n_segments_samples[i],), random_state=rs)
+            replace_samples.append(self.p_replace.draw_samples(
+                (n_segments_samples[i],), random_state=rs))
 
-            if np.max(replace_samples) == 0:
-                # not a single superpixel would be replaced by its average
-                # color, i.e. the image would not be changed, so just keep it
-                continue
+        images_aug = self._map_images_threaded(
+            self._augment_image_by_samples,
+            zip(images, n_segments_samples, replace_samples))
+        for i, image_aug in enumerate(images_aug):
+            if image_aug is not None:
+                batch.images[i] = image_aug
+        return batch
 
-            orig_shape = image.shape
-            image = _ensure_image_max_size(image, self.max_size,
-                                           self.interpolation)
+    def _augment_image_by_samples(self, inputs):
+        image, n_segments, replace_samples = inputs
+        if replace_samples is None or np.max(replace_samples) == 0:
+            # not a single superpixel would be replaced by its average
+            # color, i.e. the image would not be changed, so just keep it
+            return None
 
-            segments = skimage.segmentation.slic(
-                image, n_segments=n_segments_samples[i], compactness=10)
+        orig_shape = image.shape
+        image = _ensure_image_max_size(image, self.max_size,
+                                       self.interpolation)
 
-            image_aug = self._replace_segments(image, segments, replace_samples)
+        segments = skimage.segmentation.slic(
+            image, n_segments=n_segments, compactness=10)
 
-            if orig_shape != image_aug.shape:
-                image_aug = ia.imresize_single_image(
-                    image_aug,
-                    orig_shape[0:2],
-                    interpolation=self.interpolation)
+        image_aug = self._replace_segments(image, segments, replace_samples)
 
-            batch.images[i] = image_aug
-        return batch
+        if orig_shape != image_aug.shape:
+            image_aug = ia.imresize_single_image(
+                image_aug,
+                orig_shape[0:2],
+                interpolation=self.interpolation)
+        return image_aug
 
     @classmethod
     def _replace_segments(cls, image, segments, replace_samples):
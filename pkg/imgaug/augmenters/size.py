@@ -1418,13 +1418,12 @@ class Resize(meta.Augmenter):
             input_dtype = images.dtype
 
         samples_a, samples_b, samples_ip = samples
-        result = []
-        for i, image in enumerate(images):
-            h, w = self._compute_height_width(image.shape, samples_a[i],
-                                              samples_b[i], self.size_order)
-            image_rs = ia.imresize_single_image(image, (h, w),
-                                                interpolation=samples_ip[i])
-            result.append(image_rs)
+        sizes = [
+            self._compute_height_width(image.shape, samples_a[i],
+                                       samples_b[i], self.size_order)
+            for i, image in enumerate(images)]
+        result = ia.imresize_many_images_grouped(images, sizes,
+                                                 interpolations=samples_ip)
 
         if input_was_array:
             all_same_size = (len({image.shape for image in result}) == 1)
@@ -4786,15 +4785,17 @@ class KeepSizeByResize(meta.Augmenter):
                           samples):
         interpolations, _, _ = samples
 
-        gen = zip(images, interpolations, shapes_orig)
-        result = []
-        for image, interpolation, input_shape in gen:
-            if interpolation == KeepSizeByResize.NO_RESIZE:
-                result.append(image)
-            else:
-                result.append(
-                    ia.imresize_single_image(image, input_shape[0:2],
-                                             interpolation))
+        result = list(images)
+        indices = [
+            i for i, interpolation in enumerate(interpolations)
+            if interpolation != KeepSizeByResize.NO_RESIZE]
+        if indices:
+            images_rs = ia.imresize_many_images_grouped(
+                [images[i] for i in indices],
+                [tuple(shapes_orig[i][0:2]) for i in indices],
+                interpolations=[interpolations[i] for i in indices])
+            for i, image_rs in zip(indices, images_rs):
+                result[i] = image_rs
 
         if images_were_array:
             # note here that NO_RESIZE can have led to different shapes
@@ -282,7 +282,57 @@ def clip_to_dtype_value_range_(array, dtype, validate=True,
     return clip_(array, min_value, max_value)
 
 
+def _get_unique_dtypes(dtypes):
+    # Fast path for the most common inputs (a single array or a list of
+    # arrays). Avoids dtype.name, which is comparatively slow in numpy.
+    if ia.is_np_array(dtypes):
+        return (dtypes.dtype,)
+    if isinstance(dtypes, list):
+        result = []
+        for dtype in dtypes:
+            if ia.is_np_array(dtype) or ia.is_np_scalar(dtype):
+                dtype = dtype.dtype
+            else:
+                dtype = normalize_dtype(dtype)
+            if dtype not in result:
+                result.append(dtype)
+        return tuple(result)
+    return (normalize_dtype(dtypes),)
+
+
+# Cache of gating calls that passed without errors or warnings. Keys are
+# ``(augmenter class, allowed, disallowed, unique input dtypes)``.
+# Gating decisions only depend on these, so a cache hit can skip all checks.
+# Calls that raise or warn are never cached and hence raise/warn each time.
+_GATE_DTYPES_CACHE = {}
+_GATE_DTYPES_CACHE_MAX_SIZE = 4096
+
+
+def _clear_gate_dtypes_cache():
+    _GATE_DTYPES_CACHE.clear()
+
+
 def gate_dtypes(dtypes, allowed, disallowed, augmenter=None):
+    dtypes = _get_unique_dtypes(dtypes)
+    cache_key = (
+        augmenter.__class__ if augmenter is not None else None,
+        tuple(allowed),
+        tuple(disallowed),
+        dtypes
+    )
+    if cache_key in _GATE_DTYPES_CACHE:
+        return
+
+    names = [dtype.name for dtype in dtypes]
+    if not _gate_dtype_names(names, allowed, disallowed, augmenter):
+        return
+
+    if len(_GATE_DTYPES_CACHE) >= _GATE_DTYPES_CACHE_MAX_SIZE:
+        _GATE_DTYPES_CACHE.clear()
+    _GATE_DTYPES_CACHE[cache_key] = True
+
+
+def _gate_dtype_names(names, allowed, disallowed, augmenter):
     # assume that at least one allowed dtype string is given
     assert len(allowed) > 0, (
         "Expected at least one dtype to be allowed, but got an empty list.")
@@ -311,33 +361,33 @@ def gate_dtypes(dtypes, allowed, disallowed, augmenter=None):
             ", ".join(inters))
     )
 
-    dtypes = normalize_dtypes(dtypes)
-
-    for dtype in dtypes:
-        if dtype.name in allowed:
+    all_allowed = True
+    for name in names:
+        if name in allowed:
             pass
-        elif dtype.name in disallowed:
+        elif name in disallowed:
             if augmenter is None:
                 raise ValueError(
                     "Got dtype '%s', which is a forbidden dtype (%s)." % (
-                        dtype.name, ", ".join(disallowed)
+                        name, ", ".join(disallowed)
                     ))
 
             raise ValueError(
                 "Got dtype '%s' in augmenter '%s' (class '%s'), which "
                 "is a forbidden dtype (%s)." % (
-                    dtype.name,
+                    name,
                     augmenter.name,
                     augmenter.__class__.__name__,
                     ", ".join(disallowed)
                 ))
         else:
+            all_allowed = False
             if augmenter is None:
                 ia.warn(
                     "Got dtype '%s', which was neither explicitly allowed "
                     "(%s), nor explicitly disallowed (%s). Generated "
                     "outputs may contain errors." % (
-                        dtype.name,
+                        name,
                         ", ".join(allowed),
                         ", ".join(disallowed)
                     ))
@@ -347,9 +397,10 @@ def gate_dtypes(dtypes, allowed, disallowed, augmenter=None):
                     "neither explicitly allowed (%s), nor explicitly "
                     "disallowed (%s). Generated outputs may contain "
                     "errors." % (
-                        dtype.name,
+                        name,
                         augmenter.name,
                         augmenter.__class__.__name__,
                         ", ".join(allowed),
                         ", ".join(disallowed)
                     ))
+    return all_allowed
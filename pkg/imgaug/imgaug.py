@@ -1,6 +1,7 @@
 """Collection of basic functions used throughout imgaug."""
 from __future__ import print_function, division, absolute_import
 
+import collections
 import math
 import numbers
 import sys
@@ -16,7 +17,6 @@ except ImportError:
 
 import numpy as np
 import cv2
-import imageio
 import six
 import six.moves as sm
 import skimage.draw
@@ -63,6 +63,14 @@ IMRESIZE_VALID_INTERPOLATIONS = [
     "nearest", "linear", "area", "cubic",
     cv2.INTER_NEAREST, cv2.INTER_LINEAR, cv2.INTER_AREA, cv2.INTER_CUBIC]
 
+# Integer downscaling factor (on both axes) starting at which "area"
+# interpolation first halves images repeatedly, see _imresize_area_pyramid().
+_IMRESIZE_AREA_PYRAMID_MIN_FACTOR = 4
+
+# Minimum number of pixels (summed over all images) of a resize call at which
+# images are distributed over the shared thread pool.
+_IMRESIZE_THREADS_MIN_PIXELS = 1024 * 1024
+
 
 ###############################################################################
 # Helpers for deprecation
@@ -847,6 +855,9 @@ def quokka(size=None, extract=None):
         The image array of dtype ``uint8``.
 
     """
+    # deferred import, imageio is slow to import
+    import imageio
+
     img = imageio.imread(QUOKKA_FP, pilmode="RGB")
     if extract is not None:
         bb = _quokka_normalize_extract(extract)
@@ -899,6 +910,9 @@ def quokka_heatmap(size=None, extract=None):
     # TODO get rid of this deferred import
     from imgaug.augmentables.heatmaps import HeatmapsOnImage
 
+    # deferred import, imageio is slow to import
+    import imageio
+
     img = imageio.imread(QUOKKA_DEPTH_MAP_HALFRES_FP, pilmode="RGB")
     img = imresize_single_image(img, (643, 960), interpolation="cubic")
 
@@ -1227,6 +1241,20 @@ def compute_line_intersection_point(x1, y1, x2, y2, x3, y3, x4, y4):
     return False
 
 
+# Loaded fonts of draw_text(), keyed by font size. Loading the font file
+# takes longer than drawing a short label.
+_DEFAULT_FONTS = {}
+
+
+def _get_default_font(size):
+    font = _DEFAULT_FONTS.get(size)
+    if font is None:
+        from PIL import ImageFont as PIL_ImageFont
+        font = PIL_ImageFont.truetype(DEFAULT_FONT_FP, size)
+        _DEFAULT_FONTS[size] = font
+    return font
+
+
 # TODO replace by cv2.putText()?
 def draw_text(img, y, x, text, color=(0, 255, 0), size=25):
     """Draw text on an image.
@@ -1283,8 +1311,7 @@ def draw_text(img, y, x, text, color=(0, 255, 0), size=25):
     """
     from PIL import (
         Image as PIL_Image,
-        ImageDraw as PIL_ImageDraw,
-        ImageFont as PIL_ImageFont
+        ImageDraw as PIL_ImageDraw
     )
 
     assert img.dtype.name in ["uint8", "float32"], (
@@ -1296,7 +1323,7 @@ def draw_text(img, y, x, text, color=(0, 255, 0), size=25):
         img = img.astype(np.uint8)
 
     img = PIL_Image.fromarray(img)
-    font = PIL_ImageFont.truetype(DEFAULT_FONT_FP, size)
+    font = _get_default_font(size)
     context = PIL_ImageDraw.Draw(img)
     context.text((x, y), text, fill=tuple(color), font=font)
     img_np = np.asarray(img)
@@ -1376,6 +1403,12 @@ def imresize_many_images(images, sizes=None, interpolation=None):
         increases, ``area`` interpolation will be picked and for size
         decreases, ``linear`` interpolation will be picked.
 
+        When downscaling both axes by integer factors that are multiples
+        of ``4`` with ``area`` interpolation, the images are first halved
+        repeatedly, which is considerably faster. The result for integer
+        dtypes may then deviate by at most one intensity level per halving
+        from a single resize due to the intermediate rounding.
+
     Returns
     -------
     (N,H',W',[C]) ndarray
@@ -1407,13 +1440,117 @@ def imresize_many_images(images, sizes=None, interpolation=None):
     height ``16`` and width ``32``.
 
     """
-    # pylint: disable=too-many-statements
-
     # we just do nothing if the input contains zero images
     # one could also argue that an exception would be appropriate here
     if len(images) == 0:
         return images
 
+    sizes = _normalize_imresize_sizes(sizes)
+
+    # if input is a list, resize all images of the same shape as one group
+    # and distribute the groups' images over the shared thread pool
+    if isinstance(images, list):
+        nb_shapes = len({image.shape for image in images})
+        if nb_shapes == 1:
+            result, tasks = _prepare_imresize_tasks(images, sizes,
+                                                    interpolation)
+            _run_imresize_tasks(tasks)
+            return list(result)
+
+        return imresize_many_images_grouped(
+            images, [sizes] * len(images), interpolation)
+
+    result, tasks = _prepare_imresize_tasks(images, sizes, interpolation)
+    _run_imresize_tasks(tasks)
+    return result
+
+
+def imresize_many_images_grouped(images, sizes, interpolations=None,
+                                 nb_workers=None):
+    """Resize each image in a list to its own size.
+
+    Images with the same shape, dtype, target size and interpolation are
+    resized as one group into a shared output array. The images of all
+    groups are then distributed over the shared thread pool from
+    :func:`~imgaug.multicore.get_thread_pool`, as ``cv2.resize()``
+    releases the GIL. This makes the function suited for lists of images
+    with many different shapes, e.g. loaded from a folder.
+
+    **Supported dtypes**:
+
+        See :func:`~imgaug.imgaug.imresize_many_images`.
+
+    Parameters
+    ----------
+    images : (N,H,W,[C]) ndarray or list of (H,W,[C]) ndarray
+        Images to resize.
+
+    sizes : iterable
+        One target size per image. Each one may have any value that
+        the argument `sizes` of
+        :func:`~imgaug.imgaug.imresize_many_images` accepts.
+
+    interpolations : None or str or int or iterable, optional
+        Either one interpolation for all images or one per image. See
+        :func:`~imgaug.imgaug.imresize_many_images` for valid values.
+
+    nb_workers : None or int, optional
+        Maximum number of threads to use. See
+        :func:`~imgaug.multicore.map_threaded`. If ``None``, threads are
+        only used if the images are large enough to benefit from them.
+
+    Returns
+    -------
+    list of ndarray
+        Resized images, in the same order as `images`. Images of the same
+        group are views of the same output array.
+
+    Examples
+    --------
+    >>> import imgaug as ia
+    >>> images = [np.zeros((8, 16, 3), dtype=np.uint8),
+    >>>           np.zeros((10, 10, 3), dtype=np.uint8)]
+    >>> images_resized = ia.imresize_many_images_grouped(
+    >>>     images, [(4, 8), 2.0])
+    >>> [image.shape for image in images_resized]
+    [(4, 8, 3), (20, 20, 3)]
+
+    """
+    sizes = list(sizes)
+    assert len(sizes) == len(images), (
+        "Expected one size per image, got %d sizes for %d images." % (
+            len(sizes), len(images)))
+    if interpolations is None or not is_iterable(interpolations) or (
+            isinstance(interpolations, six.string_types)):
+        interpolations = [interpolations] * len(images)
+    else:
+        interpolations = list(interpolations)
+        assert len(interpolations) == len(images), (
+            "Expected one interpolation per image, got %d interpolations "
+            "for %d images." % (len(interpolations), len(images)))
+
+    groups = collections.OrderedDict()
+    gen = zip(images, sizes, interpolations)
+    for i, (image, size, interpolation) in enumerate(gen):
+        size_key = tuple(size) if is_iterable(size) else size
+        key = (image.shape, image.dtype.name, size_key, interpolation)
+        groups.setdefault(key, []).append(i)
+
+    result = [None] * len(images)
+    tasks = []
+    for (_shape, _dtype, size, interpolation), indices in groups.items():
+        group_images = [images[i] for i in indices]
+        group_result, group_tasks = _prepare_imresize_tasks(
+            group_images, _normalize_imresize_sizes(size), interpolation)
+        tasks.extend(group_tasks)
+        for i, image_rs in zip(indices, group_result):
+            result[i] = image_rs
+
+    _run_imresize_tasks(tasks, nb_workers=nb_workers)
+    return result
+
+
+def _normalize_imresize_sizes(sizes):
     # verify that sizes contains only values >0
     if is_single_number(sizes) and sizes <= 0:
         raise ValueError(
@@ -1423,38 +1560,29 @@ def imresize_many_images(images, sizes=None, interpolation=None):
     # change after the validation to make the above error messages match the
     # original input
     if is_single_number(sizes):
-        sizes = (sizes, sizes)
-    else:
-        assert len(sizes) == 2, (
-            "If 'sizes' is given as a tuple, it is expected be a tuple of two "
-            "entries, got %d entries." % (len(sizes),))
-        assert all([is_single_number(val) and val >= 0 for val in sizes]), (
-            "If 'sizes' is given as a tuple, it is expected be a tuple of two "
-            "ints or two floats, each >= 0, got types %s with values %s." % (
-                str([type(val) for val in sizes]), str(sizes)))
-
-    # if input is a list, call this function N times for N images
-    # but check beforehand if all images have the same shape, then just
-    # convert to a single array and de-convert afterwards
-    if isinstance(images, list):
-        nb_shapes = len({image.shape for image in images})
-        if nb_shapes == 1:
-            return list(imresize_many_images(
-                np.array(images), sizes=sizes, interpolation=interpolation))
-
-        return [
-            imresize_many_images(
-                image[np.newaxis, ...],
-                sizes=sizes,
-                interpolation=interpolation)[0, ...]
-            for image in images]
-
-    shape = images.shape
-    assert images.ndim in [3, 4], "Expected array of shape (N, H, W, [C]), " \
-                                  "got shape %s" % (str(shape),)
-    nb_images = shape[0]
+        return sizes, sizes
+
+    assert len(sizes) == 2, (
+        "If 'sizes' is given as a tuple, it is expected be a tuple of two "
+        "entries, got %d entries." % (len(sizes),))
+    assert all([is_single_number(val) and val >= 0 for val in sizes]), (
+        "If 'sizes' is given as a tuple, it is expected be a tuple of two "
+        "ints or two floats, each >= 0, got types %s with values %s." % (
+            str([type(val) for val in sizes]), str(sizes)))
+    return sizes
+
+
+def _prepare_imresize_tasks(images, sizes, interpolation):
+    # pylint: disable=too-many-statements
+    # Validate a group of equally shaped images, allocate their output
+    # array and return it together with one resize task per image.
+    # images may be an array or a list of arrays.
+    shape = (len(images),) + tuple(images[0].shape)
+    assert len(shape) in [3, 4], "Expected array of shape (N, H, W, [C]), " \
+                                 "got shape %s" % (str(shape),)
     height_image, width_image = shape[1], shape[2]
-    nb_channels = shape[3] if images.ndim > 3 else None
+    nb_channels = shape[3] if len(shape) > 3 else None
+    dtype = images[0].dtype
 
     height_target, width_target = sizes[0], sizes[1]
     height_target = (int(np.round(height_image * height_target))
@@ -1465,19 +1593,19 @@ def imresize_many_images(images, sizes=None, interpolation=None):
                     else width_target)
 
     if height_target == height_image and width_target == width_image:
-        return np.copy(images)
+        return np.array(images, dtype=dtype).reshape(shape), []
 
     # return empty array if input array contains zero-sized axes
     # note that None==0 is not True (for case nb_channels=None)
     if 0 in [height_target, width_target, nb_channels]:
         shape_out = tuple([shape[0], height_target, width_target]
                           + list(shape[3:]))
-        return np.zeros(shape_out, dtype=images.dtype)
+        return np.zeros(shape_out, dtype=dtype), []
 
     # place this after the (h==h' and w==w') check so that images with
     # zero-sized don't result in errors if the aren't actually resized
     # verify that all input images have height/width > 0
-    has_zero_size_axes = any([axis == 0 for axis in images.shape[1:]])
+    has_zero_size_axes = any([axis == 0 for axis in shape[1:]])
     assert not has_zero_size_axes, (
         "Cannot resize images, because at least one image has a height and/or "
         "width and/or number of channels of zero. "
@@ -1532,55 +1660,116 @@ def imresize_many_images(images, sizes=None, interpolation=None):
                         "float96", "float128", "float256"],
             augmenter=None)
 
-    result_shape = (nb_images, height_target, width_target)
+    result_shape = (shape[0], height_target, width_target)
     if nb_channels is not None:
         result_shape = result_shape + (nb_channels,)
-    result = np.zeros(result_shape, dtype=images.dtype)
-    for i, image in enumerate(images):
-        input_dtype = image.dtype
-        input_dtype_name = input_dtype.name
-
-        if input_dtype_name == "bool":
-            image = image.astype(np.uint8) * 255
-        elif input_dtype_name == "int8" and inter != cv2.INTER_NEAREST:
-            image = image.astype(np.int16)
-        elif input_dtype_name == "float16":
-            image = image.astype(np.float32)
-
-        if nb_channels is not None and nb_channels > 512:
-            channels = [
-                cv2.resize(image[..., c], (width_target, height_target),
-                           interpolation=inter) for c in sm.xrange(nb_channels)]
-            result_img = np.stack(channels, axis=-1)
-        else:
-            result_img = cv2.resize(
-                image, (width_target, height_target), interpolation=inter)
+    result = np.zeros(result_shape, dtype=dtype)
+    tasks = [(image, result[i], inter) for i, image in enumerate(images)]
+    return result, tasks
+
+
+def _run_imresize_tasks(tasks, nb_workers=None):
+    if not tasks:
+        return
+    if nb_workers is None:
+        nb_pixels = sum([image.shape[0] * image.shape[1]
+                         for image, _, _ in tasks])
+        if nb_pixels < _IMRESIZE_THREADS_MIN_PIXELS:
+            nb_workers = 1
+
+    from . import multicore
+    multicore.map_threaded(_imresize_image_into_, tasks,
+                           nb_workers=nb_workers)
+
+
+def _imresize_image_into_(task):
+    image, out, inter = task
+    height_target, width_target = out.shape[0:2]
+    nb_channels = out.shape[2] if out.ndim == 3 else None
+    input_dtype_name = image.dtype.name
+
+    if input_dtype_name == "bool":
+        image = image.astype(np.uint8) * 255
+    elif input_dtype_name == "int8" and inter != cv2.INTER_NEAREST:
+        image = image.astype(np.int16)
+    elif input_dtype_name == "float16":
+        image = image.astype(np.float32)
+
+    if inter == cv2.INTER_AREA and (nb_channels is None
+                                    or nb_channels <= 512):
+        image = _imresize_area_pyramid(image, height_target, width_target)
+
+    # cv2 can write directly into the output array if the dtype was not
+    # changed above
+    dst = out if out.dtype.name == image.dtype.name else None
+    if nb_channels is not None and nb_channels > 512:
+        channels = [
+            cv2.resize(image[..., c], (width_target, height_target),
+                       interpolation=inter) for c in sm.xrange(nb_channels)]
+        result_img = np.stack(channels, axis=-1)
+    elif dst is not None:
+        result_img = cv2.resize(
+            image, (width_target, height_target), dst=dst,
+            interpolation=inter)
+    else:
+        result_img = cv2.resize(
+            image, (width_target, height_target), interpolation=inter)
 
-        assert result_img.dtype.name == image.dtype.name, (
-            "Expected cv2.resize() to keep the input dtype '%s', but got "
-            "'%s'. This is an internal error. Please report." % (
-                image.dtype.name, result_img.dtype.name
-            )
+    assert result_img.dtype.name == image.dtype.name, (
+        "Expected cv2.resize() to keep the input dtype '%s', but got "
+        "'%s'. This is an internal error. Please report." % (
+            image.dtype.name, result_img.dtype.name
         )
+    )
 
-        # cv2 removes the channel axis if input was (H, W, 1)
-        # we re-add it (but only if input was not (H, W))
-        if (len(result_img.shape) == 2 and nb_channels is not None
-                and nb_channels == 1):
-            result_img = result_img[:, :, np.newaxis]
-
-        if input_dtype_name == "bool":
-            result_img = result_img > 127
-        elif input_dtype_name == "int8" and inter != cv2.INTER_NEAREST:
-            # TODO somehow better avoid circular imports here
-            from . import dtypes as iadt
-            result_img = iadt.restore_dtypes_(result_img, np.int8)
-        elif input_dtype_name == "float16":
-            # TODO see above
-            from . import dtypes as iadt
-            result_img = iadt.restore_dtypes_(result_img, np.float16)
-        result[i] = result_img
-    return result
+    if dst is not None and np.shares_memory(result_img, out):
+        return
+
+    # cv2 removes the channel axis if input was (H, W, 1)
+    # we re-add it (but only if input was not (H, W))
+    if (len(result_img.shape) == 2 and nb_channels is not None
+            and nb_channels == 1):
+        result_img = result_img[:, :, np.newaxis]
+
+    if input_dtype_name == "bool":
+        result_img = result_img > 127
+    elif input_dtype_name == "int8" and inter != cv2.INTER_NEAREST:
+        # TODO somehow better avoid circular imports here
+        from . import dtypes as iadt
+        result_img = iadt.restore_dtypes_(result_img, np.int8)
+    elif input_dtype_name == "float16":
+        # TODO see above
+        from . import dtypes as iadt
+        result_img = iadt.restore_dtypes_(result_img, np.float16)
+    out[...] = result_img
+
+
+def _imresize_area_pyramid(image, height_target, width_target):
+    # For large downscaling factors, halving the image repeatedly via
+    # INTER_AREA (which has a fast path for a factor of exactly 2) is
+    # several times faster than a single INTER_AREA resize. This is only
+    # done if both axes are downscaled by integer factors that are
+    # multiples of 4. Each halving then averages exactly the 2x2 blocks
+    # that the single resize would also have averaged, so the only
+    # deviation is the rounding of the intermediate images (for integer
+    # dtypes at most one intensity level per halving).
+    height, width = image.shape[0:2]
+    min_factor = _IMRESIZE_AREA_PYRAMID_MIN_FACTOR
+    if height % height_target != 0 or width % width_target != 0:
+        return image
+    factor_h = height // height_target
+    factor_w = width // width_target
+    while (factor_h >= min_factor and factor_h % 2 == 0
+           and factor_w >= min_factor and factor_w % 2 == 0):
+        factor_h = factor_h // 2
+        factor_w = factor_w // 2
+        image_half = cv2.resize(
+            image, (width_target * factor_w, height_target * factor_h),
+            interpolation=cv2.INTER_AREA)
+        if image_half.ndim < image.ndim:
+            image_half = image_half[..., np.newaxis]
+        image = image_half
+    return image
 
 
 def _assert_two_or_three_dims(shape):
@@ -1630,6 +1819,154 @@ def imresize_single_image(image, sizes, interpolation=None):
     return rs[0, ...]
 
 
+# dtypes that are supported by cv2.boxFilter(), cv2.dilate() and cv2.erode()
+_POOL_CV2_DTYPES = {"uint8", "uint16", "int16", "float32", "float64"}
+
+# Maximum block size (height*width) for which median pooling uses a sorting
+# network. Larger blocks fall back to skimage.
+_POOL_MEDIAN_NETWORK_MAX_SIZE = 64
+
+# cache of comparator pairs for _get_sorting_network()
+_SORTING_NETWORKS = {}
+
+
+def _get_pool_kernel_name(func):
+    # pylint: disable=comparison-with-callable
+    if func in [np.average, np.mean]:
+        return "avg"
+    if func in [np.max, np.amax]:
+        return "max"
+    if func in [np.min, np.amin]:
+        return "min"
+    if func == np.median:
+        return "median"
+    return None
+
+
+def _pool_padded_fast(arr, block_h, block_w, func):
+    """Pool ``(N,H,W,C)`` arrays with heights/widths divisible by the blocks.
+
+    Returns the same result as ``skimage.measure.block_reduce`` with `func`
+    (up to floating point inaccuracies for float inputs) or ``None`` if
+    there is no dedicated kernel for `func` and the array's dtype.
+
+    """
+    kernel_name = _get_pool_kernel_name(func)
+    if kernel_name is None:
+        return None
+
+    nb_images, height, width, nb_channels = arr.shape
+    height_pooled = height // block_h
+    width_pooled = width // block_w
+    dtype = arr.dtype
+    # cv2 cannot handle bool arrays, but the kernels below work the same
+    # way on their uint8 view
+    is_bool = (dtype.kind == "b")
+    cv2_compatible = (
+        (is_bool or dtype.name in _POOL_CV2_DTYPES)
+        and nb_channels <= 512)
+
+    if kernel_name == "median":
+        if dtype.kind not in ["b", "u", "i"] \
+                or block_h * block_w > _POOL_MEDIAN_NETWORK_MAX_SIZE:
+            return None
+        return _pool_median_network(arr, block_h, block_w)
+
+    if not cv2_compatible:
+        return None
+
+    # Stack all images vertically. As the heights are multiples of the
+    # block height, no window with anchor (0, 0) crosses the border between
+    # two images at the sampled locations.
+    stacked = np.ascontiguousarray(arr).reshape(
+        (nb_images * height, width, nb_channels))
+    if is_bool:
+        stacked = stacked.view(np.uint8)
+
+    if kernel_name == "avg":
+        # Sum via an unnormalized box filter in float64, which is exact for
+        # all integer dtypes, and divide afterwards. This matches the
+        # float64 averages (and their truncation when preserving the dtype)
+        # computed by np.average.
+        sums = cv2.boxFilter(stacked, cv2.CV_64F, (block_w, block_h),
+                             anchor=(0, 0), normalize=False,
+                             borderType=cv2.BORDER_CONSTANT)
+        result = sums[::block_h, ::block_w] / (block_h * block_w)
+        if dtype.kind == "f":
+            result = result.astype(dtype)
+    else:
+        kernel = np.ones((block_h, block_w), dtype=np.uint8)
+        morph_func = cv2.dilate if kernel_name == "max" else cv2.erode
+        result = morph_func(stacked, kernel, anchor=(0, 0))
+        result = result[::block_h, ::block_w]
+        if is_bool:
+            result = result.view(np.bool_)
+
+    return result.reshape(
+        (nb_images, height_pooled, width_pooled, nb_channels))
+
+
+def _pool_median_network(arr, block_h, block_w):
+    # Median of each block via a Batcher odd-even merge sorting network.
+    # Each comparator is a vectorized minimum/maximum over the strided
+    # slices of all blocks, which is considerably faster than calling
+    # np.median() or np.partition() on many tiny blocks.
+    block_size = block_h * block_w
+    network_size = 1
+    while network_size < block_size:
+        network_size *= 2
+
+    values = [np.array(arr[:, y::block_h, x::block_w])
+              for y in sm.xrange(block_h) for x in sm.xrange(block_w)]
+    if network_size > block_size:
+        # filled with the maximum value, hence sorted to the end and not
+        # affecting the median
+        if arr.dtype.kind == "b":
+            fill_value = True
+        else:
+            fill_value = np.iinfo(arr.dtype).max
+        fill = np.full_like(values[0], fill_value)
+        values.extend([fill] * (network_size - block_size))
+
+    for idx_a, idx_b in _get_sorting_network(network_size):
+        value_a = values[idx_a]
+        value_b = values[idx_b]
+        values[idx_a] = np.minimum(value_a, value_b)
+        values[idx_b] = np.maximum(value_a, value_b)
+
+    # same as np.median(): a float64 center value or the mean of the two
+    # center values
+    center = block_size // 2
+    if block_size % 2 == 1:
+        return values[center].astype(np.float64)
+    return (values[center-1].astype(np.float64) + values[center]) / 2
+
+
+def _get_sorting_network(size):
+    # comparator pairs of a Batcher odd-even merge sort for a power of two
+    pairs = _SORTING_NETWORKS.get(size)
+    if pairs is not None:
+        return pairs
+
+    pairs = []
+    merge_size = 1
+    while merge_size < size:
+        step = merge_size
+        while step >= 1:
+            for j in sm.xrange(step % merge_size, size - step, 2 * step):
+                for i in sm.xrange(min(step, size - j - step)):
+                    same_merge = (
+                        (i + j) // (merge_size * 2)
+                        == (i + j + step) // (merge_size * 2))
+                    if same_merge:
+                        pairs.append((i + j, i + j + step))
+            step //= 2
+        merge_size *= 2
+    pairs = tuple(pairs)
+    _SORTING_NETWORKS[size] = pairs
+    return pairs
+
+
 def pool(arr, block_size, func, pad_mode="constant", pad_cval=0,
          preserve_dtype=True, cval=None):
     """Resize an array by pooling values within blocks.
@@ -1748,14 +2085,23 @@ def pool(arr, block_size, func, pad_mode="constant", pad_cval=0,
 
     input_dtype = arr.dtype
 
-    arr_reduced = skimage.measure.block_reduce(arr, tuple(block_size), func,
-                                               cval=cval)
+    arr_reduced = None
+    if len(block_size) == 2 or block_size[2] == 1:
+        arr_reduced = _pool_padded_fast(
+            arr.reshape((1, arr.shape[0], arr.shape[1], -1)),
+            block_size[0], block_size[1], func)
+        if arr_reduced is not None:
+            arr_reduced = arr_reduced.reshape(
+                arr_reduced.shape[1:3] + arr.shape[2:])
+
+    if arr_reduced is None:
+        arr_reduced = skimage.measure.block_reduce(arr, tuple(block_size),
+                                                   func, cval=cval)
     if preserve_dtype and arr_reduced.dtype.name != input_dtype.name:
         arr_reduced = arr_reduced.astype(input_dtype)
     return arr_reduced
 
 
-# TODO does OpenCV have a faster avg pooling method?
 def avg_pool(arr, block_size, pad_mode="reflect", pad_cval=128,
              preserve_dtype=True, cval=None):
     """Resize an array using average pooling.
@@ -1938,6 +2284,109 @@ def median_pool(arr, block_size, pad_mode="reflect", pad_cval=128,
                 pad_cval=pad_cval, preserve_dtype=preserve_dtype)
 
 
+def pool_many_images(images, block_size, func, pad_mode="constant",
+                     pad_cval=0, preserve_dtype=True):
+    """Resize many images of identical shape by pooling values within blocks.
+
+    This produces the same outputs as calling :func:`pool` on each image,
+    but pools the whole batch at once if `func` is one of
+    :func:`numpy.average`, :func:`numpy.mean`, :func:`numpy.max`,
+    :func:`numpy.min` or :func:`numpy.median`.
+
+    **Supported dtypes**:
+
+        See :func:`~imgaug.imgaug.pool`.
+
+    Parameters
+    ----------
+    images : (N,H,W) ndarray or (N,H,W,C) ndarray or list of ndarray
+        Images to pool. If a ``list``, all images must have the same shape
+        and dtype.
+
+    block_size : int or tuple of int
+        Spatial size of each group of values to pool. If a ``tuple``, it is
+        expected to contain the block height and width. Pooling always
+        happens per channel.
+
+    func : callable
+        Function to apply to a given block in order to convert it to a single
+        number. See :func:`~imgaug.imgaug.pool` for details.
+
+    pad_mode : str, optional
+        Padding mode to use if the images cannot be divided by `block_size`
+        without remainder. See :func:`~imgaug.imgaug.pad` for details.
+
+    pad_cval : number, optional
+        Value to use for padding if `mode` is ``constant``.
+        See :func:`numpy.pad` for details.
+
+    preserve_dtype : bool, optional
+        Whether to convert the array back to the input datatype if it is
+        changed away from that in the pooling process.
+
+    Returns
+    -------
+    (N,H',W') ndarray or (N,H',W',C) ndarray
+        Images after pooling.
+
+    """
+    # TODO find better way to avoid circular import
+    from . import dtypes as iadt
+    from .augmenters import size as iasize
+
+    if is_single_integer(block_size):
+        block_size = (block_size, block_size)
+    assert len(block_size) == 2, (
+        "Expected block_size to be a single integer or a tuple of two "
+        "integers, got %s." % (str(block_size),))
+
+    if len(images) == 0 or images[0].size == 0:
+        return np.array([
+            pool(image, block_size, func, pad_mode=pad_mode,
+                 pad_cval=pad_cval, preserve_dtype=preserve_dtype)
+            for image in images])
+
+    images_arr = images if is_np_array(images) else np.stack(images)
+    assert images_arr.ndim in [3, 4], (
+        "Expected images to be (N,H,W) or (N,H,W,C), got shape %s." % (
+            images_arr.shape,))
+    iadt.gate_dtypes(images_arr,
+                     allowed=["bool",
+                              "uint8", "uint16", "uint32",
+                              "int8", "int16", "int32",
+                              "float16", "float32", "float64", "float128"],
+                     disallowed=["uint64", "uint128", "uint256",
+                                 "int64", "int128", "int256",
+                                 "float256"],
+                     augmenter=None)
+
+    paddings = iasize.compute_paddings_to_reach_multiples_of(
+        images_arr[0], block_size[0], block_size[1])
+    if any([padding > 0 for padding in paddings]):
+        images_arr = np.stack([
+            iasize.pad_to_multiples_of(image, block_size[0], block_size[1],
+                                       mode=pad_mode, cval=pad_cval)
+            for image in images_arr])
+
+    nb_images, height, width = images_arr.shape[0:3]
+    images_pooled = _pool_padded_fast(
+        images_arr.reshape((nb_images, height, width, -1)),
+        block_size[0], block_size[1], func)
+    if images_pooled is None:
+        images_pooled = np.stack([
+            skimage.measure.block_reduce(image,
+                                         tuple(block_size)
+                                         + (1,) * (image.ndim - 2),
+                                         func)
+            for image in images_arr])
+    images_pooled = images_pooled.reshape(
+        images_pooled.shape[0:3] + images_arr.shape[3:])
+
+    if preserve_dtype and images_pooled.dtype.name != images_arr.dtype.name:
+        images_pooled = images_pooled.astype(images_arr.dtype)
+    return images_pooled
+
+
 def draw_grid(images, rows=None, cols=None):
     """Combine multiple images into a single grid-like image.
 
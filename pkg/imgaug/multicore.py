@@ -1,6 +1,8 @@
 """Classes and functions dealing with augmentation on multiple CPU cores."""
 from __future__ import print_function, division, absolute_import
+import os
 import sys
+import hashlib
 import multiprocessing
 import threading
 import traceback
@@ -116,6 +118,15 @@ class Pool(object):
         The seed to use for child processes. If ``None``, a random seed will
         be used.
 
+    seed_per_sample : bool, optional
+        Whether to seed every row of a batch by its own sample key instead
+        of seeding whole batches by their index. If ``True``, `seed` must be
+        set and the ``data`` attribute of each batch must be a list with one
+        sample key per row, see
+        :func:`~imgaug.multicore.augment_batch_by_sample_seeds_`. The
+        results then neither depend on the number of workers nor on how the
+        samples are split into batches, e.g. across several machines.
+
     """
     # This attribute saves the augmentation sequence for background workers so
     # that it does not have to be resend with every batch. The attribute is set
@@ -131,8 +142,12 @@ class Pool(object):
     # attribute.
     _WORKER_SEED_START = None
 
+    # Whether background workers derive the seeds from the batches' sample
+    # keys instead of from the batch indices.
+    _WORKER_SEED_PER_SAMPLE = False
+
     def __init__(self, augseq, processes=None, maxtasksperchild=None,
-                 seed=None):
+                 seed=None, seed_per_sample=False):
         # make sure that don't call pool again in a child process
         assert Pool._WORKER_AUGSEQ is None, (
             "_WORKER_AUGSEQ was already set when calling Pool.__init__(). "
@@ -159,7 +174,11 @@ class Pool(object):
                     str(seed)
                 )
             )
+        assert not seed_per_sample or seed is not None, (
+            "Expected `seed` to be set if `seed_per_sample` is True, as "
+            "otherwise the sample seeds would not be reproducible.")
         self.seed = seed
+        self.seed_per_sample = seed_per_sample
 
         # multiprocessing.Pool instance
         self._pool = None
@@ -213,7 +232,7 @@ class Pool(object):
             self._pool = _get_context().Pool(
                 processes,
                 initializer=_Pool_initialize_worker,
-                initargs=(self.augseq, self.seed),
+                initargs=(self.augseq, self.seed, self.seed_per_sample),
                 maxtasksperchild=self.maxtasksperchild)
         return self._pool
 
@@ -465,7 +484,7 @@ def _create_output_buffer_left(output_buffer_size):
 
 # This could be a classmethod or staticmethod of Pool in 3.x, but in 2.7 that
 # leads to pickle errors.
-def _Pool_initialize_worker(augseq, seed_start):
+def _Pool_initialize_worker(augseq, seed_start, seed_per_sample=False):
     # pylint: disable=invalid-name, protected-access
 
     # Not using this seems to have caused infinite hanging in the case
@@ -490,6 +509,7 @@ def _Pool_initialize_worker(augseq, seed_start):
         seed = hash(process_name) + seed_offset
         _reseed_global_local(seed, augseq)
     Pool._WORKER_SEED_START = seed_start
+    Pool._WORKER_SEED_PER_SAMPLE = seed_per_sample
     Pool._WORKER_AUGSEQ = augseq
     # not sure if really necessary, but shouldn't hurt either
     Pool._WORKER_AUGSEQ.localize_random_state_()
@@ -514,6 +534,9 @@ def _Pool_worker(batch_idx, batch):
         "call _Pool_worker()?")
 
     augseq = Pool._WORKER_AUGSEQ
+    if Pool._WORKER_SEED_PER_SAMPLE:
+        return augment_batch_by_sample_seeds_(
+            augseq, batch, Pool._WORKER_SEED_START)
     # TODO why is this if here? _WORKER_SEED_START should always be set?
     if Pool._WORKER_SEED_START is not None:
         seed = Pool._WORKER_SEED_START + batch_idx
@@ -545,6 +568,253 @@ def _derive_seed(base_seed, offset=0):
     )
 
 
+def derive_sample_seed(seed, sample_id, variant=None):
+    """Derive a seed for a single sample from a stable sample key.
+
+    The seed is computed from a hash of the base seed, the sample ID and
+    the variant index. It hence does not depend on the process, the
+    position of the sample in a batch or the batch index, and is identical
+    across machines and python versions.
+
+    Parameters
+    ----------
+    seed : int
+        Base seed of the whole augmentation run.
+
+    sample_id : str or int
+        Stable identifier of the sample, e.g. a hash of the file path or of
+        the file content.
+
+    variant : None or int or str, optional
+        Index of the augmented variant of the sample, if each sample is
+        augmented several times.
+
+    Returns
+    -------
+    int
+        Seed in the interval ``[0, 2**31)``.
+
+    """
+    keys = [seed, sample_id] + ([variant] if variant is not None else [])
+    text = "|".join([str(key) for key in keys])
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "little") & 0x7FFFFFFF
+
+
+def augment_batch_by_sample_seeds_(augseq, batch, seed):
+    """Augment each row of a batch with a seed derived from its sample key.
+
+    Each row is augmented on its own after reseeding `augseq` (and the
+    global RNG) via :func:`derive_sample_seed`. A row's result is therefore
+    independent of the other rows in its batch, which allows to split a
+    dataset into arbitrary batches and shards, e.g. across processes or
+    machines, while getting the same outputs as a single sequential run.
+
+    Parameters
+    ----------
+    augseq : imgaug.augmenters.meta.Augmenter
+        The augmentation sequence to apply. Its random state is changed.
+
+    batch : imgaug.augmentables.batches.Batch or imgaug.augmentables.batches.UnnormalizedBatch
+        The batch to augment. Its ``data`` attribute must be a list
+        containing one sample key per row. Each key is either a sample ID
+        or a tuple ``(sample_id, variant)``, see :func:`derive_sample_seed`.
+
+    seed : int
+        Base seed of the whole augmentation run.
+
+    Returns
+    -------
+    imgaug.augmentables.batches.Batch or imgaug.augmentables.batches.UnnormalizedBatch
+        Augmented batch.
+
+    """
+    batch_unnorm = None
+    batch_norm = batch
+    if isinstance(batch, UnnormalizedBatch):
+        batch_unnorm = batch
+        batch_norm = batch.to_normalized_batch()
+    batch_inaug = batch_norm.to_batch_in_augmentation()
+
+    sample_keys = batch_norm.data
+    nb_rows = batch_inaug.nb_rows
+    assert (isinstance(sample_keys, (list, tuple))
+            and len(sample_keys) == nb_rows), (
+                "Expected the batch's `data` to contain one sample key per "
+                "row, i.e. %d keys. Got type %s with value %s." % (
+                    nb_rows, type(sample_keys), str(sample_keys)))
+
+    for i, sample_key in enumerate(sample_keys):
+        if not isinstance(sample_key, tuple):
+            sample_key = (sample_key,)
+        _reseed_global_local(derive_sample_seed(seed, *sample_key), augseq)
+        rows = batch_inaug.subselect_rows_by_indices([i])
+        rows = augseq.augment_batch_(rows)
+        batch_inaug = batch_inaug.invert_subselect_rows_by_indices_([i], rows)
+
+    batch_norm = batch_norm.fill_from_batch_in_augmentation_(batch_inaug)
+    if batch_unnorm is not None:
+        return batch_unnorm.fill_from_augmented_normalized_batch_(batch_norm)
+    return batch_norm
+
+
+_THREAD_POOL = None
+_THREAD_POOL_LOCK = threading.Lock()
+
+# marks the threads of the shared pool, see map_threaded()
+_THREAD_POOL_WORKER = threading.local()
+
+# default number of threads that augmenters use to process the images of
+# a batch, see set_intra_batch_workers()
+_INTRA_BATCH_WORKERS = 1
+
+
+def get_thread_pool():
+    """Get the process-wide thread pool used for intra-batch parallelism.
+
+    The pool is created lazily on the first call and then shared by all
+    callers. It is meant for work that releases the GIL, e.g. most ``cv2``
+    functions, where threads avoid the pickling overhead of :class:`Pool`.
+    Child processes forked after the pool was created (e.g. the workers of
+    :class:`Pool` on Linux) create their own pool on their first call.
+
+    Returns
+    -------
+    concurrent.futures.ThreadPoolExecutor
+        The shared thread pool.
+
+    """
+    # pylint: disable=global-statement
+    global _THREAD_POOL
+    if _THREAD_POOL is None:
+        with _THREAD_POOL_LOCK:
+            if _THREAD_POOL is None:
+                from concurrent import futures
+                nb_workers = multiprocessing.cpu_count()
+                _THREAD_POOL = futures.ThreadPoolExecutor(
+                    max_workers=nb_workers,
+                    thread_name_prefix="imgaug",
+                    initializer=_mark_thread_pool_worker)
+    return _THREAD_POOL
+
+
+def _mark_thread_pool_worker():
+    _THREAD_POOL_WORKER.active = True
+
+
+def _reset_thread_pool_after_fork():
+    # A forked child process (e.g. a worker of Pool on Linux) inherits the
+    # parent's pool object, but none of its threads. Work submitted to it
+    # would never run, hence the child creates its own pool on demand.
+    # pylint: disable=global-statement
+    global _THREAD_POOL, _THREAD_POOL_LOCK
+    _THREAD_POOL = None
+    _THREAD_POOL_LOCK = threading.Lock()
+    _THREAD_POOL_WORKER.active = False
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_thread_pool_after_fork)
+
+
+def map_threaded(func, items, nb_workers=None):
+    """Apply a function to each item using the shared thread pool.
+
+    Parameters
+    ----------
+    func : callable
+        Function to apply. Receives a single item and returns a result.
+
+    items : iterable
+        Items to process.
+
+    nb_workers : None or int, optional
+        Maximum number of items processed concurrently. ``None`` uses all
+        threads of :func:`get_thread_pool`. A value of ``1`` processes all
+        items sequentially in the calling thread. Calls from within a
+        thread of the pool are always processed sequentially, as waiting
+        for other threads of the same pool could otherwise deadlock.
+
+    Returns
+    -------
+    list
+        Results of `func`, in the same order as `items`.
+
+    """
+    items = list(items)
+    is_nested = getattr(_THREAD_POOL_WORKER, "active", False)
+    if (len(items) <= 1 or is_nested
+            or (nb_workers is not None and nb_workers <= 1)):
+        return [func(item) for item in items]
+
+    pool = get_thread_pool()
+    if nb_workers is None or nb_workers >= len(items):
+        return list(pool.map(func, items))
+
+    # limit concurrency by letting each worker process a strided chunk
+    results = [None] * len(items)
+
+    def _process_chunk(offset):
+        for idx in range(offset, len(items), nb_workers):
+            results[idx] = func(items[idx])
+
+    list(pool.map(_process_chunk, range(nb_workers)))
+    return results
+
+
+def set_intra_batch_workers(nb_workers):
+    """Set how many threads augmenters use to process the images of a batch.
+
+    Some augmenters spend most of their time in per-image ``cv2`` or
+    ``skimage`` calls that release the GIL, e.g.
+    :class:`~imgaug.augmenters.segmentation.Superpixels`,
+    :class:`~imgaug.augmenters.blur.BilateralBlur`,
+    :class:`~imgaug.augmenters.blur.MeanShiftBlur`,
+    :class:`~imgaug.augmenters.artistic.Cartoon`,
+    :class:`~imgaug.augmenters.edges.Canny`,
+    :class:`~imgaug.augmenters.contrast.CLAHE` and
+    :class:`~imgaug.augmenters.contrast.AllChannelsCLAHE`. These can
+    distribute the images of a batch over the threads of
+    :func:`get_thread_pool`. All random samples are drawn before the images
+    are distributed, so the results do not depend on the number of threads.
+
+    This is the process-wide default. It can be overwritten per augmenter
+    via :func:`~imgaug.augmenters.meta.Augmenter.set_intra_batch_workers`.
+
+    Parameters
+    ----------
+    nb_workers : int or str
+        Maximum number of images processed concurrently by one augmenter.
+        ``1`` (the default) processes the images sequentially. ``"auto"``
+        uses all threads of :func:`get_thread_pool`.
+
+    """
+    # pylint: disable=global-statement
+    global _INTRA_BATCH_WORKERS
+    _INTRA_BATCH_WORKERS = _normalize_intra_batch_workers(nb_workers)
+
+
+def get_intra_batch_workers():
+    """Get the default number of threads used to process a batch's images.
+
+    Returns
+    -------
+    int or str
+        See :func:`set_intra_batch_workers`.
+
+    """
+    return _INTRA_BATCH_WORKERS
+
+
+def _normalize_intra_batch_workers(nb_workers):
+    if nb_workers == "auto":
+        return nb_workers
+    assert ia.is_single_integer(nb_workers) and nb_workers >= 1, (
+        "Expected nb_workers to be \"auto\" or an integer >= 1, got %s." % (
+            nb_workers,))
+    return int(nb_workers)
+
+
 class BatchLoader(object):
     """**Deprecated**. Load batches in the background.
 
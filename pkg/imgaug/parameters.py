@@ -14,9 +14,6 @@ import tempfile
 import numpy as np
 import six
 import six.moves as sm
-import scipy
-import scipy.stats
-import imageio
 
 from . import imgaug as ia
 from . import dtypes as iadt
@@ -617,6 +614,9 @@ class StochasticParameter(object):
             ax.set_title("\n".join(title_fragments))
         fig.tight_layout(pad=0)
 
+        # deferred import, imageio is slow to import and only needed here
+        import imageio
+
         with tempfile.NamedTemporaryFile(suffix=".png") as f:
             # we don't add bbox_inches='tight' here so that
             # draw_distributions_grid has an easier time combining many plots
@@ -1162,6 +1162,9 @@ class TruncatedNormal(StochasticParameter):
             return np.full(size, fill_value=loc, dtype=np.float32)
         a = (low - loc) / scale
         b = (high - loc) / scale
+        # deferred import, scipy.stats takes about a second to import
+        import scipy.stats
+
         tnorm = scipy.stats.truncnorm(a=a, b=b, loc=loc, scale=scale)
 
         # Using a seed here works with both np.random interfaces.
@@ -1599,22 +1602,10 @@ class FromLowerResolution(StochasticParameter):
                             "of shape (H, W, C) or (N, H, W, C), "
                             "requested was %s." % (str(size),))
 
-        if self.size_method == "percent":
-            hw_percents = self.size_percent.draw_samples(
-                (n, 2), random_state=random_state)
-            hw_pxs = (hw_percents * np.array([h, w])).astype(np.int32)
-        else:
-            hw_pxs = self.size_px.draw_samples(
-                (n, 2), random_state=random_state)
-
-        methods = self.method.draw_samples((n,), random_state=random_state)
         result = None
-        for i, (hw_px, method) in enumerate(zip(hw_pxs, methods)):
-            h_small = max(hw_px[0], self.min_size)
-            w_small = max(hw_px[1], self.min_size)
-            samples = self.other_param.draw_samples(
-                (1, h_small, w_small, c), random_state=random_state)
-
+        gen = enumerate(self._draw_low_resolution_samples(
+            (n, h, w, c), random_state))
+        for i, (samples, method) in gen:
             # This (1) makes sure that samples are of dtypes supported by
             # imresize_many_images, and (2) forces samples to be float-kind
             # if the requested interpolation is something else than nearest
@@ -1652,6 +1643,58 @@ class FromLowerResolution(StochasticParameter):
             return result[0]
         return result
 
+    def draw_low_resolution_samples(self, size, random_state=None):
+        """Draw the samples of the low resolution planes without upscaling.
+
+        This draws exactly the same samples as :func:`draw_samples` for
+        the same `random_state` and leaves `random_state` in the same state
+        afterwards, but skips the upscaling to ``HxW``. It allows callers
+        that only need e.g. a coarse binary mask to apply it without
+        materializing the full resolution array.
+
+        Parameters
+        ----------
+        size : tuple of int
+            Requested size ``(N, H, W, C)`` of the upscaled samples.
+
+        random_state : None or int or imgaug.random.RNG or numpy.random.Generator or numpy.random.BitGenerator or numpy.random.SeedSequence or numpy.random.RandomState, optional
+            A seed or random number generator to use during the sampling
+            process. If ``None``, the global RNG will be used.
+
+        Returns
+        -------
+        list of tuple of ndarray and (str or int)
+            One ``(samples, method)`` tuple per ``N``. ``samples`` has shape
+            ``(1, H', W', C)`` with ``H'`` and ``W'`` being the size of the
+            low resolution plane. ``method`` is the interpolation method
+            that would be used to upscale the samples.
+
+        """
+        random_state = iarandom.RNG(random_state)
+        samples = self._draw_low_resolution_samples(size, random_state)
+        random_state.advance_()
+        return samples
+
+    def _draw_low_resolution_samples(self, size, random_state):
+        n, h, w, c = size
+        if self.size_method == "percent":
+            hw_percents = self.size_percent.draw_samples(
+                (n, 2), random_state=random_state)
+            hw_pxs = (hw_percents * np.array([h, w])).astype(np.int32)
+        else:
+            hw_pxs = self.size_px.draw_samples(
+                (n, 2), random_state=random_state)
+
+        methods = self.method.draw_samples((n,), random_state=random_state)
+        result = []
+        for hw_px, method in zip(hw_pxs, methods):
+            h_small = max(hw_px[0], self.min_size)
+            w_small = max(hw_px[1], self.min_size)
+            samples = self.other_param.draw_samples(
+                (1, h_small, w_small, c), random_state=random_state)
+            result.append((samples, method))
+        return result
+
     def __repr__(self):
         return self.__str__()
 
@@ -1770,25 +1813,7 @@ class Discretize(StochasticParameter):
 
     def _draw_samples(self, size, random_state):
         samples = self.other_param.draw_samples(size, random_state=random_state)
-        assert samples.dtype.kind in ["u", "i", "b", "f"], (
-            "Expected to get uint, int, bool or float dtype as samples in "
-            "Discretize(), but got dtype '%s' (kind '%s') instead." % (
-                samples.dtype.name, samples.dtype.kind))
-
-        if samples.dtype.kind in ["u", "i", "b"]:
-            return samples
-
-        # floats seem to reliably cover ints that have half the number of
-        # bits -- probably not the case for float128 though as that is
-        # really float96
-        bitsize = 8 * samples.dtype.itemsize // 2
-        # in case some weird system knows something like float8 we set a
-        # lower bound here -- shouldn't happen though
-        bitsize = max(bitsize, 8)
-        dtype = np.dtype("int%d" % (bitsize,))
-        if self.round:
-            samples = np.round(samples)
-        return samples.astype(dtype)
+        return _discretize_samples(samples, self.round)
 
     def __repr__(self):
         return self.__str__()
@@ -1798,6 +1823,28 @@ class Discretize(StochasticParameter):
         return "Discretize(%s, round=%s)" % (opstr, str(self.round))
 
 
+def _discretize_samples(samples, round_):
+    assert samples.dtype.kind in ["u", "i", "b", "f"], (
+        "Expected to get uint, int, bool or float dtype as samples in "
+        "Discretize(), but got dtype '%s' (kind '%s') instead." % (
+            samples.dtype.name, samples.dtype.kind))
+
+    if samples.dtype.kind in ["u", "i", "b"]:
+        return samples
+
+    # floats seem to reliably cover ints that have half the number of
+    # bits -- probably not the case for float128 though as that is
+    # really float96
+    bitsize = 8 * samples.dtype.itemsize // 2
+    # in case some weird system knows something like float8 we set a
+    # lower bound here -- shouldn't happen though
+    bitsize = max(bitsize, 8)
+    dtype = np.dtype("int%d" % (bitsize,))
+    if round_:
+        samples = np.round(samples)
+    return samples.astype(dtype)
+
+
 class Multiply(StochasticParameter):
     """Multiply the samples of another stochastic parameter.
 
@@ -3197,6 +3244,466 @@ class FrequencyNoise(StochasticParameter):
             str(self.upscale_method))
 
 
+def compile_parameters(params):
+    """Compile stochastic parameters to a flat sampling plan.
+
+    See :class:`SamplingPlan` for details.
+
+    Parameters
+    ----------
+    params : iterable of imgaug.parameters.StochasticParameter
+        The parameters to compile.
+
+    Returns
+    -------
+    imgaug.parameters.SamplingPlan
+        Sampling plan for `params`.
+
+    Examples
+    --------
+    >>> import imgaug.parameters as iap
+    >>> plan = iap.compile_parameters([
+    >>>     iap.Clip(iap.Multiply(iap.Uniform(0, 1.0), 2), 0, 1.5),
+    >>>     iap.Deterministic(1)])
+    >>> samples_a, samples_b = plan.draw_samples([(16,), (16, 3)])
+
+    Draw ``16`` samples from the first and ``16x3`` samples from the second
+    parameter in one call.
+
+    """
+    return SamplingPlan(params)
+
+
+def get_sampling_plan(owner, key, params):
+    """Get a cached sampling plan for parameters of an object.
+
+    The plan is stored in `owner` and recompiled if any of the parameters
+    was replaced by another parameter object since the last call. In-place
+    changes of the parameters' attributes are not detected.
+
+    Parameters
+    ----------
+    owner : object
+        The object that owns `params`, usually an augmenter.
+
+    key : str
+        Name of the cached plan. Allows to cache multiple plans per `owner`.
+
+    params : iterable of imgaug.parameters.StochasticParameter
+        The parameters to compile.
+
+    Returns
+    -------
+    imgaug.parameters.SamplingPlan
+        Sampling plan for `params`.
+
+    """
+    plans = owner.__dict__.get("_sampling_plans")
+    if plans is None:
+        plans = {}
+        owner._sampling_plans = plans
+    plan = plans.get(key)
+    if plan is None or not plan.matches(params):
+        plan = SamplingPlan(params)
+        plans[key] = plan
+    return plan
+
+
+class SamplingPlan(object):
+    """Flat vectorized sampler for a fixed list of stochastic parameters.
+
+    Calling :func:`StochasticParameter.draw_samples` on a tree of nested
+    parameters, e.g. ``Clip(Multiply(Uniform(0, 1), 2), 0, 1.5)``, leads to
+    one python-level call chain per node, each one wrapping the random
+    number generator and advancing it afterwards. For small images this
+    overhead can dominate the runtime of an augmenter.
+
+    This class compiles the parameter trees once to closures, folds
+    :class:`Deterministic` parameters to constants and fuses the arithmetic
+    wrappers (:class:`Clip`, :class:`Discretize`, :class:`Add`,
+    :class:`Subtract`, :class:`Multiply`, :class:`Divide`) into in-place
+    operations where the output dtype allows it. All samples of all
+    parameters are then drawn in one pass with a single batched advance of
+    the random number generator.
+
+    The samples and the state of the random number generator afterwards are
+    identical to calling ``param.draw_samples(size, random_state)`` for
+    each parameter in sequence with the same generator. Parameters without
+    a compiled equivalent are sampled via their own ``_draw_samples()``.
+
+    Parameters
+    ----------
+    params : iterable of imgaug.parameters.StochasticParameter
+        The parameters to compile.
+
+    """
+
+    def __init__(self, params):
+        self.params = list(params)
+        for i, param in enumerate(self.params):
+            _assert_arg_is_stoch_param("params[%d]" % (i,), param)
+        self._nodes = None
+        self._compile()
+
+    def _compile(self):
+        compiler = _SamplingPlanCompiler()
+        self._nodes = [compiler.compile_samples(param)[0]
+                       for param in self.params]
+
+    def __getstate__(self):
+        # the compiled closures cannot be pickled, recompile instead
+        return {"params": self.params}
+
+    def __setstate__(self, state):
+        self.params = state["params"]
+        self._compile()
+
+    def matches(self, params):
+        """Estimate whether this plan was compiled for `params`.
+
+        Parameters
+        ----------
+        params : iterable of imgaug.parameters.StochasticParameter
+            Parameters to compare with the compiled ones.
+
+        Returns
+        -------
+        bool
+            ``True`` if `params` contains the same parameter objects in the
+            same order as this plan, otherwise ``False``.
+
+        """
+        params = list(params)
+        return (
+            len(params) == len(self.params)
+            and all([param is param_compiled
+                     for param, param_compiled
+                     in zip(params, self.params)]))
+
+    def draw_samples(self, sizes, random_state=None):
+        """Draw samples from all compiled parameters.
+
+        Parameters
+        ----------
+        sizes : iterable of (tuple of int or int)
+            Number of samples by dimension, one entry per parameter.
+
+        random_state : None or int or imgaug.random.RNG or numpy.random.Generator or numpy.random.BitGenerator or numpy.random.SeedSequence or numpy.random.RandomState, optional
+            A seed or random number generator to use during the sampling
+            process. If ``None``, the global RNG will be used.
+            See also :func:`~imgaug.augmenters.meta.Augmenter.__init__`
+            for a similar parameter with more details.
+
+        Returns
+        -------
+        list of ndarray
+            Sampled values, one array per parameter.
+
+        """
+        sizes = list(sizes)
+        assert len(sizes) == len(self.params), (
+            "Expected one size per parameter, got %d sizes for %d "
+            "parameters." % (len(sizes), len(self.params)))
+        sizes = [size if not ia.is_single_integer(size) else tuple([size])
+                 for size in sizes]
+
+        random_state = iarandom.RNG(random_state)
+        if not random_state._is_new_rng_style:
+            # the delayed advancing is only implemented for numpy 1.17+
+            # generators
+            return [param.draw_samples(size, random_state=random_state)
+                    for param, size in zip(self.params, sizes)]
+
+        context = _SamplingContext(random_state)
+        samples = [node(context, size)
+                   for node, size in zip(self._nodes, sizes)]
+        context.flush()
+        return samples
+
+
+class _SamplingContext(object):
+    # Tracks the advances of the RNG that were skipped so far.
+    # Each call of StochasticParameter.draw_samples() ends with
+    # RNG.advance_(), which resets the generator's uint32 cache and samples
+    # one float. These calls are accumulated and executed at once right
+    # before the generator is used again, which leads to the same state.
+    __slots__ = ["rng", "generator", "nb_pending", "dirty"]
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.generator = rng.generator
+        self.nb_pending = 0
+        # whether the generator's uint32 cache might be set
+        self.dirty = True
+
+    def flush(self):
+        nb_pending = self.nb_pending
+        if nb_pending > 0:
+            if self.dirty:
+                iarandom.reset_generator_cache_(self.generator)
+                self.dirty = False
+            if nb_pending == 1:
+                self.generator.random()
+            else:
+                self.generator.random(nb_pending)
+            self.nb_pending = 0
+
+
+class _SamplingPlanCompiler(object):
+    # Compiles parameters to functions `node(context, size) -> samples` and
+    # `scalar(context) -> sample`, which are equivalent to
+    # `param.draw_samples(size, random_state)` and
+    # `param.draw_sample(random_state)`.
+    # Each node is returned together with a flag denoting whether its
+    # samples are always a newly allocated array and may hence be changed
+    # in-place.
+
+    def __init__(self):
+        self._nodes = {}
+
+    def compile_samples(self, param):
+        key = id(param)
+        if key not in self._nodes:
+            self._nodes[key] = self._compile_samples(param)
+        return self._nodes[key]
+
+    def _compile_samples(self, param):
+        param_type = type(param)
+        compile_funcs = {
+            Deterministic: self._compile_deterministic,
+            Uniform: self._compile_uniform,
+            Normal: self._compile_normal,
+            DiscreteUniform: self._compile_discrete_uniform,
+            Binomial: self._compile_binomial,
+            Clip: self._compile_clip,
+            Discretize: self._compile_discretize,
+            Add: self._compile_arithmetic,
+            Subtract: self._compile_arithmetic,
+            Multiply: self._compile_arithmetic,
+            Divide: self._compile_divide
+        }
+        # exact type matches only, subclasses might change the sampling
+        compile_func = compile_funcs.get(param_type)
+        if compile_func is None:
+            return self._compile_generic(param)
+        return compile_func(param)
+
+    def compile_scalar(self, param):
+        # pylint: disable=unidiomatic-typecheck
+        if type(param) is Deterministic:
+            value = self._compile_deterministic(param)[0](None, (1,))[0]
+
+            def _scalar_deterministic(context):
+                context.nb_pending += 1
+                return value
+            return _scalar_deterministic
+
+        node = self.compile_samples(param)[0]
+
+        def _scalar(context):
+            return node(context, (1,))[0]
+        return _scalar
+
+    @classmethod
+    def _compile_generic(cls, param):
+        if type(param).draw_samples is not StochasticParameter.draw_samples:
+            def _node_draw_samples(context, size):
+                context.flush()
+                samples = param.draw_samples(size,
+                                             random_state=context.rng)
+                context.dirty = True
+                return samples
+            return _node_draw_samples, False
+
+        draw_samples_func = param._draw_samples
+
+        def _node_generic(context, size):
+            context.flush()
+            samples = draw_samples_func(size, context.rng)
+            context.dirty = True
+            context.nb_pending += 1
+            return samples
+        return _node_generic, False
+
+    @classmethod
+    def _compile_deterministic(cls, param):
+        # constant folding: the dtype is derived only once
+        value = param.value
+        dtype = None
+        if ia.is_single_integer(value):
+            dtype = np.int32
+        elif ia.is_single_float(value):
+            dtype = np.float32
+
+        def _node_deterministic(context, size):
+            if context is not None:
+                context.nb_pending += 1
+            return np.full(size, value, dtype=dtype)
+        return _node_deterministic, True
+
+    def _compile_uniform(self, param):
+        # pylint: disable=invalid-name
+        scalar_a = self.compile_scalar(param.a)
+        scalar_b = self.compile_scalar(param.b)
+
+        def _node_uniform(context, size):
+            a = scalar_a(context)
+            b = scalar_b(context)
+            if a > b:
+                a, b = b, a
+            elif a == b:
+                context.nb_pending += 1
+                return np.full(size, a, dtype=np.float32)
+            context.flush()
+            samples = context.generator.uniform(
+                low=a, high=b, size=size).astype(np.float32)
+            context.nb_pending += 1
+            return samples
+        return _node_uniform, True
+
+    def _compile_normal(self, param):
+        scalar_loc = self.compile_scalar(param.loc)
+        scalar_scale = self.compile_scalar(param.scale)
+
+        def _node_normal(context, size):
+            loc = scalar_loc(context)
+            scale = scalar_scale(context)
+            assert scale >= 0, "Expected scale to be >=0, got %.4f." % (
+                scale,)
+            if scale == 0:
+                context.nb_pending += 1
+                return np.full(size, loc, dtype=np.float32)
+            context.flush()
+            samples = context.generator.normal(
+                loc=loc, scale=scale, size=size).astype(np.float32)
+            context.nb_pending += 1
+            return samples
+        return _node_normal, True
+
+    def _compile_discrete_uniform(self, param):
+        # pylint: disable=invalid-name
+        scalar_a = self.compile_scalar(param.a)
+        scalar_b = self.compile_scalar(param.b)
+
+        def _node_discrete_uniform(context, size):
+            a = scalar_a(context)
+            b = scalar_b(context)
+            if a > b:
+                a, b = b, a
+            elif a == b:
+                context.nb_pending += 1
+                return np.full(size, a, dtype=np.int32)
+            context.flush()
+            samples = context.rng.integers(a, b + 1, size, dtype=np.int32)
+            context.dirty = True
+            context.nb_pending += 1
+            return samples
+        return _node_discrete_uniform, True
+
+    def _compile_binomial(self, param):
+        scalar_p = self.compile_scalar(param.p)
+
+        def _node_binomial(context, size):
+            p = scalar_p(context)
+            assert 0 <= p <= 1.0, (
+                "Expected probability p to be in the interval [0.0, 1.0], "
+                "got %.4f." % (p,))
+            context.flush()
+            samples = context.rng.binomial(1, p, size).astype(np.int32)
+            context.dirty = True
+            context.nb_pending += 1
+            return samples
+        return _node_binomial, True
+
+    def _compile_clip(self, param):
+        node, fresh = self.compile_samples(param.other_param)
+        minval = param.minval
+        maxval = param.maxval
+        if minval is None and maxval is None:
+            def _node_clip_noop(context, size):
+                samples = node(context, size)
+                context.nb_pending += 1
+                return samples
+            return _node_clip_noop, fresh
+
+        def _node_clip(context, size):
+            samples = node(context, size)
+            context.nb_pending += 1
+            return np.clip(samples, minval, maxval, out=samples)
+        return _node_clip, fresh
+
+    def _compile_discretize(self, param):
+        node = self.compile_samples(param.other_param)[0]
+        round_ = param.round
+
+        def _node_discretize(context, size):
+            samples = _discretize_samples(node(context, size), round_)
+            context.nb_pending += 1
+            return samples
+        return _node_discretize, False
+
+    def _compile_arithmetic(self, param):
+        ufunc = {
+            Add: np.add,
+            Subtract: np.subtract,
+            Multiply: np.multiply
+        }[type(param)]
+        node, fresh = self.compile_samples(param.other_param)
+        elementwise = (param.elementwise
+                       and not isinstance(param.val, Deterministic))
+        if elementwise:
+            node_val = self.compile_samples(param.val)[0]
+        else:
+            node_val = self.compile_scalar(param.val)
+
+        def _node_arithmetic(context, size):
+            samples = node(context, size)
+            if elementwise:
+                val = node_val(context, size)
+            else:
+                val = node_val(context)
+            context.nb_pending += 1
+            if (fresh
+                    and type(samples) is np.ndarray
+                    and np.result_type(samples, val) == samples.dtype):
+                return ufunc(samples, val, out=samples)
+            return ufunc(samples, val)
+        return _node_arithmetic, True
+
+    def _compile_divide(self, param):
+        node, fresh = self.compile_samples(param.other_param)
+        elementwise = (param.elementwise
+                       and not isinstance(param.val, Deterministic))
+        if elementwise:
+            node_val = self.compile_samples(param.val)[0]
+        else:
+            node_val = self.compile_scalar(param.val)
+
+        def _node_divide(context, size):
+            samples = node(context, size)
+            if elementwise:
+                val = node_val(context, size)
+                # prevent division by zero
+                val[val == 0] = 1
+                val = force_np_float_dtype(val)
+            else:
+                val = node_val(context)
+                # prevent division by zero
+                if val == 0:
+                    val = 1
+                val = float(val)
+            context.nb_pending += 1
+
+            samples_f = force_np_float_dtype(samples)
+            fresh_f = fresh or samples_f is not samples
+            if (fresh_f
+                    and type(samples_f) is np.ndarray
+                    and np.result_type(samples_f, val) == samples_f.dtype):
+                return np.divide(samples_f, val, out=samples_f)
+            return np.divide(samples_f, val)
+        return _node_divide, True
+
+
 def _assert_arg_is_stoch_param(arg_name, arg_value):
     assert isinstance(arg_value, StochasticParameter), (
         "Expected '%s' to be a StochasticParameter, "
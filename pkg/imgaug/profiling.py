@@ -0,0 +1,356 @@
+"""Classes and functions to measure the runtime of augmenters.
+
+Profiling is opt-in. While no :class:`AugmenterProfiler` is active, the only
+overhead added to :func:`~imgaug.augmenters.meta.Augmenter.augment_batch_`
+is a single check of a module-level variable.
+
+Example::
+
+    import imgaug.augmenters as iaa
+    from imgaug.profiling import AugmenterProfiler
+
+    seq = iaa.Sequential([iaa.Fliplr(0.5), iaa.GaussianBlur((0, 1.0))])
+    with AugmenterProfiler() as profiler:
+        images_aug = seq(images=images)
+    print(profiler.format_table())
+
+"""
+from __future__ import print_function, division, absolute_import
+
+import csv
+import io
+import json
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+
+# The currently active profiler. Checked by Augmenter.augment_batch_().
+_ACTIVE_PROFILER = None
+
+# Maximum number of distinct dtype/shape descriptions stored per augmenter.
+_MAX_INPUT_DESCRIPTIONS = 8
+
+# Columns of the report, in the order used for CSV files and tables.
+_REPORT_COLUMNS = [
+    "path", "name", "class", "depth", "calls", "nb_images",
+    "total_seconds", "self_seconds", "images_per_second",
+    "bytes_allocated", "peak_bytes", "inputs"]
+
+
+def get_active_profiler():
+    """Get the currently active profiler.
+
+    Returns
+    -------
+    None or AugmenterProfiler
+        The active profiler or ``None`` if profiling is disabled.
+
+    """
+    return _ACTIVE_PROFILER
+
+
+class _AugmenterStats(object):
+    def __init__(self, path, name, class_name, depth):
+        self.path = path
+        self.name = name
+        self.class_name = class_name
+        self.depth = depth
+        self.calls = 0
+        self.nb_images = 0
+        self.total_seconds = 0.0
+        self.self_seconds = 0.0
+        self.bytes_allocated = 0
+        self.peak_bytes = 0
+        self.inputs = []
+
+    def to_dict(self):
+        ips = (self.nb_images / self.total_seconds
+               if self.total_seconds > 0 else 0.0)
+        return {
+            "path": self.path,
+            "name": self.name,
+            "class": self.class_name,
+            "depth": self.depth,
+            "calls": self.calls,
+            "nb_images": self.nb_images,
+            "total_seconds": self.total_seconds,
+            "self_seconds": self.self_seconds,
+            "images_per_second": ips,
+            "bytes_allocated": self.bytes_allocated,
+            "peak_bytes": self.peak_bytes,
+            "inputs": list(self.inputs)
+        }
+
+
+class _Frame(object):
+    # pylint: disable=too-few-public-methods
+    def __init__(self, stats, time_start, memory_start):
+        self.stats = stats
+        self.time_start = time_start
+        self.memory_start = memory_start
+        self.children_seconds = 0.0
+        self.peak = 0
+
+
+class AugmenterProfiler(object):
+    """Record runtime statistics of all augmenters called while active.
+
+    The profiler measures every call of
+    :func:`~imgaug.augmenters.meta.Augmenter.augment_batch_`, which includes
+    the children of meta augmenters such as
+    :class:`~imgaug.augmenters.meta.Sequential`,
+    :class:`~imgaug.augmenters.meta.SomeOf`,
+    :class:`~imgaug.augmenters.meta.Sometimes` or the ``BlendAlpha*``
+    augmenters. Statistics are aggregated per augmenter path, i.e. per
+    augmenter name prefixed by the names of its parents.
+
+    Only one profiler can be active at a time. Calls from multiple threads
+    are supported, except while `trace_memory` is set.
+
+    Parameters
+    ----------
+    trace_memory : bool, optional
+        Whether to record the bytes allocated per augmenter via
+        ``tracemalloc``. This slows down augmentation noticeably.
+        ``tracemalloc`` only tracks the memory of the whole process, hence
+        augmenters may then only be called from one thread at a time.
+        Calling an augmenter while another thread is inside a profiled
+        call fails with an assertion error. Allocations of intra-batch
+        worker threads (see
+        :func:`~imgaug.augmenters.meta.Augmenter.set_intra_batch_workers`)
+        are counted for the augmenter that started them.
+
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracemalloc = False
+        self._tracing_thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        """Activate this profiler."""
+        # pylint: disable=global-statement
+        global _ACTIVE_PROFILER
+        assert _ACTIVE_PROFILER is None or _ACTIVE_PROFILER is self, (
+            "Another AugmenterProfiler is already active.")
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        _ACTIVE_PROFILER = self
+
+    def stop(self):
+        """Deactivate this profiler. Recorded statistics are kept."""
+        # pylint: disable=global-statement
+        global _ACTIVE_PROFILER
+        if _ACTIVE_PROFILER is self:
+            _ACTIVE_PROFILER = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def reset(self):
+        """Remove all recorded statistics."""
+        with self._lock:
+            self._stats = {}
+
+    def _get_stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+    def enter(self, augmenter, parents, batch):
+        """Start measuring a call of an augmenter.
+
+        Called by :func:`~imgaug.augmenters.meta.Augmenter.augment_batch_`.
+
+        Parameters
+        ----------
+        augmenter : imgaug.augmenters.meta.Augmenter
+            The augmenter that is about to augment `batch`.
+
+        parents : None or list of imgaug.augmenters.meta.Augmenter
+            Parents of `augmenter`.
+
+        batch : imgaug.augmentables.batches._BatchInAugmentation
+            The batch that is about to be augmented.
+
+        """
+        stack = self._get_stack()
+        if self.trace_memory and not stack:
+            with self._lock:
+                assert self._tracing_thread is None, (
+                    "AugmenterProfiler with trace_memory=True cannot measure "
+                    "augmenters called from several threads at the same "
+                    "time, as tracemalloc tracks the whole process.")
+                self._tracing_thread = threading.current_thread()
+
+        parents = parents if parents is not None else []
+        path = "/".join([parent.name for parent in parents]
+                        + [augmenter.name])
+        with self._lock:
+            stats = self._stats.get(path)
+            if stats is None:
+                stats = _AugmenterStats(path, augmenter.name,
+                                        augmenter.__class__.__name__,
+                                        len(parents))
+                self._stats[path] = stats
+            stats.calls += 1
+            stats.nb_images += batch.nb_rows
+            description = _describe_images(batch.images)
+            if (description is not None
+                    and description not in stats.inputs
+                    and len(stats.inputs) < _MAX_INPUT_DESCRIPTIONS):
+                stats.inputs.append(description)
+
+        memory_start = 0
+        if self.trace_memory and tracemalloc.is_tracing():
+            memory_start, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+        stack.append(_Frame(stats, time.perf_counter(), memory_start))
+
+    def exit(self):
+        """Finish measuring the most recently entered augmenter call."""
+        time_end = time.perf_counter()
+        stack = self._get_stack()
+        frame = stack.pop()
+        duration = time_end - frame.time_start
+
+        bytes_allocated = 0
+        peak_bytes = 0
+        if self.trace_memory and tracemalloc.is_tracing():
+            memory_end, peak = tracemalloc.get_traced_memory()
+            frame.peak = max(frame.peak, peak)
+            bytes_allocated = max(memory_end - frame.memory_start, 0)
+            peak_bytes = max(frame.peak - frame.memory_start, 0)
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, frame.peak)
+
+        if stack:
+            stack[-1].children_seconds += duration
+
+        with self._lock:
+            if self.trace_memory and not stack:
+                self._tracing_thread = None
+            stats = frame.stats
+            stats.total_seconds += duration
+            stats.self_seconds += duration - frame.children_seconds
+            stats.bytes_allocated += bytes_allocated
+            stats.peak_bytes = max(stats.peak_bytes, peak_bytes)
+
+    def get_report(self):
+        """Get the recorded statistics.
+
+        Returns
+        -------
+        list of dict
+            One dictionary per augmenter path, in the order in which the
+            augmenters were first called. Each dictionary contains the keys
+            ``path``, ``name``, ``class``, ``depth``, ``calls``,
+            ``nb_images``, ``total_seconds`` (including children),
+            ``self_seconds`` (excluding children), ``images_per_second``,
+            ``bytes_allocated`` and ``peak_bytes`` (both ``0`` unless
+            `trace_memory` was set) and ``inputs`` (dtype and shape
+            descriptions of the input images).
+
+        """
+        with self._lock:
+            return [stats.to_dict() for stats in self._stats.values()]
+
+    def to_json(self, path=None):
+        """Serialize the report to JSON.
+
+        Parameters
+        ----------
+        path : None or str, optional
+            If set, the JSON string is also written to this file.
+
+        Returns
+        -------
+        str
+            The report as a JSON string.
+
+        """
+        content = json.dumps(self.get_report(), indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(content)
+        return content
+
+    def to_csv(self, path=None):
+        """Serialize the report to CSV.
+
+        Parameters
+        ----------
+        path : None or str, optional
+            If set, the CSV string is also written to this file.
+
+        Returns
+        -------
+        str
+            The report as a CSV string. The column ``inputs`` is joined
+            via ``;``.
+
+        """
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=_REPORT_COLUMNS)
+        writer.writeheader()
+        for row in self.get_report():
+            row = dict(row)
+            row["inputs"] = ";".join(row["inputs"])
+            writer.writerow(row)
+        content = buf.getvalue()
+        if path is not None:
+            with open(path, "w", newline="") as f:
+                f.write(content)
+        return content
+
+    def format_table(self):
+        """Format the report as a human-readable table.
+
+        Returns
+        -------
+        list of str
+            Lines of the table, indented by augmenter depth.
+
+        """
+        lines = ["%-40s %7s %8s %10s %10s %10s %10s" % (
+            "augmenter", "calls", "images", "total ms", "self ms",
+            "img/s", "alloc KB")]
+        for row in self.get_report():
+            name = "  " * row["depth"] + row["name"]
+            lines.append("%-40s %7d %8d %10.2f %10.2f %10.1f %10.1f" % (
+                name[:40], row["calls"], row["nb_images"],
+                row["total_seconds"] * 1000, row["self_seconds"] * 1000,
+                row["images_per_second"], row["bytes_allocated"] / 1024))
+        return lines
+
+
+def _describe_images(images):
+    if images is None:
+        return None
+    if isinstance(images, np.ndarray):
+        return "%s %s" % (images.dtype.name, tuple(images.shape[1:]))
+    if len(images) == 0:
+        return None
+    # lists of images can contain many different shapes, only describe
+    # the first one to keep this cheap
+    image = images[0]
+    return "%s %s" % (image.dtype.name, tuple(image.shape))
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+低延迟增强预览
+预览只需要显示几百像素大小的图像，因此不在原始分辨率上增强：
+- 用cv2.IMREAD_REDUCED_*解码缩小的图像（JPEG在解码时即按1/2、1/4、1/8缩小），
+  解码结果按文件缓存，重复点击预览不再读取文件；
+- 以像素为单位的参数（模糊核大小、弹性变换幅度等）按缩小比例换算，
+  使缩小图上的效果与原图上的效果看起来一致；
+- 增强管道在选择不变时复用；
+- 在工作线程中一次生成K个变体并拼成网格，界面线程不被阻塞。
+"""
+
+import collections
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from batch_manifest import canonical_config
+
+
+# 预览图像最长边的默认像素数
+DEFAULT_PREVIEW_SIZE = 300
+
+# 默认生成的变体数
+DEFAULT_NB_VARIANTS = 6
+
+# 缓存的预览解码结果数
+_PROXY_CACHE_SIZE = 16
+
+# 按缩小倍数从大到小排列的缩小解码标志
+_REDUCED_READ_FLAGS = [
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+]
+
+# 以像素为单位的增强器参数及其换算方式
+#   float: 按比例缩放
+#   int: 按比例缩放并取整，至少为1
+#   odd: 按比例缩放并取最近的奇数，至少为1（MedianBlur的核大小）
+#   kernel: 按比例缩放并取整，至少为3（MotionBlur的核大小）
+# 其余参数是相对值（比例、角度、强度等）或在增强器内部已按图像大小换算，无需调整。
+_PIXEL_PARAMS = {
+    "GaussianBlur": {"sigma": "float"},
+    "AverageBlur": {"k": "int"},
+    "MedianBlur": {"k": "odd"},
+    "MotionBlur": {"k": "kernel"},
+    "ElasticTransformation": {"alpha": "float", "sigma": "float"},
+}
+
+
+def _scale_value(value, scale, kind):
+    if isinstance(value, (list, tuple)):
+        return type(value)(_scale_value(item, scale, kind) for item in value)
+    if not isinstance(value, (int, float)):
+        return value
+    scaled = value * scale
+    if kind == "float":
+        return scaled
+    if kind == "odd":
+        return max(1, 2 * int(round((scaled - 1) / 2)) + 1)
+    if kind == "kernel":
+        return max(3, int(round(scaled)))
+    return max(1, int(round(scaled)))
+
+
+def scale_augmenter_params(aug_name, params, scale):
+    """
+    将增强器中以像素为单位的参数按预览图的缩小比例换算
+    Args:
+        aug_name: 增强器名称
+        params: 增强器参数字典
+        scale: 预览图边长与原图边长之比
+    Returns:
+        换算后的参数字典（不修改输入）
+    """
+    pixel_params = _PIXEL_PARAMS.get(aug_name)
+    if not pixel_params or scale == 1.0:
+        return params
+    return {name: (_scale_value(value, scale, pixel_params[name])
+                   if name in pixel_params else value)
+            for name, value in params.items()}
+
+
+def _read_image_size(path):
+    # 只读取文件头，不解码像素
+    try:
+        with Image.open(path) as image:
+            return image.size
+    except (OSError, ValueError):
+        return None
+
+
+def decode_proxy(path, max_size=DEFAULT_PREVIEW_SIZE):
+    """
+    解码缩小后的图像用于预览
+    Args:
+        path: 图像路径
+        max_size: 预览图最长边的像素数
+    Returns:
+        (BGR图像, 预览图边长与原图边长之比)；无法读取时返回(None, 1.0)
+    """
+    path = str(path)
+    size = _read_image_size(path)
+    flag = cv2.IMREAD_COLOR
+    if size is not None:
+        for factor, reduced_flag in _REDUCED_READ_FLAGS:
+            # 缩小后最长边仍不小于预览尺寸时使用该缩小倍数
+            if max(size) / factor >= max_size:
+                flag = reduced_flag
+                break
+
+    image = cv2.imread(path, flag)
+    if image is None and flag != cv2.IMREAD_COLOR:
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+    if image is None:
+        return None, 1.0
+
+    height, width = image.shape[:2]
+    if max(height, width) > max_size:
+        factor = max_size / max(height, width)
+        image = cv2.resize(image, (max(1, int(round(width * factor))),
+                                   max(1, int(round(height * factor)))),
+                           interpolation=cv2.INTER_AREA)
+
+    full_size = max(size) if size is not None else max(height, width)
+    return image, max(image.shape[:2]) / full_size
+
+
+def make_grid(images, nb_cols, gap=4, background=(240, 240, 240)):
+    """
+    将若干大小可能不同的BGR图像拼成网格
+    Args:
+        images: BGR图像列表
+        nb_cols: 列数
+        gap: 图像之间的间距
+        background: 背景颜色
+    Returns:
+        网格图像
+    """
+    nb_rows = -(-len(images) // nb_cols)
+    cell_height = max(image.shape[0] for image in images)
+    cell_width = max(image.shape[1] for image in images)
+    grid = np.empty((nb_rows * cell_height + (nb_rows - 1) * gap,
+                     nb_cols * cell_width + (nb_cols - 1) * gap, 3),
+                    dtype=np.uint8)
+    grid[...] = background
+    for i, image in enumerate(images):
+        row, col = divmod(i, nb_cols)
+        y = row * (cell_height + gap)
+        x = col * (cell_width + gap)
+        grid[y:y + image.shape[0], x:x + image.shape[1]] = image
+    return grid
+
+
+class PreviewResult:
+    """一次预览的结果"""
+
+    def __init__(self, path, original, variants, grid, scale, seconds):
+        self.path = path
+        # 预览分辨率的原图（BGR）
+        self.original = original
+        # 增强后的变体（BGR）
+        self.variants = variants
+        # 变体拼成的网格（BGR）
+        self.grid = grid
+        # 预览图边长与原图边长之比
+        self.scale = scale
+        # 渲染耗时（秒）
+        self.seconds = seconds
+
+
+class PreviewEngine:
+    """
+    预览引擎：缓存缩小解码结果和增强管道，在工作线程中渲染变体网格
+
+    用法:
+        engine = PreviewEngine(create_augmenters)
+        engine.render_async(path, selected_augmenters, seed, callback)
+        # callback(result, error)在工作线程中调用，界面需自行切换到界面线程
+    """
+
+    def __init__(self, create_augmenters, max_size=DEFAULT_PREVIEW_SIZE,
+                 nb_variants=DEFAULT_NB_VARIANTS, nb_cols=3):
+        """
+        Args:
+            create_augmenters: 由选中的增强器[(名称, {"params": 参数}), ...]创建增强器列表的函数，
+                在工作线程中调用，不能直接操作界面控件
+            max_size: 预览图最长边的像素数
+            nb_variants: 每次预览生成的变体数
+            nb_cols: 网格的列数
+        """
+        self.create_augmenters = create_augmenters
+        self.max_size = max_size
+        self.nb_variants = nb_variants
+        self.nb_cols = nb_cols
+        self._proxies = collections.OrderedDict()
+        self._pipeline_key = None
+        self._pipeline = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def load_proxy(self, path):
+        """获取缓存的预览图；文件被修改后重新解码"""
+        path = os.path.abspath(str(path))
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size, self.max_size)
+        cached = self._proxies.get(key)
+        if cached is not None:
+            self._proxies.move_to_end(key)
+            return cached
+
+        cached = decode_proxy(path, self.max_size)
+        if cached[0] is not None:
+            self._proxies[key] = cached
+            while len(self._proxies) > _PROXY_CACHE_SIZE:
+                self._proxies.popitem(last=False)
+        return cached
+
+    def get_pipeline(self, selected_augmenters, scale):
+        """
+        获取预览分辨率下的增强管道，选择（及换算后的参数）不变时复用
+        Args:
+            selected_augmenters: [(名称, {"params": 参数, ...}), ...]
+            scale: 预览图边长与原图边长之比
+        Returns:
+            增强管道；没有有效的增强器时返回None
+        """
+        scaled = [(aug_name, {"params": scale_augmenter_params(aug_name, config["params"], scale)})
+                  for aug_name, config in selected_augmenters]
+        key = canonical_config([[aug_name, config["params"]] for aug_name, config in scaled])
+        if key != self._pipeline_key:
+            import imgaug.augmenters as iaa
+            augmenters = self.create_augmenters(scaled)
+            self._pipeline = (iaa.Sequential(augmenters, random_order=True)
+                              if augmenters else None)
+            self._pipeline_key = key
+        return self._pipeline
+
+    def render(self, path, selected_augmenters, seed):
+        """
+        同步渲染一次预览
+        Args:
+            path: 图像路径
+            selected_augmenters: [(名称, {"params": 参数, ...}), ...]
+            seed: 随机种子，相同种子得到相同的变体
+        Returns:
+            PreviewResult
+        """
+        with self._lock:
+            time_start = time.perf_counter()
+            original, scale = self.load_proxy(path)
+            if original is None:
+                raise ValueError(f"无法读取图像 {os.path.basename(str(path))}")
+
+            pipeline = self.get_pipeline(selected_augmenters, scale)
+            if pipeline is None:
+                raise ValueError("没有有效的增强器")
+
+            pipeline.seed_(seed)
+            image_rgb = cv2.cvtColor(original, cv2.COLOR_BGR2RGB)
+            variants = [cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+                        for image in pipeline(images=[image_rgb] * self.nb_variants)]
+            grid = make_grid(variants, self.nb_cols)
+            return PreviewResult(path, original, variants, grid, scale,
+                                 time.perf_counter() - time_start)
+
+    def render_async(self, path, selected_augmenters, seed, callback):
+        """
+        在工作线程中渲染预览
+        只有最新一次请求的结果会传给callback，被新请求取代的结果直接丢弃。
+        Args:
+            path: 图像路径
+            selected_augmenters: [(名称, {"params": 参数, ...}), ...]
+            seed: 随机种子
+            callback: callback(result, error)，在工作线程中调用
+        """
+        self._generation += 1
+        generation = self._generation
+
+        def task():
+            if generation != self._generation:
+                return
+            result, error = None, None
+            try:
+                result = self.render(path, selected_augmenters, seed)
+            except Exception as e:
+                error = e
+            if generation == self._generation:
+                callback(result, error)
+
+        self._executor.submit(task)
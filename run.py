@@ -4,32 +4,40 @@
 批量图像增强工具启动脚本
 """
 
+import importlib.util
 import sys
 import os
 import tkinter as tk
 from tkinter import messagebox
 
+# 需要检查的模块: (模块名, 安装包名)
+REQUIRED_MODULES = [
+    ("numpy", "numpy"),
+    ("cv2", "opencv-python"),
+    ("PIL", "Pillow"),
+    ("PIL.ImageTk", "Pillow"),
+    ("skimage", "scikit-image"),
+    ("scipy", "scipy"),
+]
+
 def check_dependencies():
-    """检查依赖项"""
+    """
+    检查依赖项
+    只查找模块而不导入，scipy等库的导入较慢，由imgaug在用到时才导入
+    """
     missing_deps = []
     
-    try:
-        import numpy
-    except ImportError:
-        missing_deps.append("numpy")
-        
-    try:
-        import cv2
-    except ImportError:
-        missing_deps.append("opencv-python")
-        
-    try:
-        from PIL import Image, ImageTk
-    except ImportError:
-        missing_deps.append("Pillow")
+    for module_name, package_name in REQUIRED_MODULES:
+        try:
+            found = importlib.util.find_spec(module_name) is not None
+        except ImportError:
+            # 查找子模块时会导入其父包，父包缺失时抛出ImportError
+            found = False
+        if not found and package_name not in missing_deps:
+            missing_deps.append(package_name)
         
     try:
-        # 检查imgaug库
+        # 检查imgaug库（导入imgaug及imgaug.augmenters很快，增强器模块在使用时才导入）
         sys.path.append(os.path.join(os.path.dirname(__file__), 'pkg'))
         import imgaug
         import imgaug.augmenters as iaa
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分片容器输出
+将大量小图片写入若干个tar分片（WebDataset布局），而不是每个变体一个文件。
+每个样本由一个键和若干扩展名组成，tar中的成员名为"<键>.<扩展名>"，
+同一样本的成员连续存放，训练任务可以按顺序流式读取。
+每个分片关闭时写入一个索引文件，记录各成员数据在tar中的偏移，支持按键随机读取。
+"""
+
+import io
+import json
+import os
+import re
+import tarfile
+import threading
+import time
+
+
+# 默认单个分片的最大字节数
+DEFAULT_MAX_SHARD_BYTES = 256 * 1024 * 1024
+
+# 默认单个分片的最大样本数
+DEFAULT_MAX_SHARD_COUNT = 10000
+
+# 索引文件后缀，索引文件为"<分片文件>.idx.json"
+_INDEX_SUFFIX = ".idx.json"
+
+_TAR_BLOCK_SIZE = tarfile.BLOCKSIZE
+
+
+def make_key(*parts):
+    """
+    由若干部分生成样本键
+    WebDataset以文件名中第一个"."之前的部分作为键，因此键中的"."被替换为"_"。
+    Args:
+        parts: 键的各部分，以"/"连接
+    Returns:
+        样本键
+    """
+    return "/".join(str(part).replace(".", "_") for part in parts)
+
+
+def _get_shard_paths(folder, prefix, include_task_shards=False):
+    # 分任务处理时（num_shards>1）各任务的前缀为"<前缀>_<序号>-of-<总数>"，
+    # 排序时未分任务的分片在前，其余按任务序号和分片编号排序
+    task_pattern = r"(?:_(\d+)-of-\d+)?" if include_task_shards else r"()"
+    pattern = re.compile(re.escape(prefix) + task_pattern + r"-(\d+)\.tar$")
+    shards = []
+    if os.path.isdir(folder):
+        for filename in os.listdir(folder):
+            match = pattern.match(filename)
+            if match:
+                task = int(match.group(1)) if match.group(1) else -1
+                shards.append((task, int(match.group(2)),
+                               os.path.join(folder, filename)))
+    return [path for _, _, path in sorted(shards)]
+
+
+def _split_member_name(name):
+    dirname, basename = os.path.split(name)
+    stem, _, ext = basename.partition(".")
+    key = dirname + "/" + stem if dirname else stem
+    return key, ext
+
+
+class _OpenShard:
+    """一个正在写入的tar分片"""
+
+    def __init__(self, path):
+        self.path = path
+        self.fileobj = open(path, "wb")
+        self.tar = tarfile.open(fileobj=self.fileobj, mode="w",
+                                format=tarfile.PAX_FORMAT)
+        self.index = {}
+        self.nb_samples = 0
+
+    @property
+    def nb_bytes(self):
+        return self.fileobj.tell()
+
+    def add(self, key, data):
+        members = {}
+        for ext, content in data.items():
+            info = tarfile.TarInfo("%s.%s" % (key, ext))
+            info.size = len(content)
+            info.mtime = time.time()
+            self.tar.addfile(info, io.BytesIO(content))
+            padded_size = -(-info.size // _TAR_BLOCK_SIZE) * _TAR_BLOCK_SIZE
+            members[ext] = [self.fileobj.tell() - padded_size, info.size]
+        # 样本写完即落盘，任务中断后已写入的样本仍可通过重建索引读取
+        self.fileobj.flush()
+        self.index[key] = members
+        self.nb_samples += 1
+
+    def close(self):
+        self.tar.close()
+        self.fileobj.close()
+        with open(self.path + _INDEX_SUFFIX, "w", encoding="utf-8") as f:
+            json.dump({"samples": self.index}, f, ensure_ascii=False)
+
+
+class ShardWriter:
+    """
+    将样本写入tar分片（WebDataset布局）
+
+    可以被多个线程同时使用：每个线程写入自己的分片，编码和写入互不阻塞，
+    只有分配分片编号时需要加锁。分片编号从文件夹中已有分片之后开始，
+    因此继续中断的任务时不会覆盖已有分片。
+
+    用法:
+        with ShardWriter(output_dir) as writer:
+            ok, buf = cv2.imencode(".png", image)
+            writer.write(make_key(stem, "aug_01"), {"png": buf.tobytes()})
+    """
+
+    def __init__(self, output_dir, prefix="shard",
+                 max_shard_bytes=DEFAULT_MAX_SHARD_BYTES,
+                 max_shard_count=DEFAULT_MAX_SHARD_COUNT):
+        """
+        Args:
+            output_dir: 分片保存的文件夹
+            prefix: 分片文件名前缀，分片命名为"<前缀>-<编号>.tar"
+            max_shard_bytes: 单个分片的最大字节数，超过后开始新的分片
+            max_shard_count: 单个分片的最大样本数，超过后开始新的分片
+        """
+        assert max_shard_bytes > 0 and max_shard_count > 0, (
+            "分片大小必须大于0")
+        self.output_dir = os.path.abspath(str(output_dir))
+        self.prefix = prefix
+        self.max_shard_bytes = max_shard_bytes
+        self.max_shard_count = max_shard_count
+        self.shard_paths = []
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        existing = _get_shard_paths(self.output_dir, prefix)
+        self._next_number = (
+            int(re.search(r"-(\d+)\.tar$", existing[-1]).group(1)) + 1
+            if existing else 0)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._open_shards = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _new_shard(self):
+        with self._lock:
+            number = self._next_number
+            self._next_number += 1
+            path = os.path.join(self.output_dir,
+                                "%s-%06d.tar" % (self.prefix, number))
+            shard = _OpenShard(path)
+            self._open_shards.append(shard)
+            self.shard_paths.append(path)
+        return shard
+
+    def _close_shard(self, shard):
+        with self._lock:
+            self._open_shards.remove(shard)
+        shard.close()
+
+    def write(self, key, data):
+        """
+        写入一个样本
+        Args:
+            key: 样本键，不能包含"."（可用make_key()生成）
+            data: 扩展名 -> 字节数据 的字典，例如{"png": b"..."}
+        Returns:
+            样本所在分片文件的路径
+        """
+        if "." in os.path.basename(key):
+            raise ValueError("样本键中不能包含'.'，得到: %s" % (key,))
+
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._new_shard()
+            self._local.shard = shard
+        shard.add(key, data)
+
+        if (shard.nb_bytes >= self.max_shard_bytes
+                or shard.nb_samples >= self.max_shard_count):
+            self._close_shard(shard)
+            self._local.shard = None
+        return shard.path
+
+    def close(self):
+        """关闭所有线程打开的分片并写入索引"""
+        with self._lock:
+            shards = list(self._open_shards)
+            self._open_shards = []
+        for shard in shards:
+            shard.close()
+        self._local = threading.local()
+
+
+class ShardReader:
+    """
+    读取ShardWriter写入的分片
+
+    支持按写入顺序流式遍历全部样本，以及按键随机读取。
+    同一个键出现在多个分片中时（例如重新处理过的文件），以编号较大的分片为准。
+    image_process_id分任务处理（num_shards>1）时各任务写入的"<前缀>_<序号>-of-<总数>"分片
+    也会被一并读取，因此所有任务写入同一文件夹后可以用一个ShardReader读取全部样本。
+    缺少索引文件的分片（例如任务中断时正在写入的分片）会扫描tar重建索引。
+
+    用法:
+        with ShardReader(output_dir) as reader:
+            for key, sample in reader:
+                image = cv2.imdecode(np.frombuffer(sample["png"], np.uint8), cv2.IMREAD_COLOR)
+            sample = reader.get("cat/cat_aug_01")
+    """
+
+    def __init__(self, folder, prefix="shard"):
+        """
+        Args:
+            folder: 分片所在文件夹
+            prefix: 分片文件名前缀，包括以该前缀开头的各任务分片
+        """
+        self.folder = os.path.abspath(str(folder))
+        self.shard_paths = _get_shard_paths(self.folder, prefix,
+                                            include_task_shards=True)
+        self._indices = [self._load_index(path) for path in self.shard_paths]
+        self._locations = {}
+        for shard_id, index in enumerate(self._indices):
+            for key in index:
+                self._locations[key] = shard_id
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def _load_index(path):
+        index_path = path + _INDEX_SUFFIX
+        if os.path.exists(index_path):
+            with open(index_path, "r", encoding="utf-8") as f:
+                return json.load(f)["samples"]
+
+        index = {}
+        file_size = os.path.getsize(path)
+        try:
+            with tarfile.open(path, mode="r:") as tar:
+                for member in tar:
+                    if (not member.isfile()
+                            or member.offset_data + member.size > file_size):
+                        continue
+                    key, ext = _split_member_name(member.name)
+                    index.setdefault(key, {})[ext] = [member.offset_data,
+                                                      member.size]
+        except (tarfile.ReadError, EOFError):
+            # 中断时写了一半的最后一个成员无法读取，保留之前的成员
+            pass
+        return index
+
+    def __len__(self):
+        return len(self._locations)
+
+    def __contains__(self, key):
+        return key in self._locations
+
+    def keys(self):
+        """所有样本键"""
+        return list(self._locations.keys())
+
+    def _read(self, shard_id, offset, size):
+        with self._lock:
+            f = self._files.get(shard_id)
+            if f is None:
+                f = open(self.shard_paths[shard_id], "rb")
+                self._files[shard_id] = f
+            f.seek(offset)
+            return f.read(size)
+
+    def get(self, key):
+        """
+        按键读取一个样本
+        Args:
+            key: 样本键
+        Returns:
+            扩展名 -> 字节数据 的字典
+        """
+        shard_id = self._locations[key]
+        members = self._indices[shard_id][key]
+        return {ext: self._read(shard_id, offset, size)
+                for ext, (offset, size) in members.items()}
+
+    __getitem__ = get
+
+    def __iter__(self):
+        """按写入顺序遍历全部样本，生成(键, 样本)"""
+        for shard_id, path in enumerate(self.shard_paths):
+            index = self._indices[shard_id]
+            with open(path, "rb") as f:
+                for key, members in index.items():
+                    if self._locations[key] != shard_id:
+                        continue
+                    sample = {}
+                    for ext, (offset, size) in members.items():
+                        f.seek(offset)
+                        sample[ext] = f.read(size)
+                    yield key, sample
+
+    def close(self):
+        """关闭随机读取时打开的文件"""
+        with self._lock:
+            for f in self._files.values():
+                f.close()
+            self._files = {}
@@ -161,6 +161,1310 @@ def test_save_and_load():
     except Exception as e:
         print(f"✗ 图像保存测试失败: {e}")
         
+def test_jpeg_batch_compression():
+    """测试批量JPEG压缩"""
+    print("\n开始测试批量JPEG压缩...")
+    
+    from imgaug.augmenters.arithmetic import compress_jpeg, compress_jpeg_batch
+    
+    test_images = np.random.randint(0, 255, (4, 64, 64, 3), dtype=np.uint8)
+    
+    # 批量结果应与逐张压缩一致
+    compressed, nb_bytes = compress_jpeg_batch(test_images, [10, 30, 60, 90], return_nb_bytes=True)
+    assert compressed.shape == test_images.shape
+    assert len(nb_bytes) == 4 and nb_bytes[0] > nb_bytes[-1]
+    assert np.array_equal(compressed[1], compress_jpeg(test_images[1], 30))
+    
+    # 灰度图像保持形状
+    gray = compress_jpeg_batch([test_images[0, :, :, :1]], 50)
+    assert gray[0].shape == (64, 64, 1)
+
+    # 不同尺寸的图像交替压缩，每个线程只保留一个最大的缓冲区
+    # （在新线程中顺序压缩，该线程的缓冲区只由这里的调用创建）
+    import threading
+    from imgaug.augmenters.arithmetic import _JPEG_BUFFERS
+    mixed = [test_images[0], np.random.randint(0, 255, (96, 80, 3), dtype=np.uint8), test_images[1, :32]]
+    compressed = compress_jpeg_batch(mixed, 50)
+    for image, image_compressed in zip(mixed, compressed):
+        assert np.array_equal(image_compressed, compress_jpeg(image, 50))
+    buffer_sizes = []
+    
+    def _compress_in_thread():
+        for images in [mixed, mixed[::-1], mixed[:1]]:
+            compress_jpeg_batch(images, 50, nb_workers=1)
+            buffer_sizes.append(_JPEG_BUFFERS.flat.size)
+    
+    thread = threading.Thread(target=_compress_in_thread)
+    thread.start()
+    thread.join()
+    assert buffer_sizes == [96 * 80 * 3] * 3
+
+    # 父进程中已创建线程池后，fork出的Pool子进程仍能使用线程池（不会卡住）
+    from imgaug.augmentables.batches import UnnormalizedBatch
+    aug = iaa.JpegCompression(compression=50)
+    aug(images=list(test_images))
+    pool = aug.pool(processes=2, seed=1)
+    try:
+        batches = [UnnormalizedBatch(images=list(test_images)) for _ in range(2)]
+        batches_aug = pool.map_batches_async(batches).get(timeout=60)
+    finally:
+        pool.terminate()
+    assert all(len(batch.images_aug) == 4 for batch in batches_aug)
+    print("✓ 批量JPEG压缩测试通过")
+    
+def test_contrast_equalization():
+    """测试CLAHE和直方图均衡化：缓存的cv2实例与每次直接调用cv2的结果一致"""
+    print("\n开始测试CLAHE和直方图均衡化...")
+    import threading
+    from imgaug import parameters as iap
+    
+    rng = np.random.RandomState(5)
+    
+    def clahe_direct(image, clip_limit, tile_grid_size):
+        clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid_size)
+        return np.stack([clahe.apply(np.ascontiguousarray(image[..., c]))
+                         for c in range(image.shape[2])], axis=-1)
+    
+    def check_clahe(clip_limit, grid_h, grid_w):
+        tile_grid_size_px = (iap.Deterministic(grid_h), iap.Deterministic(grid_w))
+        for shape in [(40, 50, 3), (31, 67, 1)]:
+            image = (rng.rand(*shape) * 255).astype(np.uint8)
+            expected = clahe_direct(image, clip_limit, (grid_w, grid_h))
+            result = iaa.AllChannelsCLAHE(clip_limit=clip_limit,
+                                          tile_grid_size_px=tile_grid_size_px)(image=image)
+            assert np.array_equal(result, expected)
+            if shape[2] == 1:
+                result = iaa.CLAHE(clip_limit=clip_limit,
+                                   tile_grid_size_px=tile_grid_size_px)(image=image)
+                assert np.array_equal(result, expected)
+    
+    # 交替使用不同的裁剪阈值和网格大小，同一网格大小的缓存实例必须使用新的裁剪阈值
+    for clip_limit, grid_h, grid_w in [(1.0, 8, 8), (4.5, 3, 3), (1.0, 8, 8), (10.0, 3, 3),
+                                       (10.0, 3, 7), (2.0, 7, 3), (1.0, 3, 7), (4.5, 3, 3)]:
+        check_clahe(clip_limit, grid_h, grid_w)
+    
+    # 新线程使用自己的缓存
+    errors = []
+    def check_in_thread():
+        try:
+            check_clahe(3.0, 3, 3)
+        except AssertionError as e:
+            errors.append(e)
+    thread = threading.Thread(target=check_in_thread)
+    thread.start()
+    thread.join()
+    assert not errors
+    
+    for shape in [(40, 50, 1), (40, 50, 3), (40, 50, 4), (40, 50, 6)]:
+        image = (rng.rand(*shape) * 255).astype(np.uint8)
+        expected = np.stack([cv2.equalizeHist(np.ascontiguousarray(image[..., c]))
+                             for c in range(shape[2])], axis=-1)
+        assert np.array_equal(iaa.AllChannelsHistogramEqualization()(image=image), expected)
+        if shape[2] == 1:
+            assert np.array_equal(iaa.HistogramEqualization()(image=image), expected)
+    print("✓ CLAHE和直方图均衡化测试通过")
+    
+def test_augmenter_profiling():
+    """测试增强器性能分析"""
+    print("\n开始测试增强器性能分析...")
+    
+    from imgaug.profiling import AugmenterProfiler
+    
+    test_images = np.random.randint(0, 255, (4, 64, 64, 3), dtype=np.uint8)
+    pipeline = iaa.Sequential([
+        iaa.Fliplr(1.0, name="flip"),
+        iaa.Sometimes(1.0, iaa.GaussianBlur(sigma=1.0, name="blur"))
+    ], name="seq")
+    
+    with AugmenterProfiler(trace_memory=True) as profiler:
+        pipeline.augment_images(test_images)
+    pipeline.augment_images(test_images)  # 停用后不再记录
+    
+    report = {row["name"]: row for row in profiler.get_report()}
+    assert report["seq"]["calls"] == 1 and report["blur"]["depth"] == 3
+    assert report["flip"]["nb_images"] == 4
+    assert report["seq"]["total_seconds"] >= report["blur"]["total_seconds"]
+    assert "uint8 (64, 64, 3)" in report["blur"]["inputs"]
+    assert profiler.to_csv().startswith("path,")
+    
+    # 批内多线程的内存计入发起的增强器
+    with AugmenterProfiler(trace_memory=True) as profiler:
+        iaa.AllChannelsCLAHE(name="clahe").set_intra_batch_workers(2)(images=test_images)
+    assert profiler.get_report()[0]["bytes_allocated"] > 0
+    
+    # 记录内存时不允许多个线程同时调用增强器（tracemalloc统计的是整个进程）
+    import threading
+    from imgaug.augmentables.batches import _BatchInAugmentation
+    for trace_memory in [True, False]:
+        errors = []
+        def augment_in_thread():
+            try:
+                iaa.Fliplr(1.0, name="thread_flip")(images=test_images)
+            except AssertionError as e:
+                errors.append(e)
+        with AugmenterProfiler(trace_memory=trace_memory) as profiler:
+            profiler.enter(pipeline, None, _BatchInAugmentation(images=test_images))
+            thread = threading.Thread(target=augment_in_thread)
+            thread.start()
+            thread.join()
+            profiler.exit()
+            pipeline.augment_images(test_images)
+        assert len(errors) == (1 if trace_memory else 0)
+        names = [row["name"] for row in profiler.get_report()]
+        assert ("thread_flip" in names) != trace_memory
+    print("✓ 增强器性能分析测试通过")
+    
+def test_compiled_sampling_plan():
+    """测试参数编译采样与逐个采样结果一致"""
+    print("\n开始测试参数编译采样...")
+    
+    import pickle
+    import imgaug.parameters as iap
+    import imgaug.random as iarandom
+    
+    params = [
+        iap.Clip(iap.Multiply(iap.Uniform(0, 1.0), 2), 0, 1.5),
+        iap.Deterministic(3),
+        iap.Choice(["constant", "edge"]),
+        iap.Divide(iap.DiscreteUniform(0, 5), iap.Normal(0, 1), elementwise=True),
+        iap.Beta(0.5, 0.5)
+    ]
+    sizes = [(16,), (16, 3), (4,), (2, 3), (5,)]
+    rng_expected = iarandom.RNG(123)
+    rng_compiled = iarandom.RNG(123)
+    expected = [param.draw_samples(size, random_state=rng_expected)
+                for param, size in zip(params, sizes)]
+    plan = pickle.loads(pickle.dumps(iap.compile_parameters(params)))
+    samples = plan.draw_samples(sizes, rng_compiled)
+    for samples_expected, samples_compiled in zip(expected, samples):
+        assert samples_expected.dtype == samples_compiled.dtype
+        assert np.array_equal(samples_expected, samples_compiled)
+    # 随机数生成器的状态也应一致
+    assert rng_expected.integers(0, 1000) == rng_compiled.integers(0, 1000)
+    print("✓ 参数编译采样测试通过")
+    
+def test_pooling_kernels():
+    """测试池化核与skimage实现结果一致"""
+    print("\n开始测试池化核...")
+    
+    import skimage.measure
+    from imgaug.augmenters import size as iasize
+    
+    for dtype in [np.uint8, np.int16, np.bool_]:
+        images = np.random.randint(0, 200, (3, 13, 10, 3)).astype(dtype)
+        for func in [np.average, np.max, np.min, np.median]:
+            if dtype == np.bool_ and func == np.median:
+                continue
+            pooled = ia.pool_many_images(images, (3, 2), func, pad_mode="edge")
+            for image, image_pooled in zip(images, pooled):
+                padded = iasize.pad_to_multiples_of(image, 3, 2, mode="edge")
+                expected = skimage.measure.block_reduce(padded, (3, 2, 1), func)
+                assert np.array_equal(image_pooled, expected.astype(dtype))
+                assert np.array_equal(ia.pool(image, (3, 2), func, pad_mode="edge"),
+                                      image_pooled)
+    print("✓ 池化核测试通过")
+    
+def test_pillike_matches_pil():
+    """测试pillike增强与滤波结果与PIL完全一致"""
+    print("\n开始测试pillike与PIL一致性...")
+    
+    import PIL.Image
+    import PIL.ImageEnhance
+    import PIL.ImageFilter
+    from imgaug.augmenters import pillike
+    
+    images = [np.random.randint(0, 255, shape, dtype=np.uint8)
+              for shape in [(24, 31, 3), (17, 9), (20, 20, 4), (4, 4, 3)]]
+    images.append(cv2.GaussianBlur(images[0], (7, 7), 2))
+    for image in images:
+        image_pil = PIL.Image.fromarray(image)
+        for factor in [0.0, 0.3, 1.0, 1.37, 2.5]:
+            for name in ["Color", "Contrast", "Brightness", "Sharpness"]:
+                expected = np.array(
+                    getattr(PIL.ImageEnhance, name)(image_pil).enhance(factor))
+                func = getattr(pillike, "enhance_%s" % (name.lower(),))
+                assert np.array_equal(func(image, factor), expected), (
+                    name, image.shape, factor)
+        for name in ["BLUR", "SMOOTH", "SMOOTH_MORE", "EDGE_ENHANCE",
+                     "EDGE_ENHANCE_MORE", "FIND_EDGES", "CONTOUR", "EMBOSS",
+                     "SHARPEN", "DETAIL"]:
+            expected = np.array(image_pil.filter(getattr(PIL.ImageFilter, name)))
+            func = getattr(pillike, "filter_%s" % (name.lower(),))
+            assert np.array_equal(func(image), expected), (name, image.shape)
+    
+    # 批量增强与逐张处理结果一致
+    batch = np.random.randint(0, 255, (3, 32, 32, 3), dtype=np.uint8)
+    batch_aug = iaa.pillike.FilterDetail()(images=batch)
+    for image, image_aug in zip(batch, batch_aug):
+        assert np.array_equal(image_aug, pillike.filter_detail(image))
+    print("✓ pillike与PIL一致性测试通过")
+    
+def test_grouped_resize():
+    """测试按尺寸分组的批量缩放与逐张缩放结果一致"""
+    print("\n开始测试分组批量缩放...")
+    
+    shapes = [(40, 30, 3), (25, 60, 3), (40, 30, 3), (33, 17), (12, 12, 1)]
+    images = [np.random.randint(0, 255, shape, dtype=np.uint8) for shape in shapes]
+    sizes = [(20, 15), 0.5, (20, 15), (66, 34), (3, 3)]
+    interpolations = ["cubic", "linear", "cubic", None, "area"]
+    images_rs = ia.imresize_many_images_grouped(images, sizes, interpolations,
+                                                nb_workers=2)
+    for image, size, interpolation, image_rs in zip(images, sizes, interpolations, images_rs):
+        expected = ia.imresize_single_image(image, size, interpolation=interpolation)
+        assert image_rs.shape == expected.shape
+        assert np.array_equal(image_rs, expected)
+    
+    # 整数倍（4的倍数）area缩小走金字塔路径，每次减半最多带来1个灰度级的舍入误差；
+    # 其他缩放倍数与直接缩放完全相同。使用未经模糊的真实图像测试
+    image_paths = sorted(Path(__file__).parent.glob("data/img/*.png"))[:2]
+    rng = np.random.RandomState(0)
+    natural_images = [cv2.imread(str(path)) for path in image_paths]
+    natural_images.append(rng.randint(0, 255, (384, 512, 3)).astype(np.uint8))
+    for image in natural_images:
+        image = image[:image.shape[0] // 64 * 64, :image.shape[1] // 64 * 64]
+        height, width = image.shape[0:2]
+        for factor, nb_halvings in [(4, 1), (8, 2), (16, 3), (64, 5), (3, 0), (6, 0), (12, 0)]:
+            image_rs = ia.imresize_single_image(image, (height // factor, width // factor),
+                                                interpolation="area")
+            expected = cv2.resize(image, (width // factor, height // factor),
+                                  interpolation=cv2.INTER_AREA)
+            assert image_rs.shape == expected.shape
+            assert np.abs(image_rs.astype(np.int32) - expected).max() <= nb_halvings
+        size = (height // 5 + 1, width // 7 + 3)
+        image_rs = ia.imresize_single_image(image, size, interpolation="area")
+        assert np.array_equal(image_rs, cv2.resize(image, size[::-1], interpolation=cv2.INTER_AREA))
+    
+    images_aug = iaa.Resize({"height": 32, "width": "keep-aspect-ratio"})(images=images)
+    assert [image.shape[0] for image in images_aug] == [32] * len(images)
+    print("✓ 分组批量缩放测试通过")
+    
+def test_background_debug_images():
+    """测试后台线程保存调试图像与同步保存结果一致"""
+    print("\n开始测试后台调试图像保存...")
+    import tempfile
+    from imgaug.augmenters import debug as iaa_debug
+    
+    images = np.random.randint(0, 255, (2, 32, 32, 3), dtype=np.uint8)
+    with tempfile.TemporaryDirectory() as folder_sync, \
+            tempfile.TemporaryDirectory() as folder_bg:
+        aug_sync = iaa.SaveDebugImageEveryNBatches(folder_sync, 2)
+        aug_bg = iaa.SaveDebugImageEveryNBatches(folder_bg, 2, background=True)
+        for _ in range(5):
+            aug_sync(images=images)
+            aug_bg(images=images)
+        assert aug_bg.flush(timeout=60)
+        files_sync = sorted(os.listdir(folder_sync))
+        assert files_sync == sorted(os.listdir(folder_bg))
+        for filename in files_sync:
+            assert np.array_equal(cv2.imread(os.path.join(folder_sync, filename)),
+                                  cv2.imread(os.path.join(folder_bg, filename)))
+        
+        # 复制的增强器不共享后台线程
+        aug_copy = aug_bg.deepcopy()
+        assert aug_copy._renderer is None
+        
+        # close()结束后台线程，之后再使用时重新启动
+        thread = aug_bg._renderer._thread
+        assert aug_bg.close(timeout=60) and not thread.is_alive()
+        assert aug_bg._renderer._thread is None
+        aug_bg(images=images)
+        aug_bg(images=images)
+        assert aug_bg._renderer._thread is not None
+        assert aug_bg.close(timeout=60) and aug_bg._renderer._thread is None
+        
+        # 被回收的副本（如to_deterministic()）的后台线程随之结束
+        import gc
+        aug_det = aug_bg.to_deterministic()
+        aug_det(images=images)
+        aug_det(images=images)
+        thread = aug_det._renderer._thread
+        del aug_det
+        gc.collect()
+        thread.join(timeout=60)
+        assert not thread.is_alive()
+    
+    # 队列已满时丢弃最旧的快照，其批次计数合并到下一个快照
+    import threading
+    from imgaug.augmentables.batches import _BatchInAugmentation
+    started = threading.Event()
+    release = threading.Event()
+    received = []
+    
+    class _BlockingDestination(iaa_debug._IImageDestination):
+        def __init__(self):
+            self.nb_batches = 0
+        
+        def on_batch(self, batch):
+            self.nb_batches += 1
+        
+        def receive(self, image):
+            started.set()
+            release.wait(60)
+            received.append(self.nb_batches)
+    
+    renderer = iaa_debug._BackgroundDebugImageRenderer(_BlockingDestination(), 1)
+    batch = _BatchInAugmentation(images=images)
+    renderer.on_batch()
+    renderer.submit(batch)
+    assert started.wait(60)
+    for _ in range(3):
+        renderer.on_batch()
+        renderer.submit(batch)
+    release.set()
+    assert renderer.flush(timeout=60)
+    assert received == [1, 4]
+    assert renderer.nb_dropped == 2
+    print("✓ 后台调试图像保存测试通过")
+    
+def test_resumable_batch_manifest():
+    """测试批处理清单：中断后继续处理的结果与一次性处理相同，已完成的文件被跳过"""
+    print("\n开始测试可恢复的批处理...")
+    import tempfile
+    import image_process_id
+    from PIL import Image
+    
+    def read_outputs(folder):
+        outputs = {}
+        for root, _, files in os.walk(folder):
+            for filename in files:
+                if filename.endswith(".jpg"):
+                    path = os.path.join(root, filename)
+                    with open(path, "rb") as f:
+                        outputs[os.path.relpath(path, folder)] = f.read()
+        return outputs
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir = os.path.join(tmp, "input")
+        os.makedirs(input_dir)
+        for name in ["a", "b"]:
+            array = np.random.randint(0, 255, (200, 240, 3), dtype=np.uint8)
+            Image.fromarray(array).save(os.path.join(input_dir, name + ".png"))
+        
+        output_full = os.path.join(tmp, "full")
+        image_process_id.batch_transform_images(input_dir, output_full)
+        expected = read_outputs(output_full)
+        
+        # 模拟在"resize"阶段中断
+        output_resumed = os.path.join(tmp, "resumed")
+        stages = image_process_id._SINGLE_IMAGE_STAGES
+        
+        def crash(*args, **kwargs):
+            raise RuntimeError("中断")
+        
+        image_process_id._SINGLE_IMAGE_STAGES = [
+            (stage, crash if stage == "resize" else func) for stage, func in stages]
+        try:
+            image_process_id.batch_transform_images(input_dir, output_resumed)
+        finally:
+            image_process_id._SINGLE_IMAGE_STAGES = stages
+        assert len(read_outputs(output_resumed)) < len(expected)
+        
+        image_process_id.batch_transform_images(input_dir, output_resumed)
+        assert read_outputs(output_resumed) == expected
+        
+        # 再次运行时全部跳过；修改源文件后只重新处理该文件
+        calls = []
+        original_func = image_process_id.gen_single_image_transforms
+        image_process_id.gen_single_image_transforms = \
+            lambda path, *args, **kwargs: calls.append(os.path.basename(path))
+        try:
+            image_process_id.batch_transform_images(input_dir, output_resumed)
+            assert calls == []
+            Image.new("RGB", (240, 200)).save(os.path.join(input_dir, "b.png"))
+            image_process_id.batch_transform_images(input_dir, output_resumed)
+            assert calls == ["b.png"]
+        finally:
+            image_process_id.gen_single_image_transforms = original_func
+    print("✓ 可恢复的批处理测试通过")
+    
+def test_sharded_output():
+    """测试tar分片输出：多线程写入、按键随机读取、顺序遍历及中断后重建索引"""
+    print("\n开始测试分片输出...")
+    import tempfile
+    import threading
+    import image_process_id
+    from PIL import Image
+    from sharded_output import ShardReader, ShardWriter, make_key
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        samples = {make_key("img%d" % t, "aug_%02d" % j): {"png": os.urandom(100 + j), "json": b"{}"}
+                   for t in range(2) for j in range(25)}
+        
+        with ShardWriter(tmp, max_shard_count=10) as writer:
+            def write_thread(t):
+                for key, sample in samples.items():
+                    if key.startswith("img%d/" % t):
+                        writer.write(key, sample)
+            threads = [threading.Thread(target=write_thread, args=(t,)) for t in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert len(writer.shard_paths) == 6
+        
+        with ShardReader(tmp) as reader:
+            assert len(reader) == len(samples)
+            assert reader.get("img1/aug_07") == samples["img1/aug_07"]
+            assert dict(reader) == samples
+        
+        # 缺少索引的分片（写入时中断）通过扫描tar重建索引
+        os.remove(writer.shard_paths[0] + ".idx.json")
+        with ShardReader(tmp) as reader:
+            assert dict(reader) == samples
+        
+        # image_process_id写入分片的内容与单独文件相同
+        input_dir = os.path.join(tmp, "input")
+        os.makedirs(input_dir)
+        Image.fromarray(np.random.randint(0, 255, (200, 240, 3), dtype=np.uint8)).save(
+            os.path.join(input_dir, "a.png"))
+        output_files = os.path.join(tmp, "files")
+        output_shards = os.path.join(tmp, "shards")
+        image_process_id.batch_transform_images(input_dir, output_files)
+        image_process_id.batch_transform_images(input_dir, output_shards, shard_output=True)
+        assert not os.path.exists(os.path.join(output_shards, "a"))
+        with ShardReader(os.path.join(output_shards, "shards")) as reader:
+            filenames = sorted(os.listdir(os.path.join(output_files, "a")))
+            assert len(reader) == len(filenames)
+            for filename in filenames:
+                with open(os.path.join(output_files, "a", filename), "rb") as f:
+                    key = make_key("a", os.path.splitext(filename)[0])
+                    assert reader.get(key)["jpg"] == f.read()
+        
+        # 分两个任务写入的分片可以用默认前缀一并读回
+        task_input_dir = os.path.join(tmp, "task_input")
+        os.makedirs(task_input_dir)
+        for name in ("a.png", "c.png"):
+            Image.fromarray(np.random.randint(0, 255, (200, 240, 3), dtype=np.uint8)).save(
+                os.path.join(task_input_dir, name))
+        task_files = os.path.join(tmp, "task_files")
+        task_shards = os.path.join(tmp, "task_shards")
+        image_process_id.batch_transform_images(task_input_dir, task_files)
+        for shard_index in range(2):
+            image_process_id.batch_transform_images(task_input_dir, task_shards, shard_output=True,
+                                                    num_shards=2, shard_index=shard_index)
+        with ShardReader(os.path.join(task_shards, "shards")) as reader:
+            expected = {}
+            for stem in ("a", "c"):
+                for filename in os.listdir(os.path.join(task_files, stem)):
+                    with open(os.path.join(task_files, stem, filename), "rb") as f:
+                        expected[make_key(stem, os.path.splitext(filename)[0])] = f.read()
+            assert len(reader.shard_paths) == 2
+            assert {key: sample["jpg"] for key, sample in reader} == expected
+    print("✓ 分片输出测试通过")
+    
+def test_image_discovery():
+    """测试输入图像发现：递归扫描、扩展名不区分大小写、按目录修改时间缓存文件列表、跳过输出文件夹"""
+    print("\n开始测试输入图像发现...")
+    import tempfile
+    import time
+    from image_discovery import ImageFileScanner, find_first_image_file, iter_image_files
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir = os.path.join(tmp, "input")
+        os.makedirs(os.path.join(input_dir, "sub", "deeper"))
+        for name in ["a.jpg", "b.PNG", "notes.txt", "sub/c.tif", "sub/deeper/d.jpeg"]:
+            with open(os.path.join(input_dir, name), "wb") as f:
+                f.write(b"x")
+        
+        def relative(paths):
+            return sorted(os.path.relpath(path, input_dir).replace(os.sep, "/") for path in paths)
+        
+        assert relative(iter_image_files(input_dir)) == ["a.jpg", "b.PNG"]
+        assert relative(iter_image_files(input_dir, recursive=True)) == [
+            "a.jpg", "b.PNG", "sub/c.tif", "sub/deeper/d.jpeg"]
+        assert find_first_image_file(os.path.join(input_dir, "sub", "deeper")).endswith("d.jpeg")
+        
+        # 目录的修改时间足够早时写入缓存，之后的扫描直接读取缓存
+        old = time.time() - 60
+        for root, dirs, _ in os.walk(input_dir):
+            os.utime(root, (old, old))
+        cache_path = os.path.join(tmp, "cache.json")
+        expected = relative(iter_image_files(input_dir, recursive=True, cache_path=cache_path))
+        assert os.path.exists(cache_path)
+        import image_discovery
+        scan = image_discovery._scan
+        image_discovery._scan = None
+        try:
+            assert relative(iter_image_files(input_dir, recursive=True, cache_path=cache_path)) == expected
+        finally:
+            image_discovery._scan = scan
+        
+        # 子文件夹中新增文件后缓存失效
+        with open(os.path.join(input_dir, "sub", "deeper", "e.bmp"), "wb") as f:
+            f.write(b"x")
+        assert "sub/deeper/e.bmp" in relative(
+            iter_image_files(input_dir, recursive=True, cache_path=cache_path))
+        
+        scanner = ImageFileScanner(input_dir, recursive=True)
+        assert len(relative(scanner)) == 5
+        assert scanner.total == 5
+        
+        # 输出文件夹位于输入文件夹中：递归扫描跳过输出，扫描过程中写入的输出也不会被当作输入
+        output_dir = os.path.join(input_dir, "output")
+        os.makedirs(os.path.join(output_dir, "sub"))
+        for name in ["a_aug_0.jpg", "sub/c_aug_0.tif", ".batch_manifest.jsonl"]:
+            with open(os.path.join(output_dir, name), "wb") as f:
+                f.write(b"x")
+        assert "output/a_aug_0.jpg" in relative(iter_image_files(input_dir, recursive=True))
+        found = []
+        for path in iter_image_files(input_dir, recursive=True, exclude=[output_dir + os.sep],
+                                     cache_path=os.path.join(output_dir, "cache.json")):
+            found.append(path)
+            with open(os.path.join(input_dir, f"new_{len(found)}.png"), "wb") as f:
+                f.write(b"x")
+        assert relative(found) == ["a.jpg", "b.PNG", "sub/c.tif", "sub/deeper/d.jpeg", "sub/deeper/e.bmp"]
+        scanner = ImageFileScanner(input_dir, recursive=True, exclude=[output_dir])
+        assert not any(path.startswith("output/") for path in relative(scanner))
+    print("✓ 输入图像发现测试通过")
+    
+def test_preview_engine():
+    """测试低延迟预览：缩小解码并缓存、像素参数换算、管道复用及异步渲染"""
+    print("\n开始测试预览引擎...")
+    import tempfile
+    import threading
+    from preview_engine import PreviewEngine, decode_proxy, scale_augmenter_params
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "large.jpg")
+        cv2.imwrite(path, np.random.randint(0, 255, (1600, 2400, 3), dtype=np.uint8))
+        
+        proxy, scale = decode_proxy(path, max_size=300)
+        assert proxy.shape == (200, 300, 3)
+        assert abs(scale - 0.125) < 1e-6
+        
+        params = scale_augmenter_params("MedianBlur", {"k": (3, 41)}, 0.125)
+        assert params["k"] == (1, 5)
+        params = scale_augmenter_params("GaussianBlur", {"sigma": [0.0, 8.0]}, 0.125)
+        assert params["sigma"] == [0.0, 1.0]
+        assert scale_augmenter_params("Rotate", {"rotate": (-30, 30)}, 0.125) == {"rotate": (-30, 30)}
+        
+        created = []
+        
+        def create_augmenters(selected):
+            created.append(selected)
+            return [getattr(iaa, name)(**config["params"]) for name, config in selected]
+        
+        engine = PreviewEngine(create_augmenters, max_size=300, nb_variants=4, nb_cols=2)
+        selected = [("Fliplr", {"params": {"p": 0.5}}), ("GaussianBlur", {"params": {"sigma": (0, 8)}})]
+        result = engine.render(path, selected, seed=1)
+        assert len(result.variants) == 4
+        assert result.grid.shape == (2 * 200 + 4, 2 * 300 + 4, 3)
+        assert created[0][1][1]["params"]["sigma"] == (0, 1.0)
+        
+        # 相同选择复用管道和解码结果，相同种子得到相同变体
+        result_again = engine.render(path, selected, seed=1)
+        assert len(created) == 1
+        assert result_again.original is result.original
+        assert np.array_equal(result_again.grid, result.grid)
+        engine.render(path, selected[:1], seed=1)
+        assert len(created) == 2
+        
+        done = threading.Event()
+        results = []
+        engine.render_async(path, selected, 2, lambda result, error: (results.append((result, error)), done.set()))
+        assert done.wait(60)
+        assert results[0][1] is None and len(results[0][0].variants) == 4
+    print("✓ 预览引擎测试通过")
+    
+def test_augment_fast_path():
+    """测试单张uint8图像的快速路径及dtype检查缓存与通用路径结果一致"""
+    print("\n开始测试augment()快速路径...")
+    import warnings
+    from imgaug import dtypes as iadt
+    
+    for shape in [(40, 60, 3), (40, 60)]:
+        image = np.random.randint(0, 255, shape, dtype=np.uint8)
+        for make_augmenter in [lambda: iaa.Add((-20, 20)),
+                               lambda: iaa.Crop(px=(0, 8)),
+                               lambda: iaa.Sequential([iaa.Fliplr(0.5), iaa.GaussianBlur((0, 2.0))])]:
+            aug_fast = make_augmenter()
+            aug_generic = make_augmenter()
+            aug_fast.seed_(5)
+            aug_generic.seed_(5)
+            for i in range(5):
+                expected = aug_generic.augment_images([image])[0]
+                result = aug_fast.augment_image(image) if i % 2 == 0 else aug_fast(image=image)
+                assert result.shape == expected.shape and result.dtype == expected.dtype
+                assert np.array_equal(result, expected)
+                assert not np.shares_memory(result, image)
+    
+    # 缓存只保存通过的检查，禁止的dtype每次都报错，未知的dtype每次都警告
+    allowed = ["uint8", "float32"]
+    disallowed = ["int64"]
+    iadt._clear_gate_dtypes_cache()
+    iadt.gate_dtypes([np.zeros((2, 2), np.uint8)] * 3, allowed, disallowed)
+    assert len(iadt._GATE_DTYPES_CACHE) == 1
+    iadt.gate_dtypes(np.zeros((2, 2), np.uint8), allowed, disallowed)
+    assert len(iadt._GATE_DTYPES_CACHE) == 1
+    for _ in range(2):
+        try:
+            iadt.gate_dtypes(np.zeros((2, 2), np.int64), allowed, disallowed)
+            assert False, "int64应被禁止"
+        except ValueError:
+            pass
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            iadt.gate_dtypes([np.zeros((2, 2), np.uint8), np.zeros((2, 2), np.int16)],
+                             allowed, disallowed)
+        assert len(caught) == 1
+    print("✓ augment()快速路径测试通过")
+    
+def test_batched_box_drawing():
+    """测试批量绘制边界框与逐个绘制的结果一致，以及标签文字缓存"""
+    print("\n开始测试批量绘制边界框...")
+    from imgaug.augmentables.bbs import BoundingBox, BoundingBoxesOnImage, _LabelOnImageDrawer
+    
+    rng = np.random.RandomState(3)
+    image = rng.randint(0, 255, (60, 80, 3)).astype(np.uint8)
+    boxes = [BoundingBox(x1=x, y1=y, x2=x + w, y2=y + h)
+             for x, y, w, h in rng.uniform([-20, -20, 0, 0], [90, 70, 40, 40], (30, 4))]
+    boxes.append(BoundingBox(x1=0, y1=0, x2=79.9, y2=59.9))
+    boxes.append(boxes[0].deepcopy())
+    bbsoi = BoundingBoxesOnImage(boxes, shape=image.shape)
+    
+    for color, alpha, size in [((0, 255, 0), 1.0, 1), (255, 0.5, 3), ((10, 20, 30), 0.3, 2)]:
+        expected = np.copy(image)
+        for bb in boxes:
+            expected = bb.draw_box_on_image(expected, color=color, alpha=alpha, size=size, copy=False)
+        result = bbsoi.draw_on_image(image, color=color, alpha=alpha, size=size)
+        assert np.array_equal(result, expected)
+    
+    # 缓存的标签文字裁剪后与直接在标签框上绘制文字相同
+    color_text, color_bg = np.uint8([255, 255, 255]), np.uint8([0, 128, 0])
+    for height, width in [(30, 200), (12, 20)]:
+        label_arr = _LabelOnImageDrawer._draw_label_arr(
+            "person", height, width, 3, np.uint8, color_text, color_bg, 20)
+        expected = np.zeros((height, width, 3), dtype=np.uint8)
+        expected[...] = color_bg
+        expected = ia.draw_text(expected, x=2, y=2, text="person", color=color_text, size=20)
+        assert np.array_equal(label_arr, expected)
+    
+    labeled = BoundingBoxesOnImage([bb.copy(label="cat") for bb in boxes], shape=image.shape)
+    assert labeled.draw_on_image(image, alpha=0.5).shape == image.shape
+    print("✓ 批量绘制边界框测试通过")
+    
+def test_lazy_imports():
+    """测试imgaug.augmenters的延迟加载：名称表完整，轻量增强器不导入重量级模块"""
+    print("\n开始测试延迟导入...")
+    import importlib
+    import inspect
+    from micro_benchmarks import HEAVY_MODULES, measure_import_time
+    
+    # 增强器模块中定义的每个公开类和函数都必须在名称表中
+    for module_name, names in iaa._MODULE_NAMES.items():
+        module = importlib.import_module("imgaug.augmenters." + module_name)
+        for name, value in vars(module).items():
+            if (not name.startswith("_") and (inspect.isclass(value) or inspect.isfunction(value))
+                    and value.__module__ == module.__name__):
+                assert name in names, f"{module_name}.{name} 不在iaa._MODULE_NAMES中"
+        for name in names:
+            assert getattr(iaa, name) is getattr(module, name)
+    assert iaa.pillike.Autocontrast is not None
+
+    # __all__中的每个名称都能通过星号导入得到，模块自身的导入不出现在dir()中
+    namespace = {}
+    exec("from imgaug.augmenters import *", namespace)
+    assert all(name in namespace for name in iaa.__all__)
+    assert "importlib" not in dir(iaa) and "importlib" not in namespace
+
+    ms, modules, _ = measure_import_time(
+        "import imgaug.augmenters as iaa; iaa.Sequential([iaa.Fliplr(0.5), iaa.AddToBrightness((-30, 30))])")
+    heavy = [name for name in HEAVY_MODULES if name in modules]
+    assert not heavy, f"导入了重量级模块: {heavy}"
+    assert "imgaug.augmenters.geometric" not in modules
+    print(f"导入imgaug并创建Fliplr+AddToBrightness耗时: {ms:.0f} ms")
+    print("✓ 延迟导入测试通过")
+
+
+def test_kmeans_histogram():
+    """测试直方图k-means颜色量化：确定性、颜色数、不修改cv2的全局随机状态、误差与cv2相近"""
+    print("\n开始测试直方图k-means颜色量化...")
+    
+    rng = np.random.RandomState(0)
+    ramp = np.linspace(0, 255, 120)
+    image = np.dstack([ramp[np.newaxis, :].repeat(90, 0),
+                       np.linspace(0, 255, 90)[:, np.newaxis].repeat(120, 1),
+                       np.full((90, 120), 100.0)])
+    image = np.clip(image + rng.normal(0, 8, image.shape), 0, 255).astype(np.uint8)
+    
+    def mse(quantized, reference):
+        return np.mean((quantized.astype(np.float64) - reference) ** 2)
+    
+    for arr in [image, image[:, :, 0]]:
+        for nb_colors in [2, 8, 32]:
+            # cv2状态在调用前后应保持不变
+            cv2.setRNGSeed(123)
+            expected_rand = cv2.randu(np.zeros(4), 0, 1000).copy()
+            cv2.setRNGSeed(123)
+            quantized = iaa.quantize_kmeans(arr, nb_colors, method="histogram")
+            assert np.array_equal(cv2.randu(np.zeros(4), 0, 1000), expected_rand)
+            
+            assert quantized.shape == arr.shape and quantized.dtype == np.uint8
+            assert np.array_equal(quantized, iaa.quantize_kmeans(arr, nb_colors, method="histogram"))
+            nb_unique = len(np.unique(quantized.reshape((-1, 1 if arr.ndim == 2 else 3)), axis=0))
+            assert nb_unique <= nb_colors
+            assert mse(quantized, arr) <= 1.2 * mse(iaa.quantize_kmeans(arr, nb_colors), arr) + 1.0
+    
+    # 颜色数不超过聚类数时结果与输入相同
+    few = np.zeros((20, 20, 3), dtype=np.uint8)
+    few[5:] = (200, 10, 30)
+    few[12:] = (7, 9, 250)
+    assert np.array_equal(iaa.quantize_kmeans(few, 4, method="histogram"), few)
+    
+    # 增强器使用自身的随机状态，相同种子结果相同
+    images = [image, image[::-1]]
+    aug = iaa.KMeansColorQuantization(n_colors=(4, 8), max_size=None, method="histogram", seed=3)
+    images_aug = aug(images=images)
+    images_aug_same = iaa.KMeansColorQuantization(
+        n_colors=(4, 8), max_size=None, method="histogram", seed=3)(images=images)
+    assert all(np.array_equal(a, b) for a, b in zip(images_aug, images_aug_same))
+    assert all(a.shape == b.shape for a, b in zip(images_aug, images))
+    
+    print("✓ 直方图k-means颜色量化测试通过")
+
+
+def test_row_mask_execution():
+    """测试SomeOf/Sometimes/OneOf按行执行：结果与逐层子选择一致，嵌套时不重复复制"""
+    print("\n开始测试容器增强器按行执行...")
+    import copy
+    from imgaug.augmentables.batches import _BatchInAugmentation
+    
+    def make_augmenter():
+        return iaa.SomeOf((1, 3), [
+            iaa.Sometimes(0.5, iaa.Sometimes(0.5, iaa.Fliplr(1.0)), iaa.Add(-10)),
+            iaa.Sometimes(0.7, iaa.Invert(0.5)),
+            iaa.OneOf([iaa.Add((-20, 20)), iaa.Crop(px=(0, 4))]),
+            iaa.Sequential([iaa.Sometimes(0.5, iaa.Flipud(1.0)), iaa.Multiply((0.8, 1.2))],
+                           random_order=True)
+        ], random_order=True)
+    
+    images = np.random.randint(0, 255, (16, 24, 32, 3), dtype=np.uint8)
+    for batch_size in [1, 5, 16]:
+        aug = make_augmenter()
+        aug_reference = copy.deepcopy(aug)
+        for _ in range(3):
+            images_aug = aug.augment_images(images[:batch_size].copy())
+            # 有hooks时容器逐层子选择各行，作为参照
+            images_ref = aug_reference.augment_images(images[:batch_size].copy(),
+                                                      hooks=ia.HooksImages())
+            assert ia.is_np_array(images_aug) and images_aug.flags["C_CONTIGUOUS"]
+            assert np.array_equal(images_aug, images_ref)
+    
+    # 嵌套的容器不再各自复制行，只有最底层的增强器子选择一次
+    nb_subselects = [0]
+    subselect = _BatchInAugmentation.subselect_rows_by_indices
+    
+    def counting_subselect(self, indices):
+        nb_subselects[0] += 1
+        return subselect(self, indices)
+    
+    aug = iaa.Sometimes(1.0, iaa.SomeOf(1, [iaa.Sometimes(1.0, iaa.OneOf([iaa.Add(1)]))]))
+    _BatchInAugmentation.subselect_rows_by_indices = counting_subselect
+    try:
+        aug.augment_images(images.copy())
+        assert nb_subselects[0] == 0
+        aug = iaa.Sometimes(0.5, iaa.SomeOf(1, [iaa.Sometimes(0.5, iaa.Add(1))]), seed=1)
+        aug.augment_images(images.copy())
+        assert nb_subselects[0] <= 1
+    finally:
+        _BatchInAugmentation.subselect_rows_by_indices = subselect
+    
+    # 连续的行以视图方式选择，原地修改后不需要写回
+    batch = _BatchInAugmentation(images=images.copy())
+    batch_sub = batch.subselect_rows_by_indices(np.arange(3, 7))
+    assert np.shares_memory(batch_sub.images, batch.images)
+    batch_sub.images += 1
+    batch = batch.invert_subselect_rows_by_indices_(np.arange(3, 7), batch_sub)
+    expected = images.copy()
+    expected[3:7] += 1
+    assert np.array_equal(batch.images, expected)
+    batch_sub = batch.subselect_rows_by_indices([1, 4])
+    assert not np.shares_memory(batch_sub.images, batch.images)
+    
+    print("✓ 容器增强器按行执行测试通过")
+    
+def test_colormap_luts():
+    """测试热力图和分割图的查找表绘制：结果与逐像素计算一致"""
+    print("\n开始测试热力图和分割图查找表绘制...")
+    import matplotlib.pyplot as plt
+    from imgaug.augmentables.heatmaps import HeatmapsOnImage
+    from imgaug.augmentables.segmaps import SegmentationMapsOnImage
+    from imgaug.augmenters import blend as blendlib
+    
+    rng = np.random.RandomState(0)
+    image = rng.randint(0, 255, (40, 50, 3)).astype(np.uint8)
+    
+    # 热力图：查找表着色与直接调用matplotlib的颜色映射一致
+    heat = rng.rand(20, 25, 2).astype(np.float32)
+    heatmaps = HeatmapsOnImage(heat, shape=image.shape)
+    for cmap in ["jet", "viridis", None]:
+        drawn = heatmaps.draw(cmap=cmap)
+        assert len(drawn) == 2
+        for c, heatmap_drawn in enumerate(drawn):
+            heat_c = heatmaps.to_uint8()[:, :, c].astype(np.float32) / 255.0
+            if cmap is None:
+                expected = np.tile(heat_c[:, :, np.newaxis], (1, 1, 3))
+            else:
+                expected = plt.get_cmap(cmap)(heat_c)[:, :, 0:3]
+            expected = np.clip(expected * 255, 0, 255).astype(np.uint8)
+            assert heatmap_drawn.dtype.name == "uint8"
+            assert np.array_equal(heatmap_drawn, expected)
+    
+    # 热力图叠加：与浮点混合公式一致
+    for alpha in [0.0, 0.3, 0.75, 1.0]:
+        drawn = heatmaps.draw_on_image(image, alpha=alpha, resize="heatmaps")
+        for heatmap_drawn, heatmap_on_image in zip(heatmaps.draw(size=image.shape[0:2]), drawn):
+            expected = np.clip(
+                (1 - alpha) * image + alpha * heatmap_drawn, 0, 255).astype(np.uint8)
+            assert np.array_equal(heatmap_on_image, expected)
+    
+    # 分割图叠加：与逐类别着色后调用blend_alpha一致
+    segmap_arr = rng.randint(0, 6, (20, 25, 2)).astype(np.int32)
+    segmap = SegmentationMapsOnImage(segmap_arr, shape=image.shape)
+    colors = SegmentationMapsOnImage.DEFAULT_SEGMENT_COLORS
+    for alpha in [0.25, 0.5, 1.0]:
+        for draw_background in [True, False]:
+            drawn = segmap.draw_on_image(image, alpha=alpha, resize="segmentation_map",
+                                         draw_background=draw_background, background_class_id=0)
+            for c, segmap_on_image in enumerate(drawn):
+                ids = ia.imresize_single_image(segmap_arr[:, :, c], image.shape[0:2],
+                                               interpolation="nearest")
+                colored = np.zeros(image.shape, dtype=np.uint8)
+                for class_id in np.unique(ids):
+                    colored[ids == class_id] = colors[class_id]
+                expected = blendlib.blend_alpha(colored, image, alpha)
+                if not draw_background:
+                    expected[ids == 0] = image[ids == 0]
+                assert np.array_equal(segmap_on_image, expected)
+    
+    # 查找表按颜色映射和alpha缓存
+    from imgaug.augmentables.heatmaps import _get_colormap_lut
+    assert _get_colormap_lut("jet") is _get_colormap_lut("jet")
+    assert blendlib._get_blend_alpha_uint8_lut(0.5) is blendlib._get_blend_alpha_uint8_lut(0.5)
+    
+    print("✓ 热力图和分割图查找表绘制测试通过")
+    
+def test_batched_primitive_drawing():
+    """测试关键点、折线和多边形的快速绘制：与逐个绘制一致，多边形按顺序逐个混合"""
+    print("\n开始测试关键点、折线和多边形的批量绘制...")
+    from imgaug.augmentables.kps import Keypoint, KeypointsOnImage
+    from imgaug.augmentables.lines import LineString, LineStringsOnImage
+    from imgaug.augmentables.polys import Polygon, PolygonsOnImage
+    
+    rng = np.random.RandomState(4)
+    image = rng.randint(0, 255, (60, 80, 3)).astype(np.uint8)
+    
+    # 关键点：不透明时与逐个绘制完全一致，半透明时只差舍入误差
+    kpsoi = KeypointsOnImage.from_xy_array(rng.uniform(-5, 85, (40, 2)), shape=image.shape)
+    for alpha, max_diff in [(1.0, 0), (0.5, 1)]:
+        expected = np.copy(image)
+        for kp in kpsoi.keypoints[0:1]:
+            expected = kp.draw_on_image(expected, color=(0, 255, 0), alpha=alpha, size=3)
+        result = KeypointsOnImage(kpsoi.keypoints[0:1], shape=image.shape).draw_on_image(
+            image, color=(0, 255, 0), alpha=alpha, size=3)
+        assert np.max(np.abs(result.astype(np.int32) - expected)) <= max_diff
+        expected = np.copy(image)
+        for kp in kpsoi.keypoints:
+            expected = kp.draw_on_image(expected, color=(0, 255, 0), alpha=1.0, size=3)
+        assert np.array_equal(kpsoi.draw_on_image(image, color=(0, 255, 0), size=3), expected)
+    
+    # 重叠的关键点只混合一次
+    kpsoi_twice = KeypointsOnImage([Keypoint(x=10, y=10), Keypoint(x=11, y=10)], shape=image.shape)
+    result = kpsoi_twice.draw_on_image(image, color=(255, 255, 255), alpha=0.5, size=3)
+    expected = np.round(image[9:12, 9:13].astype(np.float32) * 0.5 + 127.5)
+    assert np.max(np.abs(result[9:12, 9:13].astype(np.int32) - expected)) <= 1
+    
+    # 折线：与skimage逐条绘制的线段和点一致，水平线段为完整颜色，相邻行不变
+    lsoi = LineStringsOnImage([LineString([(5, 5), (70, 5), (40, 50)]),
+                               LineString([(10, 55), (75, 40)])], shape=image.shape)
+    result = lsoi.draw_on_image(image, color=(255, 0, 0), size=1)
+    expected = np.copy(image)
+    for ls in lsoi.line_strings:
+        expected = ls.draw_lines_on_image(expected, color=(255, 0, 0), size=1)
+        expected = ls.draw_points_on_image(expected, color=(127, 0, 0), size=3)
+    assert np.array_equal(result, expected)
+    assert np.all(result[5, 10:65] == [255, 0, 0])
+    assert np.array_equal(result[[4, 6], 10:65], image[[4, 6], 10:65])
+    assert np.array_equal(result[55, 10], [127, 0, 0])  # 折线的点为0.5倍颜色
+    for alpha, size in [(0.5, 1), (0.5, 3), (1.0, 2)]:
+        expected = np.copy(image)
+        for ls in lsoi.line_strings:
+            expected = ls.draw_lines_on_image(expected, color=(255, 0, 0), alpha=alpha, size=size)
+        result = lsoi.draw_on_image(image, color=(255, 0, 0), alpha=alpha, alpha_points=0, size=size)
+        assert np.max(np.abs(result.astype(np.int32) - expected)) <= 1
+    
+    # 多边形：内部按alpha_face混合，边界为完整的0.5倍颜色，外部不变，越界时可报错
+    psoi = PolygonsOnImage([Polygon([(10, 10), (40, 10), (40, 40), (10, 40)]),
+                            Polygon([(30, 30), (60, 30), (60, 55), (30, 55)])], shape=image.shape)
+    result = psoi.draw_on_image(image, color=(0, 0, 255), alpha=1.0)
+    for y, x in [(20, 20), (50, 50)]:
+        expected = np.round(image[y, x].astype(np.float32) * 0.5 + np.float32([0, 0, 127.5]))
+        assert np.max(np.abs(result[y, x].astype(np.int32) - expected)) <= 1
+    assert np.array_equal(result[5, 70], image[5, 70])
+    assert np.array_equal(result[10, 25], [0, 0, 128])
+    assert np.array_equal(result[9, 25], image[9, 25])
+    assert np.array_equal(psoi.polygons[0].draw_on_image(image, color=(0, 0, 255)),
+                          PolygonsOnImage(psoi.polygons[0:1], shape=image.shape)
+                          .draw_on_image(image, color=(0, 0, 255)))
+    
+    # 多边形逐个绘制：后一个多边形的内部覆盖前一个多边形的边界
+    result = psoi.draw_on_image(image, color_face=(0, 0, 255), color_lines=(255, 0, 0),
+                                alpha_face=1.0, alpha_points=0)
+    assert np.array_equal(result[35, 40], [0, 0, 255])
+    assert np.array_equal(result[20, 40], [255, 0, 0])
+    expected = np.copy(image)
+    for poly in psoi.polygons:
+        expected = poly.draw_on_image(expected.astype(np.float32), color=(0, 0, 255), alpha=0.5)
+    result = psoi.draw_on_image(image, color=(0, 0, 255), alpha=0.5)
+    assert np.max(np.abs(result.astype(np.int32) - expected)) <= 2
+    psoi_ooi = PolygonsOnImage([Polygon([(100, 100), (120, 100), (120, 120)])], shape=image.shape)
+    try:
+        psoi_ooi.draw_on_image(image, raise_if_out_of_image=True)
+        assert False, "越界的多边形应当报错"
+    except Exception as e:
+        assert "Cannot draw polygon" in str(e)
+    print("✓ 关键点、折线和多边形批量绘制测试通过")
+    
+def test_bulk_out_of_image_clipping():
+    """测试多边形和折线按图像平面批量分类后的裁剪与移除：与逐个计算一致"""
+    print("\n开始测试多边形和折线的批量越界裁剪...")
+    from imgaug.augmentables.lines import LineString, LineStringsOnImage
+    from imgaug.augmentables.polys import Polygon, PolygonsOnImage
+    from imgaug.augmentables.utils import (
+        _classify_coords_by_image_plane, _COORDS_INSIDE, _COORDS_OUTSIDE,
+        _COORDS_CROSSING)
+    
+    shape = (50, 100, 3)
+    inside = Polygon([(10, 10), (10, 40), (60, 40), (60, 10)])  # 顺时针
+    outside = Polygon([(110, 10), (150, 10), (150, 40)])
+    crossing = Polygon([(80, 10), (120, 10), (120, 40), (80, 40)])
+    border = Polygon([(100, 10), (120, 10), (120, 40)])  # 只接触右边界
+    coords = [poly.exterior for poly in [inside, outside, crossing, border]]
+    coords.append(np.zeros((0, 2), dtype=np.float32))
+    assert list(_classify_coords_by_image_plane(coords, shape)) == [
+        _COORDS_INSIDE, _COORDS_OUTSIDE, _COORDS_CROSSING, _COORDS_CROSSING,
+        _COORDS_CROSSING]
+    
+    # 完全在图像内的多边形原样返回，点的顺序不变
+    psoi = PolygonsOnImage([inside, outside, crossing, border], shape=shape)
+    clipped = psoi.deepcopy().clip_out_of_image_()
+    assert len(clipped.polygons) == 2
+    assert np.array_equal(clipped.polygons[0].exterior, inside.exterior)
+    assert np.array_equal(clipped.polygons[1].exterior,
+                          crossing.clip_out_of_image(shape)[0].exterior)
+
+    # 图像内的退化多边形与原实现一样经过shapely：没有面积的被丢弃，重复点被去除
+    collinear = Polygon([(10, 10), (20, 20), (30, 30)])
+    repeated = Polygon([(10, 10), (10, 10), (60, 10), (60, 40), (10, 40)])
+    for degenerate in [collinear, repeated]:
+        bulk = PolygonsOnImage([degenerate], shape=shape).clip_out_of_image_()
+        assert [poly.exterior.tolist() for poly in bulk.polygons] == \
+            [poly.exterior.tolist() for poly in degenerate.clip_out_of_image(shape)]
+    assert collinear.clip_out_of_image(shape) == []
+    assert len(repeated.clip_out_of_image(shape)[0].exterior) == 4
+    for fraction in [0.0, 0.5, 1.0]:
+        result = psoi.deepcopy().remove_out_of_image_fraction_(fraction)
+        expected = [poly for poly in psoi.polygons
+                    if poly.compute_out_of_image_fraction(shape) < fraction]
+        assert [poly.coords_almost_equals(exp) for poly, exp
+                in zip(result.polygons, expected)] == [True] * len(expected)
+        assert len(result.polygons) == len(expected)
+    for fully, partly in [(True, False), (False, True), (True, True)]:
+        result = psoi.deepcopy().remove_out_of_image_(fully, partly)
+        expected = [poly for poly in psoi.polygons
+                    if not poly.is_out_of_image(shape, fully=fully, partly=partly)]
+        assert len(result.polygons) == len(expected)
+    
+    # 折线：与逐条裁剪一致
+    lsoi = LineStringsOnImage([LineString(inside.exterior), LineString(outside.exterior),
+                               LineString(crossing.exterior)], shape=shape)
+    clipped = lsoi.deepcopy().clip_out_of_image_()
+    expected = [part for ls in lsoi.line_strings for part in ls.clip_out_of_image(shape)]
+    assert len(clipped.line_strings) == len(expected)
+    for ls, exp in zip(clipped.line_strings, expected):
+        assert np.allclose(ls.coords, exp.coords)
+    fractions = [ls.compute_out_of_image_fraction(shape) for ls in lsoi.line_strings]
+    assert fractions[0] == 0.0 and fractions[1] == 1.0 and 0.0 < fractions[2] < 1.0
+    assert len(lsoi.deepcopy().remove_out_of_image_fraction_(0.7).line_strings) == 2
+    print("✓ 多边形和折线批量越界裁剪测试通过")
+
+
+def test_coarse_dropout_masks():
+    """测试CoarseDropout直接应用低分辨率掩码、Cutout批量计算矩形：结果与原实现一致"""
+    print("\n开始测试CoarseDropout低分辨率掩码和Cutout批量矩形...")
+    import imgaug as ia
+    from imgaug.augmenters.arithmetic import (
+        MultiplyElementwise, _multiply_elementwise_by_coarse_mask_)
+    
+    # 掩码按最近邻放大后相乘的结果相同，包括逐通道掩码和比图像更大的掩码
+    rng = np.random.RandomState(5)
+    for (h_small, w_small, c_mask), (height, width) in [
+            ((3, 4, 1), (50, 70)), ((7, 5, 3), (64, 64)),
+            ((40, 30, 1), (37, 29)), ((9, 11, 3), (1, 100))]:
+        image = rng.randint(1, 255, (height, width, 3)).astype(np.uint8)
+        mask = rng.randint(0, 2, (h_small, w_small, c_mask))
+        mask_full = ia.imresize_many_images(
+            mask[np.newaxis].astype(np.uint16), (height, width), interpolation="nearest")[0]
+        expected = image * mask_full.astype(bool)
+        result = _multiply_elementwise_by_coarse_mask_(np.copy(image), mask)
+        assert np.array_equal(result, expected)
+    
+    # 增强器：与先放大掩码再相乘的原实现一致
+    images = [rng.randint(1, 255, (rng.randint(20, 120), rng.randint(20, 120), 3)).astype(np.uint8)
+              for _ in range(5)]
+    make_augs = [lambda: iaa.CoarseDropout(0.3, size_px=(2, 9), seed=2),
+                 lambda: iaa.CoarseDropout(0.2, size_percent=0.3, per_channel=0.5, seed=3)]
+    results = [make_aug().augment_images([np.copy(image) for image in images])
+               for make_aug in make_augs]
+    is_coarse_mask_param = MultiplyElementwise.__dict__["_is_coarse_mask_param"]
+    MultiplyElementwise._is_coarse_mask_param = classmethod(lambda cls, param: False)
+    try:
+        expected = [make_aug().augment_images([np.copy(image) for image in images])
+                    for make_aug in make_augs]
+    finally:
+        MultiplyElementwise._is_coarse_mask_param = is_coarse_mask_param
+    for result, exp in zip(results, expected):
+        assert all(np.array_equal(r, e) for r, e in zip(result, exp))
+    assert any(np.any(image == 0) for image in results[0])
+    
+    # Cutout：矩形按图像大小换算并裁剪到图像内，正方形区域使用高度
+    image = np.full((100, 200, 3), 255, dtype=np.uint8)
+    aug = iaa.Cutout(nb_iterations=1, position=(0.5, 0.5), size=0.2, squared=False, cval=0)
+    result = aug.augment_images([image, image[0:50]])
+    assert np.all(result[0][40:60, 80:120] == 0) and np.sum(result[0] == 0) == 20 * 40 * 3
+    assert np.all(result[1][20:30, 80:120] == 0) and np.sum(result[1] == 0) == 10 * 40 * 3
+    aug = iaa.Cutout(nb_iterations=1, position=(1.0, 0.5), size=0.2, squared=True, cval=0)
+    result = aug.augment_image(image)
+    assert np.all(result[40:60, 190:200] == 0) and np.sum(result == 0) == 20 * 10 * 3
+    print("✓ CoarseDropout低分辨率掩码和Cutout批量矩形测试通过")
+
+
+def test_affine_warp_planner():
+    """测试Affine/PerspectiveTransform的cv2后端规划：多通道分块与逐通道结果一致，uint32/int32改用cv2"""
+    print("\n开始测试仿射变换后端规划和多通道分块...")
+    from imgaug.augmenters import geometric
+    
+    # 分块覆盖所有通道，每块最多4个通道，且不出现2通道块（cv2对2通道的插值结果不同）
+    for nb_channels in range(1, 20):
+        chunks = geometric._split_channels_for_cv2(nb_channels)
+        sizes = [end - start for start, end in chunks]
+        assert sum(sizes) == nb_channels and chunks[0][0] == 0
+        assert all(size in [1, 3, 4] for size in sizes)
+    
+    # 多通道图像分块变换的结果与逐通道变换一致
+    rng = np.random.RandomState(7)
+    for dtype in ["uint8", "uint16", "int16", "float32", "float64"]:
+        for nb_channels in [4, 6, 7, 12]:
+            image = (rng.rand(40, 50, nb_channels) * 200).astype(dtype)
+            for order in [0, 1, 3]:
+                aug = iaa.Affine(rotate=20, scale=1.2, order=order, mode="reflect")
+                result = aug(image=image)
+                expected = np.concatenate(
+                    [aug(image=np.ascontiguousarray(image[..., c:c+1])) for c in range(nb_channels)],
+                    axis=-1)
+                assert result.dtype.name == dtype
+                assert np.array_equal(result, expected)
+    
+    # uint32/int32在所有cv2插值阶数下都使用cv2（float64），结果与skimage接近
+    assert geometric._get_cv2_warp_dtype(np.dtype("uint32"), 1).name == "float64"
+    assert geometric._get_cv2_warp_dtype(np.dtype("int8"), 1).name == "int16"
+    assert geometric._get_cv2_warp_dtype(np.dtype("bool"), 0).name == "uint8"
+    assert geometric._get_cv2_warp_dtype(np.dtype("uint64"), 0) is None
+
+    # Affine文档中cv2后端的dtype列表与_get_cv2_warp_dtype一致，每个脚注都被引用
+    import re
+    for order in [0, 1, 3]:
+        block = iaa.Affine.__doc__.split('if (backend="cv2", order=%d):' % order)[1].split("if (")[0]
+        entries = re.findall(r"\* ``(\w+)``: (yes|no)[^(\n]*(?:\((\d)\))?", block)
+        notes = dict(re.findall(r"- \((\d)\) ([^\n]+)", block))
+        assert sorted(set(note for _, _, note in entries if note)) == sorted(notes)
+        for dtype, supported, note in entries:
+            warp_dtype = geometric._get_cv2_warp_dtype(np.dtype(dtype), order) \
+                if dtype != "float128" else None
+            assert (supported == "yes") == (warp_dtype is not None)
+            mapped = re.search(r"mapped internally to ``(\w+)``", notes.get(note, ""))
+            expected_dtype = mapped.group(1) if mapped else dtype
+            assert warp_dtype is None or warp_dtype.name == expected_dtype, (order, dtype)
+    image = np.tile(np.linspace(0, 2 ** 31 - 1, 60)[np.newaxis, :, np.newaxis], (40, 1, 6))
+    for dtype in ["uint32", "int32"]:
+        for order in [0, 1, 3]:
+            arr = image.astype(dtype)
+            result = iaa.Affine(rotate=10, order=order, backend="cv2")(image=arr)
+            expected = iaa.Affine(rotate=10, order=order, backend="skimage")(image=arr)
+            assert result.dtype.name == dtype and result.shape == arr.shape
+            diff = np.abs(result.astype(np.float64) - expected.astype(np.float64))
+            assert np.median(diff) < 2 ** 31 * 1e-3
+    
+    # PerspectiveTransform：多通道分块与逐通道一致，支持uint32/int32
+    image = (rng.rand(40, 50, 6) * 1000).astype(np.uint16)
+    make_aug = lambda: iaa.PerspectiveTransform(scale=0.1, cval=(0, 255), seed=3)
+    result = make_aug()(image=image)
+    expected = np.concatenate(
+        [make_aug()(image=np.ascontiguousarray(image[..., c:c+1])) for c in range(6)], axis=-1)
+    assert np.array_equal(result, expected)
+    result = iaa.PerspectiveTransform(scale=0.1, seed=3)(image=image.astype(np.uint32))
+    assert result.dtype.name == "uint32" and result.shape == image.shape
+    print("✓ 仿射变换后端规划和多通道分块测试通过")
+
+
+def test_intra_batch_threads():
+    """测试批内多线程：开启线程后结果与顺序处理一致，嵌套调用不会死锁"""
+    print("\n开始测试批内多线程处理...")
+    from imgaug import multicore
+    
+    rng = np.random.RandomState(11)
+    images = [(rng.rand(48, 64, 3) * 255).astype(np.uint8) for _ in range(6)]
+    images.append(np.zeros((0, 64, 3), dtype=np.uint8))
+    make_augs = [
+        lambda: iaa.Superpixels(p_replace=0.5, n_segments=(16, 64), seed=1),
+        lambda: iaa.BilateralBlur(d=(1, 7), seed=2),
+        lambda: iaa.Canny(alpha=(0.5, 1.0), seed=3),
+        lambda: iaa.AllChannelsCLAHE(clip_limit=(1, 10), per_channel=True, seed=4),
+        lambda: iaa.CLAHE(seed=5),
+    ]
+    nonempty = images[:-1]
+    for make_aug in make_augs:
+        expected = make_aug()(images=[image.copy() for image in images])
+        for nb_workers in [4, "auto"]:
+            result = make_aug().set_intra_batch_workers(nb_workers)(
+                images=[image.copy() for image in images])
+            assert all(np.array_equal(a, b) for a, b in zip(result, expected))
+    for make_aug in [lambda: iaa.MeanShiftBlur(seed=6), lambda: iaa.Cartoon(seed=7)]:
+        expected = make_aug()(images=[image.copy() for image in nonempty])
+        result = make_aug().set_intra_batch_workers(4)(
+            images=[image.copy() for image in nonempty])
+        assert all(np.array_equal(a, b) for a, b in zip(result, expected))
+    
+    # 全局设置同样生效，CLAHE会把设置传递给内部的AllChannelsCLAHE
+    expected = iaa.Canny(seed=3)(images=nonempty)
+    try:
+        multicore.set_intra_batch_workers("auto")
+        result = iaa.Canny(seed=3)(images=nonempty)
+    finally:
+        multicore.set_intra_batch_workers(1)
+    assert all(np.array_equal(a, b) for a, b in zip(result, expected))
+    assert iaa.CLAHE().set_intra_batch_workers(3).all_channel_clahe._intra_batch_workers == 3
+    
+    # 线程池内部的嵌套调用按顺序执行
+    nested = multicore.map_threaded(
+        lambda i: multicore.map_threaded(lambda j: i * 10 + j, range(3)), range(4))
+    assert nested == [[i * 10 + j for j in range(3)] for i in range(4)]
+    print("✓ 批内多线程处理测试通过")
+
+
+def test_sample_seeds():
+    """测试按样本种子增强：结果与批次划分、样本顺序和进程数无关，与清单的种子派生一致"""
+    print("\n开始测试按样本种子增强...")
+    from imgaug import multicore
+    from imgaug.augmentables.batches import UnnormalizedBatch
+    from batch_manifest import derive_seed, shard_index_of
+    
+    assert multicore.derive_sample_seed(3, "abc", 2) == derive_seed(3, "abc", 2)
+    assert multicore.derive_sample_seed(3, "abc") == derive_seed(3, "abc")
+    assert multicore.derive_sample_seed(3, "abc", 1) != multicore.derive_sample_seed(3, "abc", 2)
+    shards = [shard_index_of("dir/img_%d.png" % i, 3) for i in range(30)]
+    assert set(shards) == {0, 1, 2}
+    assert shards == [shard_index_of("dir/img_%d.png" % i, 3) for i in range(30)]
+    
+    rng = np.random.RandomState(5)
+    images = [(rng.rand(32, 40, 3) * 255).astype(np.uint8) for _ in range(3)]
+    keys = [("sample_%d" % i, j) for i in range(3) for j in range(2)]
+    pipeline = iaa.Sequential([
+        iaa.Affine(rotate=(-20, 20)),
+        iaa.Resize((0.5, 1.5)),
+        iaa.Sometimes(0.5, iaa.Fliplr(1.0)),
+        iaa.AdditiveGaussianNoise(scale=(0, 20))
+    ], random_order=True)
+    
+    def augment(order, batch_size):
+        results = {}
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            batch = UnnormalizedBatch(images=[images[i // 2] for i in rows],
+                                      data=[keys[i] for i in rows])
+            batch = multicore.augment_batch_by_sample_seeds_(pipeline, batch, 7)
+            results.update(zip(batch.data, batch.images_aug))
+        return results
+    
+    expected = augment(list(range(6)), 6)
+    for order, batch_size in [(list(range(6)), 1), ([5, 2, 0, 3, 1, 4], 4)]:
+        result = augment(order, batch_size)
+        assert all(np.array_equal(result[key], expected[key]) for key in keys)
+    # 同一张图像的不同副本使用不同的种子
+    assert not np.array_equal(expected[keys[0]], expected[keys[1]])
+    
+    # 多进程处理的结果与单进程相同
+    batches = [UnnormalizedBatch(images=[images[i // 2] for i in rows], data=[keys[i] for i in rows])
+               for rows in [[4, 0, 1], [5], [2, 3]]]
+    with multicore.Pool(pipeline, processes=2, seed=7, seed_per_sample=True) as pool:
+        batches_aug = pool.map_batches(batches, chunksize=1)
+    result = {key: image for batch in batches_aug for key, image in zip(batch.data, batch.images_aug)}
+    assert all(np.array_equal(result[key], expected[key]) for key in keys)
+    print("✓ 按样本种子增强测试通过")
+
+
+def test_augmenter_factory():
+    """测试GUI与基准测试共用的增强器创建（参数原样传入，无法创建的增强器被报告而不是跳过），以及基准测试的运行和微基准测试注册"""
+    print("\n开始测试增强器创建...")
+    from augmenter_factory import create_augmenter
+    from benchmark_augmenters import (build_inputs, can_measure_rss, check_buildable, compare_with_baseline,
+                                      run_benchmarks)
+    
+    aug = create_augmenter("CLAHE", {"clip_limit": [1, 4], "tile_grid_size": [3, 7]})
+    assert isinstance(aug, iaa.CLAHE)
+    aug = create_augmenter("GaussianBlur", {"sigma": [0.0, 3.0]})
+    assert isinstance(aug, iaa.GaussianBlur)
+    try:
+        create_augmenter("NoSuchAugmenter", {})
+        assert False, "未知的增强器应当报错"
+    except ValueError:
+        pass
+    
+    specs = [("模糊", "GaussianBlur", {"sigma": [0.0, 3.0]}),
+             ("天气效果", "Fog", {"density": [0.0, 0.3]})]
+    buildable, build_errors = check_buildable(specs)
+    assert buildable == specs[0:1]
+    assert [(category, aug_name) for category, aug_name, _ in build_errors] == [("天气效果", "Fog")]
+
+    # 无法创建本身不算退化，只有基准中能运行的增强器变得无法创建时才算
+    baseline = {"results": [{"augmenter": "GaussianBlur", "input": "data_img", "batch_size": 1,
+                             "ms_per_image": 1.0}]}
+    assert compare_with_baseline([], baseline, 1.5, 0.05, build_errors) == []
+    regressions = compare_with_baseline([], baseline, 1.5, 0.05, [("模糊", "GaussianBlur", "TypeError")])
+    assert regressions == [("GaussianBlur", "data_img", 1, 1.0, "TypeError")]
+
+    # data/img中的图像按请求的批大小组成批次
+    inputs = build_inputs([], [1, 16], seed=1, max_batch_mb=1024)
+    assert [(name, batch_size, len(images)) for name, batch_size, images in inputs] == [
+        ("data_img", 1, 1), ("data_img", 16, 16)]
+
+    # 每项测试在子进程中运行并记录其峰值RSS，出错的测试记录错误信息
+    inputs = [("synthetic_64", 2, np.zeros((2, 64, 64, 3), dtype=np.uint8))]
+    results = run_benchmarks(buildable + [("测试", "Resize", {"size": "无效"})], inputs, seed=1, repeats=1)
+    assert results[0]["ms_per_image"] > 0 and results[0]["error"] is None
+    assert results[1]["ms_per_image"] is None and results[1]["error"]
+    if can_measure_rss():
+        assert results[0]["peak_rss_bytes"] > 0
+
+    # 注册的微基准测试自动获得命令行开关，结果保存在报告中与名称相同的键下
+    from benchmark_augmenters import build_report, parse_args
+    from micro_benchmarks import MICRO_BENCHMARKS, register_micro_benchmark, run_micro_benchmarks
+
+    @register_micro_benchmark("test_echo", "测试", "仅用于测试")
+    def _echo(inputs, seed, repeats):
+        return [{"nb_inputs": len(inputs), "seed": seed}]
+
+    try:
+        args = parse_args(["--test-echo", "--import-time"])
+        assert args.test_echo and args.import_time and not args.pooling
+        micro_results = run_micro_benchmarks(["test_echo"], inputs, args.seed, args.repeats)
+        report = build_report(results, args, micro_results=micro_results)
+        assert report["test_echo"] == [{"nb_inputs": 1, "seed": args.seed}]
+    finally:
+        del MICRO_BENCHMARKS["test_echo"]
+    print("✓ 增强器创建测试通过")
+
+
 def main():
     """主测试函数"""
     print("=" * 50)
@@ -173,6 +1477,31 @@ def main():
     test_image_loading()
     test_augmenter_creation()
     test_save_and_load()
+    test_jpeg_batch_compression()
+    test_contrast_equalization()
+    test_augmenter_profiling()
+    test_compiled_sampling_plan()
+    test_pooling_kernels()
+    test_pillike_matches_pil()
+    test_grouped_resize()
+    test_background_debug_images()
+    test_resumable_batch_manifest()
+    test_sharded_output()
+    test_image_discovery()
+    test_preview_engine()
+    test_augment_fast_path()
+    test_batched_box_drawing()
+    test_lazy_imports()
+    test_kmeans_histogram()
+    test_row_mask_execution()
+    test_colormap_luts()
+    test_batched_primitive_drawing()
+    test_bulk_out_of_image_clipping()
+    test_coarse_dropout_masks()
+    test_affine_warp_planner()
+    test_intra_batch_threads()
+    test_sample_seeds()
+    test_augmenter_factory()
     
     print("\n" + "=" * 50)
     print("测试完成！")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+确定性校验工具
+
+按样本种子（基础种子 + 样本ID + 副本序号，见imgaug.multicore.derive_sample_seed）
+增强一组图像，先在当前进程中顺序处理得到参考结果，再用multicore.Pool以不同的
+进程数、批大小和样本顺序重新处理，逐个比较输出的SHA-256校验和。
+校验和可以保存为JSON，在另一台机器（或分片任务的合并结果）上用--compare对比。
+结果不一致时以非零状态码退出；无法按配置创建的增强器会被醒目地列出，但不影响状态码。
+
+用法:
+    python verify_determinism.py                                  # data/img中的图像，1、2、4个进程
+    python verify_determinism.py --input 图像文件夹 --count 5       # 指定输入图像和每张图像的副本数
+    python verify_determinism.py --workers 1 3 8 --batch-sizes 1 7
+    python verify_determinism.py --augmenters Affine GaussianBlur  # 只使用这些增强器
+    python verify_determinism.py --output checksums.json          # 保存参考结果的校验和
+    python verify_determinism.py --compare checksums.json         # 与保存的校验和对比
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# 添加imgaug库路径
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pkg'))
+import imgaug.augmenters as iaa
+from imgaug import multicore
+from imgaug.augmentables.batches import UnnormalizedBatch
+
+from batch_manifest import file_hash
+from augmenter_factory import create_augmenter
+from benchmark_augmenters import DEFAULT_CONFIG, check_buildable, load_augmenter_specs, print_build_errors
+from micro_benchmarks import DATA_IMAGE_DIR
+
+DEFAULT_WORKERS = [1, 2, 4]
+DEFAULT_BATCH_SIZES = [1, 4]
+DEFAULT_COUNT = 3
+
+# 没有输入图像时生成的合成图像数量和边长
+SYNTHETIC_NB_IMAGES = 4
+SYNTHETIC_SIZE = 128
+
+
+def load_samples(input_dir, max_images, seed):
+    """
+    读取输入图像（RGB），样本ID为文件内容哈希；文件夹中没有图像时生成合成图像
+    Returns:
+        [(样本ID, 图像), ...]
+    """
+    samples = []
+    if input_dir is not None and Path(input_dir).is_dir():
+        for image_file in sorted(Path(input_dir).iterdir()):
+            image = cv2.imread(str(image_file))
+            if image is not None:
+                samples.append((file_hash(str(image_file)), cv2.cvtColor(image, cv2.COLOR_BGR2RGB)))
+            if max_images and len(samples) >= max_images:
+                break
+    if not samples:
+        rng = np.random.RandomState(seed)
+        for i in range(SYNTHETIC_NB_IMAGES):
+            image = rng.randint(0, 256, size=(SYNTHETIC_SIZE, SYNTHETIC_SIZE, 3), dtype=np.uint8)
+            samples.append((f"synthetic_{i}", image))
+    return samples
+
+
+def build_pipeline(config_path, names=None):
+    """
+    按配置文件创建增强管道，与GUI相同以随机顺序组合
+    Returns:
+        (增强管道, [(类别, 增强器名称, 错误信息), ...])
+    """
+    specs, build_errors = check_buildable(load_augmenter_specs(config_path, names=names))
+    augmenters = [create_augmenter(aug_name, params) for _, aug_name, params in specs]
+    return iaa.Sequential(augmenters, random_order=True), build_errors
+
+
+def checksum(image):
+    """计算图像（含形状和数据类型）的SHA-256校验和"""
+    digest = hashlib.sha256(f"{image.shape}|{image.dtype.name}|".encode("utf-8"))
+    digest.update(np.ascontiguousarray(image).tobytes())
+    return digest.hexdigest()
+
+
+def _key_text(sample_key):
+    sample_id, variant = sample_key
+    return f"{sample_id}|{variant}"
+
+
+def make_batches(samples, count, batch_size, shuffle_seed=None):
+    """
+    把所有(样本, 副本序号)组合分成批次，batch.data中保存每行的样本键
+    Args:
+        shuffle_seed: 提供时打乱样本顺序，用于验证结果与顺序无关
+    """
+    images = dict(samples)
+    keys = [(sample_id, j) for sample_id, _ in samples for j in range(count)]
+    if shuffle_seed is not None:
+        random.Random(shuffle_seed).shuffle(keys)
+    return [UnnormalizedBatch(images=[images[sample_id] for sample_id, _ in keys[i:i + batch_size]],
+                              data=keys[i:i + batch_size])
+            for i in range(0, len(keys), batch_size)]
+
+
+def _collect_checksums(batches_aug):
+    return {_key_text(sample_key): checksum(image)
+            for batch in batches_aug
+            for sample_key, image in zip(batch.data, batch.images_aug)}
+
+
+def run_reference(pipeline, samples, count, seed):
+    """在当前进程中按样本顺序处理，每个样本一个批次"""
+    batches = make_batches(samples, count, count)
+    return _collect_checksums(
+        multicore.augment_batch_by_sample_seeds_(pipeline, batch, seed) for batch in batches)
+
+
+def run_pool(pipeline, batches, seed, nb_workers):
+    """用multicore.Pool处理，种子只由样本键决定"""
+    with multicore.Pool(pipeline, processes=nb_workers, seed=seed, seed_per_sample=True) as pool:
+        return _collect_checksums(pool.map_batches(batches, chunksize=1))
+
+
+def compare_checksums(expected, actual):
+    """返回校验和不一致或缺失的样本键"""
+    return sorted(key for key in set(expected) | set(actual)
+                  if expected.get(key) != actual.get(key))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="按样本种子增强的确定性校验")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG), help="配置文件路径")
+    parser.add_argument("--augmenters", nargs="+", default=None, help="只使用这些增强器（默认配置中的全部）")
+    parser.add_argument("--input", default=str(DATA_IMAGE_DIR), help="输入图像文件夹，没有图像时使用合成图像")
+    parser.add_argument("--max-images", type=int, default=8, help="最多读取的输入图像数")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT, help="每张图像的增强副本数")
+    parser.add_argument("--seed", type=int, default=42, help="基础随机种子")
+    parser.add_argument("--workers", type=int, nargs="+", default=DEFAULT_WORKERS, help="对比的进程数")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES, help="对比的批大小")
+    parser.add_argument("--output", default=None, help="将参考结果的校验和保存为JSON")
+    parser.add_argument("--compare", default=None, help="与该JSON中保存的校验和对比")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """主函数"""
+    args = parse_args(argv)
+
+    print("=" * 50)
+    print("按样本种子增强的确定性校验")
+    print("=" * 50)
+
+    pipeline, build_errors = build_pipeline(args.config, args.augmenters)
+    if build_errors:
+        print_build_errors(build_errors)
+    samples = load_samples(args.input, args.max_images, args.seed)
+    print(f"共 {len(pipeline)} 个增强器，{len(samples)} 张图像，每张 {args.count} 个副本\n")
+
+    reference = run_reference(pipeline, samples, args.count, args.seed)
+    print(f"参考结果（当前进程顺序处理）: {len(reference)} 个输出")
+
+    nb_failures = 0
+    for nb_workers in args.workers:
+        for batch_size in args.batch_sizes:
+            batches = make_batches(samples, args.count, batch_size,
+                                   shuffle_seed=nb_workers * 1000 + batch_size)
+            mismatches = compare_checksums(reference, run_pool(pipeline, batches, args.seed, nb_workers))
+            status = "✓ 一致" if not mismatches else f"✗ {len(mismatches)} 个输出不一致"
+            print(f"  进程数 {nb_workers}，批大小 {batch_size}: {status}")
+            nb_failures += len(mismatches) > 0
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"seed": args.seed, "checksums": reference}, f, ensure_ascii=False, indent=2)
+        print(f"\n校验和已保存到: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        mismatches = compare_checksums(saved["checksums"], reference)
+        if mismatches:
+            print(f"\n✗ 与 {args.compare} 相比有 {len(mismatches)} 个输出不一致，例如:")
+            for key in mismatches[:10]:
+                print(f"  {key}")
+            nb_failures += 1
+        else:
+            print(f"\n✓ 与 {args.compare} 中的 {len(saved['checksums'])} 个校验和一致")
+
+    if build_errors:
+        print_build_errors(build_errors)
+    if nb_failures:
+        return 1
+    print("\n✓ 所有配置的输出一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())